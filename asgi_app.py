@@ -0,0 +1,819 @@
+"""
+ASGI-Variante des Webhook Receivers (Starlette)
+
+Gleiche Routen und byte-identische JSON-Antworten wie webhook_receiver.py, aber mit
+async Handlern und async HTTP-Clients für HOC, OpenAI und ElevenLabs. Ein Prozess hält
+damit hunderte gleichzeitige Anreicherungen statt 1 Request pro gunicorn Worker.
+
+Prompt-/Variablen-Builder, Caches und Governors werden aus webhook_receiver geteilt.
+
+Start:
+    uvicorn asgi_app:app --host 0.0.0.0 --port $PORT
+"""
+import asyncio
+import json
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import wraps
+from urllib.parse import parse_qsl
+
+import httpx
+from elevenlabs.client import AsyncElevenLabs
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import Response
+from starlette.routing import Match, Route
+
+import http_pool
+import metrics
+import structured_logging
+import timing
+from config import Config
+from rate_limit import GovernorTimeout
+from webhook_receiver import (
+    AI_ALL_VARIABLES_CACHE_NAME,
+    AI_ALL_VARIABLES_PROMPT_VERSION,
+    AI_EXTRACTED_VARIABLES,
+    AI_EXTRACTION_PROMPT_VERSION,
+    AI_VARIABLE_FALLBACKS,
+    PERSONALIZATION_FALLBACK_RESPONSE,
+    _hoc_questionnaire_request,
+    _parse_hoc_questionnaire_response,
+    _store_questionnaire,
+    attach_timings,
+    build_all_variables_request,
+    build_call_started_response,
+    build_extraction_request,
+    build_outbound_call_request,
+    build_personalization_response,
+    build_webrtc_agent_override,
+    build_webrtc_fallback_response,
+    build_webrtc_link_response,
+    active_calls,
+    campaign_generations,
+    check_api_key,
+    clean_ai_value,
+    dial_governor,
+    discard_outbound_call,
+    enqueue_trigger_job,
+    extract_dynamic_variables,
+    get_cached_questionnaire,
+    health_status,
+    is_valid_twilio_request,
+    log_call_dynamic_variables,
+    log_personalization_event,
+    log_trigger_request,
+    lookup_campaign_variables,
+    lookup_llm_result,
+    openai_governor,
+    parse_all_variables_response,
+    precompute_personalization,
+    preregister_outbound_call,
+    record_twilio_status,
+    register_outbound_call,
+    resolve_personalization_candidate,
+    serialize_json_body,
+    store_campaign_variables,
+    store_llm_result,
+    trigger_error_response,
+    twilio_signed_url,
+    validate_trigger_request,
+    wants_async_dispatch,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Async Clients mit eigenem Keep-Alive-Pool (Statistiken unter *-async in den Pool-Statistiken)
+elevenlabs_http_client = http_pool.create_httpx_client(
+    "elevenlabs-async", client_class=httpx.AsyncClient, timeout=240, follow_redirects=True
+)
+async_client = AsyncElevenLabs(
+    api_key=Config.ELEVENLABS_API_KEY,
+    base_url=Config.ELEVENLABS_BASE_URL,
+    httpx_client=elevenlabs_http_client
+)
+
+async_openai_client = AsyncOpenAI(
+    api_key=Config.OPENAI_API_KEY,
+    http_client=http_pool.create_httpx_client("openai-async", client_class=DefaultAsyncHttpxClient)
+)
+
+hoc_client = http_pool.create_httpx_client("hoc-async", client_class=httpx.AsyncClient, timeout=10)
+
+# Laufende HOC-Abrufe pro Kampagne (async Gegenstück zu SingleFlight)
+questionnaire_refreshes = {}
+
+
+# =================================================================
+# Responses (byte-kompatibel zu Flask jsonify)
+# =================================================================
+
+class FlaskJSONResponse(Response):
+    """JSON-Response mit exakt derselben Serialisierung wie Flask jsonify (sortiert, kompakt, ASCII, Newline)"""
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return serialize_json_body(content)
+
+
+def json_response(body, status_code: int = 200, headers: dict = None) -> FlaskJSONResponse:
+    """Erstellt eine JSON-Response wie `jsonify(body), status_code`"""
+    return FlaskJSONResponse(body, status_code=status_code, headers=headers)
+
+
+def require_api_key(handler):
+    """Decorator für API Key Authentifizierung (wie webhook_receiver.require_api_key)"""
+
+    @wraps(handler)
+    async def decorated_handler(request):
+        remote_addr = request.client.host if request.client else None
+        with timing.stage("auth"):
+            error = check_api_key(request.headers.get('Authorization', ''), remote_addr)
+        if error:
+            error_body, status_code = error
+            return json_response(error_body, status_code)
+
+        return await handler(request)
+
+    return decorated_handler
+
+
+def track_timing(name: str):
+    """Decorator für Stage-Timing einer Route (wie webhook_receiver.track_timing)"""
+
+    def decorator(handler):
+        @wraps(handler)
+        async def decorated_handler(request):
+            timer = timing.start_request(name)
+            status_code = 500
+            try:
+                response = await handler(request)
+                status_code = response.status_code
+                response.headers['Server-Timing'] = timer.server_timing_header()
+                return response
+            finally:
+                timing.finish_request(timer, status_code=status_code)
+
+        return decorated_handler
+
+    return decorator
+
+
+class MetricsMiddleware:
+    """ASGI-Middleware für Request-Metriken (Route-Template als Label, wie in der Flask-Variante)"""
+
+    def __init__(self, app, routes: list):
+        self.app = app
+        self.routes = routes
+
+    def route_label(self, scope) -> str:
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started_at = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        route = self.route_label(scope)
+        in_flight = metrics.IN_FLIGHT.labels(route=route)
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            metrics.observe_request(route, scope["method"], status["code"], time.perf_counter() - started_at)
+
+
+# =================================================================
+# Governors (thread-basiert, geteilt mit der Flask-Variante)
+# =================================================================
+
+@asynccontextmanager
+async def governor_slot(governor, key="default", timeout: float = None):
+    """
+    Belegt einen Governor-Slot, ohne den Event Loop zu blockieren
+
+    Das Warten in der Queue läuft im Default-Executor. Wird der Task währenddessen
+    abgebrochen, wird ein doch noch vergebener Slot sofort wieder freigegeben.
+
+    Yields:
+        Wartezeit in der Queue in Sekunden
+    """
+    acquire = asyncio.ensure_future(asyncio.to_thread(governor.acquire, key, timeout))
+    try:
+        wait_seconds = await asyncio.shield(acquire)
+    except asyncio.CancelledError:
+        def release_if_acquired(future):
+            if not future.cancelled() and future.exception() is None:
+                governor.release(key)
+
+        acquire.add_done_callback(release_if_acquired)
+        raise
+
+    try:
+        yield wait_seconds
+    finally:
+        governor.release(key)
+
+
+async def openai_chat_completion(**kwargs):
+    """Async OpenAI Chat-Completion (rate-limitiert über openai_governor)"""
+    async with governor_slot(openai_governor):
+        return await async_openai_client.chat.completions.create(**kwargs)
+
+
+# =================================================================
+# AI-Extraktion
+# =================================================================
+
+async def extract_with_ai(questions: list, variable_name: str) -> str:
+    """
+    Extrahiert eine Dynamic Variable per OpenAI (Fehler werden weitergeworfen)
+
+    Returns:
+        Bereinigter Wert oder ""
+    """
+    request_kwargs = build_extraction_request(questions, variable_name)
+    if request_kwargs is None:
+        return ""
+
+    with timing.stage(f"ai_{variable_name}"):
+        cache_entry, content = lookup_llm_result(request_kwargs, AI_EXTRACTION_PROMPT_VERSION, variable_name, questions)
+        if content is None:
+            content = (await openai_chat_completion(**request_kwargs)).choices[0].message.content
+            store_llm_result(cache_entry, content)
+    result = clean_ai_value(variable_name, content)
+
+    if structured_logging.verbose:
+        logger.info(f"✅ AI-Extraktion für {variable_name}: {result[:50]}...")
+    return result
+
+
+async def extract_variables_concurrently(questions: list, failed: set) -> dict:
+    """
+    Extrahiert alle AI-Variablen gleichzeitig mit Gesamt-Deadline
+    (Fallback-Wert für nicht fertige oder fehlgeschlagene Variablen)
+
+    Returns:
+        Dict {variable_name: Wert} für alle AI_EXTRACTED_VARIABLES
+    """
+    if not questions or not Config.OPENAI_API_KEY:
+        return dict(AI_VARIABLE_FALLBACKS)
+
+    deadline_seconds = Config.AI_EXTRACTION_DEADLINE_SECONDS
+    tasks = {
+        name: asyncio.ensure_future(extract_with_ai(questions, name))
+        for name in AI_EXTRACTED_VARIABLES
+    }
+    _, pending = await asyncio.wait(tasks.values(), timeout=deadline_seconds)
+
+    results = {}
+    for name, task in tasks.items():
+        fallback = AI_VARIABLE_FALLBACKS.get(name, "")
+
+        if task in pending:
+            task.cancel()
+            logger.warning(f"⏱️ AI-Extraktion für {name} hat Deadline ({deadline_seconds}s) überschritten - nutze Fallback")
+            metrics.record_ai_fallback("deadline")
+            results[name] = fallback
+            failed.add(name)
+            continue
+
+        if task.exception() is not None:
+            logger.warning(f"⚠️ AI-Extraktion für {name} fehlgeschlagen: {task.exception()} - nutze Fallback")
+            metrics.record_ai_fallback("error")
+            results[name] = fallback
+            failed.add(name)
+            continue
+
+        results[name] = task.result() or fallback
+
+    return results
+
+
+async def extract_ai_variables(questions: list, failed: set) -> dict:
+    """Extrahiert alle AI-Variablen im konfigurierten Modus (Config.AI_EXTRACTION_MODE)"""
+    if Config.AI_EXTRACTION_MODE != "single":
+        return await extract_variables_concurrently(questions, failed)
+
+    if not questions or not Config.OPENAI_API_KEY:
+        return dict(AI_VARIABLE_FALLBACKS)
+
+    try:
+        if structured_logging.verbose:
+            logger.info(f"🤖 Starte Structured-Output-Extraktion für {len(AI_EXTRACTED_VARIABLES)} Variablen")
+
+        request_kwargs = build_all_variables_request(questions)
+        with timing.stage("ai_all"):
+            cache_entry, content = lookup_llm_result(
+                request_kwargs, AI_ALL_VARIABLES_PROMPT_VERSION, AI_ALL_VARIABLES_CACHE_NAME, questions
+            )
+            if content is not None:
+                return parse_all_variables_response(content)
+            content = (await openai_chat_completion(**request_kwargs)).choices[0].message.content
+
+        results = parse_all_variables_response(content)
+        store_llm_result(cache_entry, content)
+        return results
+
+    except Exception as e:
+        logger.warning(f"⚠️ Structured-Output-Extraktion fehlgeschlagen: {e} - nutze Einzel-Extraktion")
+        return await extract_variables_concurrently(questions, failed)
+
+
+async def extract_campaign_variables(questionnaire: dict, campaign_id: int = None) -> dict:
+    """Liefert die kampagnenweiten AI-Variablen aus dem (geteilten) Campaign-Cache oder per AI"""
+    cache_key, cached = lookup_campaign_variables(questionnaire, campaign_id)
+    if cached is not None:
+        return cached
+
+    failed = set()
+    variables = await extract_ai_variables(questionnaire.get('questions', []), failed)
+    store_campaign_variables(cache_key, variables, failed)
+
+    return variables
+
+
+async def build_dynamic_variables(questionnaire: dict, company_name: str, first_name: str, last_name: str,
+                                  campaign_id: int = None) -> dict:
+    """
+    Extrahiert alle Dynamic Variables: AI-Teil async, Rest über die geteilten Builder
+
+    Returns:
+        Dict mit allen Dynamic Variables für ElevenLabs
+    """
+    campaign_variables = None
+    if questionnaire.get('questions'):
+        campaign_variables = await extract_campaign_variables(questionnaire, campaign_id)
+
+    return extract_dynamic_variables(
+        questionnaire, company_name, first_name, last_name, campaign_id,
+        campaign_variables=campaign_variables
+    )
+
+
+# =================================================================
+# HOC Questionnaire (geteilter Cache, Stale-While-Revalidate)
+# =================================================================
+
+async def _hoc_get(url: str, headers: dict) -> httpx.Response:
+    """GET bei HOC mit Retry (jittered Backoff) auf 429/502/503/504 wie die requests-Session"""
+    for attempt in range(Config.HTTP_RETRY_TOTAL + 1):
+        response = await hoc_client.get(url, headers=headers)
+        if response.status_code not in http_pool.RETRY_STATUS_CODES or attempt == Config.HTTP_RETRY_TOTAL:
+            return response
+        await asyncio.sleep(random.uniform(0, Config.HTTP_RETRY_BACKOFF_FACTOR * (2 ** attempt)))
+
+
+async def _fetch_questionnaire_from_hoc(campaign_id: int, etag: str = None, last_modified: str = None) -> tuple:
+    """
+    Holt den Questionnaire async bei HOC
+
+    Returns:
+        Tuple (questionnaire, validators) wie webhook_receiver._fetch_questionnaire_from_hoc
+    """
+    try:
+        url, headers = _hoc_questionnaire_request(campaign_id, etag, last_modified)
+        if url is None:
+            return {}, {}
+
+        response = await _hoc_get(url, headers)
+        return _parse_hoc_questionnaire_response(campaign_id, response, etag, last_modified)
+
+    except httpx.HTTPStatusError as e:
+        logger.error(f"❌ HTTP Fehler beim Laden des Questionnaires (Campaign {campaign_id}): {e}")
+        logger.error(f"   Status Code: {e.response.status_code}")
+        logger.error(f"   Response: {e.response.text[:200]}")
+        return {}, {}
+    except httpx.HTTPError as e:
+        logger.error(f"❌ Fehler beim Laden des Questionnaires (Campaign {campaign_id}): {e}")
+        return {}, {}
+    except Exception as e:
+        logger.error(f"❌ Unerwarteter Fehler beim Laden des Questionnaires (Campaign {campaign_id}): {e}", exc_info=True)
+        return {}, {}
+
+
+async def _refresh_questionnaire(campaign_id: int, previous: dict = None) -> dict:
+    """Lädt einen Questionnaire bei HOC (ggf. Conditional Request) und aktualisiert den Cache"""
+    generation = campaign_generations.current(campaign_id)
+    questionnaire, validators = await _fetch_questionnaire_from_hoc(
+        campaign_id,
+        etag=previous.get('etag') if previous else None,
+        last_modified=previous.get('last_modified') if previous else None
+    )
+    return _store_questionnaire(campaign_id, previous, questionnaire, validators, generation)
+
+
+def _start_refresh(campaign_id: int, previous: dict = None) -> asyncio.Task:
+    """Startet einen HOC-Abruf für die Kampagne oder liefert den bereits laufenden"""
+    task = questionnaire_refreshes.get(campaign_id)
+    if task is None:
+        task = asyncio.ensure_future(_refresh_questionnaire(campaign_id, previous))
+        questionnaire_refreshes[campaign_id] = task
+        task.add_done_callback(lambda _: questionnaire_refreshes.pop(campaign_id, None))
+    return task
+
+
+async def fetch_questionnaire_context(campaign_id: int, force_refresh: bool = False) -> dict:
+    """
+    Holt den Questionnaire - frisch aus dem Cache, stale mit Hintergrund-Revalidierung,
+    sonst bei HOC (gleichzeitige Abrufe pro Kampagne werden zu einem Request gebündelt)
+
+    Returns:
+        dict mit Questionnaire-Daten (leer bei Fehler)
+    """
+    entry = get_cached_questionnaire(campaign_id)
+
+    if entry is not None and not force_refresh:
+        age = time.monotonic() - entry['fetched_at']
+
+        if age < Config.QUESTIONNAIRE_CACHE_TTL_SECONDS:
+            if structured_logging.verbose:
+                logger.info(f"⚡ Questionnaire-Cache HIT für Campaign {campaign_id} (Alter: {age:.0f}s)")
+            return entry['questionnaire']
+
+        if structured_logging.verbose:
+            logger.info(f"♻️ Questionnaire-Cache STALE für Campaign {campaign_id} (Alter: {age:.0f}s) - revalidiere im Hintergrund")
+        _start_refresh(campaign_id, entry)
+        return entry['questionnaire']
+
+    entry = await asyncio.shield(_start_refresh(campaign_id, entry))
+    return entry['questionnaire'] if entry else {}
+
+
+# =================================================================
+# Dial
+# =================================================================
+
+async def place_outbound_call(agent_phone_number_id: str, to_number: str, dynamic_vars: dict):
+    """
+    Startet einen ElevenLabs Twilio Outbound Call (async, über dial_governor)
+
+    Raises:
+        GovernorTimeout: Dial-Kapazität innerhalb von DIAL_QUEUE_TIMEOUT_SECONDS nicht frei
+    """
+    # Slot pro Nummer: frei nach dem Dial (bzw. beim finalen Twilio-Status, siehe DIAL_HOLD_UNTIL_FINAL_STATUS)
+    acquire = asyncio.ensure_future(asyncio.to_thread(
+        active_calls.acquire, agent_phone_number_id, Config.DIAL_QUEUE_TIMEOUT_SECONDS
+    ))
+    try:
+        slot_id, active_wait = await asyncio.shield(acquire)
+    except asyncio.CancelledError:
+        def release_if_acquired(future):
+            if not future.cancelled() and future.exception() is None:
+                active_calls.release(future.result()[0])
+
+        acquire.add_done_callback(release_if_acquired)
+        raise
+
+    try:
+        remaining = max(0.0, Config.DIAL_QUEUE_TIMEOUT_SECONDS - active_wait)
+        async with governor_slot(dial_governor, agent_phone_number_id, remaining) as wait_seconds:
+            wait_seconds += active_wait
+            timing.record_stage("dial_queue", wait_seconds * 1000)
+            if wait_seconds >= 1:
+                logger.info(f"⏳ Dial für {agent_phone_number_id} {wait_seconds:.1f}s in der Queue gewartet")
+            with timing.stage("dial"):
+                response = await async_client.conversational_ai.twilio.outbound_call(
+                    **build_outbound_call_request(agent_phone_number_id, to_number, dynamic_vars)
+                )
+    except BaseException:
+        active_calls.release(slot_id)
+        raise
+
+    if Config.DIAL_HOLD_UNTIL_FINAL_STATUS:
+        await asyncio.to_thread(active_calls.attach, slot_id, getattr(response, 'call_sid', None))
+    else:
+        await asyncio.to_thread(active_calls.release, slot_id)
+    return response
+
+
+async def dispatch_trigger(params: dict) -> tuple:
+    """
+    Async Gegenstück zu webhook_receiver.dispatch_trigger
+
+    Returns:
+        Tuple (response_body, status_code)
+    """
+    campaign_id = params['campaign_id']
+    company_name = params['company_name']
+    first_name = params['first_name']
+    last_name = params['last_name']
+
+    log_trigger_request(params)
+
+    if structured_logging.verbose:
+        logger.info(f"\n🔄 Lade Questionnaire für Campaign {campaign_id}...")
+    with timing.stage("questionnaire"):
+        questionnaire = await fetch_questionnaire_context(campaign_id)
+
+    if not questionnaire:
+        logger.warning(f"⚠️  Kein Questionnaire gefunden, fahre mit Basis-Prompt fort")
+
+    if params['to_number']:
+        if structured_logging.verbose:
+            logger.info(f"📞 STARTE TWILIO OUTBOUND CALL (mit voller Personalisierung)")
+
+        try:
+            dynamic_vars = await build_dynamic_variables(questionnaire, company_name, first_name, last_name, campaign_id)
+            log_call_dynamic_variables(dynamic_vars)
+            personalization = precompute_personalization(questionnaire, company_name, first_name, last_name, campaign_id)
+
+            # Vor dem Dial registrieren: der Personalization Webhook kann vor der API-Antwort kommen
+            registry_id = await asyncio.to_thread(preregister_outbound_call, campaign_id, company_name, first_name,
+                                                  last_name, params['to_number'], personalization)
+
+            try:
+                response = await place_outbound_call(params['agent_phone_number_id'], params['to_number'], dynamic_vars)
+            except Exception:
+                await asyncio.to_thread(discard_outbound_call, registry_id)
+                raise
+            await asyncio.to_thread(register_outbound_call, campaign_id, company_name, first_name, last_name,
+                                    params['to_number'], response, personalization,
+                                    params['agent_phone_number_id'], registry_id=registry_id)
+
+            return build_call_started_response(params, questionnaire, dynamic_vars, response)
+
+        except GovernorTimeout as capacity_error:
+            logger.warning(f"🚦 Dial-Kapazität erschöpft: {capacity_error}")
+            return trigger_error_response(
+                "Dial capacity exhausted", capacity_error, 503,
+                retry_after_seconds=max(1, int(Config.DIAL_QUEUE_TIMEOUT_SECONDS))
+            )
+
+        except Exception as api_error:
+            logger.error(f"❌ ElevenLabs API Error: {api_error}", exc_info=True)
+            return trigger_error_response("API call failed", api_error)
+
+    if structured_logging.verbose:
+        logger.info(f"🔗 ERSTELLE WEBRTC LINK (Kein to_number vorhanden)")
+
+    try:
+        dynamic_vars_full = await build_dynamic_variables(questionnaire, company_name, first_name, last_name, campaign_id)
+        with timing.stage("link"):
+            return build_webrtc_link_response(params, questionnaire, dynamic_vars_full)
+
+    except Exception as api_error:
+        logger.error(f"❌ WebRTC Link Error: {api_error}", exc_info=True)
+        return trigger_error_response("WebRTC Link creation failed", api_error)
+
+
+# =================================================================
+# Routen
+# =================================================================
+
+@track_timing("trigger-call")
+@require_api_key
+async def trigger_outbound_call(request):
+    """POST /webhook/trigger-call (siehe webhook_receiver.trigger_outbound_call)"""
+    try:
+        with timing.stage("parse"):
+            raw_body = await request.body()
+            if not raw_body:
+                return json_response({
+                    "error": "No JSON data provided",
+                    "message": "Request body is empty"
+                }, 400)
+
+            try:
+                data = json.loads(raw_body.decode('utf-8'))
+                if isinstance(data, str):
+                    data = json.loads(data)
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                logger.error(f"❌ JSON Parse Error: {e}")
+                logger.error(f"Request data: {raw_body[:200]}")
+                return json_response({
+                    "error": "Invalid JSON format",
+                    "message": f"Could not parse JSON: {str(e)}"
+                }, 400)
+
+            if not isinstance(data, dict):
+                logger.error(f"❌ Data is not a dict, type: {type(data)}, value: {data}")
+                return json_response({
+                    "error": "Invalid request format",
+                    "message": f"Request body must be a JSON object (dict), got {type(data).__name__}"
+                }, 400)
+
+            params, error = validate_trigger_request(data)
+            if error:
+                error_body, status_code = error
+                return json_response(error_body, status_code)
+
+        # Async Dispatch läuft über den geteilten Dispatch-Worker-Pool + Job-Store
+        if wants_async_dispatch(data, request.headers.get('Prefer', '')):
+            response_body, status_code = enqueue_trigger_job(params, data.get('callback_url'))
+            return json_response(response_body, status_code)
+
+        response_body, status_code = await dispatch_trigger(params)
+        attach_timings(response_body)
+        if status_code == 503 and 'retry_after_seconds' in response_body:
+            return json_response(response_body, status_code, {"Retry-After": str(response_body['retry_after_seconds'])})
+        return json_response(response_body, status_code)
+
+    except Exception as e:
+        logger.error(f"❌ Fehler beim Call: {e}", exc_info=True)
+
+        return json_response({
+            "status": "error",
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }, 500)
+
+
+@track_timing("create-webrtc-link")
+@require_api_key
+async def create_webrtc_link(request):
+    """POST /webhook/create-webrtc-link (siehe webhook_receiver.create_webrtc_link)"""
+    try:
+        try:
+            data = json.loads(await request.body())
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return json_response({
+                "error": "Invalid request format",
+                "message": "Request body must be a JSON object"
+            }, 400)
+
+        required_fields = ['campaign_id', 'company_name', 'candidate_first_name', 'candidate_last_name']
+        missing = [f for f in required_fields if not data.get(f)]
+        if missing:
+            return json_response({
+                "error": "Missing required fields",
+                "missing": missing
+            }, 400)
+
+        campaign_id = int(data['campaign_id'])
+        company_name = data['company_name']
+        first_name = data['candidate_first_name']
+        last_name = data['candidate_last_name']
+
+        with timing.stage("questionnaire"):
+            questionnaire = await fetch_questionnaire_context(campaign_id)
+        enhanced_prompt, first_message = build_webrtc_agent_override(
+            questionnaire, company_name, first_name, last_name, data.get('override_prompt')
+        )
+
+        try:
+            conversations = async_client.conversational_ai.conversations
+            conv = await conversations.create(
+                agent_id=Config.ELEVENLABS_AGENT_ID,
+                agent_override={
+                    "prompt": {"prompt": enhanced_prompt},
+                    "first_message": first_message
+                }
+            )
+            conversation_id = getattr(conv, 'id', getattr(conv, 'conversation_id', None))
+            if not hasattr(conversations, 'get_signed_url'):
+                raise AttributeError('get_signed_url not available')
+
+            signed_result = await conversations.get_signed_url(conversation_id=conversation_id)
+            return json_response({
+                "status": "success",
+                "conversation_id": conversation_id,
+                "signed_url": getattr(signed_result, 'url', signed_result),
+                "questionnaire_loaded": bool(questionnaire),
+                "timestamp": datetime.now().isoformat()
+            }, 200)
+        except Exception:
+            return json_response(build_webrtc_fallback_response(questionnaire, company_name, first_name, last_name), 200)
+    except Exception as e:
+        return json_response({
+            "status": "error",
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }, 500)
+
+
+@track_timing("twilio-personalization")
+@require_api_key
+async def twilio_personalization(request):
+    """POST /webhook/twilio-personalization (siehe webhook_receiver.twilio_personalization)"""
+    try:
+        data = json.loads(await request.body())
+        if structured_logging.verbose:
+            logger.info(f"🔔 TWILIO PERSONALIZATION WEBHOOK AUFGERUFEN")
+            logger.info(f"📥 Empfangene Daten: {json.dumps(data, indent=2)}")
+
+        candidate = resolve_personalization_candidate(data)
+        if candidate is None:
+            return json_response(PERSONALIZATION_FALLBACK_RESPONSE, 200)
+        campaign_id = candidate['campaign_id']
+
+        if structured_logging.verbose:
+            logger.info(f"📞 Anruf von: {data.get('caller_id')}")
+            logger.info(f"📋 Campaign ID: {campaign_id}")
+        else:
+            log_personalization_event(data, candidate)
+
+        if candidate['personalization'] is not None:
+            return Response(candidate['personalization'], status_code=200, media_type="application/json")
+
+        with timing.stage("questionnaire"):
+            questionnaire = await fetch_questionnaire_context(campaign_id)
+
+        with timing.stage("context"):
+            response_data = build_personalization_response(
+                questionnaire, candidate['company_name'], candidate['first_name'], candidate['last_name'], campaign_id
+            )
+
+        return json_response(response_data, 200)
+
+    except Exception as e:
+        logger.error(f"❌ Fehler in Twilio Personalization: {e}", exc_info=True)
+
+        # Fallback: Minimale Response
+        return json_response(PERSONALIZATION_FALLBACK_RESPONSE, 200)
+
+
+async def twilio_status(request):
+    """POST /webhook/twilio-status (Twilio Status Callback, form-encoded, nur mit gültiger X-Twilio-Signature)"""
+    data = dict(parse_qsl((await request.body()).decode('utf-8')))
+    url = twilio_signed_url(str(request.url), request.headers.get('X-Forwarded-Proto'))
+    if not is_valid_twilio_request(url, data, request.headers.get('X-Twilio-Signature', '')):
+        logger.warning(f"🚫 Twilio Status Callback ohne gültige Signatur abgelehnt "
+                       f"(von {request.client.host if request.client else 'unknown'})")
+        return json_response({"status": "error", "error": "Invalid Twilio signature"}, 403)
+
+    try:
+        logger.info(f"📞 Twilio Status Update: {data.get('CallStatus', 'unknown')} (Call SID: {data.get('CallSid', 'unknown')})")
+        await asyncio.to_thread(record_twilio_status, data)
+
+        return json_response({"status": "received"}, 200)
+    except Exception as e:
+        logger.error(f"❌ Fehler in Twilio Status: {e}")
+        return json_response({"status": "error"}, 200)
+
+
+async def health_check(request):
+    """GET /webhook/health"""
+    return json_response(health_status(), 200)
+
+
+async def test_questionnaire_fetch(request):
+    """GET /webhook/test-questionnaire/{campaign_id} (?refresh=1 umgeht den Cache)"""
+    campaign_id = request.path_params['campaign_id']
+    force_refresh = request.query_params.get('refresh', '').lower() in ('1', 'true', 'yes')
+    questionnaire = await fetch_questionnaire_context(campaign_id, force_refresh=force_refresh)
+
+    if questionnaire:
+        return json_response({
+            "status": "success",
+            "campaign_id": campaign_id,
+            "questionnaire": questionnaire
+        }, 200)
+
+    return json_response({
+        "status": "error",
+        "campaign_id": campaign_id,
+        "message": "Questionnaire not found or error fetching"
+    }, 404)
+
+
+async def metrics_endpoint(request):
+    """GET /metrics (Prometheus, siehe metrics.py)"""
+    payload, content_type = metrics.render()
+    return Response(payload, status_code=200, headers={"Content-Type": content_type})
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Schließt die async HTTP-Clients beim Shutdown"""
+    yield
+    await hoc_client.aclose()
+    await async_openai_client.close()
+    await elevenlabs_http_client.aclose()
+
+
+routes = [
+    Route('/webhook/trigger-call', trigger_outbound_call, methods=['POST']),
+    Route('/webhook/create-webrtc-link', create_webrtc_link, methods=['POST']),
+    Route('/webhook/twilio-personalization', twilio_personalization, methods=['POST']),
+    Route('/webhook/twilio-status', twilio_status, methods=['POST']),
+    Route('/webhook/health', health_check, methods=['GET']),
+    Route('/webhook/test-questionnaire/{campaign_id:int}', test_questionnaire_fetch, methods=['GET']),
+    Route('/metrics', metrics_endpoint, methods=['GET']),
+]
+
+app = Starlette(
+    routes=routes,
+    middleware=[Middleware(MetricsMiddleware, routes=routes)],
+    lifespan=lifespan
+)
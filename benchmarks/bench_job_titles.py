@@ -0,0 +1,126 @@
+"""
+Micro-Benchmark und Golden-File-Check für job_titles.make_gender_neutral_job_title
+
+    python benchmarks/bench_job_titles.py            # Check + Benchmark
+    python benchmarks/bench_job_titles.py --check    # nur Golden-Corpus prüfen (Exit-Code 1 bei Abweichung)
+"""
+import argparse
+import os
+import sys
+import timeit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from job_titles import JobTitleNormalizer  # noqa: E402
+
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "job_titles_golden.tsv")
+
+
+def load_golden(path: str = GOLDEN_PATH) -> list:
+    """Liest (Eingabe, Erwartet) Paare aus der TSV-Datei"""
+    cases = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line or line.startswith("#"):
+                continue
+            job_title, expected = line.split("\t")
+            cases.append((job_title, expected))
+    return cases
+
+
+def check(normalizer: JobTitleNormalizer, cases: list) -> int:
+    """Vergleicht alle Fälle mit der erwarteten Ausgabe; liefert die Anzahl Abweichungen"""
+    failures = 0
+    for job_title, expected in cases:
+        actual = normalizer.normalize(job_title)
+        if actual != expected:
+            failures += 1
+            print(f"❌ {job_title!r}: erwartet {expected!r}, erhalten {actual!r}")
+    print(f"{'✅' if not failures else '❌'} {len(cases) - failures}/{len(cases)} Golden-Fälle korrekt")
+    return failures
+
+
+def legacy_make_gender_neutral_job_title(job_title: str) -> str:
+    """Vorherige Implementierung (Referenz für den Benchmark: dict-Scan + 10 re.sub Pässe)"""
+    if not job_title:
+        return ""
+    job_title = job_title.strip()
+    gender_neutral_mapping = {
+        "pflegefachfrau/-mann": "Pflegefachkraft",
+        "pflegefachfrau": "Pflegefachkraft",
+        "pflegefachmann": "Pflegefachkraft",
+        "krankenschwester": "Pflegefachkraft",
+        "krankenpfleger": "Pflegefachkraft",
+        "krankenschwester/-pfleger": "Pflegefachkraft",
+        "krankenpfleger/in": "Pflegefachkraft",
+        "gesundheits- und krankenpfleger/in": "Pflegefachkraft",
+        "gesundheits- und krankenpfleger": "Pflegefachkraft",
+        "erzieher/in": "Erzieher",
+        "erzieher*in": "Erzieher",
+        "erzieher:in": "Erzieher",
+        "erzieherin": "Erzieher",
+        "sozialpädagoge/in": "Sozialpädagogische Fachkraft",
+        "sozialpädagogin": "Sozialpädagogische Fachkraft",
+        "sozialpädagoge": "Sozialpädagogische Fachkraft",
+        "arzthelfer/in": "Medizinische Fachangestellte",
+        "arzthelferin": "Medizinische Fachangestellte",
+        "arzthelfer": "Medizinische Fachangestellte",
+        "mfa": "Medizinische Fachangestellte",
+        "leitungsfachkraft": "Leitungskraft",
+        "leitungsfachfrau/-mann": "Leitungskraft",
+    }
+    job_lower = job_title.lower()
+    for gendered, neutral in gender_neutral_mapping.items():
+        if gendered in job_lower or job_lower == gendered:
+            return neutral
+    import re
+    result = re.sub(r'[-/]\s*(frau|mann|in)', '', job_title, flags=re.IGNORECASE)
+    result = re.sub(r'[*:]\s*in', '', result, flags=re.IGNORECASE)
+    result = re.sub(r'\(frau/-mann\)', '', result, flags=re.IGNORECASE)
+    result = re.sub(r'\(-frau/-mann\)', '', result, flags=re.IGNORECASE)
+    result = re.sub(r'frau$', '', result, flags=re.IGNORECASE)
+    result = re.sub(r'mann$', '', result, flags=re.IGNORECASE)
+    result = re.sub(r'in$', '', result, flags=re.IGNORECASE)
+    result = re.sub(r'\s+', ' ', result)
+    result = re.sub(r'-\s*-', '-', result)
+    result = result.strip(' -')
+    return result or "Fachkraft"
+
+
+def bench(name: str, func, titles: list, repeat: int, number: int) -> float:
+    """Misst die Zeit pro Titel (bestes von repeat Läufen) in Mikrosekunden"""
+    timer = timeit.Timer(lambda: [func(title) for title in titles])
+    best = min(timer.repeat(repeat=repeat, number=number))
+    per_title_us = best / (number * len(titles)) * 1e6
+    print(f"  {name:<10} {per_title_us:8.2f} µs/Titel")
+    return per_title_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Golden-Check und Micro-Benchmark für Job-Titel")
+    parser.add_argument("--check", action="store_true", help="Nur Golden-Corpus prüfen")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    normalizer = JobTitleNormalizer()
+    cases = load_golden()
+    failures = check(normalizer, cases)
+    if args.check:
+        sys.exit(1 if failures else 0)
+
+    titles = [job_title for job_title, _ in cases]
+    changed = sum(legacy_make_gender_neutral_job_title(title) != expected for title, expected in cases)
+    print(f"\n⏱️  {len(titles)} Titel × {args.number} ({changed} Fälle weichen von der alten Implementierung ab)")
+    legacy = bench("legacy", legacy_make_gender_neutral_job_title, titles, args.repeat, args.number)
+    current = bench("trie", normalizer.normalize, titles, args.repeat, args.number)
+    print(f"  Speedup: {legacy / current:.1f}x")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Korrektheits-Check, Fuzzing und Benchmark für json_recovery.recover_json
+
+Der Corpus wird generiert: gültige HOC-Responses (rein, in <script>, in HTML-Text)
+sowie pathologische HTML-Seiten (offene <script> Tags, tausende "<", tief
+verschachtelte Klammern, riesiges CSS), an denen die alte Regex-Variante
+quadratisch lief oder mit RecursionError abbrach.
+
+    python benchmarks/bench_json_recovery.py --check     # Corpus prüfen (Exit-Code 1 bei Abweichung)
+    python benchmarks/bench_json_recovery.py --fuzz 2000 # zufällige Mutationen (keine Exception, Zeitbudget)
+    python benchmarks/bench_json_recovery.py             # Check + Benchmark gegen die alte Implementierung
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import json_recovery  # noqa: E402
+from fake_upstreams import SAMPLE_QUESTIONS  # noqa: E402
+
+
+QUESTIONNAIRE = {"campaign_id": 4711, "campaign_name": "Benchmark-Kampagne", "questions": SAMPLE_QUESTIONS}
+PAYLOAD = json.dumps(QUESTIONNAIRE, ensure_ascii=False)
+
+# Zeitbudget + Toleranz für Fuzzing (Scheduler-Jitter)
+BUDGET_SLACK_SECONDS = 0.05
+
+
+def build_corpus(scale: int = 1) -> list:
+    """
+    Erzeugt den Corpus
+
+    Args:
+        scale: Multiplikator für die Größe der pathologischen Fälle
+
+    Returns:
+        Liste von (Name, Text, erwartete Strategie, erwartet questions gefunden)
+    """
+    n = 2000 * scale
+    css = "".join(f".c{i} {{ color: #{i % 999:03d}; margin: 0 }}\n" for i in range(n // 4))
+    return [
+        ("plain", PAYLOAD, json_recovery.STRATEGY_DIRECT, True),
+        ("empty", "  \n", json_recovery.STRATEGY_EMPTY, False),
+        ("script_assignment", f"<html><script>window.__DATA__ = {PAYLOAD};</script></html>",
+         json_recovery.STRATEGY_SCRIPT, True),
+        ("script_after_analytics", f'<script>track({{"event": "view"}})</script><SCRIPT type="x">{PAYLOAD}</SCRIPT>',
+         json_recovery.STRATEGY_SCRIPT, True),
+        # "İ".lower() ist zwei Zeichen lang: Offsets müssen sich auf den Originaltext beziehen
+        ("script_after_dotted_i", f'<title>{"İstanbul İzmir " * 8}</title><script>var d = {PAYLOAD};</script>',
+         json_recovery.STRATEGY_SCRIPT, True),
+        ("pre_block", f"<html><body><h1>Export</h1><pre>{PAYLOAD}</pre></body></html>",
+         json_recovery.STRATEGY_EMBEDDED, True),
+        ("text_prefix", f"Antwort der API: {PAYLOAD} -- Ende", json_recovery.STRATEGY_EMBEDDED, True),
+        ("css_then_payload", f"<style>{css}</style><pre>{PAYLOAD}</pre>", json_recovery.STRATEGY_EMBEDDED, True),
+        ("error_page", "<html><head><title>502 Bad Gateway</title></head><body>nginx</body></html>",
+         json_recovery.STRATEGY_FAILED, False),
+        ("unclosed_scripts", "<script>" * n, json_recovery.STRATEGY_FAILED, False),
+        ("many_scripts_no_json", "<script>var a = 1;</script>" * n, json_recovery.STRATEGY_FAILED, False),
+        ("many_lt", "<" * (10 * n), json_recovery.STRATEGY_FAILED, False),
+        ("brace_soup", "{" * (10 * n), json_recovery.STRATEGY_FAILED, False),
+        ("quoted_brace_soup", '{"' * (5 * n), json_recovery.STRATEGY_FAILED, False),
+        ("deeply_nested", '{"a":[' * (5 * n), json_recovery.STRATEGY_TIMEOUT, False),
+        ("too_large", "<html>" + "x" * (json_recovery.Config.HOC_JSON_RECOVERY_MAX_BYTES + 1),
+         json_recovery.STRATEGY_TOO_LARGE, False),
+    ]
+
+
+def check(corpus: list) -> int:
+    """Prüft Strategie, Ergebnis und Zeitbudget aller Fälle; liefert die Anzahl Abweichungen"""
+    limit_ms = (json_recovery.Config.HOC_JSON_RECOVERY_TIME_BUDGET_SECONDS + BUDGET_SLACK_SECONDS) * 1000
+    failures = 0
+    for name, text, expected_strategy, expects_questions in corpus:
+        started = time.perf_counter()
+        data, strategy = json_recovery.recover_json(text)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        found = data.get("questions") == SAMPLE_QUESTIONS if isinstance(data, dict) else False
+        ok = strategy == expected_strategy and found == expects_questions and elapsed_ms <= limit_ms
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {name:<24} {len(text):>9} Zeichen  {strategy:<10} {elapsed_ms:8.2f} ms"
+              + ("" if ok else f"  (erwartet {expected_strategy}, questions={expects_questions})"))
+    print(f"{'✅' if not failures else '❌'} {len(corpus) - failures}/{len(corpus)} Fälle korrekt")
+    return failures
+
+
+def mutate(rng: random.Random, text: str) -> str:
+    """Zufällige Mutation: Zeichen löschen/duplizieren, Tags und Klammern einstreuen"""
+    fragments = ["{", "}", "[", "]", '"', "<script>", "</script>", "<", ">", "\\", ":", ","]
+    chars = list(text)
+    for _ in range(rng.randint(1, 20)):
+        position = rng.randrange(len(chars) + 1)
+        action = rng.random()
+        if action < 0.3 and chars:
+            del chars[min(position, len(chars) - 1)]
+        elif action < 0.5:
+            chars[position:position] = list(text[position:position + rng.randint(1, 200)])
+        else:
+            chars[position:position] = list(rng.choice(fragments) * rng.randint(1, 500))
+    return "".join(chars)
+
+
+def fuzz(iterations: int, seed: int) -> int:
+    """Mutiert die Corpus-Fälle; liefert die Anzahl Fälle mit Exception oder überschrittenem Zeitbudget"""
+    rng = random.Random(seed)
+    seeds = [text for _, text, _, _ in build_corpus() if len(text) < 100_000]
+    limit = json_recovery.Config.HOC_JSON_RECOVERY_TIME_BUDGET_SECONDS + BUDGET_SLACK_SECONDS
+    failures = 0
+    slowest = 0.0
+    strategies = {}
+
+    for i in range(iterations):
+        text = mutate(rng, rng.choice(seeds))
+        started = time.perf_counter()
+        try:
+            _, strategy = json_recovery.recover_json(text)
+        except Exception as e:
+            failures += 1
+            print(f"❌ Iteration {i}: {type(e).__name__}: {e}")
+            continue
+        elapsed = time.perf_counter() - started
+        slowest = max(slowest, elapsed)
+        strategies[strategy] = strategies.get(strategy, 0) + 1
+        if elapsed > limit:
+            failures += 1
+            print(f"❌ Iteration {i}: {elapsed * 1000:.0f} ms > Budget ({len(text)} Zeichen)")
+
+    print(f"{'✅' if not failures else '❌'} Fuzzing: {iterations} Eingaben, {failures} Fehler, "
+          f"langsamste {slowest * 1000:.1f} ms, Strategien {strategies}")
+    return failures
+
+
+def legacy_parse_json_response(response_text: str) -> dict:
+    """Vorherige Implementierung (Referenz: lazy <script> Regex + verschachtelter Klammer-Regex)"""
+    if not response_text or not response_text.strip():
+        return {}
+    try:
+        return json.loads(response_text)
+    except json.JSONDecodeError:
+        pass
+    script_pattern = r'<script[^>]*>.*?(\{.*?\}).*?</script>'
+    matches = re.findall(script_pattern, response_text, re.DOTALL | re.IGNORECASE)
+    for match in matches:
+        try:
+            return json.loads(match)
+        except json.JSONDecodeError:
+            continue
+    cleaned = re.sub(r'<[^>]+>', '', response_text)
+    cleaned = cleaned.strip()
+    json_pattern = r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}'
+    json_matches = re.findall(json_pattern, cleaned, re.DOTALL)
+    for json_str in json_matches:
+        try:
+            parsed = json.loads(json_str)
+            if isinstance(parsed, dict) and 'questions' in parsed:
+                return parsed
+        except json.JSONDecodeError:
+            continue
+    return {}
+
+
+def bench(corpus: list) -> None:
+    """Vergleicht die Laufzeit pro Fall mit der alten Implementierung"""
+    print(f"\n⏱️  {'Fall':<24} {'legacy':>12} {'recovery':>12}")
+    for name, text, _, _ in corpus:
+        timings = []
+        for func in (legacy_parse_json_response, json_recovery.recover_json):
+            started = time.perf_counter()
+            try:
+                func(text)
+                timings.append(f"{(time.perf_counter() - started) * 1000:9.2f} ms")
+            except Exception as e:
+                timings.append(f"{type(e).__name__[:12]:>12}")
+        print(f"   {name:<24} {timings[0]:>12} {timings[1]:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check, Fuzzing und Benchmark für die HOC JSON-Recovery")
+    parser.add_argument("--check", action="store_true", help="Nur Corpus prüfen")
+    parser.add_argument("--fuzz", type=int, default=0, metavar="N", help="N zufällige Mutationen prüfen")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scale", type=int, default=1, help="Größe der pathologischen Fälle")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.scale)
+    failures = check(corpus)
+    if args.fuzz:
+        failures += fuzz(args.fuzz, args.seed)
+    if not args.check and not args.fuzz:
+        bench(corpus)
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
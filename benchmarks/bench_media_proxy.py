@@ -0,0 +1,199 @@
+"""
+Benchmark des Media-Stream Proxys: zusätzliche Latenz pro Frame und Calls pro CPU-Kern
+
+Startet den Fake-ElevenLabs-Agent und media_proxy.py als eigene Prozesse und lässt N
+gleichzeitige Fake-Twilio-Calls (20-ms-Frames, Echo vom Agent) laufen:
+
+1. Baseline: Calls direkt gegen den Fake-Agent (ohne Proxy)
+2. Proxy: dieselben Calls über media_proxy.py (mit Session und Prompt-Override)
+
+Zusätzliche Latenz = Round-Trip über den Proxy minus Baseline (zwei Hops mehr pro
+Frame: Twilio → Proxy → Agent und zurück). Calls pro Kern aus der CPU-Zeit des
+Proxy-Prozesses (GET /health) während der Messung.
+
+    python benchmarks/bench_media_proxy.py                         # 100 Calls, 10 s
+    python benchmarks/bench_media_proxy.py --calls 300 --duration 20 --output media_proxy.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+from fake_media_peers import run_twilio_call  # noqa: E402
+from twilio.request_validator import RequestValidator  # noqa: E402
+
+# Auth Token nur für den Benchmark-Proxy (Handshake-Signatur wie von Twilio)
+BENCH_AUTH_TOKEN = "bench-auth-token"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get_json(url: str) -> dict:
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def wait_for(url: str, timeout: float = 15) -> dict:
+    deadline = time.time() + timeout
+    while True:
+        try:
+            return get_json(url)
+        except OSError:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else float("nan")
+
+
+async def run_calls(url: str, calls: int, frames: int, frame_interval: float, session_ids: list = None,
+                    direct: bool = False, headers: dict = None) -> tuple:
+    """Startet alle Calls gleichzeitig (leicht versetzt wie echte Anrufe); liefert (Latenzen, Ergebnisse)"""
+    latencies = []
+
+    async def call(index):
+        await asyncio.sleep(index * frame_interval / max(calls, 1))
+        return await run_twilio_call(url, index, frames, frame_interval, latencies,
+                                     session_id=session_ids[index] if session_ids else None, direct=direct,
+                                     headers=headers)
+
+    results = await asyncio.gather(*(call(i) for i in range(calls)), return_exceptions=True)
+    return latencies, results
+
+
+def summarize(name: str, latencies: list, results: list) -> dict:
+    failed = [r for r in results if isinstance(r, Exception)]
+    sent = sum(r["sent"] for r in results if isinstance(r, dict))
+    received = sum(r["received"] for r in results if isinstance(r, dict))
+    summary = {
+        "frames_sent": sent,
+        "frames_received": received,
+        "failed_calls": len(failed),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p90_ms": round(percentile(latencies, 90), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(max(latencies), 3) if latencies else None,
+    }
+    print(f"  {name:<9} RTT p50 {summary['p50_ms']:7.2f} ms   p90 {summary['p90_ms']:7.2f} ms   "
+          f"p99 {summary['p99_ms']:7.2f} ms   Frames {received}/{sent}"
+          + (f"   ❌ {len(failed)} Calls fehlgeschlagen ({failed[0]!r})" if failed else ""))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latenz und Calls pro Kern des Media-Stream Proxys")
+    parser.add_argument("--calls", type=int, default=100, help="Gleichzeitige Calls")
+    parser.add_argument("--duration", type=float, default=10, help="Gesprächsdauer in Sekunden")
+    parser.add_argument("--frame-ms", type=float, default=20, help="Frame-Abstand (Twilio: 20 ms)")
+    parser.add_argument("--buffer-frames", type=int, default=50, help="MEDIA_PROXY_BUFFER_FRAMES")
+    parser.add_argument("--output", help="Ergebnis als JSON speichern")
+    args = parser.parse_args()
+
+    frame_interval = args.frame_ms / 1000
+    frames = int(args.duration / frame_interval)
+
+    db_path = os.path.join(tempfile.mkdtemp(), "bench_media_proxy.db")
+    agent_port, proxy_port = free_port(), free_port()
+    env = dict(os.environ, LOCAL_DB_PATH=db_path, SESSION_STORE_BACKEND="sqlite", ELEVENLABS_API_KEY="",
+               ELEVENLABS_CONVAI_WS_URL=f"ws://127.0.0.1:{agent_port}/v1/convai/conversation",
+               MEDIA_PROXY_BUFFER_FRAMES=str(args.buffer_frames), LOG_MODE="structured",
+               TWILIO_AUTH_TOKEN=BENCH_AUTH_TOKEN, MEDIA_PROXY_URL=f"ws://127.0.0.1:{proxy_port}/media-stream",
+               MEDIA_PROXY_ALLOWED_AGENT_IDS="agent_bench")
+    os.environ.update(env)
+
+    from session_store import create_session_store  # noqa: E402 (liest LOCAL_DB_PATH beim Import)
+
+    # Sessions wie TwilioElevenLabsIntegration.initiate_call_with_elevenlabs
+    sessions = create_session_store()
+    prompt = "Du bist Recruiterin und führst ein telefonisches Vorqualifizierungsgespräch. " * 100
+    session_ids = [sessions.create({"enhanced_prompt": f"{prompt}Kandidat {i}", "first_message": f"Hallo {i}"})
+                   for i in range(args.calls)]
+
+    agent = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, "fake_media_peers.py"), "--port", str(agent_port)],
+                             env=env, stdout=subprocess.PIPE, text=True)
+    proxy = subprocess.Popen([sys.executable, os.path.join(REPO_ROOT, "media_proxy.py"),
+                              "--host", "127.0.0.1", "--port", str(proxy_port)],
+                             env=env, cwd=REPO_ROOT, stderr=subprocess.DEVNULL)
+    try:
+        agent.stdout.readline()
+        health_url = f"http://127.0.0.1:{proxy_port}/health"
+        wait_for(health_url)
+
+        print(f"⏱️  {args.calls} gleichzeitige Calls, {args.duration:.0f} s, {frames} Frames pro Call und Richtung")
+        if (os.cpu_count() or 1) < 3:
+            print("⚠️  Weniger als 3 Kerne: Client, Agent und Proxy teilen sich die CPU - Latenzen sind Obergrenzen")
+        baseline = summarize("direkt", *asyncio.run(run_calls(
+            f"ws://127.0.0.1:{agent_port}/v1/convai/conversation", args.calls, frames, frame_interval, direct=True
+        )))
+
+        before = get_json(health_url)
+        started = time.perf_counter()
+        # Handshake wie von Twilio signiert (der Proxy prüft X-Twilio-Signature)
+        proxy_url = f"ws://127.0.0.1:{proxy_port}/media-stream"
+        signature = RequestValidator(BENCH_AUTH_TOKEN).compute_signature(proxy_url, {})
+        latencies, results = asyncio.run(run_calls(
+            proxy_url, args.calls, frames, frame_interval, session_ids, headers={"X-Twilio-Signature": signature}
+        ))
+        wall = time.perf_counter() - started
+        after = get_json(health_url)
+        proxied = summarize("Proxy", latencies, results)
+        agent_stats = get_json(f"http://127.0.0.1:{agent_port}/stats")
+    finally:
+        proxy.terminate()
+        agent.terminate()
+        proxy.wait()
+        agent.wait()
+
+    cpu = after["cpu_seconds"] - before["cpu_seconds"]
+    utilization = cpu / wall
+    calls_per_core = args.calls / utilization if utilization else float("inf")
+    added = {pct: round(proxied[f"p{pct}_ms"] - baseline[f"p{pct}_ms"], 3) for pct in (50, 90, 99)}
+
+    print(f"  Zusätzliche Latenz pro Frame (Round-Trip): p50 {added[50]:.2f} ms   p90 {added[90]:.2f} ms   "
+          f"p99 {added[99]:.2f} ms")
+    print(f"  Proxy-CPU: {cpu:.2f} s in {wall:.1f} s ({utilization * 100:.0f}% eines Kerns) "
+          f"→ ~{calls_per_core:.0f} Calls pro Kern")
+    print(f"  Backpressure-Wartefälle: {after['backpressure_waits'] - before['backpressure_waits']}, "
+          f"Fehler: {after['errors'] - before['errors']}, Overrides beim Agent: {agent_stats['overrides']}/{args.calls}")
+
+    result = {
+        "config": {"calls": args.calls, "duration": args.duration, "frame_ms": args.frame_ms,
+                   "buffer_frames": args.buffer_frames},
+        "baseline": baseline,
+        "proxy": proxied,
+        "added_latency_ms": {f"p{pct}": value for pct, value in added.items()},
+        "proxy_cpu_seconds": round(cpu, 3),
+        "proxy_core_utilization": round(utilization, 3),
+        "calls_per_core": round(calls_per_core),
+        "proxy_stats": after,
+        "agent_stats": agent_stats,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+    ok = not proxied["failed_calls"] and proxied["frames_received"] == proxied["frames_sent"] \
+        and agent_stats["overrides"] == args.calls
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Latenz des Twilio Personalization Webhooks: vorberechnete Antwort vs. Live-Aufbau
+
+Registriert Calls wie beim Trigger (inkl. vorberechneter Antwort in der Call-Registry)
+und misst POST /webhook/twilio-personalization im Prozess (Flask Test-Client, ohne
+Netzwerk). Der Live-Pfad läuft einmal mit gecachtem Questionnaire (bester Fall ohne
+HOC) und einmal mit leerem Questionnaire-Cache (HOC-Abruf mit --hoc-latency-ms).
+
+    python benchmarks/bench_personalization.py                      # Vergleich + p99-Ziel prüfen
+    python benchmarks/bench_personalization.py --requests 5000 --target-p99-ms 3
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_upstreams import FakeService, FakeUpstreams  # noqa: E402
+
+
+CAMPAIGN_ID = 4711
+COMPANY_NAME = "Beispiel GmbH"
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def measure(client, headers: dict, calls: list, requests: int, before=None) -> tuple:
+    """Sendet requests Webhooks (reihum über die registrierten Calls); liefert (Latenzen in ms, Bodies)"""
+    latencies = []
+    bodies = {}
+    for i in range(requests):
+        call_sid = calls[i % len(calls)]
+        if before is not None:
+            before()
+        started = time.perf_counter()
+        response = client.post("/webhook/twilio-personalization", headers=headers,
+                               json={"call_sid": call_sid, "caller_id": "+4930123456", "agent_id": "agent_bench"})
+        latencies.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f"Status {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        bodies[call_sid] = response.get_data()
+    return latencies, bodies
+
+
+def report(name: str, latencies: list) -> float:
+    p99 = percentile(latencies, 99)
+    print(f"  {name:<14} p50 {percentile(latencies, 50):7.2f} ms   p90 {percentile(latencies, 90):7.2f} ms   "
+          f"p99 {p99:7.2f} ms   max {max(latencies):7.2f} ms")
+    return p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latenz des Personalization Webhooks (vorberechnet vs. live)")
+    parser.add_argument("--calls", type=int, default=200, help="Registrierte Calls")
+    parser.add_argument("--requests", type=int, default=2000, help="Webhook-Requests pro Variante")
+    parser.add_argument("--cold-requests", type=int, default=50, help="Live-Requests mit leerem Questionnaire-Cache")
+    parser.add_argument("--hoc-latency-ms", type=float, default=120)
+    parser.add_argument("--target-p99-ms", type=float, default=5.0, help="p99-Ziel für vorberechnete Antworten")
+    args = parser.parse_args()
+
+    upstreams = FakeUpstreams(FakeService("hoc", latency_ms=args.hoc_latency_ms), FakeService("openai", latency_ms=0),
+                              FakeService("elevenlabs", latency_ms=0)).start()
+    os.environ.update(upstreams.env())
+    os.environ.update({
+        "WEBHOOK_API_KEY": "bench-key",
+        "LOCAL_DB_PATH": os.path.join(tempfile.mkdtemp(), "bench_personalization.db"),
+        "LOG_MODE": "structured",
+        "TWILIO_AUTH_TOKEN": "bench-auth-token",
+    })
+
+    import webhook_receiver  # noqa: E402 (liest die Umgebungsvariablen beim Import)
+    from config import Config  # noqa: E402
+
+    logging.disable(logging.CRITICAL)
+    client = webhook_receiver.app.test_client()
+    headers = {"Authorization": "Bearer bench-key"}
+
+    # Calls registrieren wie dispatch_trigger (Questionnaire einmal laden, Antwort pro Kandidat vorberechnen)
+    questionnaire = webhook_receiver.fetch_questionnaire_context(CAMPAIGN_ID)
+    calls = []
+    started = time.perf_counter()
+    for i in range(args.calls):
+        call_sid = f"CAbench{i:06d}"
+        personalization = webhook_receiver.precompute_personalization(
+            questionnaire, COMPANY_NAME, f"Vorname{i}", f"Nachname{i}", CAMPAIGN_ID
+        )
+        webhook_receiver.register_outbound_call(CAMPAIGN_ID, COMPANY_NAME, f"Vorname{i}", f"Nachname{i}",
+                                                f"+49151{i:07d}", SimpleNamespace(call_sid=call_sid),
+                                                personalization)
+        calls.append(call_sid)
+    precompute_ms = (time.perf_counter() - started) * 1000 / args.calls
+
+    print(f"⏱️  {args.requests} Webhooks über {args.calls} Calls "
+          f"(Vorberechnung + Registrierung: {precompute_ms:.2f} ms pro Call beim Trigger)")
+    precomputed, precomputed_bodies = measure(client, headers, calls, args.requests)
+    Config.PERSONALIZATION_PRECOMPUTE = False
+    live, live_bodies = measure(client, headers, calls, args.requests)
+    cold, _ = measure(client, headers, calls, args.cold_requests, before=webhook_receiver.questionnaire_cache.clear)
+    upstreams.stop()
+
+    p99 = report("vorberechnet", precomputed)
+    live_p99 = report("live", live)
+    cold_p99 = report("live, HOC", cold)
+    print(f"  Speedup p99: {live_p99 / p99:.1f}x (gecacht), {cold_p99 / p99:.0f}x (HOC-Abruf)")
+
+    mismatches = sum(precomputed_bodies[call_sid] != live_bodies[call_sid] for call_sid in calls)
+    print(f"{'✅' if not mismatches else '❌'} Antworten byte-identisch zum Live-Aufbau ({mismatches} Abweichungen)")
+    print(f"{'✅' if p99 <= args.target_p99_ms else '❌'} p99 {p99:.2f} ms (Ziel ≤ {args.target_p99_ms:.1f} ms)")
+    sys.exit(1 if mismatches or p99 > args.target_p99_ms else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark und Ausgabe-Vergleich: kompilierte Prompt-Templates vs. bisherige Builder
+
+Erzeugt große Questionnaires (Default 100, 250 und 500 Fragen), prüft, dass
+questions, gate_questions, preference_questions und questionnaire_context
+byte-identisch zur bisherigen Implementierung sind, und misst beide Varianten.
+
+    python benchmarks/bench_prompt_templates.py                    # Check + Benchmark
+    python benchmarks/bench_prompt_templates.py --check            # nur Vergleich (Exit-Code 1 bei Abweichung)
+    python benchmarks/bench_prompt_templates.py --questions 150 1000
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import timeit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import legacy_prompt_builders as legacy  # noqa: E402
+import prompt_templates  # noqa: E402
+from questionnaire_index import QuestionnaireIndex  # noqa: E402
+
+
+GROUPS = ["Qualifikation", "Rahmen", "Standort", "Unternehmen", "Berufserfahrung", "Sprache", "Position"]
+QUESTION_TYPES = ["boolean", "text", "choice", "date"]
+CANDIDATE = ("Beispiel GmbH", "Max", "Mustermann")
+
+
+def make_questionnaire(count: int, seed: int = 7) -> dict:
+    """Synthetischer Questionnaire mit gemischten Priorities, Kategorien und optionalen Feldern"""
+    rng = random.Random(seed)
+    questions = []
+    for i in range(count):
+        group = rng.choice(GROUPS)
+        question = {
+            "question": f"Frage {i}: Haben Sie Erfahrung mit Aufgabe {i} im Bereich {group}?",
+            "priority": rng.choice([1, 1, 2, 2, 3]),
+            "group": group,
+            "category": group.lower(),
+            "category_order": GROUPS.index(group),
+            "question_type": rng.choice(QUESTION_TYPES),
+        }
+        if rng.random() < 0.5:
+            question["context"] = f"Muss-Kriterium {i}: mindestens {rng.randint(1, 5)} Jahre Erfahrung"
+        if rng.random() < 0.3:
+            question["preamble"] = f"Ich würde gern kurz auf Thema {i} eingehen."
+        if rng.random() < 0.2:
+            question["help_text"] = f"Hinweis {i}: Benefits, Schichtmodell, Standort"
+        if rng.random() < 0.2:
+            question["options"] = ["Frühdienst", "Spätdienst", "Nachtdienst"]
+        questions.append(question)
+    return {"campaign_id": 4711, "questions": questions}
+
+
+def legacy_render(questionnaire: dict) -> tuple:
+    return (
+        legacy.build_questions_list(questionnaire),
+        legacy.build_gate_questions(questionnaire),
+        legacy.build_preference_questions(questionnaire),
+        legacy.build_questionnaire_context(questionnaire, *CANDIDATE),
+    )
+
+
+def template_render(questionnaire: dict) -> tuple:
+    # Index pro Durchlauf neu bauen (kalter Pfad: erster Call einer Kampagne)
+    return render_with_index(QuestionnaireIndex(questionnaire.get("questions") or []))
+
+
+def render_with_index(index: QuestionnaireIndex) -> tuple:
+    # Mit demselben Index: ab dem zweiten Aufruf aus dem Cache (wie weitere Kandidaten einer Kampagne)
+    return (
+        prompt_templates.render_questions(index),
+        prompt_templates.render_gate_questions(index),
+        prompt_templates.render_preference_questions(index),
+        prompt_templates.render_questionnaire_context(index, *CANDIDATE),
+    )
+
+
+def check(questionnaires: list) -> int:
+    """Vergleicht alle vier Texte; liefert die Anzahl Abweichungen"""
+    names = ("questions", "gate_questions", "preference_questions", "questionnaire_context")
+    failures = 0
+    for questionnaire in questionnaires:
+        for name, expected, actual in zip(names, legacy_render(questionnaire), template_render(questionnaire)):
+            if expected != actual:
+                failures += 1
+                print(f"❌ {name} ({len(questionnaire['questions'])} Fragen) weicht ab")
+    print(f"{'✅' if not failures else '❌'} {len(questionnaires)} Questionnaires verglichen, {failures} Abweichungen")
+    return failures
+
+
+def bench(name: str, func, questionnaire: dict, repeat: int, number: int) -> float:
+    """Misst die Zeit für alle vier Texte (bestes von repeat Läufen) in Mikrosekunden"""
+    best = min(timeit.Timer(lambda: func(questionnaire)).repeat(repeat=repeat, number=number))
+    per_call_us = best / number * 1e6
+    print(f"  {name:<10} {per_call_us:10.1f} µs")
+    return per_call_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ausgabe-Vergleich und Benchmark der Prompt-Templates")
+    parser.add_argument("--check", action="store_true", help="Nur Ausgabe vergleichen")
+    parser.add_argument("--questions", type=int, nargs="+", default=[100, 250, 500], help="Fragen pro Questionnaire")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    edge_cases = [{}, {"questions": []}, {"questions": [{"priority": 3}]}]
+    questionnaires = [make_questionnaire(count, seed) for count in args.questions for seed in range(3)]
+    failures = check(edge_cases + questionnaires)
+    if args.check:
+        sys.exit(1 if failures else 0)
+
+    for count in args.questions:
+        questionnaire = make_questionnaire(count)
+        print(f"\n⏱️  {count} Fragen (questions + gate + preference + context)")
+        before = bench("legacy", legacy_render, questionnaire, args.repeat, args.number)
+        after = bench("templates", template_render, questionnaire, args.repeat, args.number)
+        warm = bench("gecacht", render_with_index, QuestionnaireIndex(questionnaire["questions"]),
+                     args.repeat, args.number)
+        print(f"  Speedup: {before / after:.1f}x (Index und Kampagnen-Texte gecacht: {before / warm:.0f}x)")
+
+        # Weitere Kandidaten derselben Kampagne: nur der Kopf des Kontexts wird neu gerendert
+        print(f"⏱️  {count} Fragen, questionnaire_context pro weiterem Kandidaten")
+        context_before = bench("legacy", lambda q: legacy.build_questionnaire_context(q, *CANDIDATE),
+                               questionnaire, args.repeat, args.number)
+        context_after = bench("templates", lambda index: prompt_templates.render_questionnaire_context(index, *CANDIDATE),
+                              QuestionnaireIndex(questionnaire["questions"]), args.repeat, args.number)
+        print(f"  Speedup: {context_before / context_after:.0f}x")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
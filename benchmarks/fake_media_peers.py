@@ -0,0 +1,212 @@
+"""
+Fake-Gegenstellen für den Media-Stream Proxy (media_proxy.py)
+
+FakeElevenLabsAgent: Conversation WebSocket wie ElevenLabs (Metadata mit ulaw_8000,
+    Ping, jedes user_audio_chunk kommt sofort als Agent-Audio zurück). GET /stats
+    liefert Verbindungen, empfangene Overrides und Frames.
+run_twilio_call: Media Stream Client wie Twilio (connected, start mit customParameters,
+    media im 20-ms-Takt, stop). Jeder Frame trägt Call-Index, Sequenznummer und
+    Sendezeitpunkt; zurückkommendes Audio ergibt die Round-Trip-Latenz pro Frame.
+
+Einzeln starten (z.B. für einen manuell gestarteten Proxy):
+    python benchmarks/fake_media_peers.py --port 9001
+"""
+import argparse
+import asyncio
+import base64
+import json
+import struct
+import time
+
+from websockets.asyncio.client import connect
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+
+
+# μ-law 8 kHz, 20 ms pro Frame (wie Twilio Media Streams)
+FRAME_BYTES = 160
+_FRAME_HEADER = struct.Struct(">IIq")  # Call-Index, Sequenznummer, Sendezeit (perf_counter_ns)
+_SILENCE = b"\xff" * (FRAME_BYTES - _FRAME_HEADER.size)
+
+
+def make_frame(call_index: int, seq: int) -> str:
+    """Base64-Payload eines Audio-Frames mit eingebettetem Sendezeitpunkt"""
+    return base64.b64encode(_FRAME_HEADER.pack(call_index, seq, time.perf_counter_ns()) + _SILENCE).decode("ascii")
+
+
+def read_frame(payload: str) -> tuple:
+    """(call_index, seq, sent_ns) aus einem Payload von make_frame"""
+    return _FRAME_HEADER.unpack(base64.b64decode(payload)[:_FRAME_HEADER.size])
+
+
+class FakeElevenLabsAgent:
+    """Fake ElevenLabs Conversation WebSocket (Echo-Agent)"""
+
+    def __init__(self, ping_interval: float = 5.0):
+        """
+        Args:
+            ping_interval: Sekunden zwischen ElevenLabs-Pings (Proxy muss mit pong antworten)
+        """
+        self.ping_interval = ping_interval
+        self.connections = 0
+        self.overrides = 0
+        self.frames = 0
+        self.pongs = 0
+
+    def stats(self) -> dict:
+        return {"connections": self.connections, "overrides": self.overrides, "frames": self.frames,
+                "pongs": self.pongs}
+
+    def process_request(self, connection, request):
+        if request.path.split("?", 1)[0] == "/stats":
+            return connection.respond(200, json.dumps(self.stats()) + "\n")
+        return None
+
+    async def handle(self, websocket) -> None:
+        self.connections += 1
+        try:
+            initiation = json.loads(await websocket.recv())
+            if initiation.get("conversation_config_override", {}).get("agent", {}).get("prompt"):
+                self.overrides += 1
+            await websocket.send(json.dumps({
+                "type": "conversation_initiation_metadata",
+                "conversation_initiation_metadata_event": {
+                    "conversation_id": f"conv_fake_{self.connections}",
+                    "agent_output_audio_format": "ulaw_8000",
+                    "user_input_audio_format": "ulaw_8000",
+                },
+            }))
+            pinger = asyncio.create_task(self._ping(websocket))
+            try:
+                event_id = 0
+                async for message in websocket:
+                    event = json.loads(message)
+                    if "user_audio_chunk" in event:
+                        self.frames += 1
+                        event_id += 1
+                        await websocket.send(json.dumps({
+                            "type": "audio",
+                            "audio_event": {"audio_base_64": event["user_audio_chunk"], "event_id": event_id},
+                        }))
+                    elif event.get("type") == "pong":
+                        self.pongs += 1
+            finally:
+                pinger.cancel()
+        except ConnectionClosed:
+            pass
+
+    async def _ping(self, websocket) -> None:
+        event_id = 0
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            event_id += 1
+            await websocket.send(json.dumps({"type": "ping", "ping_event": {"event_id": event_id, "ping_ms": 0}}))
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0):
+        """Server-Kontext (async with); Port über server.sockets[0].getsockname()[1]"""
+        return serve(self.handle, host, port, process_request=self.process_request, compression=None)
+
+
+async def run_twilio_call(url: str, call_index: int, frames: int, frame_interval: float, latencies: list,
+                          session_id: str = None, agent_id: str = "agent_bench", direct: bool = False,
+                          headers: dict = None) -> dict:
+    """
+    Simuliert einen Twilio Media Stream (bzw. mit direct=True einen Client direkt an ElevenLabs)
+
+    Args:
+        url: Proxy-URL (ws://.../media-stream) bzw. Fake-ElevenLabs-URL bei direct=True
+        call_index: Index des Calls (steckt in jedem Frame)
+        frames: Anzahl Audio-Frames
+        frame_interval: Abstand der Frames in Sekunden (Twilio: 0.02)
+        latencies: Liste, an die die Round-Trip-Latenzen in ms angehängt werden
+        session_id: customParameters.session_id für den Proxy
+        agent_id: customParameters.agent_id
+        direct: Ohne Proxy (ElevenLabs-Protokoll, Baseline)
+        headers: Zusätzliche Handshake-Header (z.B. X-Twilio-Signature für den Proxy)
+
+    Returns:
+        Dict mit sent, received
+    """
+    received = 0
+    done = asyncio.Event()
+
+    async with connect(url, additional_headers=headers, compression=None) as websocket:
+        if direct:
+            await websocket.send(json.dumps({"type": "conversation_initiation_client_data"}))
+        else:
+            stream_sid = f"MZbench{call_index:06d}"
+            await websocket.send(json.dumps({"event": "connected", "protocol": "Call", "version": "1.0.0"}))
+            await websocket.send(json.dumps({
+                "event": "start",
+                "streamSid": stream_sid,
+                "start": {
+                    "streamSid": stream_sid,
+                    "callSid": f"CAbench{call_index:06d}",
+                    "tracks": ["inbound"],
+                    "mediaFormat": {"encoding": "audio/x-mulaw", "sampleRate": 8000, "channels": 1},
+                    "customParameters": {"session_id": session_id or "", "agent_id": agent_id},
+                },
+            }))
+
+        async def receive():
+            nonlocal received
+            async for message in websocket:
+                event = json.loads(message)
+                if direct:
+                    payload = event.get("audio_event", {}).get("audio_base_64") if event.get("type") == "audio" else None
+                else:
+                    payload = event["media"]["payload"] if event.get("event") == "media" else None
+                if payload is None:
+                    continue
+                _, _, sent_ns = read_frame(payload)
+                latencies.append((time.perf_counter_ns() - sent_ns) / 1e6)
+                received += 1
+                if received >= frames:
+                    done.set()
+
+        receiver = asyncio.create_task(receive())
+        started = time.perf_counter()
+        for seq in range(frames):
+            # Fester Takt ab Startzeitpunkt (kein Drift durch Sendedauer)
+            delay = started + seq * frame_interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            payload = make_frame(call_index, seq)
+            if direct:
+                await websocket.send('{"user_audio_chunk":"' + payload + '"}')
+            else:
+                await websocket.send('{"event":"media","streamSid":"' + stream_sid + '","media":{"payload":"'
+                                     + payload + '"}}')
+
+        try:
+            await asyncio.wait_for(done.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            pass
+        if not direct:
+            await websocket.send(json.dumps({"event": "stop", "streamSid": stream_sid}))
+        receiver.cancel()
+        await asyncio.gather(receiver, return_exceptions=True)
+
+    return {"sent": frames, "received": received}
+
+
+async def _serve_agent(host: str, port: int) -> None:
+    agent = FakeElevenLabsAgent()
+    async with agent.serve(host, port) as server:
+        print(f"ready ws://{host}:{server.sockets[0].getsockname()[1]}", flush=True)
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake ElevenLabs Conversation WebSocket (Echo-Agent)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve_agent(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
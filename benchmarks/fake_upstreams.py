@@ -0,0 +1,328 @@
+"""
+Lokale Stand-ins für HOC, OpenAI und ElevenLabs (nur für Benchmarks/Lasttests)
+
+Jeder Dienst läuft als eigener HTTP-Server mit konfigurierbarer Latenz, Jitter und
+Fehlerrate und zählt Requests, Fehler und ausgelieferte Latenz.
+
+Standalone:
+    python benchmarks/fake_upstreams.py --openai-latency-ms 600 --hoc-error-rate 0.05
+
+gibt die Umgebungsvariablen aus, mit denen der Webhook gegen die Fakes läuft.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Beispiel-Fragebogen im Format der HOC API (questionnaire/<campaign_id>)
+SAMPLE_QUESTIONS = [
+    {"question": "Haben Sie: Deutschkenntnisse B2?", "priority": 1, "group": "Qualifikation",
+     "category": "Sprache", "context": "Muss-Kriterium: Deutschkenntnisse B2", "question_type": "boolean"},
+    {"question": "Haben Sie: mehrjährige Berufserfahrung?", "priority": 1, "group": "Qualifikation",
+     "context": "Muss-Kriterium: mehrjährige Berufserfahrung", "question_type": "boolean"},
+    {"question": "Verfügen Sie über einen Abschluss als Pflegefachfrau/-mann?", "priority": 1,
+     "group": "Qualifikation", "context": "Muss-Kriterium", "question_type": "boolean"},
+    {"question": "Die Stelle ist in Vollzeit (39 Wochenstunden). Ist das für Sie passend?", "priority": 2,
+     "group": "Rahmen", "preamble": "Ich möchte kurz auf das Arbeitszeitmodell eingehen.", "question_type": "boolean"},
+    {"question": "Unser Standort ist Stollberger Straße 25, 12627 Berlin. Passt das für Sie?", "priority": 1,
+     "group": "Standort", "question_type": "boolean"},
+    {"question": "Welche Schicht bevorzugen Sie?", "priority": 2, "group": "Rahmen",
+     "options": ["Frühdienst", "Spätdienst", "Nachtdienst"], "question_type": "choice"},
+    {"question": "Ab wann könnten Sie starten?", "priority": 2, "group": "Rahmen", "question_type": "text"},
+    {"question": "Wir sind ein Klinikverbund mit ca. 250 Mitarbeitenden. Kennen Sie uns bereits?", "priority": 3,
+     "group": "Unternehmen", "help_text": "Benefits: Jobticket, betriebliche Altersvorsorge", "question_type": "boolean"},
+]
+
+# Antworten des Fake-Modells pro Variable (erkannt am Prompt der Einzel-Extraktion)
+FAKE_AI_VALUES = {
+    "campaignlocation_label": "Berlin",
+    "companypriorities": "Deutschkenntnisse B2, mehrjährige Berufserfahrung, Vollzeit 39h",
+    "companysize": "ca. 250 Mitarbeitende",
+    "companypitch": "Ein moderner Klinikverbund mit Jobticket und betrieblicher Altersvorsorge.",
+    "campaignrole_title": "Pflegefachkraft",
+}
+
+FAKE_AI_PROMPT_MARKERS = {
+    "ARBEITSORT": "campaignlocation_label",
+    "PRIORITÄTEN": "companypriorities",
+    "UNTERNEHMENSGRÖSSE": "companysize",
+    "COMPANY PITCH": "companypitch",
+    "BERUFSBEZEICHNUNG": "campaignrole_title",
+}
+
+
+class FakeService:
+    """Latenz-/Fehlerprofil und Zähler eines Fake-Upstreams"""
+
+    def __init__(self, name: str, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0):
+        self.name = name
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.total_latency_ms = 0.0
+        self.server = None
+
+    def simulate(self) -> bool:
+        """
+        Wartet die konfigurierte Latenz ab und würfelt einen Fehler
+
+        Returns:
+            True, falls der Request mit einem Fehler beantwortet werden soll
+        """
+        delay_ms = max(0.0, random.gauss(self.latency_ms, self.jitter_ms) if self.jitter_ms else self.latency_ms)
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+
+        failed = random.random() < self.error_rate
+        with self._lock:
+            self.requests += 1
+            self.total_latency_ms += delay_ms
+            if failed:
+                self.errors += 1
+        return failed
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "mean_latency_ms": round(self.total_latency_ms / self.requests, 2) if self.requests else 0.0,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.errors = 0
+            self.total_latency_ms = 0.0
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    """Basis-Handler: JSON-Antworten, keine Access-Logs, Keep-Alive"""
+
+    protocol_version = "HTTP/1.1"
+    service = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def send_json(self, status: int, body: dict, headers: dict = None) -> None:
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_error_json(self) -> None:
+        self.send_json(503, {"error": {"message": f"{self.service.name} fake: injected error"}})
+
+
+class HOCHandler(_FakeHandler):
+    """GET /api/v1/questionnaire/<campaign_id> (mit ETag / 304)"""
+
+    def do_GET(self):
+        match = re.match(r"^/api/v1/questionnaire/(\d+)$", self.path)
+        if not match:
+            return self.send_json(404, {"error": "not found"})
+
+        if self.service.simulate():
+            return self.send_error_json()
+
+        campaign_id = int(match.group(1))
+        etag = f'"campaign-{campaign_id}-v1"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_json(200, {
+            "campaign_id": campaign_id,
+            "campaign_name": f"Benchmark-Kampagne {campaign_id}",
+            "work_location": "Berlin",
+            "questions": SAMPLE_QUESTIONS,
+        }, headers={"ETag": etag})
+
+
+class OpenAIHandler(_FakeHandler):
+    """POST /v1/chat/completions (Einzel-Extraktion und Structured Output)"""
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            return self.send_json(404, {"error": {"message": "not found"}})
+
+        body = self.read_json()
+        if self.service.simulate():
+            return self.send_error_json()
+
+        if body.get("response_format", {}).get("type") == "json_schema":
+            content = json.dumps(FAKE_AI_VALUES, ensure_ascii=False)
+        else:
+            prompt = body.get("messages", [{}])[-1].get("content", "")
+            variable = next((name for marker, name in FAKE_AI_PROMPT_MARKERS.items() if marker in prompt), None)
+            content = FAKE_AI_VALUES.get(variable, "")
+
+        self.send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 800, "completion_tokens": 20, "total_tokens": 820},
+        })
+
+
+class ElevenLabsHandler(_FakeHandler):
+    """POST /v1/convai/twilio/outbound-call, GET /v1/convai/conversation/get-signed-url"""
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/v1/convai/twilio/outbound-call":
+            return self.send_json(404, {"detail": "not found"})
+
+        self.read_json()
+        if self.service.simulate():
+            return self.send_error_json()
+
+        self.send_json(200, {
+            "success": True,
+            "message": "Call initiated",
+            "conversation_id": f"conv_{uuid.uuid4().hex[:16]}",
+            "callSid": f"CA{uuid.uuid4().hex}",
+        })
+
+    def do_GET(self):
+        if not self.path.startswith("/v1/convai/conversation/get-signed-url"):
+            return self.send_json(404, {"detail": "not found"})
+
+        if self.service.simulate():
+            return self.send_error_json()
+
+        self.send_json(200, {"signed_url": f"wss://fake.local/convai?token={uuid.uuid4().hex}"})
+
+
+def _start_server(service: FakeService, handler_class, host: str) -> None:
+    handler = type(f"{service.name}Handler", (handler_class,), {"service": service})
+    service.server = ThreadingHTTPServer((host, 0), handler)
+    service.server.daemon_threads = True
+    threading.Thread(target=service.server.serve_forever, name=f"fake-{service.name}", daemon=True).start()
+
+
+class FakeUpstreams:
+    """Startet/stoppt alle drei Fake-Upstreams und liefert die passenden Umgebungsvariablen"""
+
+    def __init__(self, hoc: FakeService, openai: FakeService, elevenlabs: FakeService, host: str = "127.0.0.1"):
+        self.host = host
+        self.services = {"hoc": hoc, "openai": openai, "elevenlabs": elevenlabs}
+
+    def start(self) -> "FakeUpstreams":
+        _start_server(self.services["hoc"], HOCHandler, self.host)
+        _start_server(self.services["openai"], OpenAIHandler, self.host)
+        _start_server(self.services["elevenlabs"], ElevenLabsHandler, self.host)
+        return self
+
+    def stop(self) -> None:
+        for service in self.services.values():
+            if service.server:
+                service.server.shutdown()
+                service.server.server_close()
+
+    def env(self) -> dict:
+        """Umgebungsvariablen, mit denen der Webhook die Fakes statt der echten APIs nutzt"""
+        return {
+            "HIRINGS_API_URL": f"{self.services['hoc'].url}/api/v1",
+            "HIRINGS_API_TOKEN": "bench-token",
+            "OPENAI_API_KEY": "bench-openai-key",
+            "OPENAI_BASE_URL": f"{self.services['openai'].url}/v1",
+            "ELEVENLABS_API_KEY": "bench-elevenlabs-key",
+            "ELEVENLABS_AGENT_ID": "agent_bench",
+            "ELEVENLABS_BASE_URL": self.services["elevenlabs"].url,
+        }
+
+    def stats(self) -> dict:
+        return {name: service.stats() for name, service in self.services.items()}
+
+    def reset(self) -> None:
+        for service in self.services.values():
+            service.reset()
+
+
+# Default-Profile grob nach Produktions-Beobachtungen
+DEFAULT_PROFILES = {
+    "hoc": {"latency_ms": 120, "jitter_ms": 40, "error_rate": 0.0},
+    "openai": {"latency_ms": 700, "jitter_ms": 250, "error_rate": 0.0},
+    "elevenlabs": {"latency_ms": 350, "jitter_ms": 100, "error_rate": 0.0},
+}
+
+
+def add_upstream_arguments(parser: argparse.ArgumentParser) -> None:
+    """Fügt --<dienst>-latency-ms / -jitter-ms / -error-rate für alle Fakes hinzu"""
+    for name, profile in DEFAULT_PROFILES.items():
+        parser.add_argument(f"--{name}-latency-ms", type=float, default=profile["latency_ms"])
+        parser.add_argument(f"--{name}-jitter-ms", type=float, default=profile["jitter_ms"])
+        parser.add_argument(f"--{name}-error-rate", type=float, default=profile["error_rate"])
+
+
+def upstreams_from_args(args: argparse.Namespace) -> FakeUpstreams:
+    """Erstellt FakeUpstreams aus den mit add_upstream_arguments geparsten Argumenten"""
+    services = {
+        name: FakeService(
+            name,
+            latency_ms=getattr(args, f"{name}_latency_ms"),
+            jitter_ms=getattr(args, f"{name}_jitter_ms"),
+            error_rate=getattr(args, f"{name}_error_rate"),
+        )
+        for name in DEFAULT_PROFILES
+    }
+    return FakeUpstreams(**services)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake HOC/OpenAI/ElevenLabs Server für lokale Lasttests")
+    add_upstream_arguments(parser)
+    args = parser.parse_args()
+
+    upstreams = upstreams_from_args(args).start()
+    print("Fake-Upstreams laufen. Webhook mit diesen Variablen starten:\n")
+    for key, value in upstreams.env().items():
+        print(f"export {key}={value}")
+
+    try:
+        while True:
+            time.sleep(10)
+            print(json.dumps(upstreams.stats()))
+    except KeyboardInterrupt:
+        upstreams.stop()
+
+
+if __name__ == "__main__":
+    main()
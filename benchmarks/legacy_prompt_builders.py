@@ -0,0 +1,318 @@
+"""
+Eingefrorene Kopie der bisherigen Prompt-Builder (vor QuestionnaireIndex und
+prompt_templates), Referenz für Benchmarks und den Ausgabe-Vergleich
+"""
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def build_questions_list(questionnaire: dict) -> str:
+    """
+    Erstellt strukturierte Fragenliste (Dashboard)
+    ALLE Fragen kombiniert
+    
+    Args:
+        questionnaire: Questionnaire-Daten aus HOC
+        
+    Returns:
+        Formatierte Fragenliste als String
+    """
+    try:
+        questions_text = "=== ALLE FRAGEN (Überblick) ===\n\n"
+        
+        if questionnaire.get('questions'):
+            questions = questionnaire['questions']
+            
+            # Gruppiere nach Kategorien
+            must_questions = [q for q in questions if q.get('priority') == 1]
+            optional_questions = [q for q in questions if q.get('priority') == 2]
+            
+            if must_questions:
+                questions_text += "MUSS-FRAGEN (Priority 1):\n"
+                for i, q in enumerate(must_questions, 1):
+                    question_text = q.get('question', '')
+                    context = q.get('context', '')
+                    questions_text += f"{i}. {question_text}\n"
+                    if context:
+                        questions_text += f"   (Hinweis: {context})\n"
+                questions_text += "\n"
+            
+            if optional_questions:
+                questions_text += "ZUSÄTZLICHE FRAGEN (Priority 2):\n"
+                for i, q in enumerate(optional_questions, 1):
+                    question_text = q.get('question', '')
+                    questions_text += f"{i}. {question_text}\n"
+        
+        return questions_text
+    except Exception as e:
+        logger.warning(f"⚠️ Fehler beim Erstellen der Fragenliste: {e}")
+        return ""
+
+
+def is_job_title_question(question: dict) -> bool:
+    """
+    Prüft, ob eine Frage eine Stellentitel- oder Alternativtitel-Frage ist
+    
+    Args:
+        question: Frage-Dict aus Questionnaire
+        
+    Returns:
+        True wenn es sich um eine Stellentitel-Frage handelt
+    """
+    question_text = (question.get('question', '') or '').lower()
+    context = (question.get('context', '') or '').lower()
+    group = (question.get('group', '') or '').lower()
+    
+    # Schlüsselwörter, die auf Stellentitel-Fragen hindeuten
+    title_keywords = [
+        'stellentitel', 'stellen-titel', 'job-titel', 'jobtitel',
+        'position', 'rolle', 'beruf', 'berufsbezeichnung',
+        'alternativtitel', 'alternativ-titel', 'alternative position',
+        'alternative rolle', 'alternative stelle'
+    ]
+    
+    # Prüfe ob eines der Schlüsselwörter im Frage-Text, Context oder Group vorkommt
+    for keyword in title_keywords:
+        if keyword in question_text or keyword in context or keyword in group:
+            return True
+    
+    return False
+
+
+def build_gate_questions(questionnaire: dict) -> str:
+    """
+    Erstellt Liste der MUSS-Fragen (Priority=1) für Phase 2 (Gate)
+    
+    WICHTIG: Nur Stellentitel/Alternativtitel-Fragen führen zum Abbruch!
+    Andere Muss-Kriterien sind wichtig, aber nicht zwingend.
+    
+    Args:
+        questionnaire: Questionnaire-Daten aus HOC
+        
+    Returns:
+        Formatierte Liste nur der Priority=1 Fragen (Stellentitel zuerst!)
+    """
+    try:
+        gate_text = "=== MUSS-KRITERIEN (Gate) für Phase 2 ===\n\n"
+        gate_text += "Diese Fragen MÜSSEN in Phase 2 gestellt werden.\n"
+        gate_text += "⚠️ WICHTIG: Nur Stellentitel/Alternativtitel-Fragen führen bei Nichterfüllung zum Abbruch!\n"
+        gate_text += "Andere Muss-Kriterien sind wichtig, aber nicht zwingend.\n\n"
+        
+        if questionnaire.get('questions'):
+            questions = questionnaire['questions']
+            
+            # Nur Priority=1 Fragen
+            must_questions = [q for q in questions if q.get('priority') == 1]
+            
+            if must_questions:
+                # Trenne Stellentitel-Fragen von anderen Muss-Kriterien
+                job_title_questions = []
+                other_must_questions = []
+                
+                for q in must_questions:
+                    if is_job_title_question(q):
+                        job_title_questions.append(q)
+                    else:
+                        other_must_questions.append(q)
+                
+                # Stellentitel-Fragen ZUERST (kritisch - führen zum Abbruch)
+                if job_title_questions:
+                    gate_text += "🔴 KRITISCHE FRAGEN (führen bei Nichterfüllung zum Abbruch):\n\n"
+                    for i, q in enumerate(job_title_questions, 1):
+                        question_text = q.get('question', '')
+                        question_type = q.get('question_type', 'boolean').upper()
+                        context = q.get('context', '')
+                        preamble = q.get('preamble', '')
+                        
+                        gate_text += f"{i}. [{question_type}] {question_text}\n"
+                        gate_text += "   ⚠️ KRITISCH: Bei Nichterfüllung → Gespräch beenden!\n"
+                        
+                        if context:
+                            gate_text += f"   → Kontext: {context}\n"
+                        if preamble:
+                            gate_text += f"   → Preamble: \"{preamble}\"\n"
+                        
+                        gate_text += "\n"
+                    
+                    gate_text += "⚠️ BEI NICHTERFÜLLUNG VON STELLENTITEL/ALTERNATIVTITEL:\n"
+                    gate_text += "\"Vielen Dank für Ihre Offenheit. Leider passt Ihre Qualifikation nicht zu den verfügbaren Positionen.\n"
+                    gate_text += "Deshalb können wir das Gespräch hier leider nicht fortsetzen. Vielen Dank für Ihr Interesse und alles Gute für Ihre weitere Suche.\"\n\n"
+                
+                # Andere Muss-Kriterien (wichtig, aber nicht zwingend)
+                if other_must_questions:
+                    gate_text += "🟡 WICHTIGE FRAGEN (sollten erfüllt sein, führen aber NICHT zum Abbruch):\n\n"
+                    for i, q in enumerate(other_must_questions, 1):
+                        question_text = q.get('question', '')
+                        question_type = q.get('question_type', 'boolean').upper()
+                        context = q.get('context', '')
+                        preamble = q.get('preamble', '')
+                        
+                        gate_text += f"{i}. [{question_type}] {question_text}\n"
+                        gate_text += "   ℹ️ WICHTIG: Sollte erfüllt sein, aber kein Abbruch-Grund\n"
+                        
+                        if context:
+                            gate_text += f"   → Kontext: {context}\n"
+                        if preamble:
+                            gate_text += f"   → Preamble: \"{preamble}\"\n"
+                        
+                        gate_text += "\n"
+            else:
+                gate_text += "(Keine Muss-Kriterien definiert)\n"
+        else:
+            gate_text += "(Keine Fragen vorhanden)\n"
+        
+        total_must = len([q for q in questionnaire.get('questions', []) if q.get('priority') == 1])
+        job_title_count = len([q for q in questionnaire.get('questions', []) if q.get('priority') == 1 and is_job_title_question(q)])
+        logger.info(f"✅ Gate Questions erstellt: {total_must} Muss-Kriterien ({job_title_count} Stellentitel-Fragen, {total_must - job_title_count} andere)")
+        return gate_text
+        
+    except Exception as e:
+        logger.warning(f"⚠️ Fehler beim Erstellen der Gate Questions: {e}")
+        return ""
+
+
+def build_preference_questions(questionnaire: dict) -> str:
+    """
+    Erstellt Liste der Präferenz-Fragen (Priority=2) für Phase 4
+    
+    Args:
+        questionnaire: Questionnaire-Daten aus HOC
+        
+    Returns:
+        Formatierte Liste nur der Priority=2 Fragen
+    """
+    try:
+        pref_text = "=== PRÄFERENZEN & WÜNSCHE für Phase 4 ===\n\n"
+        pref_text += "Diese Fragen werden in Phase 4 gestellt.\n"
+        pref_text += "Nutze Preamble als Einleitung, falls vorhanden!\n\n"
+        
+        if questionnaire.get('questions'):
+            questions = questionnaire['questions']
+            
+            # Nur Priority=2 Fragen
+            optional_questions = [q for q in questions if q.get('priority') == 2]
+            
+            if optional_questions:
+                for i, q in enumerate(optional_questions, 1):
+                    question_text = q.get('question', '')
+                    question_type = q.get('question_type', 'boolean').upper()
+                    preamble = q.get('preamble', '')
+                    help_text = q.get('help_text', '')
+                    options = q.get('options', None)
+                    
+                    pref_text += f"{i}. [{question_type}] {question_text}\n"
+                    
+                    if preamble:
+                        pref_text += f"   → Preamble: \"{preamble}\" (Nutze als Einleitung!)\n"
+                    if help_text:
+                        pref_text += f"   → Help Text: {help_text}\n"
+                    if options:
+                        pref_text += f"   → Optionen: {options}\n"
+                    
+                    pref_text += "\n"
+            else:
+                pref_text += "(Keine optionalen Fragen definiert)\n"
+        else:
+            pref_text += "(Keine Fragen vorhanden)\n"
+        
+        logger.info(f"✅ Preference Questions erstellt: {len([q for q in questionnaire.get('questions', []) if q.get('priority') == 2])} Fragen")
+        return pref_text
+        
+    except Exception as e:
+        logger.warning(f"⚠️ Fehler beim Erstellen der Preference Questions: {e}")
+        return ""
+
+
+def build_questionnaire_context(questionnaire: dict, company_name: str, first_name: str, last_name: str) -> str:
+    """
+    Erstellt Questionnaire-Kontext als formatierten Text
+    
+    Args:
+        questionnaire: Questionnaire-Daten aus HOC (enthält 'questions' Array)
+        company_name: Firmenname
+        first_name: Vorname Kandidat
+        last_name: Nachname Kandidat
+        
+    Returns:
+        Questionnaire-Kontext als formatierter Text mit Fragen
+    """
+    
+    # KONTEXT: Basis-Informationen
+    questionnaire_context = f"""
+===================================
+KONTEXT AUS QUESTIONNAIRE:
+===================================
+
+Kandidat: {first_name} {last_name}
+Firma: {company_name}
+"""
+    
+    if questionnaire and questionnaire.get('questions'):
+        questions = questionnaire['questions']
+        
+        # Gruppiere Fragen nach Kategorien
+        questions_by_category = {}
+        for q in questions:
+            if isinstance(q, dict):
+                category = q.get('category', 'general')
+                group = q.get('group', 'Allgemein')
+                
+                if category not in questions_by_category:
+                    questions_by_category[category] = {
+                        'group': group,
+                        'questions': []
+                    }
+                
+                questions_by_category[category]['questions'].append(q)
+        
+        # Formatiere Fragen nach Kategorien
+        questionnaire_context += f"\n\n📋 FRAGEN ZU KLÄREN ({len(questions)} insgesamt):\n"
+        questionnaire_context += "="*50
+        
+        # Sortiere nach category_order wenn vorhanden
+        sorted_categories = sorted(
+            questions_by_category.items(),
+            key=lambda x: x[1]['questions'][0].get('category_order', 99) if x[1]['questions'] else 99
+        )
+        
+        for category, data in sorted_categories:
+            group_name = data['group']
+            category_questions = data['questions']
+            
+            questionnaire_context += f"\n\n🔹 {group_name.upper()}:"
+            
+            # Sortiere Fragen nach Priority (1 = wichtig, 2 = optional)
+            must_questions = [q for q in category_questions if q.get('priority') == 1]
+            optional_questions = [q for q in category_questions if q.get('priority') == 2]
+            
+            if must_questions:
+                questionnaire_context += f"\n\n  ⚠️  MUSS-KRITERIEN:"
+                for q in must_questions:
+                    question_text = q.get('question', '')
+                    context = q.get('context', '')
+                    preamble = q.get('preamble', '')
+                    
+                    questionnaire_context += f"\n  • {question_text}"
+                    if context:
+                        questionnaire_context += f"\n    (Kontext: {context})"
+                    if preamble:
+                        questionnaire_context += f"\n    (Überleitung: {preamble})"
+            
+            if optional_questions:
+                questionnaire_context += f"\n\n  ℹ️  ZUSÄTZLICHE FRAGEN:"
+                for q in optional_questions:
+                    question_text = q.get('question', '')
+                    preamble = q.get('preamble', '')
+                    
+                    questionnaire_context += f"\n  • {question_text}"
+                    if preamble:
+                        questionnaire_context += f"\n    (Überleitung: {preamble})"
+    
+    questionnaire_context += "\n\n===================================\n"
+    
+    logger.info(f"📝 Questionnaire-Kontext erstellt: {len(questionnaire_context)} Zeichen")
+    
+    return questionnaire_context
+
@@ -0,0 +1,380 @@
+"""
+Lasttest / Latenz-Benchmark für POST /webhook/trigger-call
+
+Startet die Fake-Upstreams (fake_upstreams.py), die echte App (gunicorn laut Procfile
+oder uvicorn für asgi_app) und feuert Requests open-loop mit fester Rate ab.
+Latenz wird ab dem geplanten Startzeitpunkt gemessen (keine Coordinated Omission).
+
+Beispiele:
+    python benchmarks/load_test.py --rps 10 --duration 30
+    python benchmarks/load_test.py --sweep 5,10,20,40 --duration 20 --output results.json
+    python benchmarks/load_test.py --server asgi --rps 20 --compare baseline.json
+    python benchmarks/load_test.py --app-url http://127.0.0.1:5000 --rps 5
+"""
+import argparse
+import json
+import os
+import random
+import re
+import shlex
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from fake_upstreams import add_upstream_arguments, upstreams_from_args
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_KEY = "bench-webhook-key"
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """Perzentil (nearest-rank) einer sortierten Liste"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def parse_server_timing(header: str) -> dict:
+    """
+    Parst einen Server-Timing Header ("fetch;dur=12.3, ai;dur=456")
+
+    Returns:
+        Dict {stage: dauer_ms}
+    """
+    stages = {}
+    for entry in (header or "").split(","):
+        name, _, params = entry.strip().partition(";")
+        match = re.search(r"dur=([\d.]+)", params)
+        if name and match:
+            stages[name] = float(match.group(1))
+    return stages
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def procfile_command(port: int) -> list:
+    """Startbefehl des web-Prozesses aus dem Procfile (mit $PORT ersetzt)"""
+    with open(os.path.join(REPO_ROOT, "Procfile")) as f:
+        for line in f:
+            if line.startswith("web:"):
+                command = line.split(":", 1)[1].strip().replace("$PORT", str(port))
+                return shlex.split(command)
+    raise RuntimeError("Kein web-Prozess im Procfile gefunden")
+
+
+def start_app(args, upstream_env: dict) -> tuple:
+    """
+    Startet die App als Subprozess gegen die Fake-Upstreams
+
+    Returns:
+        Tuple (process, base_url, db_dir)
+    """
+    port = free_port()
+    if args.server == "asgi":
+        command = [sys.executable, "-m", "uvicorn", "asgi_app:app", "--host", "127.0.0.1",
+                   "--port", str(port), "--workers", str(args.workers or 2), "--log-level", "warning"]
+    else:
+        command = procfile_command(port)
+        if args.workers and "--workers" in command:
+            command[command.index("--workers") + 1] = str(args.workers)
+
+    db_dir = tempfile.mkdtemp(prefix="webhook-bench-")
+    env = dict(os.environ)
+    env.update(upstream_env)
+    env.update({
+        "WEBHOOK_API_KEY": API_KEY,
+        "LOCAL_DB_PATH": os.path.join(db_dir, "bench.db"),
+        "PYTHONUNBUFFERED": "1",
+        "TWILIO_AUTH_TOKEN": "bench-auth-token",
+    })
+    if args.no_cache:
+        env.update({
+            "CAMPAIGN_CACHE_TTL_SECONDS": "0",
+            "QUESTIONNAIRE_CACHE_TTL_SECONDS": "0",
+            "QUESTIONNAIRE_CACHE_STALE_SECONDS": "0",
+        })
+    for assignment in args.env:
+        key, _, value = assignment.partition("=")
+        env[key] = value
+
+    log = open(os.path.join(db_dir, "app.log"), "w")
+    process = subprocess.Popen(command, cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+                               start_new_session=True)
+    print(f"🚀 App gestartet: {' '.join(command)} (Log: {log.name})")
+    return process, f"http://127.0.0.1:{port}", db_dir
+
+
+def stop_app(process) -> None:
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=15)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def wait_for_health(base_url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{base_url}/webhook/health", timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"App unter {base_url} nicht innerhalb von {timeout:.0f}s erreichbar")
+
+
+def build_payload(args, index: int) -> dict:
+    """Trigger-Payload; campaign_id rotiert über --campaigns Kampagnen"""
+    payload = {
+        "campaign_id": args.campaign_base + index % args.campaigns,
+        "company_name": "Benchmark GmbH",
+        "candidate_first_name": "Max",
+        "candidate_last_name": f"Mustermann{index}",
+    }
+    if args.mode == "sip":
+        payload["to_number"] = f"+4915{random.randint(10**8, 10**9 - 1)}"
+        payload["agent_phone_number_id"] = f"phnum_bench_{index % args.phone_numbers}"
+    return payload
+
+
+class LoadRun:
+    """Open-loop Lastlauf mit fester Rate; sammelt Latenz, Status und Server-Timing"""
+
+    def __init__(self, base_url: str, args):
+        self.base_url = base_url
+        self.args = args
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=args.max_in_flight)
+        self.session.mount("http://", adapter)
+        self.session.headers["Authorization"] = f"Bearer {API_KEY}"
+        self._lock = threading.Lock()
+        self.samples = []
+
+    def _send(self, index: int, scheduled_at: float, record: bool) -> None:
+        status, stages = None, {}
+        try:
+            response = self.session.post(f"{self.base_url}/webhook/trigger-call",
+                                         json=build_payload(self.args, index), timeout=self.args.timeout)
+            status = response.status_code
+            stages = parse_server_timing(response.headers.get("Server-Timing"))
+        except requests.RequestException as e:
+            status = type(e).__name__
+
+        latency_ms = (time.perf_counter() - scheduled_at) * 1000
+        if record:
+            with self._lock:
+                self.samples.append((latency_ms, status, stages))
+
+    def run(self, rps: float, duration: float, warmup: float) -> dict:
+        """
+        Feuert rps Requests/s für warmup + duration Sekunden (Warmup wird nicht gewertet)
+
+        Returns:
+            Ergebnis dieser Laststufe als dict
+        """
+        self.samples = []
+        total = int((warmup + duration) * rps)
+        warmup_count = int(warmup * rps)
+        interval = 1.0 / rps
+
+        started_at = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.args.max_in_flight) as executor:
+            for index in range(total):
+                scheduled_at = started_at + index * interval
+                delay = scheduled_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(self._send, index, scheduled_at, index >= warmup_count)
+        elapsed = time.perf_counter() - started_at - warmup
+
+        return summarize(rps, self.samples, elapsed)
+
+
+def summarize(rps: float, samples: list, elapsed: float) -> dict:
+    """Aggregiert Latenzen, Status-Codes und Server-Timing Stufen einer Laststufe"""
+    latencies = sorted(sample[0] for sample in samples)
+    ok = [sample for sample in samples if sample[1] == 200]
+
+    statuses = {}
+    for _, status, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    stage_values = {}
+    for _, _, stages in samples:
+        for name, value in stages.items():
+            stage_values.setdefault(name, []).append(value)
+
+    return {
+        "target_rps": rps,
+        "requests": len(samples),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed > 0 else 0.0,
+        "success_rate": round(len(ok) / len(samples), 4) if samples else 0.0,
+        "statuses": statuses,
+        "latency_ms": {
+            **{f"p{p}": round(percentile(latencies, p), 1) for p in PERCENTILES},
+            "mean": round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+            "max": round(latencies[-1], 1) if latencies else 0.0,
+        },
+        "stages_ms": {
+            name: {
+                "p50": round(percentile(sorted(values), 50), 1),
+                "p95": round(percentile(sorted(values), 95), 1),
+                "p99": round(percentile(sorted(values), 99), 1),
+            }
+            for name, values in sorted(stage_values.items())
+        },
+    }
+
+
+def git_revision() -> dict:
+    def git(*arguments):
+        try:
+            return subprocess.check_output(["git", *arguments], cwd=REPO_ROOT, text=True,
+                                           stderr=subprocess.DEVNULL).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def print_level(result: dict) -> None:
+    latency = result["latency_ms"]
+    print(f"  {result['target_rps']:>6} rps → {result['throughput_rps']:>6} ok/s | "
+          f"p50 {latency['p50']:>7.1f} | p95 {latency['p95']:>7.1f} | p99 {latency['p99']:>7.1f} | "
+          f"max {latency['max']:>7.1f} ms | {result['statuses']}")
+    for name, values in result["stages_ms"].items():
+        print(f"           {name:<24} p50 {values['p50']:>7.1f} | p95 {values['p95']:>7.1f} | p99 {values['p99']:>7.1f} ms")
+
+
+def compare(current: dict, baseline_path: str, threshold: float) -> bool:
+    """
+    Vergleicht p50/p95/p99 und Durchsatz je Laststufe mit einer früheren Ergebnisdatei
+
+    Returns:
+        True, falls eine Laststufe um mehr als threshold (relativ) schlechter ist
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    baseline_levels = {level["target_rps"]: level for level in baseline["levels"]}
+
+    print(f"\n📊 Vergleich mit {baseline_path} ({(baseline.get('git') or {}).get('commit', '?')[:10]})")
+    regressed = False
+    for level in current["levels"]:
+        previous = baseline_levels.get(level["target_rps"])
+        if not previous:
+            continue
+        for metric in ("p50", "p95", "p99"):
+            old, new = previous["latency_ms"][metric], level["latency_ms"][metric]
+            change = (new - old) / old if old else 0.0
+            flag = "❌" if change > threshold else "✅"
+            regressed |= change > threshold
+            print(f"  {flag} {level['target_rps']:>6} rps {metric}: {old:.1f} → {new:.1f} ms ({change:+.1%})")
+        old, new = previous["throughput_rps"], level["throughput_rps"]
+        change = (new - old) / old if old else 0.0
+        flag = "❌" if change < -threshold else "✅"
+        regressed |= change < -threshold
+        print(f"  {flag} {level['target_rps']:>6} rps throughput: {old:.2f} → {new:.2f} ok/s ({change:+.1%})")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lasttest für /webhook/trigger-call gegen Fake-Upstreams")
+    parser.add_argument("--rps", type=float, default=5, help="Ziel-Requests pro Sekunde")
+    parser.add_argument("--sweep", help="Kommaseparierte RPS-Stufen (überschreibt --rps), z.B. 5,10,20,40")
+    parser.add_argument("--duration", type=float, default=20, help="Messdauer pro Stufe in Sekunden")
+    parser.add_argument("--warmup", type=float, default=3, help="Nicht gewertete Aufwärmzeit pro Stufe")
+    parser.add_argument("--mode", choices=("sip", "webrtc"), default="sip",
+                        help="sip = Outbound-Call, webrtc = Signed-URL Link (ohne to_number)")
+    parser.add_argument("--campaigns", type=int, default=5, help="Anzahl verschiedener campaign_ids")
+    parser.add_argument("--campaign-base", type=int, default=1000)
+    parser.add_argument("--phone-numbers", type=int, default=10, help="Anzahl verschiedener agent_phone_number_ids")
+    parser.add_argument("--timeout", type=float, default=60, help="Client-Timeout pro Request")
+    parser.add_argument("--max-in-flight", type=int, default=512, help="Max. gleichzeitig offene Requests")
+    parser.add_argument("--server", choices=("procfile", "asgi"), default="procfile",
+                        help="procfile = gunicorn laut Procfile, asgi = uvicorn asgi_app:app")
+    parser.add_argument("--workers", type=int, default=0, help="Worker-Anzahl überschreiben (0 = Procfile)")
+    parser.add_argument("--app-url", help="Bereits laufende App nutzen statt sie zu starten")
+    parser.add_argument("--no-cache", action="store_true", help="Campaign-/Questionnaire-Cache deaktivieren")
+    parser.add_argument("--env", action="append", default=[], help="Zusätzliche App-Umgebung KEY=VALUE")
+    parser.add_argument("--output", help="Ergebnis als JSON schreiben")
+    parser.add_argument("--compare", help="Ergebnis mit früherer JSON-Datei vergleichen")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Regressionsschwelle für --compare")
+    add_upstream_arguments(parser)
+    args = parser.parse_args()
+
+    levels = [float(level) for level in args.sweep.split(",")] if args.sweep else [args.rps]
+
+    upstreams = upstreams_from_args(args).start()
+    process = None
+    try:
+        if args.app_url:
+            base_url = args.app_url.rstrip("/")
+        else:
+            process, base_url, _ = start_app(args, upstreams.env())
+        wait_for_health(base_url)
+
+        run = LoadRun(base_url, args)
+        results = []
+        print(f"⏱️  {args.mode.upper()} | {args.duration:.0f}s pro Stufe (+{args.warmup:.0f}s Warmup)")
+        for rps in levels:
+            upstreams.reset()
+            result = run.run(rps, args.duration, args.warmup)
+            result["upstreams"] = upstreams.stats()
+            results.append(result)
+            print_level(result)
+    finally:
+        if process:
+            stop_app(process)
+        upstreams.stop()
+
+    saturated = next((level["target_rps"] for level in results
+                      if level["throughput_rps"] < 0.9 * level["target_rps"] or level["success_rate"] < 0.99), None)
+    if args.sweep:
+        print(f"\n📈 Sättigung ab: {saturated} rps" if saturated else "\n📈 Keine Sättigung im getesteten Bereich")
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "git": git_revision(),
+        "config": {
+            "server": "external" if args.app_url else args.server,
+            "mode": args.mode,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "campaigns": args.campaigns,
+            "no_cache": args.no_cache,
+            "upstreams": {name: {"latency_ms": getattr(args, f"{name}_latency_ms"),
+                                 "jitter_ms": getattr(args, f"{name}_jitter_ms"),
+                                 "error_rate": getattr(args, f"{name}_error_rate")}
+                          for name in ("hoc", "openai", "elevenlabs")},
+        },
+        "saturation_rps": saturated,
+        "levels": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Ergebnis gespeichert: {args.output}")
+
+    if args.compare and compare(report, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
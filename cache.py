@@ -0,0 +1,194 @@
+"""
+In-Memory Caches für den Webhook Receiver
+Thread-sicherer LRU-Cache mit TTL und Hit/Miss-Zählern
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+import metrics
+
+
+class TTLCache:
+    """LRU-Cache mit Ablaufzeit pro Eintrag (thread-sicher, pro Prozess)"""
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float):
+        """
+        Args:
+            name: Name des Caches (für Statistiken/Logs)
+            max_entries: Maximale Anzahl Einträge, danach LRU-Eviction
+            ttl_seconds: Standard-Lebensdauer eines Eintrags in Sekunden
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Liefert den Wert zu key oder default (zählt Hit/Miss)
+
+        Args:
+            key: Cache-Key
+            default: Rückgabewert bei Miss oder abgelaufenem Eintrag
+
+        Returns:
+            Gecachter Wert oder default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                metrics.record_cache(self.name, hit=False)
+                return default
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                metrics.record_cache(self.name, hit=False)
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            metrics.record_cache(self.name, hit=True)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: float = None) -> None:
+        """
+        Speichert value unter key (verdrängt bei Bedarf den ältesten Eintrag)
+
+        Args:
+            key: Cache-Key
+            value: Zu speichernder Wert
+            ttl_seconds: Optionale abweichende Lebensdauer
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Entfernt key aus dem Cache und liefert den Wert (ohne Hit/Miss-Zählung)"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return entry[1] if entry else default
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Entfernt alle Einträge, deren Key predicate erfüllt
+
+        Args:
+            predicate: Funktion key → bool
+
+        Returns:
+            Anzahl entfernter Einträge
+        """
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        """Leert den Cache (Zähler bleiben erhalten)"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Liefert Größe und Hit/Miss-Statistik des Caches"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class _InFlightCall:
+    """Laufender Aufruf innerhalb von SingleFlight"""
+
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Bündelt gleichzeitige Aufrufe mit demselben Key zu EINEM Upstream-Aufruf
+
+    Der erste Aufrufer führt fn aus, alle weiteren warten auf dessen Ergebnis
+    (bzw. erhalten dieselbe Exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Führt fn für key genau einmal gleichzeitig aus
+
+        Args:
+            key: Key, über den Aufrufe gebündelt werden
+            fn: Funktion ohne Argumente, die das Ergebnis liefert
+
+        Returns:
+            Ergebnis von fn (geteilt mit allen gleichzeitigen Aufrufern)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlightCall()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Prüft, ob für key gerade ein Aufruf läuft"""
+        with self._lock:
+            return key in self._calls
@@ -0,0 +1,405 @@
+"""
+Call-Lifecycle: Twilio Status Callbacks, Zuordnung zum auslösenden Request und Rollups
+
+Der Webhook reiht Events nur in eine Queue ein; ein Hintergrund-Thread pro Prozess
+schreibt sie gebündelt in SQLite (siehe local_db):
+
+    call_events      append-only Rohdaten (ein Eintrag pro Callback bzw. Dial)
+    call_lifecycle   ein Eintrag pro Call-SID: Kampagne, Phone-Number-ID, Request-ID und
+                     Zeitpunkte (dialed, initiated, ringing, answered, completed)
+    call_rollups     Zähler pro Stunde und Kampagne bzw. Phone-Number-ID
+
+Die Rollups werden bei jedem Schreiben inkrementell über die Differenz des Lifecycle-
+Beitrags vorher/nachher angepasst. Doppelte Callbacks (Twilio-Retries) ändern daher
+nichts, und Callbacks, die vor dem Dial-Eintrag ankommen, werden nachträglich
+zugeordnet. Abfragen lesen nur die Rollups, nie die Rohdaten.
+"""
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import local_db
+from config import Config
+
+
+logger = logging.getLogger(__name__)
+
+# Twilio CallStatus → Lifecycle-Spalte ("answered" heißt bei Twilio "in-progress")
+STATUS_COLUMNS = {
+    "initiated": "initiated_at",
+    "ringing": "ringing_at",
+    "in-progress": "answered_at",
+    "answered": "answered_at",
+    "completed": "completed_at",
+}
+# Endzustände ohne Gespräch
+UNANSWERED_STATUSES = ("busy", "no-answer", "failed", "canceled")
+FINAL_STATUSES = ("completed",) + UNANSWERED_STATUSES
+
+DIMENSIONS = ("campaign", "phone_number")
+ROLLUP_COUNTERS = ("calls", "answered", "unanswered", "finished", "answer_seconds_sum", "answer_count",
+                   "duration_seconds_sum", "duration_count")
+BUCKET_SECONDS = 3600
+
+_EVENT_DIAL = "dial"
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS call_events (
+        event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        call_sid TEXT NOT NULL,
+        status TEXT NOT NULL,
+        event_at REAL NOT NULL,
+        received_at REAL NOT NULL,
+        payload_json TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS call_lifecycle (
+        call_sid TEXT PRIMARY KEY,
+        campaign_id INTEGER,
+        agent_phone_number_id TEXT,
+        request_id TEXT,
+        dialed_at REAL,
+        initiated_at REAL,
+        ringing_at REAL,
+        answered_at REAL,
+        completed_at REAL,
+        final_status TEXT,
+        duration_seconds REAL,
+        updated_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS call_rollups (
+        dimension TEXT NOT NULL,
+        dimension_value TEXT NOT NULL,
+        bucket_start REAL NOT NULL,
+        calls INTEGER NOT NULL DEFAULT 0,
+        answered INTEGER NOT NULL DEFAULT 0,
+        unanswered INTEGER NOT NULL DEFAULT 0,
+        finished INTEGER NOT NULL DEFAULT 0,
+        answer_seconds_sum REAL NOT NULL DEFAULT 0,
+        answer_count INTEGER NOT NULL DEFAULT 0,
+        duration_seconds_sum REAL NOT NULL DEFAULT 0,
+        duration_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (dimension, dimension_value, bucket_start)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_call_events_received_at ON call_events (received_at)",
+    "CREATE INDEX IF NOT EXISTS idx_call_events_call_sid ON call_events (call_sid)",
+    "CREATE INDEX IF NOT EXISTS idx_call_lifecycle_updated_at ON call_lifecycle (updated_at)",
+    "CREATE INDEX IF NOT EXISTS idx_call_rollups_bucket ON call_rollups (dimension, bucket_start)",
+)
+
+# Alte Rohdaten/Lifecycles werden höchstens so oft pro Prozess gelöscht (Rollups bleiben)
+CLEANUP_INTERVAL_SECONDS = 300
+
+
+def parse_twilio_timestamp(value: str) -> float:
+    """Twilio "Timestamp" (RFC 2822, z.B. "Mon, 16 Aug 2010 03:45:01 +0000") als Unix-Zeit oder None"""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def lifecycle_contribution(row: dict) -> tuple:
+    """
+    Beitrag eines Calls zu den Rollups
+
+    Args:
+        row: call_lifecycle Eintrag
+
+    Returns:
+        (bucket_start, {Dimension: Wert}, {Zähler: Wert}) oder None (Call noch keinem Dial zugeordnet)
+    """
+    if not row or row.get("campaign_id") is None:
+        return None
+
+    started = row.get("dialed_at") or row.get("initiated_at")
+    if started is None:
+        return None
+
+    answered = row.get("answered_at") is not None
+    final_status = row.get("final_status")
+    counters = {
+        "calls": 1,
+        "answered": int(answered),
+        "unanswered": int(final_status in UNANSWERED_STATUSES),
+        "finished": int(final_status is not None),
+        "answer_seconds_sum": max(0.0, row["answered_at"] - started) if answered else 0.0,
+        "answer_count": int(answered),
+        "duration_seconds_sum": (row.get("duration_seconds") or 0.0) if answered else 0.0,
+        "duration_count": int(answered and row.get("duration_seconds") is not None),
+    }
+    dimensions = {"campaign": str(row["campaign_id"])}
+    if row.get("agent_phone_number_id"):
+        dimensions["phone_number"] = row["agent_phone_number_id"]
+    return started - started % BUCKET_SECONDS, dimensions, counters
+
+
+class CallEventStore:
+    """Append-only Event-Store mit gebündelten Schreibzugriffen aus einem Hintergrund-Thread"""
+
+    def __init__(self, path: str = None, batch_size: int = None, flush_interval: float = None,
+                 queue_size: int = None, ttl_seconds: float = None):
+        """
+        Args:
+            path: Pfad zur SQLite-Datei (Default: Config.CALL_EVENTS_PATH)
+            batch_size: Maximale Events pro Transaktion (Default: Config.CALL_EVENTS_BATCH_SIZE)
+            flush_interval: Maximale Wartezeit bis zum Schreiben (Default: Config.CALL_EVENTS_FLUSH_INTERVAL_SECONDS)
+            queue_size: Maximale Länge der Queue, danach werden Events verworfen (Default: Config.CALL_EVENTS_QUEUE_SIZE)
+            ttl_seconds: Aufbewahrung von Rohdaten und Lifecycles (Default: Config.CALL_EVENTS_TTL_SECONDS)
+        """
+        self.path = path or Config.CALL_EVENTS_PATH
+        self.batch_size = Config.CALL_EVENTS_BATCH_SIZE if batch_size is None else batch_size
+        self.flush_interval = Config.CALL_EVENTS_FLUSH_INTERVAL_SECONDS if flush_interval is None else flush_interval
+        self.ttl_seconds = Config.CALL_EVENTS_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._queue = queue.Queue(maxsize=Config.CALL_EVENTS_QUEUE_SIZE if queue_size is None else queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._next_cleanup = 0.0
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+
+    # -----------------------------------------------------------------
+    # Request-Thread: nur einreihen
+    # -----------------------------------------------------------------
+
+    def record_dial(self, call_sid: str, campaign_id: int, agent_phone_number_id: str = None,
+                    request_id: str = None) -> None:
+        """
+        Vermerkt einen gestarteten Call (Zuordnung für spätere Status Callbacks)
+
+        Args:
+            call_sid: Twilio Call SID
+            campaign_id: Campaign ID
+            agent_phone_number_id: ElevenLabs Phone-Number-ID, über die gewählt wurde
+            request_id: ID des auslösenden Requests (timing)
+        """
+        if not call_sid:
+            return
+        self._enqueue({
+            "call_sid": call_sid, "status": _EVENT_DIAL, "event_at": time.time(),
+            "campaign_id": campaign_id, "agent_phone_number_id": agent_phone_number_id, "request_id": request_id,
+        })
+
+    def record_status(self, data: dict) -> bool:
+        """
+        Reiht einen Twilio Status Callback ein
+
+        Args:
+            data: Form-Daten des Callbacks (CallSid, CallStatus, Timestamp, CallDuration, ...)
+
+        Returns:
+            False, wenn CallSid/CallStatus fehlen oder die Queue voll ist
+        """
+        call_sid = data.get("CallSid")
+        status = (data.get("CallStatus") or "").lower()
+        if not call_sid or not status:
+            return False
+        return self._enqueue({
+            "call_sid": call_sid, "status": status,
+            "event_at": parse_twilio_timestamp(data.get("Timestamp")) or time.time(),
+            "duration_seconds": float(data["CallDuration"]) if data.get("CallDuration") else None,
+            "payload": data,
+        })
+
+    def _enqueue(self, event: dict) -> bool:
+        self._ensure_writer()
+        event["received_at"] = time.time()
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    # -----------------------------------------------------------------
+    # Writer-Thread
+    # -----------------------------------------------------------------
+
+    def _ensure_writer(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="call-events-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self.write_batch(batch)
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                logger.error(f"❌ Call-Events nicht geschrieben ({len(batch)} Events): {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self) -> None:
+        """Wartet, bis alle eingereihten Events geschrieben sind"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def write_batch(self, events: list) -> None:
+        """
+        Schreibt Events in einer Transaktion (Rohdaten, Lifecycle und Rollup-Differenzen)
+
+        Args:
+            events: Events aus record_dial/record_status
+        """
+        local_db.ensure_schema("call_events", _SCHEMA, self.path)
+        now = time.time()
+        with local_db.transaction(self.path) as conn:
+            for event in events:
+                self._apply(conn, event, now)
+            self._cleanup(conn, now)
+        with self._lock:
+            self.written += len(events)
+
+    def _apply(self, conn, event: dict, now: float) -> None:
+        call_sid = event["call_sid"]
+        status = event["status"]
+        conn.execute(
+            "INSERT INTO call_events (call_sid, status, event_at, received_at, payload_json) VALUES (?, ?, ?, ?, ?)",
+            (call_sid, status, event["event_at"], event["received_at"],
+             json.dumps(event.get("payload") or {k: event.get(k) for k in ("campaign_id", "agent_phone_number_id", "request_id")},
+                        ensure_ascii=False, default=str))
+        )
+
+        existing = conn.execute("SELECT * FROM call_lifecycle WHERE call_sid = ?", (call_sid,)).fetchone()
+        before = dict(existing) if existing is not None else {"call_sid": call_sid}
+        after = dict(before)
+
+        if status == _EVENT_DIAL:
+            after.update(dialed_at=event["event_at"], campaign_id=event["campaign_id"],
+                         agent_phone_number_id=event["agent_phone_number_id"], request_id=event["request_id"])
+        else:
+            column = STATUS_COLUMNS.get(status)
+            # Frühester Zeitpunkt gewinnt (Retries und Callbacks außer der Reihe)
+            if column and (after.get(column) is None or event["event_at"] < after[column]):
+                after[column] = event["event_at"]
+            if status in FINAL_STATUSES:
+                after["final_status"] = status
+                if status in UNANSWERED_STATUSES:
+                    after["completed_at"] = after.get("completed_at") or event["event_at"]
+            if event.get("duration_seconds") is not None:
+                after["duration_seconds"] = event["duration_seconds"]
+                # Ohne "answered" Callback: Annahme aus Gesprächsdauer ableiten
+                if status == "completed" and after.get("answered_at") is None and event["duration_seconds"] > 0:
+                    after["answered_at"] = event["event_at"] - event["duration_seconds"]
+        after["updated_at"] = now
+
+        columns = [column for column in after if column != "call_sid"]
+        conn.execute(
+            f"INSERT INTO call_lifecycle (call_sid, {', '.join(columns)}) VALUES (?{', ?' * len(columns)}) "
+            f"ON CONFLICT(call_sid) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in columns)}",
+            [call_sid] + [after[column] for column in columns]
+        )
+        self._apply_rollup_delta(conn, lifecycle_contribution(before), -1)
+        self._apply_rollup_delta(conn, lifecycle_contribution(after), 1)
+
+    def _apply_rollup_delta(self, conn, contribution: tuple, sign: int) -> None:
+        if contribution is None:
+            return
+        bucket_start, dimensions, counters = contribution
+        if not any(counters.values()):
+            return
+        assignments = ", ".join(f"{name} = {name} + ?" for name in ROLLUP_COUNTERS)
+        values = [sign * counters[name] for name in ROLLUP_COUNTERS]
+        for dimension, value in dimensions.items():
+            conn.execute(
+                "INSERT OR IGNORE INTO call_rollups (dimension, dimension_value, bucket_start) VALUES (?, ?, ?)",
+                (dimension, value, bucket_start)
+            )
+            conn.execute(
+                f"UPDATE call_rollups SET {assignments} WHERE dimension = ? AND dimension_value = ? AND bucket_start = ?",
+                values + [dimension, value, bucket_start]
+            )
+
+    def _cleanup(self, conn, now: float) -> None:
+        if now < self._next_cleanup:
+            return
+        self._next_cleanup = now + CLEANUP_INTERVAL_SECONDS
+        conn.execute("DELETE FROM call_events WHERE received_at < ?", (now - self.ttl_seconds,))
+        conn.execute("DELETE FROM call_lifecycle WHERE updated_at < ?", (now - self.ttl_seconds,))
+
+    # -----------------------------------------------------------------
+    # Abfragen (nur Rollups)
+    # -----------------------------------------------------------------
+
+    def aggregates(self, dimension: str = "campaign", since: float = None, value: str = None) -> list:
+        """
+        Kennzahlen pro Kampagne bzw. Phone-Number-ID aus den Rollups
+
+        Args:
+            dimension: "campaign" oder "phone_number"
+            since: Nur Calls ab diesem Zeitpunkt (Unix-Zeit, auf Stunden gerundet)
+            value: Nur diese Kampagne bzw. Phone-Number-ID
+
+        Returns:
+            Liste mit calls, answered, unanswered, in_progress, answer_rate,
+            avg_time_to_answer_seconds und avg_duration_seconds pro Wert
+        """
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unbekannte Dimension '{dimension}' (erlaubt: {', '.join(DIMENSIONS)})")
+
+        sums = ", ".join(f"SUM({name}) AS {name}" for name in ROLLUP_COUNTERS)
+        sql = f"SELECT dimension_value, {sums} FROM call_rollups WHERE dimension = ? AND bucket_start >= ?"
+        params = [dimension, (since or 0) - (since or 0) % BUCKET_SECONDS]
+        if value is not None:
+            sql += " AND dimension_value = ?"
+            params.append(str(value))
+        sql += " GROUP BY dimension_value ORDER BY SUM(calls) DESC"
+
+        local_db.ensure_schema("call_events", _SCHEMA, self.path)
+        results = []
+        for row in local_db.connect(self.path).execute(sql, params):
+            decided = row["answered"] + row["unanswered"]
+            results.append({
+                dimension: row["dimension_value"],
+                "calls": row["calls"],
+                "answered": row["answered"],
+                "unanswered": row["unanswered"],
+                "in_progress": row["calls"] - row["finished"],
+                "answer_rate": round(row["answered"] / decided, 4) if decided else None,
+                "avg_time_to_answer_seconds":
+                    round(row["answer_seconds_sum"] / row["answer_count"], 2) if row["answer_count"] else None,
+                "avg_duration_seconds":
+                    round(row["duration_seconds_sum"] / row["duration_count"], 2) if row["duration_count"] else None,
+            })
+        return results
+
+    def stats(self) -> dict:
+        """Queue- und Schreibstatistik dieses Prozesses"""
+        with self._lock:
+            return {
+                "path": self.path,
+                "queued": self._queue.qsize(),
+                "written": self.written,
+                "dropped": self.dropped,
+                "errors": self.errors,
+            }
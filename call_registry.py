@@ -0,0 +1,290 @@
+"""
+Call-Registry: ordnet Telefonnummern, Call-SIDs und Conversation-IDs dem Kandidaten zu
+
+Wird beim Start eines Outbound Calls befüllt und vom Twilio Personalization Webhook
+gelesen (lokaler Primärschlüssel-Lookup statt Anfrage bei HOC). Gespeichert in
+SQLite (siehe local_db), damit alle gunicorn Worker dieselben Einträge sehen.
+
+Ein Call steht einmal in registered_calls (inkl. optional vorberechneter
+Personalization-Antwort) und ist über call_lookup_keys unter jedem Schlüssel erreichbar.
+Der Eintrag wird vor dem Dial unter der Nummer angelegt (register) - der Personalization
+Webhook kann kommen, bevor die ElevenLabs API antwortet; Call-SID und Conversation-ID
+kommen danach hinzu (attach).
+"""
+import re
+import uuid
+import threading
+import time
+
+import local_db
+from config import Config
+
+
+KEY_PHONE = "phone"
+KEY_CALL_SID = "call_sid"
+KEY_CONVERSATION = "conversation"
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS registered_calls (
+        call_id TEXT PRIMARY KEY,
+        campaign_id INTEGER NOT NULL,
+        first_name TEXT,
+        last_name TEXT,
+        company_name TEXT,
+        to_number TEXT,
+        call_sid TEXT,
+        conversation_id TEXT,
+        personalization BLOB,
+        registered_at REAL NOT NULL,
+        expires_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS call_lookup_keys (
+        lookup_key TEXT PRIMARY KEY,
+        call_id TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_registered_calls_expires_at ON registered_calls (expires_at)",
+    "CREATE INDEX IF NOT EXISTS idx_call_lookup_keys_expires_at ON call_lookup_keys (expires_at)",
+)
+
+# Abgelaufene Einträge werden höchstens so oft pro Prozess gelöscht
+CLEANUP_INTERVAL_SECONDS = 60
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_phone_number(number: str, default_country_code: str = None) -> str:
+    """
+    Normalisiert eine Telefonnummer auf E.164 (z.B. "0151 234-567" → "+49151234567")
+
+    Args:
+        number: Nummer in beliebiger Schreibweise (+49..., 0049..., 0151..., mit Leer-/Trennzeichen)
+        default_country_code: Ländervorwahl für nationale Nummern (Default: Config.DEFAULT_COUNTRY_CODE)
+
+    Returns:
+        Nummer im Format +<Ziffern> oder "" falls keine Ziffern enthalten sind
+    """
+    if not number:
+        return ""
+
+    number = str(number).strip()
+    digits = _NON_DIGITS.sub("", number)
+    if not digits:
+        return ""
+
+    if number.startswith("+"):
+        return f"+{digits}"
+    if digits.startswith("00"):
+        return f"+{digits[2:]}"
+    if digits.startswith("0"):
+        country_code = default_country_code or Config.DEFAULT_COUNTRY_CODE
+        return f"+{country_code}{digits[1:]}"
+    return f"+{digits}"
+
+
+class CallRegistry:
+    """Prozessübergreifender Index Nummer/Call-SID/Conversation-ID → Kandidat (mit TTL)"""
+
+    def __init__(self, path: str = None, ttl_seconds: float = None):
+        """
+        Args:
+            path: Pfad zur SQLite-Datei (Default: Config.LOCAL_DB_PATH)
+            ttl_seconds: Gültigkeit eines Eintrags (Default: Config.CALL_REGISTRY_TTL_SECONDS)
+        """
+        self.path = path
+        self.ttl_seconds = Config.CALL_REGISTRY_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._cleanup_lock = threading.Lock()
+        self._next_cleanup = 0.0
+
+    def _conn(self):
+        local_db.ensure_schema("call_registry", _SCHEMA, self.path)
+        return local_db.connect(self.path)
+
+    def register(self, candidate: dict, to_number: str = None, call_sid: str = None,
+                 conversation_id: str = None, personalization: bytes = None) -> str:
+        """
+        Registriert einen Call unter allen bekannten Schlüsseln (neuere Calls überschreiben ältere)
+
+        Args:
+            candidate: Dict mit campaign_id, first_name, last_name, company_name
+            to_number: Angerufene Nummer des Kandidaten
+            call_sid: Twilio Call SID
+            conversation_id: ElevenLabs Conversation ID
+            personalization: Vorberechneter Response-Body des Personalization Webhooks (serialisiert)
+
+        Returns:
+            ID des Eintrags (für attach/discard) oder None, falls kein Schlüssel bekannt ist
+        """
+        phone = normalize_phone_number(to_number)
+        keys = self._keys(phone=phone, call_sid=call_sid, conversation_id=conversation_id)
+        if not keys:
+            return None
+
+        now = time.time()
+        call_id = uuid.uuid4().hex
+        expires_at = now + self.ttl_seconds
+
+        local_db.ensure_schema("call_registry", _SCHEMA, self.path)
+        with local_db.transaction(self.path) as conn:
+            conn.execute(
+                """
+                INSERT INTO registered_calls
+                    (call_id, campaign_id, first_name, last_name, company_name, to_number, call_sid,
+                     conversation_id, personalization, registered_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (call_id, int(candidate['campaign_id']), candidate.get('first_name'), candidate.get('last_name'),
+                 candidate.get('company_name'), phone or None, call_sid, conversation_id, personalization,
+                 now, expires_at)
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO call_lookup_keys (lookup_key, call_id, expires_at) VALUES (?, ?, ?)",
+                [(key, call_id, expires_at) for key in keys]
+            )
+            self._cleanup(conn, now)
+        return call_id
+
+    def attach(self, call_id: str, call_sid: str = None, conversation_id: str = None) -> list:
+        """
+        Ergänzt einen vor dem Dial registrierten Call um Call-SID und Conversation-ID
+
+        Args:
+            call_id: ID aus register
+            call_sid: Twilio Call SID
+            conversation_id: ElevenLabs Conversation ID
+
+        Returns:
+            Liste der ergänzten Schlüssel (leer, falls der Eintrag nicht mehr existiert)
+        """
+        keys = self._keys(call_sid=call_sid, conversation_id=conversation_id)
+        if not keys:
+            return []
+
+        local_db.ensure_schema("call_registry", _SCHEMA, self.path)
+        with local_db.transaction(self.path) as conn:
+            row = conn.execute("SELECT expires_at FROM registered_calls WHERE call_id = ?", (call_id,)).fetchone()
+            if row is None:
+                return []
+            conn.execute(
+                """
+                UPDATE registered_calls SET call_sid = COALESCE(?, call_sid), conversation_id = COALESCE(?, conversation_id)
+                WHERE call_id = ?
+                """,
+                (call_sid, conversation_id, call_id)
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO call_lookup_keys (lookup_key, call_id, expires_at) VALUES (?, ?, ?)",
+                [(key, call_id, row["expires_at"]) for key in keys]
+            )
+        return keys
+
+    def discard(self, call_id: str) -> None:
+        """Entfernt einen Call mit allen Schlüsseln (z.B. wenn der Dial fehlgeschlagen ist)"""
+        local_db.ensure_schema("call_registry", _SCHEMA, self.path)
+        with local_db.transaction(self.path) as conn:
+            conn.execute("DELETE FROM call_lookup_keys WHERE call_id = ?", (call_id,))
+            conn.execute("DELETE FROM registered_calls WHERE call_id = ?", (call_id,))
+
+    @staticmethod
+    def _keys(phone: str = None, call_sid: str = None, conversation_id: str = None) -> list:
+        return [
+            f"{kind}:{value}"
+            for kind, value in ((KEY_PHONE, phone), (KEY_CALL_SID, call_sid), (KEY_CONVERSATION, conversation_id))
+            if value
+        ]
+
+    def _cleanup(self, conn, now: float) -> None:
+        with self._cleanup_lock:
+            if now < self._next_cleanup:
+                return
+            self._next_cleanup = now + CLEANUP_INTERVAL_SECONDS
+        conn.execute("DELETE FROM call_lookup_keys WHERE expires_at < ?", (now,))
+        # Calls, deren Schlüssel alle abgelaufen oder von neueren Calls übernommen sind
+        conn.execute(
+            """
+            DELETE FROM registered_calls WHERE expires_at < ?
+                OR call_id NOT IN (SELECT call_id FROM call_lookup_keys)
+            """,
+            (now,)
+        )
+
+    def lookup(self, call_sid: str = None, conversation_id: str = None, numbers: tuple = ()) -> dict:
+        """
+        Sucht den Kandidaten eines Calls (Call-SID vor Conversation-ID vor Nummern)
+
+        Args:
+            call_sid: Twilio Call SID
+            conversation_id: ElevenLabs Conversation ID
+            numbers: Telefonnummern in Prioritätsreihenfolge (z.B. caller_id, called_number)
+
+        Returns:
+            Dict mit campaign_id, first_name, last_name, company_name, matched_key und
+            personalization (vorberechneter Response-Body oder None) oder None
+        """
+        keys = [f"{KEY_CALL_SID}:{call_sid}" if call_sid else None,
+                f"{KEY_CONVERSATION}:{conversation_id}" if conversation_id else None]
+        keys += [f"{KEY_PHONE}:{phone}" for phone in map(normalize_phone_number, numbers) if phone]
+
+        conn = self._conn()
+        now = time.time()
+        for key in filter(None, keys):
+            row = conn.execute(
+                """
+                SELECT c.campaign_id, c.first_name, c.last_name, c.company_name, c.personalization
+                FROM call_lookup_keys r JOIN registered_calls c ON c.call_id = r.call_id
+                WHERE r.lookup_key = ? AND r.expires_at >= ?
+                """,
+                (key, now)
+            ).fetchone()
+            if row is not None:
+                return {
+                    "campaign_id": row["campaign_id"],
+                    "first_name": row["first_name"],
+                    "last_name": row["last_name"],
+                    "company_name": row["company_name"],
+                    "matched_key": key.split(":", 1)[0],
+                    "personalization": row["personalization"],
+                }
+        return None
+
+    def discard_personalizations(self, campaign_id: int) -> int:
+        """
+        Verwirft vorberechnete Personalization-Antworten einer Kampagne (z.B. nach geändertem Questionnaire)
+
+        Args:
+            campaign_id: Campaign ID
+
+        Returns:
+            Anzahl betroffener Calls (deren Webhook baut die Antwort wieder live)
+        """
+        local_db.ensure_schema("call_registry", _SCHEMA, self.path)
+        with local_db.transaction(self.path) as conn:
+            return conn.execute(
+                "UPDATE registered_calls SET personalization = NULL WHERE campaign_id = ? AND personalization IS NOT NULL",
+                (campaign_id,)
+            ).rowcount
+
+    def stats(self) -> dict:
+        """Anzahl gültiger Einträge pro Schlüsselart und vorberechneter Antworten (über alle Worker)"""
+        conn = self._conn()
+        now = time.time()
+        rows = conn.execute(
+            """
+            SELECT substr(lookup_key, 1, instr(lookup_key, ':') - 1) AS kind, COUNT(*) AS entries
+            FROM call_lookup_keys WHERE expires_at >= ? GROUP BY kind
+            """,
+            (now,)
+        ).fetchall()
+        precomputed = conn.execute(
+            "SELECT COUNT(*) FROM registered_calls WHERE expires_at >= ? AND personalization IS NOT NULL",
+            (now,)
+        ).fetchone()[0]
+        return {
+            "ttl_seconds": self.ttl_seconds,
+            "entries": {row["kind"]: row["entries"] for row in rows},
+            "precomputed_personalizations": precomputed,
+        }
@@ -0,0 +1,82 @@
+"""
+Invalidierungszähler pro Kampagne (prozessübergreifend, SQLite, siehe local_db)
+
+Questionnaire- und Campaign-Cache liegen im Speicher jedes gunicorn Workers. Der
+Admin-Endpoint erreicht nur den Worker, der den Request bedient; deshalb erhöht er
+zusätzlich die Generation der Kampagne in der geteilten Datenbank. Cache-Einträge
+tragen die Generation, mit der sie geladen wurden - weicht sie beim Lesen ab, gilt
+der Eintrag in jedem Worker als Miss.
+"""
+import logging
+import time
+
+import local_db
+
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS campaign_generations (
+        campaign_id INTEGER PRIMARY KEY,
+        generation INTEGER NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+)
+
+
+class CampaignGenerations:
+    """Generation pro Kampagne (0 = nie invalidiert)"""
+
+    def __init__(self, path: str = None):
+        """
+        Args:
+            path: Pfad zur SQLite-Datei (Default: Config.LOCAL_DB_PATH)
+        """
+        self.path = path
+        self.errors = 0
+
+    def current(self, campaign_id: int) -> int:
+        """
+        Liefert die aktuelle Generation einer Kampagne (ein Primärschlüssel-Lookup)
+
+        Args:
+            campaign_id: Campaign ID
+
+        Returns:
+            Generation (0, falls die Kampagne nie invalidiert wurde oder die Datenbank nicht lesbar ist)
+        """
+        try:
+            local_db.ensure_schema("campaign_generations", _SCHEMA, self.path)
+            row = local_db.connect(self.path).execute(
+                "SELECT generation FROM campaign_generations WHERE campaign_id = ?", (campaign_id,)
+            ).fetchone()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️ Campaign-Generation für Campaign {campaign_id} nicht lesbar: {e}")
+            return 0
+        return row["generation"] if row is not None else 0
+
+    def bump(self, campaign_id: int) -> int:
+        """
+        Erhöht die Generation einer Kampagne (macht ihre Cache-Einträge in allen Workern ungültig)
+
+        Args:
+            campaign_id: Campaign ID
+
+        Returns:
+            Neue Generation
+        """
+        local_db.ensure_schema("campaign_generations", _SCHEMA, self.path)
+        with local_db.transaction(self.path) as conn:
+            conn.execute(
+                """
+                INSERT INTO campaign_generations (campaign_id, generation, updated_at) VALUES (?, 1, ?)
+                ON CONFLICT (campaign_id) DO UPDATE SET generation = generation + 1, updated_at = excluded.updated_at
+                """,
+                (campaign_id, time.time())
+            )
+            return conn.execute(
+                "SELECT generation FROM campaign_generations WHERE campaign_id = ?", (campaign_id,)
+            ).fetchone()["generation"]
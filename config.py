@@ -3,6 +3,8 @@ ElevenLabs Voice Agent Configuration
 Zentrale Konfiguration für den Voice-Agent
 """
 import os
+import tempfile
+from urllib.parse import urlparse
 from dotenv import load_dotenv
 
 # Lade Umgebungsvariablen
@@ -28,6 +30,12 @@ class Config:
     TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
     TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
     TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER")
+    # X-Twilio-Signature von Twilio-Requests prüfen (Media-Stream Handshake, Status Callbacks);
+    # ohne TWILIO_AUTH_TOKEN werden diese Requests dann abgelehnt. Nur für lokale Tests abschalten.
+    TWILIO_VALIDATE_SIGNATURE = os.getenv("TWILIO_VALIDATE_SIGNATURE", "true").strip().lower() not in ("0", "false", "no")
+    # Öffentliche Basis-URL des Webhooks, wie Twilio sie aufruft (z.B. https://app.onrender.com) -
+    # hinter dem TLS-Proxy sieht der Server selbst nur http://interner-host
+    WEBHOOK_PUBLIC_URL = os.getenv("WEBHOOK_PUBLIC_URL")
     
     # ElevenLabs Phone Number ID
     ELEVENLABS_AGENT_PHONE_NUMBER_ID = os.getenv("ELEVENLABS_AGENT_PHONE_NUMBER_ID")
@@ -36,6 +44,9 @@ class Config:
     # Für EU Data Residency Keys muss die EU-spezifische Base URL verwendet werden
     ELEVENLABS_API_URL = "https://api.elevenlabs.io"  # SDK handled das automatisch mit dem _eu Key
     
+    # Base URL des Webhook-Clients (EU Data Residency), überschreibbar z.B. für lokale Benchmarks
+    ELEVENLABS_BASE_URL = os.getenv("ELEVENLABS_BASE_URL", "https://api.eu.residency.elevenlabs.io")
+    
     # Voice Settings
     VOICE_NAME = os.getenv("VOICE_NAME", "Bella")
     VOICE_MODEL = os.getenv("VOICE_MODEL", "eleven_multilingual_v2")
@@ -45,7 +56,144 @@ class Config:
     # Cursor Settings
     CURSOR_MODEL = os.getenv("CURSOR_MODEL", "cursor-small")
     CURSOR_API_URL = "https://api.cursor.sh/v1/chat/completions"
-    
+
+    # AI-Extraktion der Dynamic Variables
+    # Modus: "concurrent" (ein Request pro Variable, parallel) oder "single" (ein Structured-Output-Request für alle)
+    AI_EXTRACTION_MODE = os.getenv("AI_EXTRACTION_MODE", "concurrent").lower()
+    # Max. parallele OpenAI-Requests pro Prozess und Deadline pro Extraktion ab deren Start (Sekunden)
+    AI_EXTRACTION_MAX_WORKERS = int(os.getenv("AI_EXTRACTION_MAX_WORKERS", "10"))
+    AI_EXTRACTION_DEADLINE_SECONDS = float(os.getenv("AI_EXTRACTION_DEADLINE_SECONDS", "12"))
+    # Max. Wartezeit auf einen freien Thread im AI-Pool, danach Fallback-Wert (Pool-Sättigung)
+    AI_EXTRACTION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("AI_EXTRACTION_QUEUE_TIMEOUT_SECONDS", "12"))
+
+    # Cache für kampagnenweite Dynamic Variables (Key: campaign_id + Hash der Fragen)
+    CAMPAIGN_CACHE_TTL_SECONDS = float(os.getenv("CAMPAIGN_CACHE_TTL_SECONDS", "3600"))
+    CAMPAIGN_CACHE_MAX_ENTRIES = int(os.getenv("CAMPAIGN_CACHE_MAX_ENTRIES", "256"))
+
+    # Lokaler Questionnaire-Cache (frisch für TTL, danach stale-while-revalidate für STALE Sekunden)
+    QUESTIONNAIRE_CACHE_TTL_SECONDS = float(os.getenv("QUESTIONNAIRE_CACHE_TTL_SECONDS", "60"))
+    QUESTIONNAIRE_CACHE_STALE_SECONDS = float(os.getenv("QUESTIONNAIRE_CACHE_STALE_SECONDS", "600"))
+    QUESTIONNAIRE_CACHE_MAX_ENTRIES = int(os.getenv("QUESTIONNAIRE_CACHE_MAX_ENTRIES", "256"))
+
+    # HTTP Connection-Pools (Keep-Alive) für HOC, Cursor, OpenAI und ElevenLabs
+    HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))  # Anzahl Host-Pools pro Session
+    HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))  # Verbindungen pro Host
+    HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "60"))
+    # Retries (nur idempotente GETs) mit exponentiellem Backoff + Jitter
+    HTTP_RETRY_TOTAL = int(os.getenv("HTTP_RETRY_TOTAL", "3"))
+    HTTP_RETRY_BACKOFF_FACTOR = float(os.getenv("HTTP_RETRY_BACKOFF_FACTOR", "0.3"))
+
+    # Lokale SQLite-Datenbank für prozessübergreifenden Zustand (Jobs, ...)
+    LOCAL_DB_PATH = os.getenv("LOCAL_DB_PATH", os.path.join(tempfile.gettempdir(), "sellcruiting_webhook.sqlite3"))
+    LOCAL_DB_BUSY_TIMEOUT_SECONDS = float(os.getenv("LOCAL_DB_BUSY_TIMEOUT_SECONDS", "5"))
+
+    # Persistenter LLM-Cache (Extraktions-Ergebnisse über Worker, Neustarts und Deploys hinweg)
+    # Auf Render auf ein Persistent Disk legen, sonst geht er beim Deploy verloren
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", LOCAL_DB_PATH)
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+    LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 86400)))
+    LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "1024"))
+
+    # Call-Registry (Nummer/Call-SID/Conversation-ID → Kandidat für den Personalization Webhook)
+    CALL_REGISTRY_TTL_SECONDS = float(os.getenv("CALL_REGISTRY_TTL_SECONDS", str(7 * 86400)))
+    DEFAULT_COUNTRY_CODE = os.getenv("DEFAULT_COUNTRY_CODE", "49")  # für nationale Nummern (0151...)
+    # Call-Lifecycle Events aus /webhook/twilio-status (gebündelt geschrieben, Rollups pro Kampagne/Nummer)
+    CALL_EVENTS_PATH = os.getenv("CALL_EVENTS_PATH", LOCAL_DB_PATH)
+    CALL_EVENTS_BATCH_SIZE = int(os.getenv("CALL_EVENTS_BATCH_SIZE", "200"))
+    CALL_EVENTS_FLUSH_INTERVAL_SECONDS = float(os.getenv("CALL_EVENTS_FLUSH_INTERVAL_SECONDS", "1.0"))
+    CALL_EVENTS_QUEUE_SIZE = int(os.getenv("CALL_EVENTS_QUEUE_SIZE", "10000"))
+    CALL_EVENTS_TTL_SECONDS = float(os.getenv("CALL_EVENTS_TTL_SECONDS", str(30 * 86400)))  # Rohdaten, Rollups bleiben
+
+    # Session-Store für Twilio-Calls (Prompt/First Message bis zum TwiML-Callback, siehe session_store)
+    SESSION_STORE_BACKEND = os.getenv("SESSION_STORE_BACKEND", "sqlite")  # sqlite (alle Worker) oder memory
+    SESSION_STORE_PATH = os.getenv("SESSION_STORE_PATH", LOCAL_DB_PATH)
+    SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "3600"))
+    SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "10000"))
+    SESSION_BLOB_MIN_BYTES = int(os.getenv("SESSION_BLOB_MIN_BYTES", "512"))  # größere Texte komprimiert auslagern
+
+    # Media-Stream Proxy (media_proxy.py): Twilio <Connect><Stream> ↔ ElevenLabs Conversation WebSocket
+    MEDIA_PROXY_URL = os.getenv("MEDIA_PROXY_URL")  # öffentliche wss:// URL für TwiML, z.B. wss://proxy.example.com/media-stream
+    MEDIA_PROXY_HOST = os.getenv("MEDIA_PROXY_HOST", "0.0.0.0")
+    MEDIA_PROXY_PORT = int(os.getenv("MEDIA_PROXY_PORT", os.getenv("PORT", "8765")))
+    MEDIA_PROXY_BUFFER_FRAMES = int(os.getenv("MEDIA_PROXY_BUFFER_FRAMES", "50"))  # pro Richtung und Call (50 x 20 ms)
+    # Agents, die ein Stream über customParameters.agent_id wählen darf (Default: ELEVENLABS_AGENT_ID)
+    MEDIA_PROXY_ALLOWED_AGENT_IDS = [
+        agent_id.strip()
+        for agent_id in os.getenv("MEDIA_PROXY_ALLOWED_AGENT_IDS", ELEVENLABS_AGENT_ID or "").split(",")
+        if agent_id.strip()
+    ]
+    ELEVENLABS_CONVAI_WS_URL = os.getenv(
+        "ELEVENLABS_CONVAI_WS_URL",
+        ELEVENLABS_BASE_URL.replace("https://", "wss://", 1).replace("http://", "ws://", 1) + "/v1/convai/conversation"
+    )
+
+    # Personalization-Antwort beim Call-Start vorberechnen (Webhook liefert dann nur den gespeicherten Body)
+    PERSONALIZATION_PRECOMPUTE = os.getenv("PERSONALIZATION_PRECOMPUTE", "true").lower() == "true"
+
+    # Asynchroner Call-Dispatch (202 + Job-ID)
+    ASYNC_DISPATCH_WORKERS = int(os.getenv("ASYNC_DISPATCH_WORKERS", "4"))
+    JOB_TTL_SECONDS = float(os.getenv("JOB_TTL_SECONDS", "86400"))
+    # Erlaubte Hosts für callback_url (kommagetrennt, Default: Host von HIRINGS_API_URL)
+    JOB_CALLBACK_ALLOWED_HOSTS = [
+        host.strip().lower()
+        for host in os.getenv("JOB_CALLBACK_ALLOWED_HOSTS", urlparse(HIRINGS_API_URL or "").hostname or "").split(",")
+        if host.strip()
+    ]
+
+    # Batch-Trigger (/webhook/trigger-calls/batch)
+    BATCH_MAX_CANDIDATES = int(os.getenv("BATCH_MAX_CANDIDATES", "500"))
+    BATCH_DIAL_CONCURRENCY = int(os.getenv("BATCH_DIAL_CONCURRENCY", "5"))
+    # Synchron nur so viele Sekunden wählen (gunicorn --timeout 120), größere Batches → Job mit 202
+    BATCH_SYNC_MAX_SECONDS = float(os.getenv("BATCH_SYNC_MAX_SECONDS", "60"))
+
+    # Pre-Warming von Kampagnen (/webhook/admin/campaigns/prewarm, prewarm_campaigns.py)
+    PREWARM_MAX_CAMPAIGNS = int(os.getenv("PREWARM_MAX_CAMPAIGNS", "100"))
+    PREWARM_CONCURRENCY = int(os.getenv("PREWARM_CONCURRENCY", "4"))
+
+    # Governor für ausgehende Dials (ElevenLabs/Twilio) und OpenAI-Requests
+    # Überlauf wartet bis *_QUEUE_TIMEOUT_SECONDS, danach 503 statt Provider-Fehler
+    # Alle Limits gelten gemeinsam für alle gunicorn Worker (Zustand in LOCAL_DB_PATH)
+    DIAL_RATE_PER_SECOND = float(os.getenv("DIAL_RATE_PER_SECOND", os.getenv("BATCH_DIAL_RATE_PER_SECOND", "2")))
+    DIAL_BURST = int(os.getenv("DIAL_BURST", "5"))
+    # Gleichzeitige Dials pro agent_phone_number_id; der Slot wird frei, sobald der Dial-Request zurückkommt
+    DIAL_MAX_CONCURRENT_PER_NUMBER = int(os.getenv("DIAL_MAX_CONCURRENT_PER_NUMBER", "3"))
+    # true: Slot bleibt bis zum finalen Twilio-Status belegt (spätestens DIAL_ACTIVE_CALL_MAX_SECONDS) - nur
+    # einschalten, wenn Twilio Status Callbacks der Calls an /webhook/twilio-status schickt; Calls über
+    # die ElevenLabs API melden hier keinen Status, die Slots liefen sonst erst nach MAX_SECONDS ab
+    DIAL_HOLD_UNTIL_FINAL_STATUS = os.getenv("DIAL_HOLD_UNTIL_FINAL_STATUS", "false").strip().lower() in ("1", "true", "yes")
+    DIAL_ACTIVE_CALL_MAX_SECONDS = float(os.getenv("DIAL_ACTIVE_CALL_MAX_SECONDS", "900"))
+    DIAL_QUEUE_TIMEOUT_SECONDS = float(os.getenv("DIAL_QUEUE_TIMEOUT_SECONDS", "60"))
+    OPENAI_REQUESTS_PER_SECOND = float(os.getenv("OPENAI_REQUESTS_PER_SECOND", "20"))
+    OPENAI_BURST = int(os.getenv("OPENAI_BURST", "10"))
+    OPENAI_QUEUE_TIMEOUT_SECONDS = float(os.getenv("OPENAI_QUEUE_TIMEOUT_SECONDS", "10"))
+
+    # Logging: "structured" (ein JSON-Event pro Stage, Previews nur als Stichprobe) oder
+    # "verbose" (bisherige ausführliche Text-Logs, zum Debuggen)
+    LOG_MODE = os.getenv("LOG_MODE", "structured").strip().lower()
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    LOG_PREVIEW_SAMPLE_RATE = float(os.getenv("LOG_PREVIEW_SAMPLE_RATE", "0.01"))
+
+    # Stage-Timing (Server-Timing Header + Sinks), kommasepariert: log, events, file, otel
+    TIMING_SINKS = os.getenv("TIMING_SINKS", "events" if LOG_MODE == "structured" else "log")
+    TIMING_FILE_PATH = os.getenv("TIMING_FILE_PATH", os.path.join(tempfile.gettempdir(), "sellcruiting_timings.jsonl"))
+
+    # Mapping geschlechtsspezifischer Berufsbezeichnungen (Reload bei Änderung, ohne Deploy)
+    JOB_TITLE_MAPPING_PATH = os.getenv(
+        "JOB_TITLE_MAPPING_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "job_title_mapping.json")
+    )
+    JOB_TITLE_MAPPING_CHECK_SECONDS = float(os.getenv("JOB_TITLE_MAPPING_CHECK_SECONDS", "30"))
+
+    # Layouts der Prompt-Variablen (Abschnitte in templates/, neu kompiliert bei geänderter Datei)
+    PROMPT_TEMPLATES_DIR = os.getenv(
+        "PROMPT_TEMPLATES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+    )
+    PROMPT_TEMPLATES_CHECK_SECONDS = float(os.getenv("PROMPT_TEMPLATES_CHECK_SECONDS", "30"))
+
+    # JSON-Recovery für HOC-Responses, die kein reines JSON sind (Body-Größe + Zeitbudget)
+    HOC_JSON_RECOVERY_MAX_BYTES = int(os.getenv("HOC_JSON_RECOVERY_MAX_BYTES", str(2 * 1024 * 1024)))
+    HOC_JSON_RECOVERY_TIME_BUDGET_SECONDS = float(os.getenv("HOC_JSON_RECOVERY_TIME_BUDGET_SECONDS", "0.25"))
+
     # Validierung
     @classmethod
     def validate(cls):
@@ -70,3 +218,14 @@ class Config:
         
         return True
 
+    @classmethod
+    def validate_twilio_signature(cls):
+        """Prüft beim Start, ob Twilio-Signaturen geprüft werden können (sonst würde jeder Callback abgelehnt)"""
+        if cls.TWILIO_VALIDATE_SIGNATURE and not cls.TWILIO_AUTH_TOKEN:
+            raise ValueError(
+                "Konfigurationsfehler:\n- TWILIO_AUTH_TOKEN fehlt, Twilio Callbacks und Media Streams würden "
+                "abgelehnt (für lokale Tests TWILIO_VALIDATE_SIGNATURE=false setzen)"
+            )
+        
+        return True
+
@@ -0,0 +1,33 @@
+"""
+gunicorn Konfiguration (Procfile: gunicorn -c gunicorn.conf.py ...)
+
+Prometheus-Metriken im Multiprocess-Modus: jeder Worker schreibt seine Werte in
+PROMETHEUS_MULTIPROC_DIR, /metrics aggregiert über alle Worker (siehe metrics.py).
+Das Verzeichnis muss gesetzt sein, bevor die Worker webhook_receiver importieren.
+"""
+import os
+import shutil
+import tempfile
+
+
+prometheus_multiproc_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    os.path.join(tempfile.gettempdir(), "sellcruiting_prometheus")
+)
+
+
+def on_starting(server):
+    """Leert das Metrik-Verzeichnis beim Start (Dateien alter Läufe würden sonst mitgezählt)"""
+    shutil.rmtree(prometheus_multiproc_dir, ignore_errors=True)
+    os.makedirs(prometheus_multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Entfernt die Live-Gauges eines beendeten Workers und schließt seine offenen Jobs ab"""
+    from prometheus_client import multiprocess
+    from job_store import JobStore
+
+    multiprocess.mark_process_dead(worker.pid)
+    orphaned = JobStore().fail_orphaned(worker.pid)
+    if orphaned:
+        server.log.warning(f"{orphaned} offene Jobs von Worker {worker.pid} als fehlgeschlagen markiert")
@@ -0,0 +1,257 @@
+"""
+Geteilte HTTP-Connection-Pools mit Keep-Alive
+Eine Session/ein Client pro Upstream (HOC, Cursor, OpenAI, ElevenLabs) statt
+neuem TCP+TLS-Handshake pro Request, inkl. Pool-Statistiken
+"""
+import random
+import threading
+import time
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metrics
+from config import Config
+
+
+# Nur idempotente Methoden werden automatisch wiederholt
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+
+class JitteredRetry(Retry):
+    """urllib3 Retry mit "Full Jitter" auf dem exponentiellen Backoff"""
+
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return 0
+        return random.uniform(0, backoff)
+
+
+class PoolStats:
+    """Thread-sichere Zähler für Requests und neu aufgebaute Verbindungen"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def record_connection(self) -> None:
+        with self._lock:
+            self.new_connections += 1
+
+    def snapshot(self) -> dict:
+        """Liefert die Zähler inkl. Reuse-Rate (Anteil Requests ohne neuen Handshake)"""
+        with self._lock:
+            requests_count = self.requests
+            connections = self.new_connections
+
+        reuse_rate = 1 - connections / requests_count if requests_count else 0.0
+        return {
+            "requests": requests_count,
+            "new_connections": connections,
+            "reuse_rate": round(max(reuse_rate, 0.0), 4),
+        }
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter, der Requests zählt und Verbindungen aus den urllib3-Pools ausliest"""
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        self.stats.record_request()
+        started = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+        except Exception as e:
+            metrics.observe_upstream(self.stats.name, time.perf_counter() - started, error=e)
+            raise
+        metrics.observe_upstream(self.stats.name, time.perf_counter() - started, response.status_code)
+        return response
+
+    def connection_counts(self) -> tuple:
+        """Summiert (Verbindungen, Requests) über alle Host-Pools des Adapters"""
+        connections = 0
+        requests_count = 0
+        pools = self.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            connections += getattr(pool, "num_connections", 0)
+            requests_count += getattr(pool, "num_requests", 0)
+        return connections, requests_count
+
+
+class MeteredTransport(httpx.BaseTransport):
+    """httpx-Transport, der Latenz und Fehler jedes Requests an metrics meldet"""
+
+    def __init__(self, name: str, transport: httpx.BaseTransport):
+        self.name = name
+        self._transport = transport
+
+    def handle_request(self, request):
+        started = time.perf_counter()
+        try:
+            response = self._transport.handle_request(request)
+        except Exception as e:
+            metrics.observe_upstream(self.name, time.perf_counter() - started, error=e)
+            raise
+        metrics.observe_upstream(self.name, time.perf_counter() - started, response.status_code)
+        return response
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncMeteredTransport(httpx.AsyncBaseTransport):
+    """Async Gegenstück zu MeteredTransport"""
+
+    def __init__(self, name: str, transport: httpx.AsyncBaseTransport):
+        self.name = name
+        self._transport = transport
+
+    async def handle_async_request(self, request):
+        started = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception as e:
+            metrics.observe_upstream(self.name, time.perf_counter() - started, error=e)
+            raise
+        metrics.observe_upstream(self.name, time.perf_counter() - started, response.status_code)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+_lock = threading.Lock()
+_sessions = {}
+_httpx_stats = {}
+
+
+def get_session(name: str) -> requests.Session:
+    """
+    Liefert die geteilte requests.Session für einen Upstream (wird beim ersten Aufruf erstellt)
+
+    Args:
+        name: Name des Upstreams (z.B. "hoc", "cursor")
+
+    Returns:
+        requests.Session mit Keep-Alive-Pool und Retry (jittered Backoff) für idempotente Requests
+    """
+    with _lock:
+        session = _sessions.get(name)
+        if session is not None:
+            return session
+
+        retry = JitteredRetry(
+            total=Config.HTTP_RETRY_TOTAL,
+            backoff_factor=Config.HTTP_RETRY_BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=IDEMPOTENT_METHODS,
+            raise_on_status=False,
+        )
+        adapter = CountingHTTPAdapter(
+            PoolStats(name),
+            pool_connections=Config.HTTP_POOL_CONNECTIONS,
+            pool_maxsize=Config.HTTP_POOL_MAXSIZE,
+            max_retries=retry,
+        )
+
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _sessions[name] = session
+        return session
+
+
+def create_httpx_client(name: str, client_class=httpx.Client, **kwargs) -> httpx.Client:
+    """
+    Erstellt einen httpx-Client mit Keep-Alive-Pool für SDKs (OpenAI, ElevenLabs)
+
+    Args:
+        name: Name des Upstreams (für Statistiken)
+        client_class: httpx.Client, httpx.AsyncClient oder eine Unterklasse (z.B. openai.DefaultHttpxClient)
+        **kwargs: Weitere Argumente für den Client (timeout, follow_redirects, ...)
+
+    Returns:
+        httpx.Client mit konfigurierten Pool-Limits und Request-/Verbindungszählern
+    """
+    stats = PoolStats(name)
+
+    # httpx.AsyncClient erwartet async Event-Hooks und async Trace-Callbacks
+    if issubclass(client_class, httpx.AsyncClient):
+        async def trace(event_name, info):
+            if event_name == "connection.connect_tcp.complete":
+                stats.record_connection()
+
+        async def on_request(request):
+            stats.record_request()
+            request.extensions["trace"] = trace
+    else:
+        def trace(event_name, info):
+            if event_name == "connection.connect_tcp.complete":
+                stats.record_connection()
+
+        def on_request(request):
+            stats.record_request()
+            request.extensions["trace"] = trace
+
+    limits = httpx.Limits(
+        max_connections=Config.HTTP_POOL_MAXSIZE,
+        max_keepalive_connections=Config.HTTP_POOL_MAXSIZE,
+        keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    )
+
+    # Eigener Transport (mit den Pool-Limits), damit Latenz/Fehler in den Metriken landen
+    if issubclass(client_class, httpx.AsyncClient):
+        transport = AsyncMeteredTransport(name, httpx.AsyncHTTPTransport(limits=limits))
+    else:
+        transport = MeteredTransport(name, httpx.HTTPTransport(limits=limits))
+
+    with _lock:
+        _httpx_stats[name] = stats
+
+    return client_class(transport=transport, event_hooks={"request": [on_request]}, **kwargs)
+
+
+def pool_stats() -> dict:
+    """
+    Liefert Pool-Statistiken aller Upstreams dieses Prozesses
+
+    Returns:
+        Dict {upstream: {requests, new_connections, reuse_rate, ...}}
+    """
+    with _lock:
+        sessions = dict(_sessions)
+        httpx_stats = dict(_httpx_stats)
+
+    result = {}
+    for name, session in sessions.items():
+        adapter = session.get_adapter("https://")
+        snapshot = adapter.stats.snapshot()
+        connections, pooled_requests = adapter.connection_counts()
+        snapshot["new_connections"] = connections
+        reuse_rate = 1 - connections / pooled_requests if pooled_requests else 0.0
+        snapshot["reuse_rate"] = round(max(reuse_rate, 0.0), 4)
+        snapshot["pool_maxsize"] = Config.HTTP_POOL_MAXSIZE
+        result[name] = snapshot
+
+    for name, stats in httpx_stats.items():
+        snapshot = stats.snapshot()
+        snapshot["pool_maxsize"] = Config.HTTP_POOL_MAXSIZE
+        result[name] = snapshot
+
+    return result
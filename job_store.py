@@ -0,0 +1,198 @@
+"""
+Job-Store für asynchron verarbeitete Webhook-Requests
+Status ist über alle gunicorn Worker sichtbar (SQLite, siehe local_db)
+
+Jobs laufen im Thread-Pool des Workers, der sie angelegt hat (owner_pid). Stirbt dieser
+Worker (Neustart, Deploy, Timeout-Kill), setzt fail_orphaned() seine offenen Jobs auf
+"failed" - sonst bliebe ihr Status für pollende Clients für immer queued/running.
+"""
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+
+import local_db
+from config import Config
+
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        job_id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        status TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        request_json TEXT,
+        http_status INTEGER,
+        result_json TEXT,
+        error TEXT,
+        callback_url TEXT,
+        callback_status TEXT,
+        owner_pid INTEGER
+    )
+    """,
+    # Bestehende Datenbanken (vor owner_pid); local_db ignoriert die Meldung "duplicate column"
+    "ALTER TABLE jobs ADD COLUMN owner_pid INTEGER",
+    "CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)",
+)
+
+ORPHANED_ERROR = "worker exited before the job finished"
+
+
+def _process_alive(pid: int) -> bool:
+    """Prüft, ob ein Prozess mit dieser PID auf diesem Host läuft"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """Persistenter Job-Status (queued → running → succeeded/failed)"""
+
+    def __init__(self, path: str = None, ttl_seconds: float = None):
+        """
+        Args:
+            path: Pfad zur SQLite-Datei (Default: Config.LOCAL_DB_PATH)
+            ttl_seconds: Aufbewahrungsdauer abgeschlossener Jobs (Default: Config.JOB_TTL_SECONDS)
+        """
+        self.path = path
+        self.ttl_seconds = Config.JOB_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+
+    def _conn(self):
+        local_db.ensure_schema("jobs", _SCHEMA, self.path)
+        return local_db.connect(self.path)
+
+    def create(self, kind: str, request_data: dict, callback_url: str = None, job_id: str = None) -> str:
+        """
+        Legt einen neuen Job im Status "queued" an
+
+        Args:
+            kind: Art des Jobs (z.B. "trigger-call")
+            request_data: Validierte Request-Parameter
+            callback_url: Optionale URL für die Abschluss-Benachrichtigung
+            job_id: Optionale feste Job-ID (Default: zufällige UUID)
+
+        Returns:
+            Job-ID
+        """
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+
+        conn = self._conn()
+        conn.execute(
+            "DELETE FROM jobs WHERE created_at < ? AND status IN ('succeeded', 'failed')",
+            (now - self.ttl_seconds,)
+        )
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO jobs
+                (job_id, kind, status, created_at, updated_at, request_json, callback_url, owner_pid)
+            VALUES (?, ?, 'queued', ?, ?, ?, ?, ?)
+            """,
+            (job_id, kind, now, now, json.dumps(request_data, ensure_ascii=False, default=str), callback_url,
+             os.getpid())
+        )
+        return job_id
+
+    def fail_orphaned(self, owner_pid: int = None) -> int:
+        """
+        Setzt offene Jobs (queued/running) toter Worker auf "failed"
+
+        Args:
+            owner_pid: Nur Jobs dieses Workers (z.B. gunicorn child_exit); ohne PID alle Jobs,
+                deren Worker nicht mehr läuft (Jobs ohne owner_pid gelten als verwaist)
+
+        Returns:
+            Anzahl als fehlgeschlagen markierter Jobs
+        """
+        conn = self._conn()
+        if owner_pid is not None:
+            job_ids = [row["job_id"] for row in conn.execute(
+                "SELECT job_id FROM jobs WHERE status IN ('queued', 'running') AND owner_pid = ?", (owner_pid,)
+            )]
+        else:
+            job_ids = [row["job_id"] for row in conn.execute(
+                "SELECT job_id, owner_pid FROM jobs WHERE status IN ('queued', 'running')"
+            ) if row["owner_pid"] is None or not _process_alive(row["owner_pid"])]
+
+        now = time.time()
+        conn.executemany(
+            """
+            UPDATE jobs SET status = 'failed', updated_at = ?, http_status = 500, error = ?
+            WHERE job_id = ? AND status IN ('queued', 'running')
+            """,
+            [(now, ORPHANED_ERROR, job_id) for job_id in job_ids]
+        )
+        return len(job_ids)
+
+    def mark_running(self, job_id: str) -> None:
+        """Setzt den Job auf "running" """
+        self._conn().execute(
+            "UPDATE jobs SET status = 'running', updated_at = ? WHERE job_id = ?",
+            (time.time(), job_id)
+        )
+
+    def finish(self, job_id: str, http_status: int, result: dict) -> None:
+        """
+        Speichert das Ergebnis eines Jobs
+
+        Args:
+            job_id: Job-ID
+            http_status: HTTP-Status, den der synchrone Request geliefert hätte
+            result: Response-Body, den der synchrone Request geliefert hätte
+        """
+        status = "succeeded" if http_status < 400 else "failed"
+        self._conn().execute(
+            "UPDATE jobs SET status = ?, updated_at = ?, http_status = ?, result_json = ? WHERE job_id = ?",
+            (status, time.time(), http_status, json.dumps(result, ensure_ascii=False, default=str), job_id)
+        )
+
+    def fail(self, job_id: str, error: str) -> None:
+        """Markiert einen Job als fehlgeschlagen (unerwartete Exception)"""
+        self._conn().execute(
+            "UPDATE jobs SET status = 'failed', updated_at = ?, http_status = 500, error = ? WHERE job_id = ?",
+            (time.time(), error, job_id)
+        )
+
+    def set_callback_status(self, job_id: str, callback_status: str) -> None:
+        """Speichert das Ergebnis der Abschluss-Benachrichtigung"""
+        self._conn().execute(
+            "UPDATE jobs SET callback_status = ? WHERE job_id = ?",
+            (callback_status, job_id)
+        )
+
+    def get(self, job_id: str) -> dict:
+        """
+        Liefert den aktuellen Status eines Jobs
+
+        Args:
+            job_id: Job-ID
+
+        Returns:
+            Job als dict oder None, falls unbekannt
+        """
+        row = self._conn().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+
+        return {
+            "job_id": row["job_id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "created_at": datetime.fromtimestamp(row["created_at"]).isoformat(),
+            "updated_at": datetime.fromtimestamp(row["updated_at"]).isoformat(),
+            "http_status": row["http_status"],
+            "result": json.loads(row["result_json"]) if row["result_json"] else None,
+            "error": row["error"],
+            "callback_url": row["callback_url"],
+            "callback_status": row["callback_status"],
+        }
@@ -0,0 +1,233 @@
+"""
+Geschlechterneutrale Berufsbezeichnungen für campaignrole_title
+
+Ein zu einem Regex kompilierter Trie über die Mapping-Tabelle (job_title_mapping.json)
+findet in einem Durchlauf den längsten geschlechtsspezifischen Teilstring; ohne Treffer entfernt ein kombinierter
+Regex alle geschlechtsspezifischen Endungen in einem Pass. Die Tabelle wird bei
+geänderter mtime neu geladen, Ops können sie also ohne Deploy erweitern.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from config import Config
+
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_TITLE = "Fachkraft"
+
+# Alle geschlechtsspezifischen Endungen in einem Pass (Ersetzung über _replace_suffix)
+_SUFFIX_PATTERN = re.compile(r"""
+      \s*\(\s*[mwdfx](?:\s*/\s*[mwdfx])+\s*\)   # "(m/w/d)"
+    | \s*\(-?frau/-?mann\)                      # "(frau/-mann)", "(-frau/-mann)"
+    | \s*[-/]\s*-?(?:frau|mann)\b               # "/-mann", "-frau", "/frau"
+    | \s*[-/*:_]\s*in(?:nen)?\b                 # "/in", "*in", ":in", "_innen"
+    | (?:(?<=er)|(?<=eur)|(?<=är)|(?<=ar)|(?<=or)|(?<=ent)|(?<=ant)|(?<=eut)|(?<=ist)|(?<=ekt)|(?<=at)|(?<=ot)|(?<=ef))in\b
+                                                # "Erzieherin", "Ingenieurin", "Sekretärin", "Direktorin", "Assistentin",
+                                                # "Praktikantin", "Physiotherapeutin", "Architektin", "Pilotin", ...
+                                                # (nicht nach anderen Stämmen: "Medizin", "Berlin", "Termin")
+    | (?:(?<=agog)|(?<=olog))(?P<og>in)\b      # "Heilpädagogin" → "Heilpädagoge", "Psychologin" → "Psychologe"
+    | (?P<kauf>kauf)(?:frau|mann)(?:\s*/\s*-?(?:frau|mann))?\b
+                                                # "Kauffrau/-mann" → "Kaufmännische Fachkraft",
+                                                # "Bürokauffrau" → "Bürokaufmännische Fachkraft"
+    | (?P<fach>fach)(?:frau|mann)\b             # "Pflegefachmann" → "Pflegefachkraft"
+""", re.IGNORECASE | re.VERBOSE)
+
+_CLEANUP_PATTERN = re.compile(r"\s+|-\s*-")
+
+
+def _replace_suffix(match) -> str:
+    fach = match.group("fach")
+    if fach:
+        return fach + ("KRAFT" if fach.isupper() else "kraft")
+    og = match.group("og")
+    if og:
+        return "E" if og.isupper() else "e"
+    kauf = match.group("kauf")
+    if kauf:
+        if kauf.isupper():
+            return "KAUFMÄNNISCHE FACHKRAFT"
+        # Im Kompositum ("Bürokauffrau") klein weiter: "Bürokaufmännische Fachkraft"
+        return "Kaufmännische Fachkraft" if kauf[0].isupper() else "kaufmännische Fachkraft"
+    return ""
+
+
+def _cleanup(match) -> str:
+    return " " if match.group().isspace() else "-"
+
+
+class JobTitleTrie:
+    """
+    Trie über die lowercase Teilstrings der Mapping-Tabelle, kompiliert zu einem Regex
+
+    Der Trie wird als verschachtelte Alternation ausgegeben (längere Fortsetzungen
+    zuerst), in einem Lookahead findet finditer damit in einem Durchlauf für jede
+    Startposition den längsten Eintrag.
+    """
+
+    def __init__(self, entries: list):
+        """
+        Args:
+            entries: Liste von {"match": str, "neutral": str, "whole_word": bool}
+        """
+        root = {}
+        self._entries = {}
+        for entry in entries:
+            key = entry["match"].lower()
+            # Doppelte Einträge: der erste gewinnt (wie bisher im dict-Literal)
+            if not key or key in self._entries:
+                continue
+            self._entries[key] = (entry["neutral"], bool(entry.get("whole_word")))
+
+            node = root
+            for char in key:
+                node = node.setdefault(char, {})
+            node[None] = True
+
+        self.size = len(self._entries)
+        self._pattern = re.compile(f"(?=({self._node_pattern(root)}))") if self._entries else None
+
+    @classmethod
+    def _node_pattern(cls, node: dict) -> str:
+        branches = [re.escape(char) + cls._node_pattern(child) for char, child in sorted(node.items(), key=str)
+                    if char is not None]
+        if not branches:
+            return ""
+
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if None in node else body
+
+    def longest_match(self, text: str) -> str:
+        """
+        Sucht den längsten Treffer in text (bei gleicher Länge: der früheste)
+
+        Args:
+            text: lowercase Job-Titel
+
+        Returns:
+            Neutrale Bezeichnung oder None
+        """
+        if self._pattern is None:
+            return None
+
+        best_length = 0
+        best = None
+        for match in self._pattern.finditer(text):
+            key = match.group(1)
+            if len(key) <= best_length:
+                continue
+
+            neutral, whole_word = self._entries[key]
+            if whole_word:
+                start, end = match.start(), match.start() + len(key)
+                if (start and text[start - 1].isalnum()) or (end < len(text) and text[end].isalnum()):
+                    continue
+
+            best_length = len(key)
+            best = neutral
+
+        return best
+
+
+class JobTitleNormalizer:
+    """Neutralisiert Job-Titel; lädt die Mapping-Tabelle bei Änderung neu"""
+
+    def __init__(self, mapping_path: str = None, check_interval_seconds: float = None):
+        """
+        Args:
+            mapping_path: Pfad zur JSON-Tabelle (Default: Config.JOB_TITLE_MAPPING_PATH)
+            check_interval_seconds: Mindestabstand zwischen mtime-Prüfungen
+                (Default: Config.JOB_TITLE_MAPPING_CHECK_SECONDS)
+        """
+        self.mapping_path = mapping_path or Config.JOB_TITLE_MAPPING_PATH
+        self.check_interval_seconds = (
+            Config.JOB_TITLE_MAPPING_CHECK_SECONDS if check_interval_seconds is None else check_interval_seconds
+        )
+        self._lock = threading.Lock()
+        self._trie = JobTitleTrie([])
+        self._mtime = None
+        self._checked_at = 0.0
+        self._maybe_reload(force=True)
+
+    def _maybe_reload(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval_seconds:
+            return
+
+        with self._lock:
+            if not force and now - self._checked_at < self.check_interval_seconds:
+                return
+            self._checked_at = now
+
+            try:
+                mtime = os.stat(self.mapping_path).st_mtime
+            except OSError as e:
+                if self._mtime is not None or force:
+                    logger.warning(f"⚠️ Job-Titel-Mapping nicht lesbar ({self.mapping_path}): {e}")
+                return
+
+            if mtime == self._mtime:
+                return
+
+            try:
+                with open(self.mapping_path, encoding="utf-8") as f:
+                    entries = json.load(f)["mappings"]
+                trie = JobTitleTrie(entries)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"⚠️ Job-Titel-Mapping ungültig ({self.mapping_path}): {e} - behalte bisherige Tabelle")
+                return
+
+            self._trie = trie
+            self._mtime = mtime
+            logger.info(f"🔁 Job-Titel-Mapping geladen: {trie.size} Einträge ({self.mapping_path})")
+
+    def normalize(self, job_title: str) -> str:
+        """
+        Konvertiert einen Job-Titel zu einer geschlechterneutralen Bezeichnung
+
+        Args:
+            job_title: Job-Titel mit möglicherweise geschlechtsspezifischen Endungen
+
+        Returns:
+            Geschlechterneutraler Job-Titel ("Fachkraft", falls nichts übrig bleibt)
+        """
+        if not job_title:
+            return ""
+
+        self._maybe_reload()
+
+        job_title = job_title.strip()
+        neutral = self._trie.longest_match(job_title.lower())
+        if neutral:
+            return neutral
+
+        result = _SUFFIX_PATTERN.sub(_replace_suffix, job_title)
+        result = _CLEANUP_PATTERN.sub(_cleanup, result).strip(" -")
+
+        return result or FALLBACK_TITLE
+
+
+_default_normalizer = None
+_default_lock = threading.Lock()
+
+
+def make_gender_neutral_job_title(job_title: str) -> str:
+    """
+    Konvertiert Job-Titel zu geschlechterneutralen Begriffen (geteilter Normalizer)
+
+    Args:
+        job_title: Job-Titel mit möglicherweise geschlechtsspezifischen Endungen
+
+    Returns:
+        Geschlechterneutraler Job-Titel
+    """
+    global _default_normalizer
+    if _default_normalizer is None:
+        with _default_lock:
+            if _default_normalizer is None:
+                _default_normalizer = JobTitleNormalizer()
+    return _default_normalizer.normalize(job_title)
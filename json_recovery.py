@@ -0,0 +1,150 @@
+"""
+Robustes, begrenztes JSON-Parsing für HOC-Responses
+
+Falls die Response kein reines JSON ist (HTML-Fehlerseite, JSON in <script> oder
+Text eingebettet), sucht ein Scanner in einem Durchlauf nach Kandidaten für
+Objekt-Anfänge und dekodiert sie mit json.JSONDecoder.raw_decode. Body-Größe und
+Zeitbudget sind begrenzt, damit eine große HTML-Seite keinen Worker blockiert.
+"""
+import json
+import re
+import time
+
+from config import Config
+
+
+# Ergebnis-Strategien (auch als Metrik-Label)
+STRATEGY_DIRECT = "direct"
+STRATEGY_SCRIPT = "script"
+STRATEGY_EMBEDDED = "embedded"
+STRATEGY_EMPTY = "empty"
+STRATEGY_TOO_LARGE = "too_large"
+STRATEGY_TIMEOUT = "timeout"
+STRATEGY_FAILED = "failed"
+
+# Kandidat für ein JSON-Objekt: "{" gefolgt von einem Key oder "}" (filtert CSS/JS-Blöcke)
+_OBJECT_START = re.compile(r'\{\s*["}]')
+# Script-Tags ohne Beachtung der Groß-/Kleinschreibung, direkt auf dem Originaltext
+# (str.lower() kann die Länge ändern, z.B. "İ", die Offsets passten dann nicht mehr)
+_SCRIPT_OPEN = re.compile(r'<script', re.IGNORECASE | re.ASCII)
+_SCRIPT_CLOSE = re.compile(r'</script', re.IGNORECASE | re.ASCII)
+
+_decoder = json.JSONDecoder()
+
+
+class RecoveryBudgetExceeded(Exception):
+    """Zeitbudget der Recovery ist aufgebraucht"""
+
+
+class _Budget:
+    def __init__(self, seconds: float):
+        self.deadline = time.monotonic() + seconds
+
+    def check(self) -> None:
+        if time.monotonic() > self.deadline:
+            raise RecoveryBudgetExceeded()
+
+
+def _scan_objects(text: str, start: int, end: int, budget: _Budget):
+    """
+    Liefert alle dekodierbaren JSON-Objekte in text[start:end] von links nach rechts
+
+    Nach einem erfolgreich dekodierten Objekt wird hinter dessen Ende weitergesucht,
+    verschachtelte Objekte werden also nicht einzeln geliefert.
+
+    Yields:
+        Dekodierte dicts
+    """
+    position = start
+    while position < end:
+        match = _OBJECT_START.search(text, position, end)
+        if match is None:
+            return
+        budget.check()
+
+        try:
+            value, value_end = _decoder.raw_decode(text, match.start())
+        except (ValueError, RecursionError):
+            position = match.start() + 1
+            continue
+
+        if value_end > end:
+            position = match.start() + 1
+            continue
+
+        if isinstance(value, dict):
+            yield value
+        position = value_end
+
+
+def _script_blocks(text: str):
+    """
+    Liefert (start, end) der Inhalte aller <script> Blöcke (ohne Regex-Backtracking)
+
+    Yields:
+        Tuple (start, end) in text
+    """
+    position = 0
+    while True:
+        tag_match = _SCRIPT_OPEN.search(text, position)
+        if tag_match is None:
+            return
+        content_start = text.find(">", tag_match.end())
+        if content_start == -1:
+            return
+        close_match = _SCRIPT_CLOSE.search(text, content_start)
+        if close_match is None:
+            return
+        yield content_start + 1, close_match.start()
+        position = close_match.start()
+
+
+def recover_json(response_text: str, max_bytes: int = None, time_budget_seconds: float = None) -> tuple:
+    """
+    Parst eine HOC-Response und liefert das JSON sowie die erfolgreiche Strategie
+
+    Reihenfolge:
+    1. direct: Reines JSON
+    2. script: Erstes Objekt in einem <script> Block (bevorzugt mit "questions")
+    3. embedded: Erstes Objekt mit "questions" irgendwo im Text
+
+    Args:
+        response_text: Roher Response-Text
+        max_bytes: Max. Größe für die Recovery (Default: Config.HOC_JSON_RECOVERY_MAX_BYTES)
+        time_budget_seconds: Zeitbudget für die Recovery (Default: Config.HOC_JSON_RECOVERY_TIME_BUDGET_SECONDS)
+
+    Returns:
+        Tuple (data, strategy): data ist {} falls nichts gefunden wurde
+    """
+    if not response_text or not response_text.strip():
+        return {}, STRATEGY_EMPTY
+
+    try:
+        return json.loads(response_text), STRATEGY_DIRECT
+    except (ValueError, RecursionError):
+        pass
+
+    max_bytes = Config.HOC_JSON_RECOVERY_MAX_BYTES if max_bytes is None else max_bytes
+    if len(response_text) > max_bytes:
+        return {}, STRATEGY_TOO_LARGE
+
+    budget = _Budget(Config.HOC_JSON_RECOVERY_TIME_BUDGET_SECONDS if time_budget_seconds is None else time_budget_seconds)
+
+    try:
+        first_script_object = None
+        for start, end in _script_blocks(response_text):
+            for value in _scan_objects(response_text, start, end, budget):
+                if 'questions' in value:
+                    return value, STRATEGY_SCRIPT
+                if first_script_object is None:
+                    first_script_object = value
+        if first_script_object is not None:
+            return first_script_object, STRATEGY_SCRIPT
+
+        for value in _scan_objects(response_text, 0, len(response_text), budget):
+            if 'questions' in value:
+                return value, STRATEGY_EMBEDDED
+    except RecoveryBudgetExceeded:
+        return {}, STRATEGY_TIMEOUT
+
+    return {}, STRATEGY_FAILED
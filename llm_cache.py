@@ -0,0 +1,273 @@
+"""
+Persistenter Cache für LLM-Extraktionen (content-addressed, SQLite, siehe local_db)
+
+Key ist ein Hash aus Modell, Prompt-Version, Variablenname und Hash der Fragen -
+unabhängig von Kampagne, Worker und Prozess. Gespeichert wird die rohe Modell-Antwort;
+die Nachbearbeitung (clean_ai_value, Job-Titel-Mapping) läuft beim Lesen, damit
+Änderungen daran ohne Cache-Leerung greifen.
+
+Alle gunicorn Worker teilen die Datei (WAL-Modus); Einträge überleben Neustarts und
+Deploys, sofern LLM_CACHE_PATH auf einem persistenten Volume liegt. Beim Worker-Start
+lädt warm() die zuletzt genutzten Einträge zusätzlich in einen In-Memory-Cache.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+
+import local_db
+import metrics
+from cache import TTLCache
+from config import Config
+
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS llm_cache (
+        cache_key TEXT PRIMARY KEY,
+        model TEXT NOT NULL,
+        prompt_version TEXT NOT NULL,
+        variable_name TEXT NOT NULL,
+        questions_hash TEXT NOT NULL,
+        response TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        last_used_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used_at ON llm_cache (last_used_at)",
+    "CREATE INDEX IF NOT EXISTS idx_llm_cache_questions_hash ON llm_cache (questions_hash)",
+)
+
+# last_used_at wird höchstens so oft geschrieben (Hits sollen keine Schreib-Transaktion kosten)
+TOUCH_INTERVAL_SECONDS = 300
+
+
+def questions_hash(questions: list) -> str:
+    """
+    Stabiler Hash über die Fragen eines Questionnaires (gleich wie questionnaire_fingerprint)
+
+    Args:
+        questions: questions Array aus HOC
+
+    Returns:
+        SHA-256 Hex-Digest
+    """
+    payload = json.dumps(questions or [], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def make_key(model: str, prompt_version: str, variable_name: str, questions_digest: str) -> str:
+    """
+    Content-Key eines LLM-Ergebnisses
+
+    Args:
+        model: OpenAI Modell (z.B. "gpt-4o-mini")
+        prompt_version: Version des Prompts (bei Prompt-Änderungen erhöht)
+        variable_name: Extrahierte Variable (bzw. "*" für alle Variablen in einem Request)
+        questions_digest: Ergebnis von questions_hash
+
+    Returns:
+        SHA-256 Hex-Digest
+    """
+    payload = "\x1f".join((model, prompt_version, variable_name, questions_digest))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """SQLite-Cache für LLM-Antworten mit Größenlimit (LRU über last_used_at) und In-Memory-Vorstufe"""
+
+    def __init__(self, path: str = None, max_entries: int = None, ttl_seconds: float = None,
+                 memory_entries: int = None):
+        """
+        Args:
+            path: Pfad zur SQLite-Datei (Default: Config.LLM_CACHE_PATH)
+            max_entries: Maximale Anzahl Einträge auf Disk (Default: Config.LLM_CACHE_MAX_ENTRIES)
+            ttl_seconds: Maximales Alter eines Eintrags (Default: Config.LLM_CACHE_TTL_SECONDS)
+            memory_entries: Größe des In-Memory-Caches pro Prozess (Default: Config.LLM_CACHE_MEMORY_ENTRIES)
+        """
+        self.path = path or Config.LLM_CACHE_PATH
+        self.max_entries = Config.LLM_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.ttl_seconds = Config.LLM_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.memory = TTLCache(
+            name="llm_results",
+            max_entries=Config.LLM_CACHE_MEMORY_ENTRIES if memory_entries is None else memory_entries,
+            # Wie der Campaign-Cache: Invalidierung wirkt nur im eigenen Worker, daher kurze Lebensdauer
+            ttl_seconds=min(self.ttl_seconds, Config.CAMPAIGN_CACHE_TTL_SECONDS)
+        )
+
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def _conn(self):
+        local_db.ensure_schema("llm_cache", _SCHEMA, self.path)
+        return local_db.connect(self.path)
+
+    def _transaction(self):
+        local_db.ensure_schema("llm_cache", _SCHEMA, self.path)
+        return local_db.transaction(self.path)
+
+    def get(self, cache_key: str) -> str:
+        """
+        Liefert die gecachte Modell-Antwort (erst In-Memory, dann SQLite)
+
+        Args:
+            cache_key: Key aus make_key
+
+        Returns:
+            Rohe Modell-Antwort oder None bei Miss (auch bei Datenbankfehlern)
+        """
+        cached = self.memory.get(cache_key)
+        if cached is not None:
+            return cached
+
+        now = time.time()
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT response, last_used_at FROM llm_cache WHERE cache_key = ? AND created_at >= ?",
+                (cache_key, now - self.ttl_seconds)
+            ).fetchone()
+            if row is not None and now - row["last_used_at"] >= TOUCH_INTERVAL_SECONDS:
+                conn.execute("UPDATE llm_cache SET last_used_at = ? WHERE cache_key = ?", (now, cache_key))
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"⚠️ LLM-Cache nicht lesbar ({self.path}): {e}")
+            return None
+
+        metrics.record_cache("llm_disk", hit=row is not None)
+        if row is None:
+            self._count("disk_misses")
+            return None
+
+        self._count("disk_hits")
+        self.memory.set(cache_key, row["response"])
+        return row["response"]
+
+    def set(self, cache_key: str, response: str, model: str, prompt_version: str, variable_name: str,
+            questions_digest: str) -> None:
+        """
+        Speichert eine Modell-Antwort (verdrängt bei Überlauf die am längsten ungenutzten Einträge)
+
+        Args:
+            cache_key: Key aus make_key
+            response: Rohe Modell-Antwort (message.content)
+            model, prompt_version, variable_name, questions_digest: Bestandteile des Keys
+        """
+        self.memory.set(cache_key, response)
+
+        now = time.time()
+        try:
+            with self._transaction() as conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO llm_cache
+                        (cache_key, model, prompt_version, variable_name, questions_hash, response, created_at, last_used_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (cache_key, model, prompt_version, variable_name, questions_digest, response, now, now)
+                )
+                evicted = conn.execute(
+                    "DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+                ).rowcount
+                overflow = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+                if overflow > 0:
+                    evicted += conn.execute(
+                        """
+                        DELETE FROM llm_cache WHERE cache_key IN (
+                            SELECT cache_key FROM llm_cache ORDER BY last_used_at LIMIT ?
+                        )
+                        """,
+                        (overflow,)
+                    ).rowcount
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"⚠️ LLM-Cache nicht beschreibbar ({self.path}): {e}")
+            return
+
+        self._count("writes")
+        if evicted:
+            self._count("evictions", evicted)
+
+    def invalidate_questions(self, questions_digests) -> int:
+        """
+        Entfernt alle Einträge zu den angegebenen Fragen-Hashes (Disk und In-Memory)
+
+        Args:
+            questions_digests: Iterable von questions_hash Werten
+
+        Returns:
+            Anzahl entfernter Disk-Einträge
+        """
+        digests = list(questions_digests)
+        if not digests:
+            return 0
+
+        placeholders = ", ".join("?" * len(digests))
+        with self._transaction() as conn:
+            keys = [row["cache_key"] for row in conn.execute(
+                f"SELECT cache_key FROM llm_cache WHERE questions_hash IN ({placeholders})", digests
+            )]
+            conn.execute(f"DELETE FROM llm_cache WHERE questions_hash IN ({placeholders})", digests)
+
+        keys = set(keys)
+        self.memory.invalidate(lambda key: key in keys)
+        return len(keys)
+
+    def warm(self, limit: int = None) -> int:
+        """
+        Lädt die zuletzt genutzten Einträge in den In-Memory-Cache (Worker-Start)
+
+        Args:
+            limit: Anzahl Einträge (Default: Größe des In-Memory-Caches)
+
+        Returns:
+            Anzahl geladener Einträge
+        """
+        limit = self.memory.max_entries if limit is None else limit
+        try:
+            rows = self._conn().execute(
+                "SELECT cache_key, response FROM llm_cache WHERE created_at >= ? ORDER BY last_used_at DESC LIMIT ?",
+                (time.time() - self.ttl_seconds, limit)
+            ).fetchall()
+        except Exception as e:
+            logger.warning(f"⚠️ LLM-Cache Warm-Start fehlgeschlagen ({self.path}): {e}")
+            return 0
+
+        # Älteste zuerst, damit die zuletzt genutzten im LRU am längsten bleiben
+        for row in reversed(rows):
+            self.memory.set(row["cache_key"], row["response"])
+        return len(rows)
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def stats(self) -> dict:
+        """Liefert Größe und Hit/Miss-Statistik (Disk-Größe über alle Worker)"""
+        try:
+            size = self._conn().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        except Exception:
+            size = None
+
+        with self._lock:
+            lookups = self.disk_hits + self.disk_misses
+            return {
+                "path": self.path,
+                "size": size,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_hits": self.disk_hits,
+                "disk_misses": self.disk_misses,
+                "disk_hit_ratio": round(self.disk_hits / lookups, 4) if lookups else 0.0,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "errors": self.errors,
+                "memory": self.memory.stats(),
+            }
@@ -0,0 +1,97 @@
+"""
+Lokale SQLite-Datenbank für prozessübergreifenden Zustand
+Wird von allen gunicorn Workern geteilt (WAL-Modus, eine Verbindung pro Thread)
+"""
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from config import Config
+
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_initialized_schemas = set()
+
+
+def connect(path: str = None) -> sqlite3.Connection:
+    """
+    Liefert die SQLite-Verbindung des aktuellen Threads für path
+
+    Args:
+        path: Pfad zur Datenbankdatei (Default: Config.LOCAL_DB_PATH)
+
+    Returns:
+        sqlite3.Connection im Autocommit-Modus mit WAL-Journal
+    """
+    path = path or Config.LOCAL_DB_PATH
+
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(path)
+    if conn is None:
+        conn = sqlite3.connect(
+            path,
+            timeout=Config.LOCAL_DB_BUSY_TIMEOUT_SECONDS,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(Config.LOCAL_DB_BUSY_TIMEOUT_SECONDS * 1000)}")
+        connections[path] = conn
+
+    return conn
+
+
+@contextmanager
+def transaction(path: str = None):
+    """
+    Schreib-Transaktion (BEGIN IMMEDIATE), sicher gegenüber anderen Prozessen
+
+    Args:
+        path: Pfad zur Datenbankdatei (Default: Config.LOCAL_DB_PATH)
+
+    Yields:
+        sqlite3.Connection innerhalb der Transaktion
+    """
+    conn = connect(path)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    else:
+        conn.execute("COMMIT")
+
+
+def ensure_schema(name: str, statements: tuple, path: str = None) -> None:
+    """
+    Legt Tabellen/Indizes einmal pro Prozess und Datenbank an (idempotent)
+
+    Args:
+        name: Name des Schemas (z.B. "jobs")
+        statements: CREATE ... IF NOT EXISTS Statements
+        path: Pfad zur Datenbankdatei (Default: Config.LOCAL_DB_PATH)
+    """
+    path = path or Config.LOCAL_DB_PATH
+    key = (name, path)
+
+    with _schema_lock:
+        if key in _initialized_schemas:
+            return
+
+        with transaction(path) as conn:
+            for statement in statements:
+                try:
+                    conn.execute(statement)
+                except sqlite3.OperationalError as e:
+                    # ALTER TABLE ... ADD COLUMN für ältere Datenbanken: Spalte existiert bereits
+                    if "duplicate column name" not in str(e):
+                        raise
+
+        _initialized_schemas.add(key)
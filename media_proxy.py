@@ -0,0 +1,349 @@
+"""
+Media-Stream Proxy: Twilio <Connect><Stream> ↔ ElevenLabs Conversation WebSocket
+
+Twilio kann über <Stream> keine conversation_config_override mitschicken. Der Proxy
+nimmt den Media Stream an, lädt Prompt und First Message aus dem Session-Store
+(session_id als <Parameter>, siehe TwilioElevenLabsIntegration), öffnet die
+ElevenLabs-Verbindung mit conversation_initiation_client_data und reicht das Audio
+in beide Richtungen durch.
+
+Audio bleibt μ-law 8 kHz base64 (Agent in ElevenLabs für Ein- und Ausgabe auf
+ulaw_8000 stellen): Payloads werden nicht dekodiert, nur ins Zielformat umverpackt.
+Pro Call und Richtung puffert eine Queue höchstens MEDIA_PROXY_BUFFER_FRAMES Nachrichten;
+ist sie voll, liest der Proxy die Quelle nicht weiter (Backpressure bis auf TCP-Ebene).
+Ein Prozess bedient alle Calls in einem Event Loop.
+
+Start:
+    python media_proxy.py --port 8765
+
+GET /health liefert Statistiken (aktive Calls, Frames, Backpressure, CPU-Zeit).
+Der Handshake muss eine gültige X-Twilio-Signature tragen (TWILIO_AUTH_TOKEN, signiert wird
+die Stream-URL aus MEDIA_PROXY_URL); customParameters.agent_id muss in
+MEDIA_PROXY_ALLOWED_AGENT_IDS stehen. Der Session-Store muss prozessübergreifend sein (SESSION_STORE_BACKEND=sqlite mit
+derselben Datei wie der Webhook).
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from urllib.parse import urlparse
+
+from twilio.request_validator import RequestValidator
+from websockets.asyncio.client import connect
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+
+import structured_logging
+from config import Config
+from session_store import create_session_store
+
+
+logger = logging.getLogger(__name__)
+
+MEDIA_PATH = "/media-stream"
+HEALTH_PATH = "/health"
+
+# Audioformat, das ohne Umkodierung durchgereicht wird (Twilio Media Streams: μ-law 8 kHz)
+AUDIO_FORMAT = "ulaw_8000"
+
+# Empfangspuffer der WebSocket-Bibliothek klein halten, damit die Queues die Pufferung bestimmen
+WS_MAX_QUEUE = 16
+
+# Wartezeit, um gepuffertes Agent-Audio nach Gesprächsende noch an Twilio zu senden
+DRAIN_TIMEOUT_SECONDS = 2.0
+
+
+class ProxyStats:
+    """Zähler des Proxy-Prozesses (nur aus dem Event Loop verändert, daher ohne Lock)"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.calls_active = 0
+        self.calls_total = 0
+        self.frames_to_elevenlabs = 0
+        self.frames_to_twilio = 0
+        self.backpressure_waits = 0
+        self.interruptions = 0
+        self.rejected = 0
+        self.errors = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "calls_active": self.calls_active,
+            "calls_total": self.calls_total,
+            "frames_to_elevenlabs": self.frames_to_elevenlabs,
+            "frames_to_twilio": self.frames_to_twilio,
+            "backpressure_waits": self.backpressure_waits,
+            "interruptions": self.interruptions,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "cpu_seconds": round(time.process_time(), 3),
+        }
+
+
+stats = ProxyStats()
+
+
+def build_initiation_message(session: dict) -> dict:
+    """
+    Erste Nachricht an ElevenLabs (conversation_initiation_client_data) aus einer Session
+
+    Args:
+        session: Session-Daten (enhanced_prompt, first_message, optional dynamic_variables)
+
+    Returns:
+        Nachricht im Format der ElevenLabs Conversation API
+    """
+    agent = {"language": "de"}
+    if session.get('enhanced_prompt'):
+        agent["prompt"] = {"prompt": session['enhanced_prompt']}
+    if session.get('first_message'):
+        agent["first_message"] = session['first_message']
+
+    message = {
+        "type": "conversation_initiation_client_data",
+        "conversation_config_override": {"agent": agent}
+    }
+    if session.get('dynamic_variables'):
+        message["dynamic_variables"] = session['dynamic_variables']
+    return message
+
+
+class CallBridge:
+    """Ein Call: Twilio Media Stream ↔ ElevenLabs Conversation (vier Tasks, zwei begrenzte Queues)"""
+
+    def __init__(self, twilio_ws, sessions, buffer_frames: int = None, elevenlabs_url: str = None):
+        """
+        Args:
+            twilio_ws: Angenommene WebSocket-Verbindung von Twilio
+            sessions: SessionStore mit Prompt/First Message
+            buffer_frames: Queue-Größe pro Richtung (Default: Config.MEDIA_PROXY_BUFFER_FRAMES)
+            elevenlabs_url: Conversation WebSocket URL (Default: Config.ELEVENLABS_CONVAI_WS_URL)
+        """
+        self.twilio_ws = twilio_ws
+        self.sessions = sessions
+        self.elevenlabs_url = elevenlabs_url or Config.ELEVENLABS_CONVAI_WS_URL
+        size = Config.MEDIA_PROXY_BUFFER_FRAMES if buffer_frames is None else buffer_frames
+        self.to_elevenlabs = asyncio.Queue(maxsize=size)
+        self.to_twilio = asyncio.Queue(maxsize=size)
+        self.stream_sid = None
+        self.call_sid = None
+        self.conversation_id = None
+
+    async def run(self) -> None:
+        """Bridge bis eine Seite auflegt (Twilio "stop" oder Ende der ElevenLabs-Conversation)"""
+        start = await self._wait_for_start()
+        if start is None:
+            return
+
+        params = start.get("customParameters") or {}
+        agent_id = params.get("agent_id") or Config.ELEVENLABS_AGENT_ID
+        if agent_id not in Config.MEDIA_PROXY_ALLOWED_AGENT_IDS:
+            stats.rejected += 1
+            logger.warning(f"🚫 Agent {agent_id!r} für Call {self.call_sid} nicht erlaubt (MEDIA_PROXY_ALLOWED_AGENT_IDS)")
+            return
+
+        session = None
+        if params.get("session_id"):
+            session = await asyncio.to_thread(self.sessions.get, params["session_id"])
+        if session is None:
+            logger.warning(f"⚠️ Keine Session für Call {self.call_sid} (session_id={params.get('session_id')}) "
+                           f"- Agent startet ohne Override")
+            session = {}
+
+        headers = {"xi-api-key": Config.ELEVENLABS_API_KEY} if Config.ELEVENLABS_API_KEY else None
+        async with connect(f"{self.elevenlabs_url}?agent_id={agent_id}", additional_headers=headers,
+                           compression=None, max_queue=WS_MAX_QUEUE) as elevenlabs_ws:
+            await elevenlabs_ws.send(json.dumps(build_initiation_message(session)))
+
+            elevenlabs_reader = asyncio.create_task(self._read_elevenlabs(elevenlabs_ws))
+            tasks = {
+                elevenlabs_reader,
+                asyncio.create_task(self._read_twilio()),
+                asyncio.create_task(self._write(self.to_elevenlabs, elevenlabs_ws, "frames_to_elevenlabs")),
+                asyncio.create_task(self._write(self.to_twilio, self.twilio_ws, "frames_to_twilio")),
+            }
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+
+            # Agent hat beendet: restliches Audio noch abspielen lassen
+            if elevenlabs_reader in done and self.to_twilio.qsize():
+                try:
+                    await asyncio.wait_for(self.to_twilio.join(), DRAIN_TIMEOUT_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, ConnectionClosed):
+                raise error
+
+    async def _wait_for_start(self) -> dict:
+        """Liest Twilio-Nachrichten bis zum "start" Event (davor kommt nur "connected")"""
+        async for message in self.twilio_ws:
+            frame = json.loads(message)
+            if frame.get("event") == "start":
+                start = frame["start"]
+                self.stream_sid = start.get("streamSid") or frame.get("streamSid")
+                self.call_sid = start.get("callSid")
+                if not self.stream_sid:
+                    # Ohne streamSid kann kein Audio an Twilio adressiert werden
+                    stats.rejected += 1
+                    logger.warning(f"⚠️ Start-Event ohne streamSid (Call {self.call_sid}) - Stream wird beendet")
+                    return None
+                return start
+        return None
+
+    async def _put(self, queue: asyncio.Queue, message: str) -> None:
+        if queue.full():
+            stats.backpressure_waits += 1
+        await queue.put(message)
+
+    async def _write(self, queue: asyncio.Queue, websocket, counter: str) -> None:
+        while True:
+            message = await queue.get()
+            try:
+                await websocket.send(message)
+                setattr(stats, counter, getattr(stats, counter) + 1)
+            finally:
+                queue.task_done()
+
+    async def _read_twilio(self) -> None:
+        async for message in self.twilio_ws:
+            frame = json.loads(message)
+            event = frame.get("event")
+            if event == "media":
+                await self._put(self.to_elevenlabs, json.dumps({"user_audio_chunk": frame["media"]["payload"]}))
+            elif event == "stop":
+                return
+
+    async def _read_elevenlabs(self, elevenlabs_ws) -> None:
+        async for message in elevenlabs_ws:
+            event = json.loads(message)
+            kind = event.get("type")
+            if kind == "audio":
+                await self._put(self.to_twilio, json.dumps({
+                    "event": "media",
+                    "streamSid": self.stream_sid,
+                    "media": {"payload": event["audio_event"]["audio_base_64"]},
+                }))
+            elif kind == "interruption":
+                # Kandidat spricht dazwischen: gepuffertes Agent-Audio verwerfen, Wiedergabe bei Twilio stoppen
+                stats.interruptions += 1
+                while not self.to_twilio.empty():
+                    self.to_twilio.get_nowait()
+                    self.to_twilio.task_done()
+                await self._put(self.to_twilio, json.dumps({"event": "clear", "streamSid": self.stream_sid}))
+            elif kind == "ping":
+                await self._put(self.to_elevenlabs, json.dumps({"type": "pong", "event_id": event["ping_event"]["event_id"]}))
+            elif kind == "conversation_initiation_metadata":
+                self._on_metadata(event.get("conversation_initiation_metadata_event") or {})
+
+    def _on_metadata(self, metadata: dict) -> None:
+        self.conversation_id = metadata.get("conversation_id")
+        for key in ("user_input_audio_format", "agent_output_audio_format"):
+            if metadata.get(key) and metadata[key] != AUDIO_FORMAT:
+                logger.warning(f"⚠️ ElevenLabs {key}={metadata[key]} - Proxy erwartet {AUDIO_FORMAT} "
+                               f"(Agent-Einstellungen prüfen)")
+        structured_logging.event("media_proxy.connected", call_sid=self.call_sid, stream_sid=self.stream_sid,
+                                 conversation_id=self.conversation_id)
+
+
+async def handle_connection(connection, sessions) -> None:
+    """Ein Twilio Media Stream (eine WebSocket-Verbindung pro Call)"""
+    stats.calls_active += 1
+    stats.calls_total += 1
+    bridge = CallBridge(connection, sessions)
+    try:
+        await bridge.run()
+    except ConnectionClosed:
+        pass
+    except Exception as e:
+        stats.errors += 1
+        logger.error(f"❌ Media-Proxy Fehler (Call {bridge.call_sid}): {e}", exc_info=True)
+    finally:
+        stats.calls_active -= 1
+
+
+def stream_url(request) -> str:
+    """
+    URL, die Twilio für die X-Twilio-Signature des Handshakes signiert (die <Stream url> aus der TwiML)
+
+    Schema und Host kommen aus MEDIA_PROXY_URL (hinter TLS-Terminierung sieht der Proxy
+    selbst nur ws://), ohne MEDIA_PROXY_URL aus dem Host-Header.
+    """
+    if Config.MEDIA_PROXY_URL:
+        public = urlparse(Config.MEDIA_PROXY_URL)
+        return f"{public.scheme}://{public.netloc}{request.path}"
+    return f"wss://{request.headers.get('Host', '')}{request.path}"
+
+
+def is_valid_twilio_handshake(request) -> bool:
+    """
+    Prüft die X-Twilio-Signature des WebSocket-Handshakes
+
+    Args:
+        request: Handshake-Request (websockets)
+
+    Returns:
+        True, wenn die Signatur zum TWILIO_AUTH_TOKEN passt (oder die Prüfung abgeschaltet ist)
+    """
+    if not Config.TWILIO_VALIDATE_SIGNATURE:
+        return True
+    if not Config.TWILIO_AUTH_TOKEN:
+        logger.error("❌ TWILIO_AUTH_TOKEN fehlt - Media Streams werden abgelehnt (oder TWILIO_VALIDATE_SIGNATURE=false)")
+        return False
+
+    signature = request.headers.get("X-Twilio-Signature", "")
+    return bool(signature) and RequestValidator(Config.TWILIO_AUTH_TOKEN).validate(stream_url(request), {}, signature)
+
+
+def process_request(connection, request):
+    """Health-Endpoint, Pfad- und Signatur-Prüfung vor dem WebSocket-Handshake"""
+    path = request.path.split("?", 1)[0]
+    if path == HEALTH_PATH:
+        response = connection.respond(200, json.dumps(stats.snapshot()) + "\n")
+        response.headers["Content-Type"] = "application/json"
+        return response
+    if path != MEDIA_PATH:
+        return connection.respond(404, "Not Found\n")
+    if not is_valid_twilio_handshake(request):
+        stats.rejected += 1
+        logger.warning(f"🚫 Media Stream ohne gültige X-Twilio-Signature abgelehnt ({connection.remote_address})")
+        return connection.respond(403, "Forbidden\n")
+    return None
+
+
+async def serve_forever(host: str, port: int) -> None:
+    """Startet den Proxy und läuft bis zum Abbruch"""
+    sessions = create_session_store()
+    if Config.SESSION_STORE_BACKEND.strip().lower() == "memory":
+        logger.warning("⚠️ SESSION_STORE_BACKEND=memory: Sessions des Webhooks sind im Proxy nicht sichtbar")
+
+    async with serve(lambda connection: handle_connection(connection, sessions), host, port,
+                     process_request=process_request, compression=None, max_queue=WS_MAX_QUEUE) as server:
+        logger.info(f"🎧 Media-Proxy läuft auf ws://{host}:{port}{MEDIA_PATH} → {Config.ELEVENLABS_CONVAI_WS_URL}")
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Twilio ↔ ElevenLabs Media-Stream Proxy")
+    parser.add_argument("--host", default=Config.MEDIA_PROXY_HOST)
+    parser.add_argument("--port", type=int, default=Config.MEDIA_PROXY_PORT)
+    args = parser.parse_args()
+
+    structured_logging.configure_logging()
+    Config.validate_twilio_signature()
+    try:
+        asyncio.run(serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Prometheus-Metriken für den Webhook Receiver (/metrics)
+Routen-Latenz, Upstream-Latenz/-Fehler (HOC, OpenAI, ElevenLabs), Cache-Treffer,
+In-Flight-Requests und Queue-Tiefe
+
+Mit PROMETHEUS_MULTIPROC_DIR (gesetzt in gunicorn.conf.py) schreibt jeder gunicorn
+Worker in eigene Dateien und /metrics aggregiert über alle Worker.
+"""
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+
+
+# Buckets von 5ms bis 60s (Trigger mit AI-Extraktion + Dial liegen im Sekundenbereich)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+REQUEST_COUNT = Counter(
+    "webhook_requests_total", "HTTP Requests pro Route und Status",
+    ["route", "method", "status"]
+)
+REQUEST_LATENCY = Histogram(
+    "webhook_request_duration_seconds", "Antwortzeit pro Route",
+    ["route", "method"], buckets=LATENCY_BUCKETS
+)
+IN_FLIGHT = Gauge(
+    "webhook_requests_in_flight", "Aktuell laufende Requests pro Route",
+    ["route"], multiprocess_mode="livesum"
+)
+
+UPSTREAM_LATENCY = Histogram(
+    "webhook_upstream_request_duration_seconds", "Latenz der Upstream-Requests (inkl. Retries)",
+    ["upstream"], buckets=LATENCY_BUCKETS
+)
+UPSTREAM_ERRORS = Counter(
+    "webhook_upstream_errors_total", "Fehlgeschlagene Upstream-Requests (HTTP >= 429 oder Verbindungsfehler)",
+    ["upstream", "kind"]
+)
+
+STAGE_LATENCY = Histogram(
+    "webhook_stage_duration_seconds", "Dauer der Hot-Path-Stages (siehe timing.py)",
+    ["stage"], buckets=LATENCY_BUCKETS
+)
+
+CACHE_REQUESTS = Counter(
+    "webhook_cache_requests_total", "Cache-Zugriffe (Hit-Ratio = hit / (hit + miss))",
+    ["cache", "result"]
+)
+
+GOVERNOR_QUEUE_DEPTH = Gauge(
+    "webhook_governor_queue_depth", "Wartende Slots pro Governor (Dial, OpenAI)",
+    ["governor"], multiprocess_mode="livesum"
+)
+GOVERNOR_WAIT = Histogram(
+    "webhook_governor_wait_seconds", "Wartezeit in der Governor-Queue",
+    ["governor"], buckets=LATENCY_BUCKETS
+)
+GOVERNOR_TIMEOUTS = Counter(
+    "webhook_governor_timeouts_total", "Governor-Slots, die nicht innerhalb der Queue-Wartezeit frei wurden",
+    ["governor"]
+)
+JSON_RECOVERY = Counter(
+    "webhook_hoc_json_recovery_total", "Parse-Strategie für HOC-Responses (direct, script, embedded, ...)",
+    ["strategy"]
+)
+AI_EXTRACTION_FALLBACKS = Counter(
+    "webhook_ai_extraction_fallbacks_total", "AI-Variablen mit Fallback-Wert (queue: AI-Pool ausgelastet, deadline, error)",
+    ["reason"]
+)
+DISPATCH_QUEUE_DEPTH = Gauge(
+    "webhook_dispatch_queue_depth", "Eingereihte, noch nicht gestartete asynchrone Jobs",
+    multiprocess_mode="livesum"
+)
+
+
+def upstream_label(name: str) -> str:
+    """Upstream-Label aus dem Pool-Namen (z.B. "openai-async" → "openai")"""
+    return name[:-len("-async")] if name.endswith("-async") else name
+
+
+def observe_request(route: str, method: str, status_code: int, seconds: float) -> None:
+    """Zählt einen abgeschlossenen HTTP-Request"""
+    REQUEST_COUNT.labels(route=route, method=method, status=str(status_code)).inc()
+    REQUEST_LATENCY.labels(route=route, method=method).observe(seconds)
+
+
+def observe_upstream(name: str, seconds: float, status_code: int = None, error: Exception = None) -> None:
+    """
+    Zählt einen Upstream-Request
+
+    Args:
+        name: Name des Connection-Pools (siehe http_pool)
+        seconds: Dauer in Sekunden
+        status_code: HTTP-Status (None bei Verbindungsfehler)
+        error: Exception bei Verbindungs-/Timeout-Fehlern
+    """
+    upstream = upstream_label(name)
+    UPSTREAM_LATENCY.labels(upstream=upstream).observe(seconds)
+
+    if error is not None:
+        UPSTREAM_ERRORS.labels(upstream=upstream, kind=type(error).__name__).inc()
+    elif status_code is not None and (status_code == 429 or status_code >= 500):
+        UPSTREAM_ERRORS.labels(upstream=upstream, kind=str(status_code)).inc()
+
+
+def record_cache(name: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache=name, result="hit" if hit else "miss").inc()
+
+
+def record_json_recovery(strategy: str) -> None:
+    JSON_RECOVERY.labels(strategy=strategy).inc()
+
+
+def record_ai_fallback(reason: str) -> None:
+    AI_EXTRACTION_FALLBACKS.labels(reason=reason).inc()
+
+
+def stage_sink(record: dict) -> None:
+    """Timing-Sink (timing.add_sink): Stage-Dauern als Histogramm"""
+    for span in record["spans"]:
+        STAGE_LATENCY.labels(stage=span["name"]).observe(span["duration_ms"] / 1000)
+
+
+def render() -> tuple:
+    """
+    Rendert alle Metriken im Prometheus Text-Format (aggregiert über alle Worker)
+
+    Returns:
+        Tuple (payload, content_type)
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
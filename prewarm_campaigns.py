@@ -0,0 +1,135 @@
+"""
+Pre-Warming von Kampagnen per CLI (z.B. als Render Cron Job, sobald Kampagnen live gehen)
+
+Standard: ruft POST /webhook/admin/campaigns/prewarm des laufenden Servers auf (202 + Job-ID)
+und pollt /webhook/jobs/<job_id> bis zum Ergebnis - ein synchroner Request würde bei vielen
+Kampagnen am gunicorn --timeout scheitern. Questionnaire- und Campaign-Cache werden dabei nur
+im Worker gefüllt, der den Job ausführt; der LLM-Cache gilt für alle Worker. Mit --local läuft
+das Pre-Warming in diesem Prozess - das füllt nur den persistenten LLM-Cache (LLM_CACHE_PATH),
+den die Server-Worker danach mitnutzen.
+
+Beispiele:
+    python prewarm_campaigns.py 123 456
+    python prewarm_campaigns.py 123 --url https://sellcruiting-webhook.onrender.com --refresh
+    python prewarm_campaigns.py --file campaign_ids.txt --local
+"""
+import argparse
+import json
+import sys
+import time
+
+import requests
+
+from config import Config
+
+
+def read_campaign_ids(args) -> list:
+    """Campaign IDs aus den Argumenten und optional einer Datei (eine ID pro Zeile, # = Kommentar)"""
+    campaign_ids = list(args.campaign_ids)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    campaign_ids.append(int(line))
+    return campaign_ids
+
+
+def prewarm_remote(url: str, campaign_ids: list, refresh: bool, timeout: float, poll_interval: float) -> dict:
+    """
+    Pre-Warming über die Admin-API des laufenden Servers (Job anlegen, Status pollen)
+
+    Args:
+        url: Basis-URL des Webhook-Servers
+        campaign_ids: Liste von Campaign IDs
+        refresh: Questionnaires bei HOC revalidieren
+        timeout: Maximale Gesamtdauer in Sekunden
+        poll_interval: Abstand zwischen zwei Status-Abfragen in Sekunden
+
+    Returns:
+        Zusammenfassung des Pre-Warmings (Ergebnis des Jobs)
+    """
+    base_url = url.rstrip('/')
+    headers = {"Content-Type": "application/json"}
+    if Config.WEBHOOK_API_KEY:
+        headers["Authorization"] = f"Bearer {Config.WEBHOOK_API_KEY}"
+
+    deadline = time.monotonic() + timeout
+    response = requests.post(
+        f"{base_url}/webhook/admin/campaigns/prewarm",
+        json={"campaign_ids": campaign_ids, "refresh": refresh},
+        headers=headers,
+        timeout=min(30, timeout)
+    )
+    response.raise_for_status()
+    accepted = response.json()
+    print(f"📥 Pre-Warming als Job {accepted['job_id']} eingereiht (Worker {accepted.get('worker_pid')})",
+          file=sys.stderr)
+
+    while True:
+        time.sleep(poll_interval)
+        response = requests.get(f"{base_url}{accepted['status_url']}", headers=headers, timeout=min(30, timeout))
+        response.raise_for_status()
+        job = response.json()["job"]
+
+        if job["status"] == "succeeded":
+            return job["result"]
+        if job["status"] == "failed":
+            raise RuntimeError(f"Pre-Warming Job {job['job_id']} fehlgeschlagen: {job.get('error') or job.get('result')}")
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Pre-Warming Job {job['job_id']} nach {timeout:.0f}s noch {job['status']}")
+
+
+def prewarm_local(campaign_ids: list, refresh: bool) -> dict:
+    """Pre-Warming in diesem Prozess (füllt den persistenten LLM-Cache)"""
+    import webhook_receiver
+
+    return webhook_receiver.warm_campaigns(campaign_ids, force_refresh=refresh)
+
+
+def print_report(summary: dict) -> None:
+    """Tabelle mit Warm-Status und Dauer pro Kampagne (auf stderr, JSON bleibt auf stdout)"""
+    print(f"{'Campaign':>10}  {'Status':<13} {'Fragen':>6} {'HOC':>9} {'AI':>9} {'Gesamt':>9}", file=sys.stderr)
+    for result in summary["campaigns"]:
+        def ms(key):
+            return f"{result[key]:.0f} ms" if key in result else "-"
+
+        print(f"{result['campaign_id']:>10}  {result['status']:<13} {result.get('questions', '-'):>6} "
+              f"{ms('questionnaire_ms'):>9} {ms('ai_ms'):>9} {ms('duration_ms'):>9}"
+              + (f"  {result['error']}" if result.get("error") else ""), file=sys.stderr)
+    print(f"🔥 {summary['warm']}/{summary['total']} Kampagnen warm ({summary['duration_ms']:.0f} ms)", file=sys.stderr)
+    if summary.get("scope_note"):
+        print(f"ℹ️  Worker {summary.get('worker_pid')}: {summary['scope_note']}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Questionnaire und AI-Variablen von Kampagnen vorwärmen")
+    parser.add_argument("campaign_ids", type=int, nargs="*", help="Campaign IDs")
+    parser.add_argument("--file", help="Datei mit Campaign IDs (eine pro Zeile)")
+    parser.add_argument("--url", default="http://127.0.0.1:5000", help="Basis-URL des Webhook-Servers")
+    parser.add_argument("--local", action="store_true", help="In diesem Prozess vorwärmen statt über die API")
+    parser.add_argument("--refresh", action="store_true", help="Questionnaires bei HOC revalidieren")
+    parser.add_argument("--timeout", type=float, default=300, help="Maximale Wartezeit auf den Job in Sekunden")
+    parser.add_argument("--poll-interval", type=float, default=2, help="Abstand der Job-Status-Abfragen in Sekunden")
+    args = parser.parse_args()
+
+    campaign_ids = read_campaign_ids(args)
+    if not campaign_ids:
+        parser.error("Keine Campaign IDs angegeben")
+
+    if args.local:
+        summary = prewarm_local(campaign_ids, args.refresh)
+    else:
+        try:
+            summary = prewarm_remote(args.url, campaign_ids, args.refresh, args.timeout, args.poll_interval)
+        except (requests.RequestException, RuntimeError, TimeoutError) as e:
+            print(f"❌ {e}", file=sys.stderr)
+            sys.exit(2)
+
+    print_report(summary)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    sys.exit(0 if summary["warm"] == summary["total"] else 1)
+
+
+if __name__ == "__main__":
+    main()
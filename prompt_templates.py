@@ -0,0 +1,438 @@
+"""
+Vorkompilierte Templates für die Prompt-Variablen (questions, gate_questions,
+preference_questions, questionnaire_context)
+
+Die Texte liegen in templates/ (bzw. PROMPT_TEMPLATES_DIR), aufgeteilt in benannte
+Abschnitte ("[[name]]" auf eigener Zeile, Zeilen mit "##" sind Kommentare).
+Platzhalter folgen der str.format-Syntax ({q.question}, {n}); beim Laden wird
+jeder Abschnitt gegen die erlaubten Variablen geprüft und zu einer f-String-Funktion
+kompiliert. Die Renderer setzen die Teile in einem Durchlauf per join zusammen.
+
+Kompilierte Templates werden pro Version (mtime der Datei) gecacht; eine geänderte
+Datei wird nach spätestens PROMPT_TEMPLATES_CHECK_SECONDS neu geladen, eine
+ungültige behält die bisherige Version.
+"""
+import logging
+import os
+import re
+import string
+import threading
+import time
+
+from config import Config
+
+
+logger = logging.getLogger(__name__)
+
+# Abschnitte pro Template und die Variablen, die jeder Abschnitt nutzen darf (in Aufruf-Reihenfolge)
+TEMPLATE_SECTIONS = {
+    "questions": {
+        "header": (),
+        "must_header": (),
+        "must_item": ("n", "q"),
+        "must_context": ("q",),
+        "must_footer": (),
+        "optional_header": (),
+        "optional_item": ("n", "q"),
+    },
+    "gate_questions": {
+        "header": (),
+        "no_questions": (),
+        "no_must": (),
+        "critical_header": (),
+        "critical_item": ("n", "q", "question_type"),
+        "critical_footer": (),
+        "important_header": (),
+        "important_item": ("n", "q", "question_type"),
+        "item_context": ("q",),
+        "item_preamble": ("q",),
+        "item_footer": (),
+    },
+    "preference_questions": {
+        "header": (),
+        "no_questions": (),
+        "no_optional": (),
+        "item": ("n", "q", "question_type"),
+        "item_preamble": ("q",),
+        "item_help_text": ("q",),
+        "item_options": ("q",),
+        "item_footer": (),
+    },
+    "questionnaire_context": {
+        "header": ("first_name", "last_name", "company_name"),
+        "questions_header": ("total",),
+        "category_header": ("group",),
+        "must_header": (),
+        "must_item": ("q",),
+        "item_context": ("q",),
+        "item_preamble": ("q",),
+        "optional_header": (),
+        "optional_item": ("q",),
+        "no_questions": (),
+        "footer": (),
+    },
+}
+
+TEMPLATE_EXTENSION = ".txt"
+
+_SECTION_MARKER = re.compile(r"^\[\[(\w+)\]\]$")
+_FIELD_NAME = re.compile(r"^[A-Za-z]\w*(?:\.[A-Za-z]\w*)*$")
+_formatter = string.Formatter()
+
+
+class TemplateError(ValueError):
+    """Template-Datei ist ungültig (fehlende/unbekannte Abschnitte oder Platzhalter)"""
+
+
+def _compile_section(template_name: str, section: str, text: str, variables: tuple):
+    """
+    Kompiliert einen Abschnitt zu einer Funktion (Parameter = erlaubte Variablen)
+
+    Returns:
+        Callable, das den Abschnitt mit den übergebenen Werten rendert
+    """
+    for _, field_name, format_spec, _ in _formatter.parse(text):
+        if field_name is None:
+            continue
+        if not _FIELD_NAME.match(field_name):
+            raise TemplateError(f"{template_name}[{section}]: ungültiger Platzhalter {{{field_name}}}")
+        if field_name.split(".", 1)[0] not in variables:
+            raise TemplateError(
+                f"{template_name}[{section}]: unbekannte Variable {{{field_name}}} (erlaubt: {', '.join(variables) or '-'})"
+            )
+        if format_spec and ("{" in format_spec or "}" in format_spec):
+            raise TemplateError(f"{template_name}[{section}]: verschachtelte Format-Angaben werden nicht unterstützt")
+
+    # Nach der Prüfung hat der Abschnitt dieselbe Bedeutung als f-String wie als str.format-Vorlage
+    source = f"lambda {', '.join(variables)}: f{text!r}"
+    return eval(compile(source, f"<template {template_name}[{section}]>", "eval"), {"__builtins__": {}})
+
+
+class CompiledTemplate:
+    """Kompilierte Abschnitte eines Templates als Attribute (z.B. template.header())"""
+
+    def __init__(self, name: str, version: float, sections: dict):
+        self.name = name
+        self.version = version
+        self.__dict__.update(sections)
+
+
+def parse_sections(text: str) -> dict:
+    """
+    Zerlegt eine Template-Datei in ihre Abschnitte
+
+    Args:
+        text: Inhalt der Datei
+
+    Returns:
+        Dict {abschnitt: text} (Text exakt bis zum nächsten Marker, inkl. Zeilenumbrüchen)
+    """
+    sections = {}
+    current = None
+    for line in text.splitlines(keepends=True):
+        if line.startswith("##"):
+            continue
+        marker = _SECTION_MARKER.match(line.rstrip("\r\n"))
+        if marker:
+            current = marker.group(1)
+            if current in sections:
+                raise TemplateError(f"Abschnitt [[{current}]] ist doppelt")
+            sections[current] = []
+        elif current is not None:
+            sections[current].append(line)
+        elif line.strip():
+            raise TemplateError("Text vor dem ersten Abschnitt")
+    return {name: "".join(lines) for name, lines in sections.items()}
+
+
+def compile_template(name: str, text: str, version: float = 0.0) -> CompiledTemplate:
+    """
+    Prüft und kompiliert ein Template
+
+    Args:
+        name: Template-Name (Schlüssel in TEMPLATE_SECTIONS)
+        text: Inhalt der Template-Datei
+        version: Version (mtime der Datei)
+
+    Returns:
+        CompiledTemplate
+
+    Raises:
+        TemplateError: Abschnitte oder Platzhalter passen nicht zu TEMPLATE_SECTIONS
+    """
+    schema = TEMPLATE_SECTIONS[name]
+    sections = parse_sections(text)
+
+    missing = [section for section in schema if section not in sections]
+    unknown = [section for section in sections if section not in schema]
+    if missing or unknown:
+        raise TemplateError(f"{name}: fehlende Abschnitte {missing}, unbekannte Abschnitte {unknown}")
+
+    return CompiledTemplate(name, version, {
+        section: _compile_section(name, section, sections[section], variables)
+        for section, variables in schema.items()
+    })
+
+
+class TemplateStore:
+    """Lädt und cacht kompilierte Templates pro Version (mtime)"""
+
+    def __init__(self, template_dir: str = None, check_interval_seconds: float = None):
+        """
+        Args:
+            template_dir: Verzeichnis der Templates (Default: Config.PROMPT_TEMPLATES_DIR)
+            check_interval_seconds: Mindestabstand zwischen mtime-Prüfungen
+                (Default: Config.PROMPT_TEMPLATES_CHECK_SECONDS)
+        """
+        self.template_dir = template_dir or Config.PROMPT_TEMPLATES_DIR
+        self.check_interval_seconds = (
+            Config.PROMPT_TEMPLATES_CHECK_SECONDS if check_interval_seconds is None else check_interval_seconds
+        )
+        self._lock = threading.Lock()
+        self._templates = {}
+        self._checked_at = {}
+
+    def get(self, name: str) -> CompiledTemplate:
+        """
+        Liefert das kompilierte Template (lädt es beim ersten Zugriff bzw. nach Änderung)
+
+        Raises:
+            TemplateError/OSError: Template konnte nie geladen werden
+        """
+        template = self._templates.get(name)
+        if template is not None and time.monotonic() - self._checked_at[name] < self.check_interval_seconds:
+            return template
+
+        with self._lock:
+            template = self._templates.get(name)
+            now = time.monotonic()
+            if template is not None and now - self._checked_at[name] < self.check_interval_seconds:
+                return template
+            self._checked_at[name] = now
+
+            path = os.path.join(self.template_dir, name + TEMPLATE_EXTENSION)
+            try:
+                version = os.stat(path).st_mtime
+                if template is not None and version == template.version:
+                    return template
+                with open(path, encoding="utf-8") as f:
+                    compiled = compile_template(name, f.read(), version)
+            except (OSError, ValueError, SyntaxError) as e:
+                if template is None:
+                    raise
+                logger.warning(f"⚠️ Prompt-Template {path} ungültig: {e} - behalte bisherige Version")
+                return template
+
+            self._templates[name] = compiled
+            logger.info(f"🔁 Prompt-Template geladen: {name} ({path})")
+            return compiled
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_template(name: str) -> CompiledTemplate:
+    """Liefert ein Template aus dem geteilten TemplateStore (lazy erstellt)"""
+    global _default_store
+    if _default_store is None:
+        with _default_lock:
+            if _default_store is None:
+                _default_store = TemplateStore()
+    return _default_store.get(name)
+
+
+# =============================================================================
+# RENDERER
+# =============================================================================
+
+def _render_cached(index, name: str, render) -> str:
+    """
+    Rendert einen Text, der nur von der Kampagne abhängt, einmal pro Index und Template-Version
+
+    Args:
+        index: QuestionnaireIndex (hält den Cache, lebt so lange wie der gecachte Questionnaire)
+        name: Template-Name
+        render: Funktion (template, index) → Text
+
+    Returns:
+        Gerenderter Text
+    """
+    t = get_template(name)
+    cached = index.rendered.get(name)
+    if cached is not None and cached[0] is t:
+        return cached[1]
+
+    text = render(t, index)
+    index.rendered[name] = (t, text)
+    return text
+
+
+def _render_questions(t: CompiledTemplate, index) -> str:
+    parts = [t.header()]
+
+    if index.must:
+        parts.append(t.must_header())
+        for n, q in enumerate(index.must, 1):
+            parts.append(t.must_item(n, q))
+            if q.context:
+                parts.append(t.must_context(q))
+        parts.append(t.must_footer())
+
+    if index.optional:
+        parts.append(t.optional_header())
+        parts.extend([t.optional_item(n, q) for n, q in enumerate(index.optional, 1)])
+
+    return "".join(parts)
+
+
+def render_questions(index) -> str:
+    """
+    Fragenliste (Dashboard): alle Muss- und Zusatzfragen (gecacht pro Kampagne)
+
+    Args:
+        index: QuestionnaireIndex
+
+    Returns:
+        Gerenderter Text
+    """
+    return _render_cached(index, "questions", _render_questions)
+
+
+def _render_gate_items(t: CompiledTemplate, item, questions: list, parts: list) -> None:
+    for n, q in enumerate(questions, 1):
+        parts.append(item(n, q, q.question_type.upper()))
+        if q.context:
+            parts.append(t.item_context(q))
+        if q.preamble:
+            parts.append(t.item_preamble(q))
+        parts.append(t.item_footer())
+
+
+def _render_gate_questions(t: CompiledTemplate, index) -> str:
+    parts = [t.header()]
+
+    if not index.total:
+        parts.append(t.no_questions())
+    elif not index.must:
+        parts.append(t.no_must())
+    else:
+        if index.job_title_must:
+            parts.append(t.critical_header())
+            _render_gate_items(t, t.critical_item, index.job_title_must, parts)
+            parts.append(t.critical_footer())
+        if index.other_must:
+            parts.append(t.important_header())
+            _render_gate_items(t, t.important_item, index.other_must, parts)
+
+    return "".join(parts)
+
+
+def render_gate_questions(index) -> str:
+    """
+    Muss-Kriterien für Phase 2: Stellentitel-Fragen (Abbruch) vor den übrigen (gecacht pro Kampagne)
+
+    Args:
+        index: QuestionnaireIndex
+
+    Returns:
+        Gerenderter Text
+    """
+    return _render_cached(index, "gate_questions", _render_gate_questions)
+
+
+def _render_preference_questions(t: CompiledTemplate, index) -> str:
+    parts = [t.header()]
+
+    if not index.total:
+        parts.append(t.no_questions())
+    elif not index.optional:
+        parts.append(t.no_optional())
+    else:
+        for n, q in enumerate(index.optional, 1):
+            parts.append(t.item(n, q, q.question_type.upper()))
+            if q.preamble:
+                parts.append(t.item_preamble(q))
+            if q.help_text:
+                parts.append(t.item_help_text(q))
+            if q.options:
+                parts.append(t.item_options(q))
+            parts.append(t.item_footer())
+
+    return "".join(parts)
+
+
+def render_preference_questions(index) -> str:
+    """
+    Präferenz-Fragen (Priority=2) für Phase 4 (gecacht pro Kampagne)
+
+    Args:
+        index: QuestionnaireIndex
+
+    Returns:
+        Gerenderter Text
+    """
+    return _render_cached(index, "preference_questions", _render_preference_questions)
+
+
+def _render_questionnaire_context_body(t: CompiledTemplate, index) -> str:
+    parts = []
+
+    if index.total:
+        parts.append(t.questions_header(index.total))
+        for category in index.categories:
+            parts.append(t.category_header(category.group.upper()))
+            if category.must:
+                parts.append(t.must_header())
+                for q in category.must:
+                    parts.append(t.must_item(q))
+                    if q.context:
+                        parts.append(t.item_context(q))
+                    if q.preamble:
+                        parts.append(t.item_preamble(q))
+            if category.optional:
+                parts.append(t.optional_header())
+                for q in category.optional:
+                    parts.append(t.optional_item(q))
+                    if q.preamble:
+                        parts.append(t.item_preamble(q))
+    else:
+        parts.append(t.no_questions())
+
+    parts.append(t.footer())
+    return "".join(parts)
+
+
+def render_questionnaire_context_body(index) -> str:
+    """
+    Kampagnen-Teil des Questionnaire-Kontexts: Fragen nach Kategorien (gecacht pro Kampagne)
+
+    Args:
+        index: QuestionnaireIndex
+
+    Returns:
+        Gerenderter Text (ohne Kopf)
+    """
+    return _render_cached(index, "questionnaire_context", _render_questionnaire_context_body)
+
+
+def render_questionnaire_context_header(company_name: str, first_name: str, last_name: str) -> str:
+    """Kandidaten-Teil des Questionnaire-Kontexts (Kopf mit Kandidat und Firma)"""
+    return get_template("questionnaire_context").header(first_name, last_name, company_name)
+
+
+def render_questionnaire_context(index, company_name: str, first_name: str, last_name: str) -> str:
+    """
+    Questionnaire-Kontext: Kopf pro Kandidat + gecachter Kampagnen-Teil
+
+    Args:
+        index: QuestionnaireIndex
+        company_name: Firmenname
+        first_name: Vorname Kandidat
+        last_name: Nachname Kandidat
+
+    Returns:
+        Gerenderter Text
+    """
+    return (render_questionnaire_context_header(company_name, first_name, last_name)
+            + render_questionnaire_context_body(index))
@@ -0,0 +1,178 @@
+"""
+Einmal pro Questionnaire aufgebauter Index für die Prompt-Builder
+
+Partitioniert die Fragen nach Priority und Kategorie, berechnet das
+Stellentitel-Flag der Muss-Kriterien vorab und trägt die Sortierschlüssel der
+Kategorien, damit build_questions_list, build_gate_questions,
+build_preference_questions und build_questionnaire_context die Fragen nicht
+jeweils erneut filtern.
+"""
+import threading
+from collections import OrderedDict
+
+
+# Schlüsselwörter, die auf Stellentitel-Fragen hindeuten
+JOB_TITLE_KEYWORDS = (
+    'stellentitel', 'stellen-titel', 'job-titel', 'jobtitel',
+    'position', 'rolle', 'beruf', 'berufsbezeichnung',
+    'alternativtitel', 'alternativ-titel', 'alternative position',
+    'alternative rolle', 'alternative stelle'
+)
+
+# Schlüsselwörter, die ein anderes enthalten, sind redundant (z.B. "berufsbezeichnung" ⊃ "beruf")
+_JOB_TITLE_SEARCH_KEYWORDS = tuple(
+    keyword for keyword in JOB_TITLE_KEYWORDS
+    if not any(other != keyword and other in keyword for other in JOB_TITLE_KEYWORDS)
+)
+
+DEFAULT_CATEGORY = 'general'
+DEFAULT_GROUP = 'Allgemein'
+DEFAULT_CATEGORY_ORDER = 99
+
+# Anzahl Questionnaires, deren Index wiederverwendet wird (Batch-Calls teilen ein Questionnaire)
+INDEX_CACHE_SIZE = 64
+
+
+def is_job_title_question(question: dict) -> bool:
+    """
+    Prüft, ob eine Frage eine Stellentitel- oder Alternativtitel-Frage ist
+
+    Args:
+        question: Frage-Dict aus Questionnaire
+
+    Returns:
+        True wenn eines der Schlüsselwörter im Frage-Text, Context oder Group vorkommt
+    """
+    # Alle drei Felder in einem String (Schlüsselwörter enthalten keinen Zeilenumbruch)
+    haystack = "\n".join((
+        question.get('question', '') or '',
+        question.get('context', '') or '',
+        question.get('group', '') or '',
+    )).lower()
+    for keyword in _JOB_TITLE_SEARCH_KEYWORDS:
+        if keyword in haystack:
+            return True
+    return False
+
+
+class QuestionRecord:
+    """Kompakte Sicht auf eine Frage (Rohwerte wie im HOC-Dict, Defaults wie in den Buildern)"""
+
+    __slots__ = (
+        'question', 'context', 'preamble', 'help_text', 'options', 'question_type',
+        'priority', 'category', 'group', 'category_order', 'is_job_title',
+    )
+
+    def __init__(self, q: dict):
+        self.question = q.get('question', '')
+        self.context = q.get('context', '')
+        self.preamble = q.get('preamble', '')
+        self.help_text = q.get('help_text', '')
+        self.options = q.get('options', None)
+        self.question_type = q.get('question_type', 'boolean')
+        self.priority = q.get('priority')
+        self.category = q.get('category', DEFAULT_CATEGORY)
+        self.group = q.get('group', DEFAULT_GROUP)
+        self.category_order = q.get('category_order', DEFAULT_CATEGORY_ORDER)
+        # Nur für Muss-Kriterien relevant (Gate: Stellentitel-Fragen führen zum Abbruch)
+        self.is_job_title = self.priority == 1 and is_job_title_question(q)
+
+
+class CategoryRecord:
+    """Fragen einer Kategorie; group und sort_key stammen von der ersten Frage der Kategorie"""
+
+    __slots__ = ('category', 'group', 'sort_key', 'must', 'optional')
+
+    def __init__(self, category, first: QuestionRecord):
+        self.category = category
+        self.group = first.group
+        self.sort_key = first.category_order
+        self.must = []
+        self.optional = []
+
+
+class QuestionnaireIndex:
+    """
+    Partitionen eines Questionnaires (Reihenfolge innerhalb jeder Partition wie im HOC-Array)
+
+    Attributes:
+        total: Anzahl Einträge im questions Array
+        must: Priority=1 Fragen
+        optional: Priority=2 Fragen
+        job_title_must: Priority=1 Stellentitel-Fragen (führen zum Abbruch)
+        other_must: Übrige Priority=1 Fragen
+        categories: CategoryRecords, sortiert nach category_order
+        rendered: Cache der kampagnenweiten Texte (siehe prompt_templates)
+    """
+
+    __slots__ = ('questions', 'total', 'must', 'optional', 'job_title_must', 'other_must', 'categories', 'rendered')
+
+    def __init__(self, questions: list):
+        """
+        Args:
+            questions: questions Array aus HOC (Einträge, die kein dict sind, werden übersprungen)
+        """
+        self.questions = questions
+        self.total = len(questions)
+        self.must = []
+        self.optional = []
+        self.job_title_must = []
+        self.other_must = []
+        self.rendered = {}
+
+        by_category = {}
+        for q in questions:
+            if not isinstance(q, dict):
+                continue
+            record = QuestionRecord(q)
+
+            category = by_category.get(record.category)
+            if category is None:
+                category = by_category[record.category] = CategoryRecord(record.category, record)
+
+            if record.priority == 1:
+                self.must.append(record)
+                (self.job_title_must if record.is_job_title else self.other_must).append(record)
+                category.must.append(record)
+            elif record.priority == 2:
+                self.optional.append(record)
+                category.optional.append(record)
+
+        # sorted ist stabil: gleiche category_order behalten die Reihenfolge des ersten Auftretens
+        self.categories = sorted(by_category.values(), key=lambda category: category.sort_key)
+
+
+_EMPTY_INDEX = QuestionnaireIndex([])
+_index_cache = OrderedDict()
+_index_cache_lock = threading.Lock()
+
+
+def get_questionnaire_index(questionnaire: dict) -> QuestionnaireIndex:
+    """
+    Liefert den Index eines Questionnaires (wiederverwendet, solange dasselbe questions Array übergeben wird)
+
+    Args:
+        questionnaire: Questionnaire-Daten aus HOC (oder None)
+
+    Returns:
+        QuestionnaireIndex (leer, falls keine Fragen vorhanden sind)
+    """
+    questions = (questionnaire.get('questions') if questionnaire else None) or []
+    if not questions:
+        return _EMPTY_INDEX
+
+    key = id(questions)
+    with _index_cache_lock:
+        index = _index_cache.get(key)
+        # Identitätsprüfung: id() kann nach Garbage Collection wiederverwendet werden
+        if index is not None and index.questions is questions:
+            _index_cache.move_to_end(key)
+            return index
+
+    index = QuestionnaireIndex(questions)
+    with _index_cache_lock:
+        _index_cache[key] = index
+        _index_cache.move_to_end(key)
+        while len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
@@ -0,0 +1,497 @@
+"""
+Rate-Limiting und Concurrency-Governor für ausgehende Requests (Dials, AI-Calls)
+Überlauf wartet in einer Queue statt fehlzuschlagen; Queue-Tiefe und Wartezeiten
+werden als Statistik erfasst
+
+Mit shared=True liegt der Token-Bucket in SQLite (siehe local_db) und gilt für alle
+gunicorn Worker gemeinsam; ActiveCallLimiter zählt aktive Calls ebenfalls prozessübergreifend.
+Queue-Statistiken bleiben pro Worker.
+"""
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import local_db
+import metrics
+
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+        name TEXT PRIMARY KEY,
+        tokens REAL NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS active_call_slots (
+        slot_id TEXT PRIMARY KEY,
+        limiter TEXT NOT NULL,
+        limit_key TEXT NOT NULL,
+        call_sid TEXT,
+        acquired_at REAL NOT NULL,
+        expires_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_active_call_slots_key ON active_call_slots (limiter, limit_key)",
+    "CREATE INDEX IF NOT EXISTS idx_active_call_slots_call_sid ON active_call_slots (call_sid)",
+)
+
+
+class GovernorTimeout(Exception):
+    """Slot konnte nicht innerhalb der Queue-Wartezeit vergeben werden"""
+
+
+class TokenBucket:
+    """Thread-sicherer Token-Bucket mit blockierendem acquire()"""
+
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        """
+        Args:
+            rate_per_second: Nachfüllrate (Tokens pro Sekunde), <= 0 deaktiviert das Limit
+            burst: Maximale Anzahl angesparter Tokens
+        """
+        self.rate = rate_per_second
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, timeout: float = None) -> float:
+        """
+        Reserviert ein Token und liefert die nötige Wartezeit in Sekunden
+
+        Returns:
+            Wartezeit oder None, falls sie timeout überschreiten würde (nichts reserviert)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+            wait_seconds = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if timeout is not None and wait_seconds > timeout:
+                return None
+
+            self._tokens -= 1
+            return wait_seconds
+
+    def acquire(self, timeout: float = None) -> float:
+        """
+        Wartet, bis ein Token verfügbar ist
+
+        Args:
+            timeout: Maximale Wartezeit in Sekunden (None = unbegrenzt)
+
+        Returns:
+            Tatsächliche Wartezeit in Sekunden
+
+        Raises:
+            GovernorTimeout: Token wäre erst nach timeout verfügbar
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        wait_seconds = self._reserve(timeout)
+        if wait_seconds is None:
+            raise GovernorTimeout(f"Rate-Limit: kein Token innerhalb von {timeout:.1f}s")
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+        return wait_seconds
+
+
+class SharedTokenBucket(TokenBucket):
+    """Token-Bucket in SQLite: ein gemeinsames Limit für alle Worker-Prozesse"""
+
+    def __init__(self, name: str, rate_per_second: float, burst: int = 1, path: str = None):
+        """
+        Args:
+            name: Name des Buckets (Zeile in rate_limit_buckets)
+            rate_per_second: Nachfüllrate (Tokens pro Sekunde), <= 0 deaktiviert das Limit
+            burst: Maximale Anzahl angesparter Tokens
+            path: Pfad zur SQLite-Datei (Default: Config.LOCAL_DB_PATH)
+        """
+        super().__init__(rate_per_second, burst)
+        self.name = name
+        self.path = path
+
+    def _reserve(self, timeout: float = None) -> float:
+        """Wie TokenBucket._reserve, Tokenstand in einer Schreib-Transaktion (Wanduhr statt monotonic)"""
+        try:
+            local_db.ensure_schema("rate_limit", _SCHEMA, self.path)
+            with local_db.transaction(self.path) as conn:
+                now = time.time()
+                row = conn.execute(
+                    "SELECT tokens, updated_at FROM rate_limit_buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                tokens = float(self.capacity) if row is None else min(
+                    self.capacity, row["tokens"] + max(0.0, now - row["updated_at"]) * self.rate
+                )
+
+                wait_seconds = 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+                if timeout is not None and wait_seconds > timeout:
+                    return None
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_limit_buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                    (self.name, tokens - 1, now)
+                )
+                return wait_seconds
+        except sqlite3.Error as e:
+            # Datenbank gesperrt/nicht verfügbar: lieber pro Worker limitieren als Dials scheitern lassen
+            logger.warning(f"⚠️ Geteiltes Rate-Limit '{self.name}' nicht verfügbar ({e}) - nutze Limit des Workers")
+            return super()._reserve(timeout)
+
+
+class ActiveCallLimiter:
+    """
+    Begrenzt aktive Calls pro Key (agent_phone_number_id) über alle Worker
+
+    Ein Slot wird vor dem Dial belegt. Der Aufrufer gibt ihn nach dem Dial frei (release) oder
+    hält ihn bis zum finalen Twilio-Status (attach + finish_call) - Letzteres nur, wenn Status
+    Callbacks tatsächlich ankommen. Ohne Status Callback (oder ohne Call-SID) läuft ein
+    gehaltener Slot nach max_call_seconds ab.
+    """
+
+    POLL_SECONDS = 0.2
+
+    def __init__(self, name: str, limit_per_key: int, max_call_seconds: float, path: str = None):
+        """
+        Args:
+            name: Name des Limiters (für Statistiken/Metriken)
+            limit_per_key: Max. gleichzeitig aktive Calls pro Key, <= 0 deaktiviert das Limit
+            max_call_seconds: Spätestens nach dieser Zeit wird ein Slot freigegeben
+            path: Pfad zur SQLite-Datei (Default: Config.LOCAL_DB_PATH)
+        """
+        self.name = name
+        self.limit_per_key = limit_per_key
+        self.max_call_seconds = max_call_seconds
+        self.path = path
+
+        self._lock = threading.Lock()
+        self.queue_depth = 0
+        self.acquired = 0
+        self.timeouts = 0
+        self.released_by_status = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _transaction(self):
+        local_db.ensure_schema("rate_limit", _SCHEMA, self.path)
+        return local_db.transaction(self.path)
+
+    def _try_acquire(self, key: str) -> str:
+        """Belegt einen Slot, falls für key einer frei ist; liefert die Slot-ID oder None"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM active_call_slots WHERE expires_at < ?", (now,))
+            active = conn.execute(
+                "SELECT COUNT(*) FROM active_call_slots WHERE limiter = ? AND limit_key = ?", (self.name, key)
+            ).fetchone()[0]
+            if active >= self.limit_per_key:
+                return None
+
+            slot_id = uuid.uuid4().hex
+            conn.execute(
+                """
+                INSERT INTO active_call_slots (slot_id, limiter, limit_key, acquired_at, expires_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (slot_id, self.name, key, now, now + self.max_call_seconds)
+            )
+            return slot_id
+
+    def acquire(self, key, timeout: float = None) -> tuple:
+        """
+        Belegt einen Slot für key (wartet, bis ein aktiver Call endet oder timeout abläuft)
+
+        Args:
+            key: z.B. agent_phone_number_id
+            timeout: Maximale Wartezeit in Sekunden (None = unbegrenzt)
+
+        Returns:
+            Tuple (slot_id, wait_seconds); slot_id ist None, wenn das Limit deaktiviert ist
+
+        Raises:
+            GovernorTimeout: Kein Slot innerhalb von timeout frei
+        """
+        if self.limit_per_key <= 0:
+            return None, 0.0
+
+        key = str(key)
+        started_at = time.monotonic()
+        queue_gauge = metrics.GOVERNOR_QUEUE_DEPTH.labels(governor=self.name)
+        with self._lock:
+            self.queue_depth += 1
+        queue_gauge.inc()
+
+        try:
+            while True:
+                slot_id = self._try_acquire(key)
+                if slot_id is not None:
+                    break
+
+                waited = time.monotonic() - started_at
+                if timeout is not None and waited >= timeout:
+                    with self._lock:
+                        self.timeouts += 1
+                    metrics.GOVERNOR_TIMEOUTS.labels(governor=self.name).inc()
+                    raise GovernorTimeout(
+                        f"{self.limit_per_key} aktive Calls für '{key}' - kein Slot innerhalb von {timeout:.1f}s frei"
+                    )
+                time.sleep(self.POLL_SECONDS if timeout is None else min(self.POLL_SECONDS, timeout - waited))
+        finally:
+            with self._lock:
+                self.queue_depth -= 1
+            queue_gauge.dec()
+
+        wait_seconds = time.monotonic() - started_at
+        with self._lock:
+            self.acquired += 1
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+        metrics.GOVERNOR_WAIT.labels(governor=self.name).observe(wait_seconds)
+        return slot_id, wait_seconds
+
+    def attach(self, slot_id: str, call_sid: str) -> None:
+        """Verknüpft einen Slot mit der Call-SID (Freigabe über finish_call beim finalen Status)"""
+        if slot_id is None or not call_sid:
+            return
+        with self._transaction() as conn:
+            conn.execute("UPDATE active_call_slots SET call_sid = ? WHERE slot_id = ?", (call_sid, slot_id))
+
+    def release(self, slot_id: str) -> None:
+        """Gibt einen Slot frei (z.B. wenn der Dial fehlgeschlagen ist)"""
+        if slot_id is None:
+            return
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM active_call_slots WHERE slot_id = ?", (slot_id,))
+
+    def finish_call(self, call_sid: str) -> bool:
+        """
+        Gibt den Slot eines beendeten Calls frei (finaler Twilio-Status)
+
+        Args:
+            call_sid: Twilio Call SID
+
+        Returns:
+            True, falls ein Slot freigegeben wurde
+        """
+        if not call_sid or self.limit_per_key <= 0:
+            return False
+        with self._transaction() as conn:
+            released = conn.execute("DELETE FROM active_call_slots WHERE call_sid = ?", (call_sid,)).rowcount > 0
+        if released:
+            with self._lock:
+                self.released_by_status += 1
+        return released
+
+    def active(self) -> dict:
+        """Aktive Calls pro Key (über alle Worker)"""
+        if self.limit_per_key <= 0:
+            return {}
+        local_db.ensure_schema("rate_limit", _SCHEMA, self.path)
+        rows = local_db.connect(self.path).execute(
+            """
+            SELECT limit_key, COUNT(*) AS calls FROM active_call_slots
+            WHERE limiter = ? AND expires_at >= ? GROUP BY limit_key
+            """,
+            (self.name, time.time())
+        ).fetchall()
+        return {row["limit_key"]: row["calls"] for row in rows}
+
+    def stats(self) -> dict:
+        """Aktive Calls (alle Worker) und Wartezeit-Statistik (dieser Worker)"""
+        active = self.active()
+        with self._lock:
+            return {
+                "name": self.name,
+                "limit_per_key": self.limit_per_key,
+                "max_call_seconds": self.max_call_seconds,
+                "active": active,
+                "queue_depth": self.queue_depth,
+                "acquired": self.acquired,
+                "timeouts": self.timeouts,
+                "released_by_status": self.released_by_status,
+                "avg_wait_seconds": round(self.total_wait_seconds / self.acquired, 4) if self.acquired else 0.0,
+                "max_wait_seconds": round(self.max_wait_seconds, 4),
+            }
+
+
+class KeyedConcurrencyLimiter:
+    """Begrenzt gleichzeitige Slots pro Key (z.B. pro agent_phone_number_id)"""
+
+    def __init__(self, limit_per_key: int):
+        """
+        Args:
+            limit_per_key: Max. gleichzeitige Slots pro Key, <= 0 deaktiviert das Limit
+        """
+        self.limit_per_key = limit_per_key
+        self._semaphores = {}
+        self._active = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, key):
+        with self._lock:
+            semaphore = self._semaphores.get(key)
+            if semaphore is None:
+                semaphore = self._semaphores[key] = threading.BoundedSemaphore(self.limit_per_key)
+            return semaphore
+
+    def acquire(self, key, timeout: float = None) -> None:
+        """
+        Belegt einen Slot für key (wartet bis timeout)
+
+        Raises:
+            GovernorTimeout: Kein Slot innerhalb von timeout frei
+        """
+        if self.limit_per_key > 0 and not self._semaphore(key).acquire(timeout=timeout):
+            raise GovernorTimeout(f"Concurrency-Limit ({self.limit_per_key}) für '{key}' erreicht")
+
+        with self._lock:
+            self._active[key] = self._active.get(key, 0) + 1
+
+    def release(self, key) -> None:
+        """Gibt einen Slot für key frei"""
+        with self._lock:
+            self._active[key] = self._active.get(key, 1) - 1
+            if not self._active[key]:
+                del self._active[key]
+
+        if self.limit_per_key > 0:
+            self._semaphore(key).release()
+
+    def active(self) -> dict:
+        """Liefert die aktuell belegten Slots pro Key"""
+        with self._lock:
+            return dict(self._active)
+
+
+class Governor:
+    """
+    Kombiniert Token-Bucket (Rate) und Concurrency-Limit pro Key
+
+    Requests, die über dem Limit liegen, warten (Queue) bis queue_timeout_seconds;
+    erst danach wird GovernorTimeout geworfen.
+    """
+
+    def __init__(self, name: str, rate_per_second: float, burst: int = 1,
+                 max_concurrent_per_key: int = 0, queue_timeout_seconds: float = None, shared: bool = False):
+        """
+        Args:
+            name: Name des Governors (für Statistiken/Logs)
+            rate_per_second: Max. Slots pro Sekunde (<= 0 = unbegrenzt)
+            burst: Max. Slots, die auf einmal vergeben werden dürfen
+            max_concurrent_per_key: Max. gleichzeitige Slots pro Key in diesem Prozess (<= 0 = unbegrenzt)
+            queue_timeout_seconds: Max. Wartezeit in der Queue (None = unbegrenzt)
+            shared: Rate-Limit über alle Worker-Prozesse (SharedTokenBucket) statt pro Prozess
+        """
+        self.name = name
+        self.shared = shared
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self._bucket = SharedTokenBucket(name, rate_per_second, burst) if shared else TokenBucket(rate_per_second, burst)
+        self._limiter = KeyedConcurrencyLimiter(max_concurrent_per_key)
+
+        self._lock = threading.Lock()
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.acquired = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def acquire(self, key="default", timeout: float = None) -> float:
+        """
+        Belegt einen Slot (wartet in der Queue, falls Rate oder Concurrency ausgeschöpft ist)
+        Muss mit release(key) wieder freigegeben werden.
+
+        Args:
+            key: Key für das Concurrency-Limit
+            timeout: Max. Wartezeit (Default: queue_timeout_seconds)
+            
+        Returns:
+            Wartezeit in der Queue in Sekunden
+            
+        Raises:
+            GovernorTimeout: Slot nicht innerhalb von queue_timeout_seconds verfügbar
+        """
+        timeout = self.queue_timeout_seconds if timeout is None else timeout
+        started_at = time.monotonic()
+        with self._lock:
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        queue_gauge = metrics.GOVERNOR_QUEUE_DEPTH.labels(governor=self.name)
+        queue_gauge.inc()
+
+        try:
+            self._limiter.acquire(key, timeout=timeout)
+            try:
+                remaining = None
+                if timeout is not None:
+                    remaining = max(0.0, timeout - (time.monotonic() - started_at))
+                self._bucket.acquire(timeout=remaining)
+            except BaseException:
+                self._limiter.release(key)
+                raise
+        except GovernorTimeout:
+            with self._lock:
+                self.queue_depth -= 1
+                self.timeouts += 1
+            queue_gauge.dec()
+            metrics.GOVERNOR_TIMEOUTS.labels(governor=self.name).inc()
+            raise
+
+        wait_seconds = time.monotonic() - started_at
+        with self._lock:
+            self.queue_depth -= 1
+            self.acquired += 1
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+        queue_gauge.dec()
+        metrics.GOVERNOR_WAIT.labels(governor=self.name).observe(wait_seconds)
+        return wait_seconds
+
+    def release(self, key="default") -> None:
+        """Gibt einen mit acquire(key) belegten Slot frei"""
+        self._limiter.release(key)
+
+    @contextmanager
+    def slot(self, key="default", timeout: float = None):
+        """
+        Context Manager um acquire()/release()
+
+        Args:
+            key: Key für das Concurrency-Limit
+            timeout: Max. Wartezeit (Default: queue_timeout_seconds)
+
+        Yields:
+            Wartezeit in der Queue in Sekunden
+
+        Raises:
+            GovernorTimeout: Slot nicht innerhalb der Wartezeit verfügbar
+        """
+        wait_seconds = self.acquire(key, timeout)
+        try:
+            yield wait_seconds
+        finally:
+            self.release(key)
+
+    def stats(self) -> dict:
+        """Liefert Queue-Tiefe, aktive Slots und Wartezeit-Statistik"""
+        with self._lock:
+            return {
+                "name": self.name,
+                "shared_rate_limit": self.shared,
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "active": self._limiter.active(),
+                "acquired": self.acquired,
+                "timeouts": self.timeouts,
+                "avg_wait_seconds": round(self.total_wait_seconds / self.acquired, 4) if self.acquired else 0.0,
+                "max_wait_seconds": round(self.max_wait_seconds, 4),
+            }
@@ -0,0 +1,279 @@
+"""
+Session-Store für Twilio-Calls (Prompt und First Message bis zum TwiML-Callback)
+
+Der Callback von Twilio landet in einem beliebigen gunicorn Worker, deshalb liegen
+Sessions standardmäßig in SQLite (siehe local_db) statt im Speicher des Prozesses,
+der den Call gestartet hat. Einträge laufen nach SESSION_TTL_SECONDS ab, die Anzahl ist
+auf SESSION_MAX_ENTRIES begrenzt (älteste zuerst). Große Texte (z.B. der Enhanced
+Prompt) werden komprimiert und über ihren Hash nur einmal gespeichert.
+
+Backends (SESSION_STORE_BACKEND):
+    sqlite  - prozessübergreifend (Default)
+    memory  - nur im eigenen Prozess (lokale Tests mit einem Worker)
+"""
+import hashlib
+import json
+from abc import ABC, abstractmethod
+import threading
+import time
+import uuid
+import zlib
+
+import local_db
+from cache import TTLCache
+from config import Config
+
+
+BACKENDS = ("sqlite", "memory")
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        fields_json TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        expires_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS session_blobs (
+        blob_hash TEXT PRIMARY KEY,
+        data BLOB NOT NULL,
+        size INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS session_blob_refs (
+        session_id TEXT NOT NULL,
+        blob_hash TEXT NOT NULL,
+        PRIMARY KEY (session_id, blob_hash)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at)",
+    "CREATE INDEX IF NOT EXISTS idx_sessions_created_at ON sessions (created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_session_blob_refs_blob_hash ON session_blob_refs (blob_hash)",
+)
+
+# Markiert in fields_json einen ausgelagerten Text: {"enhanced_prompt": {"$blob": "<sha256>"}}
+BLOB_REF = "$blob"
+
+# Nicht mehr referenzierte Blobs werden höchstens so oft pro Prozess gelöscht
+CLEANUP_INTERVAL_SECONDS = 60
+
+
+class SessionStore(ABC):
+    """Schnittstelle der Session-Backends (Werte: JSON-serialisierbares Dict)"""
+
+    def create(self, data: dict) -> str:
+        """
+        Legt eine neue Session an
+
+        Args:
+            data: Session-Daten (z.B. enhanced_prompt, first_message)
+
+        Returns:
+            Session-ID (UUID)
+        """
+        session_id = str(uuid.uuid4())
+        self.put(session_id, data)
+        return session_id
+
+    @abstractmethod
+    def put(self, session_id: str, data: dict) -> None:
+        """Speichert die Session-Daten unter session_id (überschreibt bestehende)"""
+
+    @abstractmethod
+    def get(self, session_id: str) -> dict:
+        """Liefert die Session-Daten oder None (unbekannt oder abgelaufen)"""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        """Löscht eine Session; True, falls sie existierte"""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Kennzahlen des Backends (Anzahl Einträge, Limits)"""
+
+
+class MemorySessionStore(SessionStore):
+    """Sessions im Speicher dieses Prozesses (LRU + TTL über TTLCache)"""
+
+    def __init__(self, ttl_seconds: float = None, max_entries: int = None):
+        """
+        Args:
+            ttl_seconds: Gültigkeit einer Session (Default: Config.SESSION_TTL_SECONDS)
+            max_entries: Maximale Anzahl Sessions (Default: Config.SESSION_MAX_ENTRIES)
+        """
+        self.cache = TTLCache(
+            name="sessions",
+            max_entries=Config.SESSION_MAX_ENTRIES if max_entries is None else max_entries,
+            ttl_seconds=Config.SESSION_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        )
+
+    def put(self, session_id: str, data: dict) -> None:
+        self.cache.set(session_id, dict(data))
+
+    def get(self, session_id: str) -> dict:
+        data = self.cache.get(session_id)
+        return dict(data) if data is not None else None
+
+    def delete(self, session_id: str) -> bool:
+        return self.cache.pop(session_id) is not None
+
+    def stats(self) -> dict:
+        return {"backend": "memory", **self.cache.stats()}
+
+
+class SQLiteSessionStore(SessionStore):
+    """Prozessübergreifende Sessions mit TTL, Größenlimit und komprimierten, deduplizierten Texten"""
+
+    def __init__(self, path: str = None, ttl_seconds: float = None, max_entries: int = None,
+                 blob_min_bytes: int = None):
+        """
+        Args:
+            path: Pfad zur SQLite-Datei (Default: Config.SESSION_STORE_PATH)
+            ttl_seconds: Gültigkeit einer Session (Default: Config.SESSION_TTL_SECONDS)
+            max_entries: Maximale Anzahl Sessions (Default: Config.SESSION_MAX_ENTRIES)
+            blob_min_bytes: Texte ab dieser Größe werden komprimiert ausgelagert (Default: Config.SESSION_BLOB_MIN_BYTES)
+        """
+        self.path = path or Config.SESSION_STORE_PATH
+        self.ttl_seconds = Config.SESSION_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_entries = Config.SESSION_MAX_ENTRIES if max_entries is None else max_entries
+        self.blob_min_bytes = Config.SESSION_BLOB_MIN_BYTES if blob_min_bytes is None else blob_min_bytes
+        self._cleanup_lock = threading.Lock()
+        self._next_cleanup = 0.0
+
+    def _conn(self):
+        local_db.ensure_schema("sessions", _SCHEMA, self.path)
+        return local_db.connect(self.path)
+
+    def _transaction(self):
+        local_db.ensure_schema("sessions", _SCHEMA, self.path)
+        return local_db.transaction(self.path)
+
+    def put(self, session_id: str, data: dict) -> None:
+        """
+        Speichert eine Session (überschreibt eine bestehende mit derselben ID)
+
+        Args:
+            session_id: Session-ID
+            data: Session-Daten (JSON-serialisierbar)
+        """
+        fields = {}
+        blobs = {}
+        for key, value in data.items():
+            encoded = value.encode("utf-8") if isinstance(value, str) else None
+            if encoded is None or len(encoded) < self.blob_min_bytes:
+                fields[key] = value
+                continue
+            # Gleicher Text (z.B. Retry desselben Kandidaten) wird nur einmal gespeichert
+            blob_hash = hashlib.sha256(encoded).hexdigest()
+            blobs[blob_hash] = encoded
+            fields[key] = {BLOB_REF: blob_hash}
+
+        now = time.time()
+        with self._transaction() as conn:
+            for blob_hash, encoded in blobs.items():
+                if conn.execute("SELECT 1 FROM session_blobs WHERE blob_hash = ?", (blob_hash,)).fetchone() is None:
+                    conn.execute(
+                        "INSERT INTO session_blobs (blob_hash, data, size) VALUES (?, ?, ?)",
+                        (blob_hash, zlib.compress(encoded), len(encoded))
+                    )
+            conn.execute("DELETE FROM session_blob_refs WHERE session_id = ?", (session_id,))
+            conn.executemany(
+                "INSERT INTO session_blob_refs (session_id, blob_hash) VALUES (?, ?)",
+                [(session_id, blob_hash) for blob_hash in blobs]
+            )
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO sessions (session_id, fields_json, created_at, expires_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (session_id, json.dumps(fields, ensure_ascii=False, default=str), now, now + self.ttl_seconds)
+            )
+            overflow = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM sessions WHERE session_id IN (SELECT session_id FROM sessions ORDER BY created_at LIMIT ?)",
+                    (overflow,)
+                )
+            self._cleanup(conn, now)
+
+    def _cleanup(self, conn, now: float) -> None:
+        with self._cleanup_lock:
+            if now < self._next_cleanup:
+                return
+            self._next_cleanup = now + CLEANUP_INTERVAL_SECONDS
+        conn.execute("DELETE FROM sessions WHERE expires_at < ?", (now,))
+        conn.execute("DELETE FROM session_blob_refs WHERE session_id NOT IN (SELECT session_id FROM sessions)")
+        conn.execute("DELETE FROM session_blobs WHERE blob_hash NOT IN (SELECT blob_hash FROM session_blob_refs)")
+
+    def get(self, session_id: str) -> dict:
+        """
+        Liefert die Daten einer Session
+
+        Args:
+            session_id: Session-ID
+
+        Returns:
+            Session-Daten oder None (unbekannt oder abgelaufen)
+        """
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT fields_json FROM sessions WHERE session_id = ? AND expires_at >= ?",
+            (session_id, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+
+        data = json.loads(row["fields_json"])
+        for key, value in data.items():
+            if isinstance(value, dict) and BLOB_REF in value:
+                blob = conn.execute(
+                    "SELECT data FROM session_blobs WHERE blob_hash = ?", (value[BLOB_REF],)
+                ).fetchone()
+                data[key] = zlib.decompress(blob["data"]).decode("utf-8") if blob is not None else None
+        return data
+
+    def delete(self, session_id: str) -> bool:
+        """Entfernt eine Session (Blobs werden beim nächsten Cleanup freigegeben)"""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM session_blob_refs WHERE session_id = ?", (session_id,))
+            return conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount > 0
+
+    def stats(self) -> dict:
+        """Anzahl Sessions und Speicherbedarf der Texte (über alle Worker)"""
+        conn = self._conn()
+        sessions = conn.execute("SELECT COUNT(*) FROM sessions WHERE expires_at >= ?", (time.time(),)).fetchone()[0]
+        blobs = conn.execute(
+            "SELECT COUNT(*) AS blobs, COALESCE(SUM(size), 0) AS raw, COALESCE(SUM(length(data)), 0) AS stored "
+            "FROM session_blobs"
+        ).fetchone()
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "sessions": sessions,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "blobs": blobs["blobs"],
+            "blob_bytes_raw": blobs["raw"],
+            "blob_bytes_stored": blobs["stored"],
+        }
+
+
+def create_session_store(backend: str = None) -> SessionStore:
+    """
+    Erstellt den konfigurierten Session-Store
+
+    Args:
+        backend: "sqlite" oder "memory" (Default: Config.SESSION_STORE_BACKEND)
+
+    Returns:
+        SessionStore
+    """
+    backend = (backend or Config.SESSION_STORE_BACKEND).strip().lower()
+    if backend == "sqlite":
+        return SQLiteSessionStore()
+    if backend == "memory":
+        return MemorySessionStore()
+    raise ValueError(f"Unbekanntes SESSION_STORE_BACKEND '{backend}' (erlaubt: {', '.join(BACKENDS)})")
@@ -0,0 +1,185 @@
+"""
+Logging-Setup mit zwei Modi (LOG_MODE)
+
+- structured (Default): ein JSON-Event pro Request-Stage und pro fachlichem Schritt
+  (trigger.received, call.started, ...). Die ausführlichen INFO-Zeilen des Hot Paths
+  (pro Request/Call) prüfen das Flag verbose und entfallen; operative INFO-Zeilen (Jobs,
+  Batch-Ergebnisse, Twilio-Status, Admin-Aktionen) bleiben als Text-Event erhalten.
+  Previews (Variablen-Werte, Payloads) nur für eine Stichprobe (LOG_PREVIEW_SAMPLE_RATE).
+- verbose: die bisherige Ausgabe (Text-Zeilen mit allen Details), zum Debuggen.
+
+In beiden Modi schreibt ein QueueListener-Thread die Logs: Request-Threads reihen den
+Record nur ein (ohne Formatierung, ohne I/O), bei voller Queue wird verworfen statt
+gewartet.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+
+from config import Config
+
+
+MODE_STRUCTURED = "structured"
+MODE_VERBOSE = "verbose"
+
+VERBOSE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+EVENT_LOGGER_NAME = "sellcruiting.events"
+
+_event_logger = logging.getLogger(EVENT_LOGGER_NAME)
+
+# True im verbose-Modus (Hot Path prüft das Flag, bevor teure Log-Zeilen gebaut werden)
+verbose = Config.LOG_MODE != MODE_STRUCTURED
+
+_configured = False
+_configure_lock = threading.Lock()
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Eine JSON-Zeile pro Record (Events mit ihren Feldern, sonstige Logs mit message)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        fields = getattr(record, "event_fields", None)
+        if fields is not None:
+            entry["event"] = record.msg
+            entry.update(fields)
+        else:
+            entry["message"] = record.getMessage()
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Reiht Records unformatiert ein (Formatierung im Listener-Thread)
+
+    Bei voller Queue wird der Record verworfen und gezählt, der Request-Thread wartet nie.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # QueueHandler.prepare würde hier (im Request-Thread) formatieren
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(mode: str = None) -> None:
+    """
+    Richtet das Root-Logging ein (einmal pro Prozess, in jedem gunicorn Worker beim Import)
+
+    Args:
+        mode: "structured" oder "verbose" (Default: Config.LOG_MODE)
+    """
+    global _configured, _listener, verbose
+    with _configure_lock:
+        if _configured:
+            return
+        _configured = True
+
+        mode = mode or Config.LOG_MODE
+        verbose = mode != MODE_STRUCTURED
+
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(logging.Formatter(VERBOSE_FORMAT) if verbose else JsonFormatter())
+
+        log_queue = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(NonBlockingQueueHandler(log_queue))
+        root.setLevel(logging.INFO)
+
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+
+def dropped_records() -> int:
+    """Anzahl verworfener Log-Records (Queue voll)"""
+    return sum(getattr(handler, "dropped", 0) for handler in logging.getLogger().handlers)
+
+
+def event(name: str, level: int = logging.INFO, **fields) -> None:
+    """
+    Schreibt ein strukturiertes Event (nur im structured-Modus; verbose loggt die Text-Zeilen)
+
+    Die Felder werden erst im Listener-Thread serialisiert und dürfen danach nicht mehr
+    verändert werden. Die request_id des aktiven Timers wird ergänzt.
+
+    Args:
+        name: Event-Name (z.B. "call.started")
+        level: Log-Level
+        **fields: Event-Felder (JSON-serialisierbar, sonst str())
+    """
+    if verbose or not _event_logger.isEnabledFor(level):
+        return
+
+    import timing
+
+    timer = timing.current_timer()
+    if timer is not None:
+        fields.setdefault("request_id", timer.request_id)
+        fields.setdefault("request", timer.name)
+    _event_logger.log(level, name, extra={"event_fields": fields})
+
+
+def sample_preview() -> bool:
+    """True für die Stichprobe der Events, die Previews (Werte, Payloads) enthalten sollen"""
+    rate = Config.LOG_PREVIEW_SAMPLE_RATE
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+def preview(values: dict, limit: int = 50) -> dict:
+    """Gekürzte Werte für ein Preview-Feld (wie die Vorschau im verbose-Modus)"""
+    return {key: str(value)[:limit] if value else "" for key, value in values.items()}
+
+
+def stage_sink(record: dict) -> None:
+    """
+    Timing-Sink (TIMING_SINKS=events): ein Event pro Stage und eines pro Request
+
+    Args:
+        record: Datensatz aus timing.RequestTimer.to_record
+    """
+    if verbose:
+        return
+
+    for span in record["spans"]:
+        fields = {
+            "request_id": record["request_id"],
+            "request": record["name"],
+            "stage": span["name"],
+            "duration_ms": span["duration_ms"],
+            "offset_ms": span["offset_ms"],
+        }
+        if span.get("attributes"):
+            fields.update(span["attributes"])
+        _event_logger.info("stage", extra={"event_fields": fields})
+
+    _event_logger.info("request", extra={"event_fields": {
+        "request_id": record["request_id"],
+        "request": record["name"],
+        "total_ms": record["total_ms"],
+        **record["attributes"],
+    }})
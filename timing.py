@@ -0,0 +1,288 @@
+"""
+Stage-Timing für den Hot Path (Auth, Body-Parse, Questionnaire, AI, Kontext, Dial)
+Der aktive Timer hängt an einer ContextVar und ist damit pro Request (Thread bzw.
+asyncio Task) isoliert; abgeschlossene Requests gehen an austauschbare Sinks
+(Log, JSONL-Datei, OpenTelemetry)
+"""
+import contextvars
+import json
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from config import Config
+
+
+logger = logging.getLogger(__name__)
+
+_current_timer = contextvars.ContextVar("request_timer", default=None)
+
+
+class RequestTimer:
+    """Sammelt die Stages eines Requests (thread-sicher, da AI-Extraktionen parallel laufen)"""
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: Name des Requests (z.B. Route)
+        """
+        self.name = name
+        self.request_id = uuid.uuid4().hex
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans = []
+        self.attributes = {}
+        self.total_ms = None
+
+    def record(self, stage: str, started: float, duration_ms: float, **attributes) -> None:
+        """
+        Speichert eine abgeschlossene Stage
+
+        Args:
+            stage: Name der Stage (Server-Timing Token, z.B. "ai_companysize")
+            started: Startzeitpunkt (time.perf_counter())
+            duration_ms: Dauer in Millisekunden
+            **attributes: Zusätzliche Attribute für die Sinks (z.B. error)
+        """
+        span = {
+            "name": stage,
+            "offset_ms": round((started - self._started) * 1000, 3),
+            "duration_ms": round(duration_ms, 3),
+        }
+        if attributes:
+            span["attributes"] = attributes
+        with self._lock:
+            self.spans.append(span)
+
+    def stages(self) -> dict:
+        """
+        Liefert die Dauer pro Stage in ms (mehrfach gemessene Stages werden summiert)
+
+        Returns:
+            Dict {stage: dauer_ms} in Reihenfolge des ersten Auftretens
+        """
+        totals = {}
+        with self._lock:
+            for span in self.spans:
+                totals[span["name"]] = totals.get(span["name"], 0.0) + span["duration_ms"]
+        return {name: round(value, 1) for name, value in totals.items()}
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+    def summary(self) -> dict:
+        """Timings für den JSON "data" Block der Response"""
+        return {
+            "total_ms": round(self.total_ms if self.total_ms is not None else self.elapsed_ms(), 1),
+            "stages_ms": self.stages(),
+        }
+
+    def server_timing_header(self) -> str:
+        """Server-Timing Header (z.B. "auth;dur=0.1, questionnaire;dur=120.4, total;dur=812.0")"""
+        entries = [f"{name};dur={value}" for name, value in self.stages().items()]
+        entries.append(f"total;dur={round(self.elapsed_ms(), 1)}")
+        return ", ".join(entries)
+
+    def to_record(self) -> dict:
+        """Vollständiger Datensatz für die Sinks"""
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "request_id": self.request_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "total_ms": round(self.total_ms, 3) if self.total_ms is not None else None,
+            "attributes": dict(self.attributes),
+            "spans": spans,
+        }
+
+
+def start_request(name: str) -> RequestTimer:
+    """
+    Startet einen Timer für den aktuellen Request (Thread bzw. asyncio Task)
+
+    Args:
+        name: Name des Requests (z.B. Route)
+
+    Returns:
+        Neuer RequestTimer
+    """
+    timer = RequestTimer(name)
+    _current_timer.set(timer)
+    return timer
+
+
+def current_timer() -> RequestTimer:
+    """Liefert den Timer des aktuellen Requests oder None"""
+    return _current_timer.get()
+
+
+def finish_request(timer: RequestTimer = None, **attributes) -> RequestTimer:
+    """
+    Schließt den Timer ab, übergibt ihn an alle Sinks und löst ihn vom Kontext
+
+    Args:
+        timer: Timer (Default: aktueller Timer)
+        **attributes: Zusätzliche Attribute (z.B. status_code)
+
+    Returns:
+        Abgeschlossener Timer oder None
+    """
+    timer = timer or _current_timer.get()
+    if timer is None:
+        return None
+
+    timer.total_ms = timer.elapsed_ms()
+    timer.attributes.update(attributes)
+    if _current_timer.get() is timer:
+        _current_timer.set(None)
+
+    record = timer.to_record()
+    for sink in _sinks:
+        try:
+            sink(record)
+        except Exception as e:
+            logger.warning(f"⚠️ Timing-Sink {getattr(sink, '__name__', sink)} fehlgeschlagen: {e}")
+    return timer
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Misst eine Stage des aktuellen Requests (ohne aktiven Timer: no-op)
+
+    Args:
+        name: Name der Stage
+    """
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        timer.record(name, started, (time.perf_counter() - started) * 1000, error=type(e).__name__)
+        raise
+    timer.record(name, started, (time.perf_counter() - started) * 1000)
+
+
+def record_stage(name: str, duration_ms: float, **attributes) -> None:
+    """
+    Speichert eine bereits gemessene Stage, die gerade geendet hat (z.B. Queue-Wartezeit)
+
+    Args:
+        name: Name der Stage
+        duration_ms: Dauer in Millisekunden
+        **attributes: Zusätzliche Attribute für die Sinks
+    """
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.record(name, time.perf_counter() - duration_ms / 1000, duration_ms, **attributes)
+
+
+def submit_with_context(executor, func, *args, **kwargs):
+    """
+    executor.submit mit Kopie des aktuellen Kontexts (Timer gilt auch im Worker-Thread)
+
+    Returns:
+        Future
+    """
+    return executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
+
+
+# =============================================================================
+# SINKS
+# =============================================================================
+
+_sinks = []
+
+
+def add_sink(sink) -> None:
+    """Registriert einen Sink (Callable, erhält den Datensatz aus RequestTimer.to_record)"""
+    _sinks.append(sink)
+
+
+def clear_sinks() -> None:
+    _sinks.clear()
+
+
+def log_sink(record: dict) -> None:
+    """Eine Log-Zeile pro Request mit allen Stages"""
+    stages = {}
+    for span in record["spans"]:
+        stages[span["name"]] = stages.get(span["name"], 0.0) + span["duration_ms"]
+    breakdown = ", ".join(f"{name}={value:.0f}ms" for name, value in stages.items())
+    logger.info(f"⏱️ {record['name']} {record['total_ms']:.0f}ms ({breakdown})")
+
+
+class JsonlFileSink:
+    """Schreibt einen JSON-Datensatz pro Request in eine Datei (append, über Worker hinweg)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+class OpenTelemetrySink:
+    """Exportiert Request und Stages als OpenTelemetry Spans (nutzt den global konfigurierten TracerProvider)"""
+
+    def __init__(self):
+        from opentelemetry import trace
+
+        self._trace = trace
+        self._tracer = trace.get_tracer("sellcruiting.webhook")
+
+    def __call__(self, record: dict) -> None:
+        start_ns = int(record["started_at"] * 1e9)
+        end_ns = start_ns + int(record["total_ms"] * 1e6)
+
+        root = self._tracer.start_span(record["name"], start_time=start_ns,
+                                       attributes={"request_id": record["request_id"], **record["attributes"]})
+        context = self._trace.set_span_in_context(root)
+        for span in record["spans"]:
+            span_start = start_ns + int(span["offset_ms"] * 1e6)
+            child = self._tracer.start_span(span["name"], context=context, start_time=span_start,
+                                            attributes=span.get("attributes") or {})
+            child.end(end_time=span_start + int(span["duration_ms"] * 1e6))
+        root.end(end_time=end_ns)
+
+
+def configure_sinks(names: str = None) -> None:
+    """
+    Registriert die Sinks aus Config.TIMING_SINKS (kommasepariert: log, events, file, otel)
+
+    Args:
+        names: Überschreibt Config.TIMING_SINKS
+    """
+    names = Config.TIMING_SINKS if names is None else names
+    clear_sinks()
+
+    for name in filter(None, (part.strip().lower() for part in names.split(","))):
+        if name == "log":
+            add_sink(log_sink)
+        elif name == "events":
+            # Lazy Import: structured_logging importiert timing
+            import structured_logging
+            add_sink(structured_logging.stage_sink)
+        elif name == "file":
+            add_sink(JsonlFileSink(Config.TIMING_FILE_PATH))
+        elif name == "otel":
+            try:
+                add_sink(OpenTelemetrySink())
+            except ImportError:
+                logger.warning("⚠️ TIMING_SINKS=otel, aber opentelemetry-api ist nicht installiert - Sink übersprungen")
+        else:
+            logger.warning(f"⚠️ Unbekannter Timing-Sink: {name}")
+
+
+configure_sinks()
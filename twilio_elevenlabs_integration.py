@@ -4,14 +4,20 @@ Nutzt Twilio REST API für Outbound Calls + ElevenLabs WebSocket
 """
 import os
 from twilio.rest import Client
-from twilio.twiml.voice_response import VoiceResponse, Start
+from twilio.twiml.voice_response import VoiceResponse, Start, Connect
 from config import Config
+from session_store import SessionStore, create_session_store
 
 class TwilioElevenLabsIntegration:
     """Handler für Twilio + ElevenLabs Calls mit Prompt Override"""
     
-    def __init__(self):
-        """Initialisiere Twilio Client"""
+    def __init__(self, sessions: SessionStore = None):
+        """
+        Initialisiere Twilio Client
+        
+        Args:
+            sessions: Session-Store für Prompt/First Message (Default: Config.SESSION_STORE_BACKEND)
+        """
         self.account_sid = os.getenv('TWILIO_ACCOUNT_SID')
         self.auth_token = os.getenv('TWILIO_AUTH_TOKEN')
         self.twilio_number = os.getenv('TWILIO_PHONE_NUMBER')
@@ -20,6 +26,9 @@ class TwilioElevenLabsIntegration:
             raise ValueError("Twilio credentials missing in .env!")
         
         self.client = Client(self.account_sid, self.auth_token)
+        
+        # Prozessübergreifend: der TwiML-Callback kann in einem anderen Worker ankommen
+        self.sessions = sessions or create_session_store()
     
     def initiate_call_with_elevenlabs(
         self, 
@@ -45,25 +54,12 @@ class TwilioElevenLabsIntegration:
         # Diese URL wird von Twilio aufgerufen, wenn der Call verbunden wird
         twiml_url = f"{webhook_base_url}/webhook/twilio-connect"
         
-        # WICHTIG: Wir müssen Prompt + First Message irgendwo speichern
-        # für den TwiML Callback. Optionen:
-        # 1. In einer Session/Database (empfohlen für Produktion)
-        # 2. Als URL-Parameter (zu lang!)
-        # 3. In einem temporären Cache (Redis, Memcached)
-        
-        # Für jetzt: Erstelle den Call und übergebe eine Session-ID
-        import uuid
-        session_id = str(uuid.uuid4())
-        
-        # Speichere Session-Daten (in Produktion: Redis/Database)
-        # Für Demo: In-Memory Dict (nur für Tests!)
-        if not hasattr(self, '_sessions'):
-            self._sessions = {}
-        
-        self._sessions[session_id] = {
+        # Prompt + First Message für den TwiML Callback speichern (zu lang für URL-Parameter)
+        # Session läuft nach SESSION_TTL_SECONDS ab
+        session_id = self.sessions.create({
             'enhanced_prompt': enhanced_prompt,
             'first_message': first_message
-        }
+        })
         
         # Starte Twilio Call
         call = self.client.calls.create(
@@ -99,14 +95,19 @@ class TwilioElevenLabsIntegration:
             str: TwiML XML
         """
         
-        # Hole Session-Daten
-        session_data = self._sessions.get(session_id, {})
-        enhanced_prompt = session_data.get('enhanced_prompt', '')
-        first_message = session_data.get('first_message', '')
-        
         # Erstelle TwiML Response
         response = VoiceResponse()
         
+        # Mit Media-Proxy (media_proxy.py): bidirektionaler Stream, der Proxy schickt
+        # Prompt + First Message als conversation_config_override an ElevenLabs
+        if Config.MEDIA_PROXY_URL:
+            connect = Connect()
+            stream = connect.stream(url=Config.MEDIA_PROXY_URL)
+            stream.parameter(name='session_id', value=session_id)
+            stream.parameter(name='agent_id', value=agent_id)
+            response.append(connect)
+            return str(response)
+        
         # WICHTIG: Twilio <Stream> Element für WebSocket-Verbindung
         # Verbindet Twilio Audio zu ElevenLabs WebSocket
         start = Start()
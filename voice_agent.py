@@ -7,6 +7,7 @@ import requests
 from elevenlabs import ElevenLabs, VoiceSettings
 from elevenlabs.environment import ElevenLabsEnvironment
 from config import Config
+import http_pool
 from colorama import init, Fore, Style
 
 # Initialisiere colorama für farbige Terminal-Ausgabe
@@ -29,7 +30,8 @@ class VoiceAgent:
         # Initialisiere ElevenLabs Client mit EU Environment
         self.client = ElevenLabs(
             api_key=Config.ELEVENLABS_API_KEY,
-            environment=ElevenLabsEnvironment.PRODUCTION_EU
+            environment=ElevenLabsEnvironment.PRODUCTION_EU,
+            httpx_client=http_pool.create_httpx_client("elevenlabs", timeout=240, follow_redirects=True)
         )
         self.conversation = None
         
@@ -63,7 +65,7 @@ class VoiceAgent:
         }
         
         try:
-            response = requests.post(Config.CURSOR_API_URL, headers=headers, json=data)
+            response = http_pool.get_session("cursor").post(Config.CURSOR_API_URL, headers=headers, json=data)
             response.raise_for_status()
             return response.json()["choices"][0]["message"]["content"]
         except requests.exceptions.RequestException as e:
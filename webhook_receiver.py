@@ -3,25 +3,44 @@ Webhook Receiver für HOC → ElevenLabs Outbound Calls
 Empfängt Call-Trigger von HOC und startet personalisierten Agent-Call
 Nutzt campaign_id um Questionnaire/Kontext aus HOC zu laden
 """
+import os
 import sys
 import io
 import json
-from urllib.parse import urlencode
-from flask import Flask, request, jsonify
+from urllib.parse import urlencode, urlparse
+from flask import Flask, Response, request, jsonify, make_response, stream_with_context
 from elevenlabs import ElevenLabs
 from config import Config
+from cache import TTLCache, SingleFlight
+from job_store import JobStore
+from call_registry import CallRegistry
+from call_events import FINAL_STATUSES, CallEventStore
+from campaign_generations import CampaignGenerations
+import llm_cache
+from job_titles import make_gender_neutral_job_title
+from questionnaire_index import get_questionnaire_index
+import prompt_templates
+import json_recovery
+from rate_limit import ActiveCallLimiter, Governor, GovernorTimeout
+import timing
+import metrics
+import structured_logging
 import requests
 from datetime import datetime
 import logging
-from openai import OpenAI
-
-# Setup Logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from openai import OpenAI, DefaultHttpxClient
+from twilio.request_validator import RequestValidator
+import http_pool
+
+# Setup Logging (LOG_MODE: structured JSON-Events oder verbose Text-Logs, Ausgabe über Queue-Thread)
+structured_logging.configure_logging()
 logger = logging.getLogger(__name__)
 
+# Ohne Auth Token würde jeder Twilio Status Callback mit 403 abgelehnt: Start abbrechen statt Events still zu verlieren
+Config.validate_twilio_signature()
+
 # Fix Windows Encoding
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
@@ -30,119 +49,306 @@ app = Flask(__name__)
 # ElevenLabs Client mit EU Base URL (für Twilio Outbound Calls)
 client = ElevenLabs(
     api_key=Config.ELEVENLABS_API_KEY,
-    base_url="https://api.eu.residency.elevenlabs.io"
+    base_url=Config.ELEVENLABS_BASE_URL,
+    httpx_client=http_pool.create_httpx_client("elevenlabs", timeout=240, follow_redirects=True)
 )
 
 # OpenAI Client konfigurieren
-openai_client = OpenAI(api_key=Config.OPENAI_API_KEY)
+openai_client = OpenAI(
+    api_key=Config.OPENAI_API_KEY,
+    http_client=http_pool.create_httpx_client("openai", client_class=DefaultHttpxClient)
+)
+
+# Begrenzter Thread-Pool für parallele AI-Extraktionen (geteilt über alle Requests)
+ai_extraction_executor = ThreadPoolExecutor(
+    max_workers=Config.AI_EXTRACTION_MAX_WORKERS,
+    thread_name_prefix="ai-extraction"
+)
+
+# AI-extrahierte Dynamic Variables (pro Kampagne, unabhängig vom Kandidaten)
+AI_EXTRACTED_VARIABLES = (
+    "campaignlocation_label",
+    "companypriorities",
+    "companysize",
+    "companypitch",
+    "campaignrole_title",
+)
+
+# Fallback-Werte, falls eine Extraktion fehlschlägt, leer bleibt oder die Deadline reißt
+AI_VARIABLE_FALLBACKS = {
+    "campaignlocation_label": "",
+    "companypriorities": "",
+    "companysize": "",
+    "companypitch": "",
+    "campaignrole_title": "Ihre Position",
+}
+
+# Cache für kampagnenweite AI-Variablen (hängen nur vom Questionnaire ab, nicht vom Kandidaten)
+campaign_variables_cache = TTLCache(
+    name="campaign_variables",
+    max_entries=Config.CAMPAIGN_CACHE_MAX_ENTRIES,
+    ttl_seconds=Config.CAMPAIGN_CACHE_TTL_SECONDS
+)
+
+# Persistenter Cache der LLM-Antworten (content-addressed, geteilt über Worker und Neustarts)
+llm_result_cache = llm_cache.LLMCache()
+if Config.LLM_CACHE_ENABLED:
+    # Warm-Start: zuletzt genutzte Antworten in den Speicher (neuer Worker / nach Deploy)
+    logger.info(f"🔥 LLM-Cache: {llm_result_cache.warm()} Einträge vorgeladen ({llm_result_cache.path})")
+
+# Prompt-Versionen (Teil des LLM-Cache-Keys) - bei jeder Änderung am jeweiligen Prompt erhöhen!
+AI_EXTRACTION_PROMPT_VERSION = "extract-1"  # build_extraction_request
+AI_ALL_VARIABLES_PROMPT_VERSION = "all-1"  # build_all_variables_request + AI_VARIABLES_JSON_SCHEMA
+AI_LEGACY_PROMPT_VERSION = "legacy-1"  # extract_variable_with_ai
+AI_ALL_VARIABLES_CACHE_NAME = "*"
+
+# Lokaler Questionnaire-Cache: Einträge leben TTL + Stale-Fenster, Frische wird per fetched_at geprüft
+questionnaire_cache = TTLCache(
+    name="questionnaires",
+    max_entries=Config.QUESTIONNAIRE_CACHE_MAX_ENTRIES,
+    ttl_seconds=Config.QUESTIONNAIRE_CACHE_TTL_SECONDS + Config.QUESTIONNAIRE_CACHE_STALE_SECONDS
+)
+
+# Bündelt gleichzeitige HOC-Abrufe pro Kampagne zu einem Request
+questionnaire_fetches = SingleFlight()
+questionnaire_revalidation_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="questionnaire-revalidation")
+
+# Invalidierungszähler pro Kampagne: macht Questionnaire-/Campaign-Cache in allen Workern ungültig
+campaign_generations = CampaignGenerations()
+
+# Asynchroner Call-Dispatch: Worker-Pool + prozessübergreifender Job-Status
+call_dispatch_executor = ThreadPoolExecutor(
+    max_workers=Config.ASYNC_DISPATCH_WORKERS,
+    thread_name_prefix="call-dispatch"
+)
+job_store = JobStore()
+# Jobs von Workern, die vor Abschluss beendet wurden (Neustart, Deploy), bekommen einen Endstatus
+_orphaned_jobs = job_store.fail_orphaned()
+if _orphaned_jobs:
+    logger.warning(f"⚠️ {_orphaned_jobs} verwaiste Jobs (Worker beendet) als fehlgeschlagen markiert")
+
+# Nummer/Call-SID/Conversation-ID → Kandidat (befüllt beim Dial, gelesen vom Personalization Webhook)
+call_registry = CallRegistry()
+
+# Twilio Status Callbacks → Lifecycle + Rollups (gebündelt aus einem Hintergrund-Thread geschrieben)
+call_event_store = CallEventStore()
+
+# Batch-Dispatch: begrenzte Parallelität (Rate-Limit über dial_governor)
+batch_dial_executor = ThreadPoolExecutor(
+    max_workers=Config.BATCH_DIAL_CONCURRENCY,
+    thread_name_prefix="batch-dial"
+)
+
+# Pre-Warming von Kampagnen (Questionnaire + AI-Variablen vor dem ersten Call)
+prewarm_executor = ThreadPoolExecutor(
+    max_workers=Config.PREWARM_CONCURRENCY,
+    thread_name_prefix="campaign-prewarm"
+)
+
+# Governor für ausgehende Dials: Rate über alle Worker
+dial_governor = Governor(
+    name="dial",
+    rate_per_second=Config.DIAL_RATE_PER_SECOND,
+    burst=Config.DIAL_BURST,
+    queue_timeout_seconds=Config.DIAL_QUEUE_TIMEOUT_SECONDS,
+    shared=True
+)
+
+# Gleichzeitige Dials pro agent_phone_number_id über alle Worker
+# (mit DIAL_HOLD_UNTIL_FINAL_STATUS: aktive Calls, frei beim finalen Twilio-Status)
+active_calls = ActiveCallLimiter(
+    name="active_calls",
+    limit_per_key=Config.DIAL_MAX_CONCURRENT_PER_NUMBER,
+    max_call_seconds=Config.DIAL_ACTIVE_CALL_MAX_SECONDS
+)
+
+# Governor für OpenAI-Requests (Requests pro Sekunde über alle Extraktionen und Worker)
+openai_governor = Governor(
+    name="openai",
+    rate_per_second=Config.OPENAI_REQUESTS_PER_SECOND,
+    burst=Config.OPENAI_BURST,
+    queue_timeout_seconds=Config.OPENAI_QUEUE_TIMEOUT_SECONDS,
+    shared=True
+)
+
+# Stage-Timings zusätzlich als Prometheus-Histogramm
+timing.add_sink(metrics.stage_sink)
+
+
+# =================================================================
+# Request-Metriken (Prometheus, siehe /metrics)
+# =================================================================
+
+def metrics_route_label() -> str:
+    """Route-Template als Label (z.B. /webhook/jobs/<job_id>), nicht der konkrete Pfad"""
+    return request.url_rule.rule if request.url_rule else "unmatched"
+
+
+@app.before_request
+def start_request_metrics():
+    """Startzeit und In-Flight-Gauge für den Request"""
+    request.environ['metrics.started_at'] = time.perf_counter()
+    metrics.IN_FLIGHT.labels(route=metrics_route_label()).inc()
+
 
+@app.after_request
+def record_request_metrics(response):
+    """Zählt Request und Latenz pro Route/Status"""
+    started_at = request.environ.get('metrics.started_at')
+    if started_at is not None:
+        metrics.observe_request(metrics_route_label(), request.method, response.status_code,
+                                time.perf_counter() - started_at)
+    return response
 
-def make_gender_neutral_job_title(job_title: str) -> str:
+
+@app.teardown_request
+def finish_request_metrics(exception=None):
+    """In-Flight-Gauge zurücksetzen (auch bei Exceptions)"""
+    if request.environ.pop('metrics.started_at', None) is not None:
+        metrics.IN_FLIGHT.labels(route=metrics_route_label()).dec()
+
+
+def openai_chat_completion(**kwargs):
     """
-    Konvertiert Job-Titel zu geschlechterneutralen Begriffen
+    Zentraler OpenAI Chat-Completion-Aufruf (rate-limitiert über openai_governor)
     
     Args:
-        job_title: Job-Titel mit möglicherweise geschlechtsspezifischen Endungen
+        **kwargs: Argumente für openai_client.chat.completions.create
         
     Returns:
-        Geschlechterneutraler Job-Titel
+        ChatCompletion Response
+        
+    Raises:
+        GovernorTimeout: Kein Slot innerhalb von OPENAI_QUEUE_TIMEOUT_SECONDS frei
     """
-    if not job_title:
-        return ""
+    with openai_governor.slot():
+        return openai_client.chat.completions.create(**kwargs)
+
+
+def lookup_llm_result(request_kwargs: dict, prompt_version: str, variable_name: str, questions: list) -> tuple:
+    """
+    Sucht die Modell-Antwort zu einem Extraktions-Request im persistenten LLM-Cache
+    (geteilt von der Flask- und der ASGI-Variante)
     
-    job_title = job_title.strip()
-    
-    # Mapping für geschlechtsspezifische zu neutralen Begriffen
-    gender_neutral_mapping = {
-        # Pflege
-        "pflegefachfrau/-mann": "Pflegefachkraft",
-        "pflegefachfrau/-mann": "Pflegefachkraft",
-        "pflegefachfrau": "Pflegefachkraft",
-        "pflegefachmann": "Pflegefachkraft",
-        "krankenschwester": "Pflegefachkraft",
-        "krankenpfleger": "Pflegefachkraft",
-        "krankenschwester/-pfleger": "Pflegefachkraft",
-        "krankenpfleger/in": "Pflegefachkraft",
-        "gesundheits- und krankenpfleger/in": "Pflegefachkraft",
-        "gesundheits- und krankenpfleger": "Pflegefachkraft",
-        
-        # Erziehung
-        "erzieher/in": "Erzieher",
-        "erzieher*in": "Erzieher",
-        "erzieher:in": "Erzieher",
-        "erzieherin": "Erzieher",
-        
-        # Sozialpädagogik
-        "sozialpädagoge/in": "Sozialpädagogische Fachkraft",
-        "sozialpädagogin": "Sozialpädagogische Fachkraft",
-        "sozialpädagoge": "Sozialpädagogische Fachkraft",
-        
-        # Medizinische Fachangestellte
-        "arzthelfer/in": "Medizinische Fachangestellte",
-        "arzthelferin": "Medizinische Fachangestellte",
-        "arzthelfer": "Medizinische Fachangestellte",
-        "mfa": "Medizinische Fachangestellte",
-        
-        # Leitung
-        "leitungsfachkraft": "Leitungskraft",
-        "leitungsfachfrau/-mann": "Leitungskraft",
+    Args:
+        request_kwargs: Argumente für chat.completions.create (liefert das Modell)
+        prompt_version: Version des Prompts (AI_*_PROMPT_VERSION)
+        variable_name: Name der Variable (AI_ALL_VARIABLES_CACHE_NAME für alle in einem Request)
+        questions: Liste der Fragen aus HOC
+        
+    Returns:
+        Tuple (entry, content): content ist None bei Miss, entry None bei deaktiviertem Cache
+    """
+    if not Config.LLM_CACHE_ENABLED:
+        return None, None
+    
+    entry = {
+        "model": request_kwargs["model"],
+        "prompt_version": prompt_version,
+        "variable_name": variable_name,
+        "questions_digest": llm_cache.questions_hash(questions),
     }
+    entry["cache_key"] = llm_cache.make_key(
+        entry["model"], prompt_version, variable_name, entry["questions_digest"]
+    )
+    return entry, llm_result_cache.get(entry["cache_key"])
+
+
+def store_llm_result(entry: dict, content: str) -> None:
+    """
+    Speichert eine (bereits erfolgreich verarbeitete) Modell-Antwort im LLM-Cache
     
-    # Prüfe exakte Übereinstimmungen (case-insensitive)
-    job_lower = job_title.lower()
-    for gendered, neutral in gender_neutral_mapping.items():
-        if gendered in job_lower or job_lower == gendered:
-            return neutral
+    Args:
+        entry: Eintrag aus lookup_llm_result (None = nicht cachen)
+        content: message.content der Chat-Completion
+    """
+    if entry is None or not isinstance(content, str):
+        return
+    llm_result_cache.set(response=content, **entry)
+
+
+def format_questions_for_ai(questions: list) -> str:
+    """
+    Formatiert die HOC-Fragen als Textblock für die AI-Extraktion
+    (inkl. Preamble und Options für bessere Extraktion)
+    
+    Args:
+        questions: Liste der Fragen aus HOC
+        
+    Returns:
+        Fragen als formatierter Text
+    """
+    return "\n".join([
+        f"- Frage: {q.get('question', '')}\n"
+        f"  Preamble: {q.get('preamble', 'N/A')}\n"
+        f"  Options: {q.get('options', 'N/A')}\n"
+        f"  Priority: {q.get('priority', 'N/A')}, Group: {q.get('group', 'N/A')}, Category: {q.get('category', 'N/A')}, Context: {q.get('context', 'N/A')}"
+        for q in questions
+    ])
+
+
+# Antworten, die das Modell für "nichts gefunden" liefert
+AI_EMPTY_ANSWERS = {'', 'nicht vorhanden', 'keine angabe', 'n/a', 'null', 'none'}
+
+# Maximale plausible Länge pro Variable (längere Werte gelten als ungültig)
+AI_VARIABLE_MAX_LENGTHS = {
+    "campaignlocation_label": 120,
+    "companypriorities": 400,
+    "companysize": 80,
+    "companypitch": 600,
+    "campaignrole_title": 100,
+}
+
+
+def clean_ai_value(variable_name: str, value) -> str:
+    """
+    Validiert und bereinigt einen AI-extrahierten Wert für eine Dynamic Variable
     
-    # Entferne geschlechtsspezifische Endungen mit Regex
-    import re
+    Args:
+        variable_name: Name der Variable
+        value: Roher Wert aus der AI-Antwort
+        
+    Returns:
+        Bereinigter Wert oder "" falls ungültig
+    """
+    if not isinstance(value, str):
+        return ""
     
-    # Entferne -frau/-mann, -frau/-mann, /in, *in, :in
-    result = re.sub(r'[-/]\s*(frau|mann|in)', '', job_title, flags=re.IGNORECASE)
-    result = re.sub(r'[*:]\s*in', '', result, flags=re.IGNORECASE)
-    result = re.sub(r'\(frau/-mann\)', '', result, flags=re.IGNORECASE)
-    result = re.sub(r'\(-frau/-mann\)', '', result, flags=re.IGNORECASE)
+    # Entferne Whitespace und Anführungszeichen falls vorhanden
+    result = value.strip().strip('"').strip("'").strip()
     
-    # Entferne geschlechtsspezifische Endungen am Ende
-    result = re.sub(r'frau$', '', result, flags=re.IGNORECASE)
-    result = re.sub(r'mann$', '', result, flags=re.IGNORECASE)
-    result = re.sub(r'in$', '', result, flags=re.IGNORECASE)
+    if result.lower() in AI_EMPTY_ANSWERS:
+        return ""
     
-    # Bereinige doppelte Leerzeichen und Bindestriche
-    result = re.sub(r'\s+', ' ', result)
-    result = re.sub(r'-\s*-', '-', result)
-    result = result.strip(' -')
+    max_length = AI_VARIABLE_MAX_LENGTHS.get(variable_name)
+    if max_length and len(result) > max_length:
+        logger.warning(f"⚠️ AI-Wert für {variable_name} zu lang ({len(result)} Zeichen) - verworfen")
+        return ""
     
-    # Falls leer geworden, verwende Fallback
-    if not result:
-        return "Fachkraft"
+    # Spezielle Nachbearbeitung für campaignrole_title: Geschlechterneutral machen
+    if variable_name == "campaignrole_title" and result:
+        original = result
+        result = make_gender_neutral_job_title(result)
+        if original != result and structured_logging.verbose:
+            logger.info(f"🔄 Geschlechterneutralisierung: '{original}' → '{result}'")
     
     return result
 
 
-def extract_with_ai(questions: list, variable_name: str) -> str:
+def build_extraction_request(questions: list, variable_name: str) -> dict:
     """
-    Nutzt OpenAI GPT-4o-mini, um eine Dynamic Variable aus Fragen zu extrahieren
+    Baut den OpenAI Chat-Completion-Request für die Extraktion einer Dynamic Variable
+    (geteilt von der Flask- und der ASGI-Variante)
     
     Args:
         questions: Liste der Fragen aus HOC
         variable_name: Name der zu extrahierenden Variable
         
     Returns:
-        Extrahierter Wert als String oder ""
+        Argumente für chat.completions.create oder None, falls kein Prompt definiert ist
     """
-    
-    if not questions or not Config.OPENAI_API_KEY:
-        return ""
-    
     # Formatiere Fragen für AI (inkl. Preamble und Options für bessere Extraktion)
-    questions_text = "\n".join([
-        f"- Frage: {q.get('question', '')}\n"
-        f"  Preamble: {q.get('preamble', 'N/A')}\n"
-        f"  Options: {q.get('options', 'N/A')}\n"
-        f"  Priority: {q.get('priority', 'N/A')}, Group: {q.get('group', 'N/A')}, Category: {q.get('category', 'N/A')}, Context: {q.get('context', 'N/A')}"
-        for q in questions
-    ])
+    questions_text = format_questions_for_ai(questions)
     
     # Prompts pro Variable
     prompts = {
@@ -243,1137 +449,2221 @@ Beispiele:
     
     prompt = prompts.get(variable_name, "")
     if not prompt:
+        return None
+    
+    return {
+        "model": "gpt-4o-mini",
+        "messages": [
+            {
+                "role": "system",
+                "content": "Du bist ein Experte für Recruiting-Datenextraktion. Antworte präzise, kurz und direkt. Keine Erklärungen, nur das Ergebnis."
+            },
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.1,
+        "max_tokens": 150,
+        "timeout": 10
+    }
+
+
+def extract_with_ai(questions: list, variable_name: str, raise_errors: bool = False) -> str:
+    """
+    Nutzt OpenAI GPT-4o-mini, um eine Dynamic Variable aus Fragen zu extrahieren
+    
+    Args:
+        questions: Liste der Fragen aus HOC
+        variable_name: Name der zu extrahierenden Variable
+        raise_errors: API-Fehler weiterwerfen statt "" zurückzugeben
+        
+    Returns:
+        Extrahierter Wert als String oder ""
+    """
+    
+    if not questions or not Config.OPENAI_API_KEY:
+        return ""
+    
+    request_kwargs = build_extraction_request(questions, variable_name)
+    if request_kwargs is None:
         return ""
     
     try:
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "Du bist ein Experte für Recruiting-Datenextraktion. Antworte präzise, kurz und direkt. Keine Erklärungen, nur das Ergebnis."
-                },
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.1,
-            max_tokens=150,
-            timeout=10
-        )
+        with timing.stage(f"ai_{variable_name}"):
+            cache_entry, content = lookup_llm_result(request_kwargs, AI_EXTRACTION_PROMPT_VERSION, variable_name, questions)
+            if content is None:
+                content = openai_chat_completion(**request_kwargs).choices[0].message.content
+                store_llm_result(cache_entry, content)
         
-        result = response.choices[0].message.content.strip()
+        result = clean_ai_value(variable_name, content)
         
-        # Entferne Anführungszeichen falls vorhanden
-        result = result.strip('"').strip("'")
-        
-        # Spezielle Nachbearbeitung für campaignrole_title: Geschlechterneutral machen
-        if variable_name == "campaignrole_title" and result:
-            original = result
-            result = make_gender_neutral_job_title(result)
-            if original != result:
-                logger.info(f"🔄 Geschlechterneutralisierung: '{original}' → '{result}'")
-        
-        logger.info(f"✅ AI-Extraktion für {variable_name}: {result[:50]}...")
+        if structured_logging.verbose:
+            logger.info(f"✅ AI-Extraktion für {variable_name}: {result[:50]}...")
         return result
         
     except Exception as e:
+        if raise_errors:
+            raise
         logger.warning(f"⚠️ AI-Extraktion für {variable_name} fehlgeschlagen: {e}")
         return ""
 
 
-def require_api_key(f):
-    """
-    Decorator für API Key Authentifizierung
-    Prüft Authorization Header: Bearer {API_KEY}
+def extract_variables_concurrently(questions: list, variable_names: tuple = AI_EXTRACTED_VARIABLES,
+                                   deadline_seconds: float = None, failed: set = None) -> dict:
     """
-    from functools import wraps
+    Extrahiert mehrere Dynamic Variables parallel über den AI-Thread-Pool
     
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        # Prüfe ob API Key konfiguriert ist
-        if not Config.WEBHOOK_API_KEY:
-            logger.warning("⚠️  WEBHOOK_API_KEY nicht gesetzt - Authentifizierung deaktiviert")
-            return f(*args, **kwargs)
-        
-        # Hole Authorization Header
-        auth_header = request.headers.get('Authorization', '')
-        
-        if not auth_header:
-            logger.warning("❌ Fehlender Authorization Header")
-            return jsonify({
-                "status": "error",
-                "error": "Missing Authorization header",
-                "message": "Please provide Authorization: Bearer {API_KEY}"
-            }), 401
-        
-        # Prüfe Format: Bearer {key}
-        if not auth_header.startswith('Bearer '):
-            logger.warning("❌ Ungültiges Authorization Format")
-            return jsonify({
-                "status": "error",
-                "error": "Invalid Authorization format",
-                "message": "Use format: Authorization: Bearer {API_KEY}"
-            }), 401
-        
-        # Extrahiere API Key
-        provided_key = auth_header.replace('Bearer ', '').strip()
-        
-        # Vergleiche mit konfiguriertem Key
-        if provided_key != Config.WEBHOOK_API_KEY:
-            logger.warning(f"❌ Ungültiger API Key (von {request.remote_addr})")
-            return jsonify({
-                "status": "error",
-                "error": "Invalid API key",
-                "message": "The provided API key is invalid"
-            }), 401
+    Die Deadline gilt pro Extraktion ab deren Start im Pool: Wartezeit auf einen freien
+    Thread (Pool durch andere Requests belegt) zählt nicht mit. Extraktionen, die nach
+    Config.AI_EXTRACTION_QUEUE_TIMEOUT_SECONDS noch nicht gestartet sind, werden abgebrochen.
+    Für nicht fertige oder fehlgeschlagene Variablen wird der Fallback-Wert verwendet
+    (gezählt in metrics.AI_EXTRACTION_FALLBACKS nach Grund: queue, deadline, error).
+    
+    Args:
+        questions: Liste der Fragen aus HOC
+        variable_names: Namen der zu extrahierenden Variablen
+        deadline_seconds: Deadline pro Extraktion in Sekunden (Default: Config.AI_EXTRACTION_DEADLINE_SECONDS)
+        failed: Optionales Set, in das die Namen fehlgeschlagener Variablen eingetragen werden
         
-        # API Key ist gültig
-        logger.info(f"✅ API Key validiert (von {request.remote_addr})")
-        return f(*args, **kwargs)
+    Returns:
+        Dict {variable_name: Wert} für alle angefragten Variablen
+    """
+    if deadline_seconds is None:
+        deadline_seconds = Config.AI_EXTRACTION_DEADLINE_SECONDS
+    if failed is None:
+        failed = set()
+    queue_timeout = Config.AI_EXTRACTION_QUEUE_TIMEOUT_SECONDS
+    
+    # Startzeitpunkt pro Variable (gesetzt im Pool-Thread, sobald die Extraktion läuft)
+    started_at = {}
+    
+    def run(name: str) -> str:
+        started_at[name] = time.monotonic()
+        return extract_with_ai(questions, name, True)
+    
+    submitted_at = time.monotonic()
+    futures = {
+        timing.submit_with_context(ai_extraction_executor, run, name): name
+        for name in variable_names
+    }
     
-    return decorated_function
+    # future → Grund ("queue": nie gestartet, "deadline": zu lange gelaufen)
+    expired = {}
+    pending = set(futures)
+    while pending:
+        now = time.monotonic()
+        next_expiry = None
+        for future in list(pending):
+            name = futures[future]
+            if name in started_at:
+                expiry, reason = started_at[name] + deadline_seconds, "deadline"
+            else:
+                expiry, reason = submitted_at + queue_timeout, "queue"
+            # cancel() schlägt fehl, wenn die Extraktion gerade erst gestartet ist - dann gilt ihre Deadline
+            if now >= expiry and (reason == "deadline" or future.cancel()):
+                expired[future] = reason
+                pending.discard(future)
+            else:
+                next_expiry = expiry if next_expiry is None else min(next_expiry, expiry)
+        if pending:
+            _, pending = wait(pending, timeout=max(next_expiry - now, 0.01), return_when=FIRST_COMPLETED)
+    
+    results = {}
+    for future, name in futures.items():
+        fallback = AI_VARIABLE_FALLBACKS.get(name, "")
+        reason = expired.get(future)
+        
+        if reason == "queue":
+            logger.warning(f"🚦 AI-Extraktion für {name} nach {queue_timeout}s Wartezeit nicht gestartet "
+                           f"(AI-Pool mit {Config.AI_EXTRACTION_MAX_WORKERS} Threads ausgelastet) - nutze Fallback")
+        elif reason == "deadline":
+            logger.warning(f"⏱️ AI-Extraktion für {name} hat Deadline ({deadline_seconds}s) überschritten - nutze Fallback")
+        else:
+            try:
+                results[name] = future.result() or fallback
+                continue
+            except Exception as e:
+                logger.warning(f"⚠️ AI-Extraktion für {name} fehlgeschlagen: {e} - nutze Fallback")
+                reason = "error"
+        
+        metrics.record_ai_fallback(reason)
+        results[name] = fallback
+        failed.add(name)
+    
+    return results
+
+
+# JSON-Schema für die Structured-Output-Extraktion aller Variablen in einem Request
+AI_VARIABLES_JSON_SCHEMA = {
+    "name": "dynamic_variables",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "campaignlocation_label": {
+                "type": "string",
+                "description": "Arbeitsort: NUR Stadt oder Stadtteil, keine Straße/Hausnummer. Leer falls unbekannt."
+            },
+            "companypriorities": {
+                "type": "string",
+                "description": "TOP 3-4 Muss-Kriterien/Prioritäten als kommaseparierte Liste. Leer falls unklar."
+            },
+            "companysize": {
+                "type": "string",
+                "description": "Unternehmensgröße im Format 'ca. X Mitarbeitende'. Leer falls nicht angegeben."
+            },
+            "companypitch": {
+                "type": "string",
+                "description": "Kurzer professioneller Company Pitch (1-2 Sätze). Leer bei zu wenig Information."
+            },
+            "campaignrole_title": {
+                "type": "string",
+                "description": "Geschlechterneutrale Berufsbezeichnung ohne Artikel. 'Fachkraft' falls nicht erkennbar."
+            },
+        },
+        "required": list(AI_EXTRACTED_VARIABLES),
+        "additionalProperties": False,
+    },
+}
 
 
-def parse_json_response(response_text: str) -> dict:
+def build_all_variables_request(questions: list) -> dict:
     """
-    Transformiert und validiert JSON-Response von HOC API
-    
-    Handhabt verschiedene Response-Formate:
-    - Reines JSON
-    - JSON in HTML eingebettet
-    - Text mit JSON-Inhalt
+    Baut den Structured-Output-Request (JSON-Schema) für alle AI-Variablen
     
     Args:
-        response_text: Roher Response-Text von HOC API
+        questions: Liste der Fragen aus HOC
         
     Returns:
-        Parsed JSON als dict oder leeres dict bei Fehler
+        Argumente für chat.completions.create
     """
-    import re
-    
-    if not response_text or not response_text.strip():
-        logger.warning("⚠️  Leere Response von HOC API")
-        return {}
+    questions_text = format_questions_for_ai(questions)
     
-    # Versuche direktes JSON-Parsing
-    try:
-        return json.loads(response_text)
-    except json.JSONDecodeError:
-        pass
-    
-    # Versuche JSON aus HTML zu extrahieren
-    # Suche nach <script> Tags mit JSON
-    script_pattern = r'<script[^>]*>.*?(\{.*?\}).*?</script>'
-    matches = re.findall(script_pattern, response_text, re.DOTALL | re.IGNORECASE)
-    for match in matches:
-        try:
-            return json.loads(match)
-        except json.JSONDecodeError:
-            continue
+    prompt = f"""
+Analysiere diese Recruiting-Fragen und extrahiere alle Felder des JSON-Schemas:
+
+{questions_text}
+
+WICHTIG:
+- Prüfe sowohl die FRAGE als auch das PREAMBLE und die OPTIONS
+- campaignlocation_label: NUR Stadt oder Stadtteil (z.B. "Berlin", "München-Schwabing"), NICHT die komplette Adresse; bei mehreren Standorten den Hauptstandort
+- companypriorities: Fokus auf Priority=1 / "Muss-Kriterium", Arbeitszeitmodelle und zentrale fachliche Anforderungen (z.B. "Deutschkenntnisse B2, mehrjährige Berufserfahrung, Vollzeit 39h")
+- companysize: Format "ca. X Mitarbeitende" oder "X Mitarbeiter"
+- companypitch: basierend auf Branche, Besonderheiten und Benefits
+- campaignrole_title: IMMER geschlechterneutral, KEINE Artikel, KEINE Endungen -frau/-mann/-in (z.B. "Pflegefachfrau/-mann" → "Pflegefachkraft", "Erzieher/in" → "Erzieher"); bei mehreren Berufen den Hauptberuf
+- Falls ein Feld nicht erkennbar ist: leerer String (campaignrole_title: "Fachkraft")
+"""
     
-    # Entferne HTML-Tags und versuche erneut
-    cleaned = re.sub(r'<[^>]+>', '', response_text)
-    cleaned = cleaned.strip()
+    return {
+        "model": "gpt-4o-mini",
+        "messages": [
+            {
+                "role": "system",
+                "content": "Du bist ein Experte für Recruiting-Datenextraktion. Antworte präzise, kurz und direkt. Keine Erklärungen, nur das Ergebnis."
+            },
+            {"role": "user", "content": prompt}
+        ],
+        "response_format": {"type": "json_schema", "json_schema": AI_VARIABLES_JSON_SCHEMA},
+        "temperature": 0.1,
+        "max_tokens": 600,
+        "timeout": Config.AI_EXTRACTION_DEADLINE_SECONDS
+    }
+
+
+def parse_all_variables_response(content: str) -> dict:
+    """
+    Parst und validiert die Structured-Output-Antwort (jedes Feld einzeln)
     
-    # Suche nach JSON-Objekt im Text
-    json_pattern = r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}'
-    json_matches = re.findall(json_pattern, cleaned, re.DOTALL)
+    Args:
+        content: message.content der Chat-Completion
+        
+    Returns:
+        Dict {variable_name: Wert} für alle AI_EXTRACTED_VARIABLES
+        
+    Raises:
+        ValueError: Antwort ist kein gültiges JSON-Objekt
+    """
+    raw = json.loads(content)
+    if not isinstance(raw, dict):
+        raise ValueError(f"Antwort ist kein JSON-Objekt: {type(raw).__name__}")
     
-    for json_str in json_matches:
-        try:
-            parsed = json.loads(json_str)
-            if isinstance(parsed, dict) and 'questions' in parsed:
-                logger.info("✅ JSON aus bereinigter Response extrahiert")
-                return parsed
-        except json.JSONDecodeError:
-            continue
+    # Validiere jedes Feld einzeln
+    results = {}
+    for name in AI_EXTRACTED_VARIABLES:
+        value = clean_ai_value(name, raw.get(name))
+        results[name] = value or AI_VARIABLE_FALLBACKS.get(name, "")
+        if structured_logging.verbose:
+            logger.info(f"✅ AI-Extraktion für {name}: {results[name][:50]}...")
     
-    logger.error(f"❌ Konnte kein gültiges JSON aus Response extrahieren")
-    logger.debug(f"Response Preview: {response_text[:200]}...")
-    return {}
+    return results
 
 
-def fetch_questionnaire_context(campaign_id: int) -> dict:
+def extract_all_with_ai(questions: list, failed: set = None) -> dict:
     """
-    Holt Questionnaire/Kontextdatei aus HOC basierend auf Campaign-ID
+    Extrahiert ALLE AI-Variablen mit EINEM Structured-Output-Request (JSON-Schema)
     
-    Mit robuster JSON-Transformation und Validierung
+    Der Fragen-Block wird nur einmal an das Modell gesendet. Jedes Feld wird einzeln
+    validiert; schlägt der Request komplett fehl, wird auf die parallele
+    Einzel-Extraktion zurückgefallen.
     
     Args:
-        campaign_id: Campaign ID für den Fragebogen
+        questions: Liste der Fragen aus HOC
+        failed: Optionales Set, in das die Namen fehlgeschlagener Variablen eingetragen werden
         
     Returns:
-        dict mit Questionnaire-Daten und Kontext
+        Dict {variable_name: Wert} für alle AI_EXTRACTED_VARIABLES
     """
+    if not questions or not Config.OPENAI_API_KEY:
+        return dict(AI_VARIABLE_FALLBACKS)
+    
     try:
-        # ✅ NEU: Prüfe ob API Key gesetzt ist
-        if not Config.HIRINGS_API_TOKEN:
-            logger.error(f"❌ HIRINGS_API_TOKEN ist nicht gesetzt!")
-            logger.error(f"   → Bitte setze HIRINGS_API_TOKEN in der .env Datei")
-            return {}
-        
-        if not Config.HIRINGS_API_URL:
-            logger.error(f"❌ HIRINGS_API_URL ist nicht gesetzt!")
-            logger.error(f"   → Bitte setze HIRINGS_API_URL in der .env Datei")
-            return {}
-        
-        headers = {
-            "Authorization": Config.HIRINGS_API_TOKEN,  # ⚠️ OHNE "Bearer" - HOC API benötigt direkten Token!
-            "Content-Type": "application/json"
-        }
+        if structured_logging.verbose:
+            logger.info(f"🤖 Starte Structured-Output-Extraktion für {len(AI_EXTRACTED_VARIABLES)} Variablen")
         
-        # HIRINGS API Endpunkt: questionnaire/<campaign_id>
-        # HIRINGS_API_URL enthält bereits /api/v1
-        url = f"{Config.HIRINGS_API_URL}/questionnaire/{campaign_id}"
-        
-        logger.info(f"📥 Lade Questionnaire von HOC: {url}")
-        logger.info(f"   API Token vorhanden: {'Ja' if Config.HIRINGS_API_TOKEN else 'Nein'} ({len(Config.HIRINGS_API_TOKEN) if Config.HIRINGS_API_TOKEN else 0} Zeichen)")
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        
-        # ✅ NEU: Prüfe Status Code vor raise_for_status
-        if response.status_code == 401:
-            logger.error(f"❌ UNAUTHORIZED (401) - API Key ist falsch oder ungültig!")
-            logger.error(f"   → Prüfe deinen HIRINGS_API_TOKEN in der .env Datei")
-            logger.error(f"   → Response: {response.text[:200]}")
-            return {}
-        elif response.status_code == 403:
-            logger.error(f"❌ FORBIDDEN (403) - API Key hat keine Berechtigung für diese Kampagne!")
-            logger.error(f"   → Response: {response.text[:200]}")
-            return {}
-        elif response.status_code == 404:
-            logger.warning(f"⚠️  NOT FOUND (404) - Kampagne {campaign_id} existiert nicht in HOC!")
-            logger.warning(f"   → Response: {response.text[:200]}")
-            return {}
-        
-        response.raise_for_status()
-        
-        # ✅ NEU: Prüfe Content-Type
-        content_type = response.headers.get('Content-Type', '')
-        logger.info(f"📋 Content-Type: {content_type}")
-        
-        # ✅ NEU: Verwende JSON-Transformator
-        questionnaire = parse_json_response(response.text)
-        
-        # ✅ NEU: Validierung der Struktur
-        if not isinstance(questionnaire, dict):
-            logger.error(f"❌ Questionnaire ist kein Dict! Type: {type(questionnaire)}")
-            logger.error(f"   Response Preview: {response.text[:200]}...")
-            return {}
-        
-        # ✅ NEU: Prüfe ob questions vorhanden
-        questions = questionnaire.get('questions', [])
-        if not questions:
-            logger.warning(f"⚠️  Campaign {campaign_id}: 'questions' Array ist leer oder fehlt!")
-            logger.warning(f"   Verfügbare Keys: {list(questionnaire.keys())}")
-            logger.warning(f"   Content-Type war: {content_type}")
-        else:
-            logger.info(f"✅ Questionnaire erfolgreich geladen für Campaign: {campaign_id}")
-            logger.info(f"   📊 {len(questions)} Fragen gefunden")
-            
-            # Zeige Priority-Verteilung
-            priority_1 = len([q for q in questions if q.get('priority') == 1])
-            priority_2 = len([q for q in questions if q.get('priority') == 2])
-            logger.info(f"   📋 Priority 1: {priority_1}, Priority 2: {priority_2}")
+        request_kwargs = build_all_variables_request(questions)
+        with timing.stage("ai_all"):
+            cache_entry, content = lookup_llm_result(
+                request_kwargs, AI_ALL_VARIABLES_PROMPT_VERSION, AI_ALL_VARIABLES_CACHE_NAME, questions
+            )
+            if content is not None:
+                return parse_all_variables_response(content)
+            content = openai_chat_completion(**request_kwargs).choices[0].message.content
         
-        return questionnaire
+        results = parse_all_variables_response(content)
+        # Erst nach erfolgreichem Parsen cachen (ungültige Antworten nicht wiederverwenden)
+        store_llm_result(cache_entry, content)
+        return results
         
-    except requests.exceptions.HTTPError as e:
-        logger.error(f"❌ HTTP Fehler beim Laden des Questionnaires (Campaign {campaign_id}): {e}")
-        if e.response:
-            logger.error(f"   Status Code: {e.response.status_code}")
-            logger.error(f"   Response: {e.response.text[:200]}")
-        return {}
-    except requests.exceptions.RequestException as e:
-        logger.error(f"❌ Fehler beim Laden des Questionnaires (Campaign {campaign_id}): {e}")
-        return {}
-    except json.JSONDecodeError as e:
-        logger.error(f"❌ JSON Parse Fehler (Campaign {campaign_id}): {e}")
-        logger.error(f"   Response Preview: {response.text[:200] if 'response' in locals() else 'N/A'}...")
-        return {}
     except Exception as e:
-        logger.error(f"❌ Unerwarteter Fehler beim Laden des Questionnaires (Campaign {campaign_id}): {e}")
-        import traceback
-        logger.error(traceback.format_exc())
-        return {}
+        logger.warning(f"⚠️ Structured-Output-Extraktion fehlgeschlagen: {e} - nutze Einzel-Extraktion")
+        return extract_variables_concurrently(questions, failed=failed)
 
 
-def build_first_message(company_name: str, first_name: str, last_name: str, campaign_location: str = "") -> str:
+def extract_ai_variables(questions: list, failed: set = None) -> dict:
     """
-    Erstellt personalisierte First Message für den Agent
+    Extrahiert alle AI-basierten Dynamic Variables im konfigurierten Modus
+    (Config.AI_EXTRACTION_MODE: "single" oder "concurrent")
     
     Args:
-        company_name: Firmenname
-        first_name: Vorname Kandidat
-        last_name: Nachname Kandidat
-        campaign_location: Standort der Kampagne (optional)
+        questions: Liste der Fragen aus HOC
+        failed: Optionales Set, in das die Namen fehlgeschlagener Variablen eingetragen werden
         
     Returns:
-        Personalisierte First Message
+        Dict {variable_name: Wert} für alle AI_EXTRACTED_VARIABLES
     """
-    if campaign_location:
-        first_message = f"Guten Tag {first_name} {last_name}, hier spricht Susi von {company_name}. Es geht um ihre Bewerbung am Standort {campaign_location}. Haben Sie ungefähr 15 Minuten Zeit für dieses Gespräch um ihre Daten zu erfassen?"
-    else:
-        first_message = f"Guten Tag {first_name} {last_name}, hier spricht Susi von {company_name}. Es geht um ihre Bewerbung. Haben Sie ungefähr 15 Minuten Zeit für dieses Gespräch um ihre Daten zu erfassen?"
+    if Config.AI_EXTRACTION_MODE == "single":
+        return extract_all_with_ai(questions, failed=failed)
     
-    logger.info(f"📝 First Message erstellt: {first_message[:100]}...")
-    return first_message
+    return extract_variables_concurrently(questions, failed=failed)
 
 
-def build_enhanced_prompt(questionnaire: dict, company_name: str, first_name: str, last_name: str) -> str:
+def questionnaire_fingerprint(questionnaire: dict) -> str:
     """
-    Erstellt erweiterten System-Prompt mit Questionnaire-Kontext
-    WICHTIG: Diese Funktion wird nur für WebRTC Links verwendet, nicht für Twilio Outbound Calls!
-    Bei Twilio Outbound Calls wird der Dashboard-Prompt direkt verwendet + Dynamic Variables injiziert.
+    Berechnet einen stabilen Hash über die Fragen eines Questionnaires
+    (ändert sich, sobald HOC den Fragebogen der Kampagne anpasst)
     
     Args:
         questionnaire: Questionnaire-Daten aus HOC
-        company_name: Firmenname
-        first_name: Vorname Kandidat
-        last_name: Nachname Kandidat
         
     Returns:
-        Erweiterter System-Prompt mit vollem Kontext
+        SHA-256 Hex-Digest der Fragen
     """
+    questions = questionnaire.get('questions', []) if questionnaire else []
+    return llm_cache.questions_hash(questions)
+
+
+def extract_campaign_variables(questionnaire: dict, campaign_id: int = None) -> dict:
+    """
+    Liefert die kampagnenweiten AI-Variablen - aus dem Cache oder per AI-Extraktion
     
-    # HINWEIS: dashboard_prompt.txt wird nicht mehr verwendet
-    # Der Dashboard-Prompt wird direkt von ElevenLabs verwendet
-    # Diese Funktion wird nur für WebRTC Links benötigt (falls conversation_config_override verwendet wird)
-    
-    # Baue Questionnaire-Kontext
-    questionnaire_context = build_questionnaire_context(questionnaire, company_name, first_name, last_name)
+    Cache-Key ist (campaign_id, Hash der Fragen); Ergebnisse mit fehlgeschlagenen
+    Extraktionen werden nicht gecacht.
     
-    # Basis-Prompt (wird nur für WebRTC Links verwendet)
-    dashboard_prompt = f"""Du bist ein professioneller Recruiting-Assistent für {company_name}.
-Du führst ein Gespräch mit {first_name} {last_name}.
-
-Nutze die Informationen aus dem KONTEXT-Abschnitt unten."""
+    Args:
+        questionnaire: Questionnaire-Daten aus HOC
+        campaign_id: Campaign ID (ohne ID wird nicht gecacht)
+        
+    Returns:
+        Dict {variable_name: Wert} für alle AI_EXTRACTED_VARIABLES
+    """
+    questions = questionnaire.get('questions', []) if questionnaire else []
     
-    # FINALER PROMPT: Dashboard-Prompt + Questionnaire-Kontext
-    final_prompt = dashboard_prompt + "\n\n" + questionnaire_context
+    cache_key, cached = lookup_campaign_variables(questionnaire, campaign_id)
+    if cached is not None:
+        return cached
     
-    logger.info(f"📝 Enhanced Prompt erstellt: {len(final_prompt)} Zeichen (Basis: {len(dashboard_prompt)}, Kontext: {len(questionnaire_context)})")
+    failed = set()
+    variables = extract_ai_variables(questions, failed=failed)
+    store_campaign_variables(cache_key, variables, failed)
     
-    return final_prompt
+    return variables
 
 
-def extract_variable_with_ai(questions: list, variable_name: str) -> str:
+def lookup_campaign_variables(questionnaire: dict, campaign_id: int = None) -> tuple:
     """
-    Nutzt OpenAI GPT-4o-mini, um eine Dynamic Variable aus den Fragen zu extrahieren
+    Sucht die kampagnenweiten AI-Variablen im Campaign-Cache
     
     Args:
-        questions: Liste von Fragen aus HOC Questionnaire
-        variable_name: Name der zu extrahierenden Variable
+        questionnaire: Questionnaire-Daten aus HOC
+        campaign_id: Campaign ID (ohne ID wird nicht gecacht)
         
     Returns:
-        Extrahierter Wert als String oder "" falls nicht extrahierbar
+        Tuple (cache_key, variables): variables ist None bei Cache-Miss, cache_key None ohne campaign_id
     """
-    try:
-        # Prüfe OpenAI API Key
-        if not Config.OPENAI_API_KEY:
-            logger.warning("⚠️ OpenAI API Key nicht konfiguriert - AI-Extraktion übersprungen")
-            return ""
-        
-        # Formatiere Fragen für AI
-        questions_text = "\n".join([
-            f"- Frage: {q.get('question', '')}\n  Gruppe: {q.get('group', 'N/A')}\n  Priority: {q.get('priority', 'N/A')}\n  Context: {q.get('context', 'N/A')}"
-            for q in questions
-        ])
-        
-        # AI-Prompts pro Variable
-        prompts = {
-            "campaignlocation_label": f"""Analysiere diese Recruiting-Fragen und extrahiere den ARBEITSORT/STANDORT:
-
-{questions_text}
-
-WICHTIG: Extrahiere NUR den ORT/DIE STADT (z.B. "Berlin", "München-Schwabing", "Hamburg-Altona").
-NICHT die komplette Adresse mit Straße und Hausnummer!
-
-Beispiele:
-- "Unser Standort ist Kita Springmäuse, Stollberger Straße 25-27, 12627 Berlin" → "Berlin"
-- "Der Arbeitsort ist München-Schwabing, Leopoldstraße 123" → "München-Schwabing"
-- "Arbeiten Sie in Hamburg-Altona?" → "Hamburg-Altona"
+    if campaign_id is None:
+        return None, None
+    
+    # Generation im Key: nach einer Invalidierung (auch in einem anderen Worker) ist der alte Eintrag unerreichbar
+    cache_key = (campaign_id, questionnaire_fingerprint(questionnaire), campaign_generations.current(campaign_id))
+    cached = campaign_variables_cache.get(cache_key)
+    if cached is not None:
+        if structured_logging.verbose:
+            logger.info(f"⚡ Campaign-Cache HIT für Campaign {campaign_id} - AI-Extraktion übersprungen")
+        return cache_key, dict(cached)
+    
+    if structured_logging.verbose:
+        logger.info(f"🔄 Campaign-Cache MISS für Campaign {campaign_id}")
+    return cache_key, None
 
-Antworte NUR mit dem Ort, ohne Erklärung.
-Falls kein Standort erkennbar: Antworte mit einem leeren String.""",
-            
-            "companypriorities": f"""Analysiere diese Recruiting-Fragen und identifiziere die TOP 3-4 MUSS-KRITERIEN oder PRIORITÄTEN:
 
-{questions_text}
+def store_campaign_variables(cache_key: tuple, variables: dict, failed: set) -> None:
+    """
+    Speichert extrahierte AI-Variablen im Campaign-Cache (nur wenn keine Extraktion fehlgeschlagen ist)
+    
+    Args:
+        cache_key: Key aus lookup_campaign_variables (None = nicht cachen)
+        variables: Extrahierte Variablen
+        failed: Namen fehlgeschlagener Variablen
+    """
+    if cache_key is None:
+        return
+    
+    if failed:
+        logger.warning(f"⚠️ Nicht gecacht - fehlgeschlagene Variablen: {', '.join(sorted(failed))}")
+    else:
+        campaign_variables_cache.set(cache_key, dict(variables))
 
-Fokus auf:
-- Fragen mit Priority=1 (Muss-Kriterien)
-- Context-Felder mit "Muss-Kriterium:"
-- Qualifikationen und Abschlüsse
-- Arbeitszeitmodelle (Vollzeit/Teilzeit)
 
-Gib die Prioritäten als kommaseparierte Liste zurück (max. 4 Items).
-Format: "Kriterium 1, Kriterium 2, Kriterium 3"
+def check_api_key(auth_header: str, remote_addr: str = None) -> tuple:
+    """
+    Prüft den Authorization Header gegen WEBHOOK_API_KEY (Format: Bearer {API_KEY})
+    
+    Args:
+        auth_header: Wert des Authorization Headers
+        remote_addr: Client-Adresse (nur für Logs)
+        
+    Returns:
+        None bei Erfolg, sonst Tuple (response_body, status_code)
+    """
+    # Prüfe ob API Key konfiguriert ist
+    if not Config.WEBHOOK_API_KEY:
+        logger.warning("⚠️  WEBHOOK_API_KEY nicht gesetzt - Authentifizierung deaktiviert")
+        return None
+    
+    if not auth_header:
+        logger.warning("❌ Fehlender Authorization Header")
+        return {
+            "status": "error",
+            "error": "Missing Authorization header",
+            "message": "Please provide Authorization: Bearer {API_KEY}"
+        }, 401
+    
+    # Prüfe Format: Bearer {key}
+    if not auth_header.startswith('Bearer '):
+        logger.warning("❌ Ungültiges Authorization Format")
+        return {
+            "status": "error",
+            "error": "Invalid Authorization format",
+            "message": "Use format: Authorization: Bearer {API_KEY}"
+        }, 401
+    
+    # Extrahiere API Key
+    provided_key = auth_header.replace('Bearer ', '').strip()
+    
+    # Vergleiche mit konfiguriertem Key
+    if provided_key != Config.WEBHOOK_API_KEY:
+        logger.warning(f"❌ Ungültiger API Key (von {remote_addr})")
+        return {
+            "status": "error",
+            "error": "Invalid API key",
+            "message": "The provided API key is invalid"
+        }, 401
+    
+    # API Key ist gültig
+    if structured_logging.verbose:
+        logger.info(f"✅ API Key validiert (von {remote_addr})")
+    return None
 
-Beispiel: "Deutschkenntnisse B2, mehrjährige Berufserfahrung, staatlich anerkannter Abschluss, Vollzeit 39h"
 
-Falls keine klaren Prioritäten: Antworte mit einem leeren String.""",
-            
-            "companysize": f"""Analysiere diese Recruiting-Fragen und extrahiere die UNTERNEHMENSGRÖSSE (Mitarbeiterzahl):
+def require_api_key(f):
+    """
+    Decorator für API Key Authentifizierung
+    Prüft Authorization Header: Bearer {API_KEY}
+    """
+    from functools import wraps
+    
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        with timing.stage("auth"):
+            error = check_api_key(request.headers.get('Authorization', ''), request.remote_addr)
+        if error:
+            error_body, status_code = error
+            return jsonify(error_body), status_code
+        
+        return f(*args, **kwargs)
+    
+    return decorated_function
 
-{questions_text}
 
-Suche nach Angaben zur Mitarbeiterzahl oder Unternehmensgröße.
+def track_timing(name: str):
+    """
+    Decorator für Stage-Timing einer Route
+    Startet den Request-Timer (vor der Authentifizierung), setzt den Server-Timing
+    Header und übergibt die Stages an die Timing-Sinks
+    
+    Args:
+        name: Name des Requests in den Timing-Sinks
+    """
+    from functools import wraps
+    
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            timer = timing.start_request(name)
+            status_code = 500
+            try:
+                response = make_response(f(*args, **kwargs))
+                status_code = response.status_code
+                response.headers['Server-Timing'] = timer.server_timing_header()
+                return response
+            finally:
+                timing.finish_request(timer, status_code=status_code)
+        
+        return decorated_function
+    
+    return decorator
 
-Beispiele:
-- "Wir sind ein Unternehmen mit 120 Mitarbeitenden" → "120 Mitarbeitende"
-- "Unser Team hat ca. 50 Mitarbeiter" → "ca. 50 Mitarbeiter"
 
-Falls keine Angabe vorhanden: Antworte mit einem leeren String.""",
-            
-            "companypitch": f"""Analysiere diese Recruiting-Fragen und erstelle einen kurzen COMPANY PITCH (2-3 Sätze):
+def attach_timings(response_body: dict) -> dict:
+    """
+    Ergänzt den "data" Block einer Response um die Stage-Timings des aktuellen Requests
+    
+    Args:
+        response_body: Response-Body (wird in-place erweitert)
+        
+    Returns:
+        response_body
+    """
+    timer = timing.current_timer()
+    if timer is not None and isinstance(response_body.get('data'), dict):
+        response_body['data']['timings'] = timer.summary()
+    return response_body
 
-{questions_text}
 
-Erstelle basierend auf erkennbaren Informationen (Branche, Besonderheiten, Benefits, Arbeitszeitmodelle) einen professionellen Pitch.
+def parse_json_response(response_text: str) -> dict:
+    """
+    Transformiert und validiert JSON-Response von HOC API
+    
+    Handhabt verschiedene Response-Formate (siehe json_recovery.recover_json):
+    - Reines JSON
+    - JSON in HTML eingebettet
+    - Text mit JSON-Inhalt
+    
+    Args:
+        response_text: Roher Response-Text von HOC API
+        
+    Returns:
+        Parsed JSON als dict oder leeres dict bei Fehler
+    """
+    parsed, strategy = json_recovery.recover_json(response_text)
+    metrics.record_json_recovery(strategy)
+    
+    if strategy == json_recovery.STRATEGY_EMPTY:
+        logger.warning("⚠️  Leere Response von HOC API")
+    elif strategy in (json_recovery.STRATEGY_SCRIPT, json_recovery.STRATEGY_EMBEDDED):
+        if structured_logging.verbose:
+            logger.info(f"✅ JSON aus bereinigter Response extrahiert (Strategie: {strategy})")
+    elif strategy == json_recovery.STRATEGY_TOO_LARGE:
+        logger.error(f"❌ Response zu groß für JSON-Recovery ({len(response_text)} Zeichen)")
+    elif strategy == json_recovery.STRATEGY_TIMEOUT:
+        logger.error("❌ Zeitbudget für JSON-Recovery überschritten")
+    elif strategy == json_recovery.STRATEGY_FAILED:
+        logger.error(f"❌ Konnte kein gültiges JSON aus Response extrahieren")
+    
+    if strategy not in (json_recovery.STRATEGY_DIRECT, json_recovery.STRATEGY_SCRIPT, json_recovery.STRATEGY_EMBEDDED):
+        logger.debug(f"Response Preview: {(response_text or '')[:200]}...")
+    return parsed
+
+
+def _hoc_questionnaire_request(campaign_id: int, etag: str = None, last_modified: str = None) -> tuple:
+    """
+    Baut URL und Header für den HOC-Questionnaire-Abruf (inkl. Conditional-Request-Headern)
+    
+    Args:
+        campaign_id: Campaign ID für den Fragebogen
+        etag: ETag der gecachten Version (optional)
+        last_modified: Last-Modified der gecachten Version (optional)
+        
+    Returns:
+        Tuple (url, headers) oder (None, None), falls HOC nicht konfiguriert ist
+    """
+    # ✅ NEU: Prüfe ob API Key gesetzt ist
+    if not Config.HIRINGS_API_TOKEN:
+        logger.error(f"❌ HIRINGS_API_TOKEN ist nicht gesetzt!")
+        logger.error(f"   → Bitte setze HIRINGS_API_TOKEN in der .env Datei")
+        return None, None
+    
+    if not Config.HIRINGS_API_URL:
+        logger.error(f"❌ HIRINGS_API_URL ist nicht gesetzt!")
+        logger.error(f"   → Bitte setze HIRINGS_API_URL in der .env Datei")
+        return None, None
+    
+    headers = {
+        "Authorization": Config.HIRINGS_API_TOKEN,  # ⚠️ OHNE "Bearer" - HOC API benötigt direkten Token!
+        "Content-Type": "application/json"
+    }
+    
+    # Conditional Request, falls HOC Validatoren geliefert hat
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    
+    # HIRINGS API Endpunkt: questionnaire/<campaign_id>
+    # HIRINGS_API_URL enthält bereits /api/v1
+    url = f"{Config.HIRINGS_API_URL}/questionnaire/{campaign_id}"
+    
+    if structured_logging.verbose:
+        logger.info(f"📥 Lade Questionnaire von HOC: {url}")
+        logger.info(f"   API Token vorhanden: {'Ja' if Config.HIRINGS_API_TOKEN else 'Nein'} ({len(Config.HIRINGS_API_TOKEN) if Config.HIRINGS_API_TOKEN else 0} Zeichen)")
+    
+    return url, headers
 
-Format: 2-3 prägnante Sätze
-Stil: Professionell und einladend
 
-Falls zu wenig Information erkennbar: Antworte mit einem leeren String."""
-        }
-        
-        # Hole Prompt für die Variable
-        prompt = prompts.get(variable_name, "")
-        if not prompt:
-            logger.warning(f"⚠️ Kein AI-Prompt für Variable '{variable_name}' definiert")
-            return ""
+def _parse_hoc_questionnaire_response(campaign_id: int, response, etag: str = None, last_modified: str = None) -> tuple:
+    """
+    Wertet die HOC-Antwort aus (requests- oder httpx-Response)
+    
+    Args:
+        campaign_id: Campaign ID für den Fragebogen
+        response: HTTP-Response von HOC
+        etag: Gesendeter ETag (wird bei 304 zurückgegeben)
+        last_modified: Gesendetes Last-Modified (wird bei 304 zurückgegeben)
         
-        logger.info(f"🤖 Starte AI-Extraktion für: {variable_name}")
+    Returns:
+        Tuple (questionnaire, validators) wie _fetch_questionnaire_from_hoc
         
-        # OpenAI API Call (neue SDK Syntax)
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",  # Schnell & günstig (~$0.15/1M tokens)
-            messages=[
-                {"role": "system", "content": "Du bist ein Experte für Recruiting-Datenextraktion. Antworte präzise, kurz und ohne Erklärungen."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.1,  # Deterministisch
-            max_tokens=150,
-            timeout=10
-        )
+    Raises:
+        HTTP-Fehler des Clients bei sonstigen 4xx/5xx (raise_for_status)
+    """
+    if response.status_code == 304:
+        if structured_logging.verbose:
+            logger.info(f"✅ Questionnaire für Campaign {campaign_id} unverändert (304 Not Modified)")
+        return None, {"etag": etag, "last_modified": last_modified}
+    
+    # ✅ NEU: Prüfe Status Code vor raise_for_status
+    if response.status_code == 401:
+        logger.error(f"❌ UNAUTHORIZED (401) - API Key ist falsch oder ungültig!")
+        logger.error(f"   → Prüfe deinen HIRINGS_API_TOKEN in der .env Datei")
+        logger.error(f"   → Response: {response.text[:200]}")
+        return {}, {}
+    elif response.status_code == 403:
+        logger.error(f"❌ FORBIDDEN (403) - API Key hat keine Berechtigung für diese Kampagne!")
+        logger.error(f"   → Response: {response.text[:200]}")
+        return {}, {}
+    elif response.status_code == 404:
+        logger.warning(f"⚠️  NOT FOUND (404) - Kampagne {campaign_id} existiert nicht in HOC!")
+        logger.warning(f"   → Response: {response.text[:200]}")
+        return {}, {}
+    
+    response.raise_for_status()
+    
+    # ✅ NEU: Prüfe Content-Type
+    content_type = response.headers.get('Content-Type', '')
+    if structured_logging.verbose:
+        logger.info(f"📋 Content-Type: {content_type}")
+    
+    # ✅ NEU: Verwende JSON-Transformator
+    questionnaire = parse_json_response(response.text)
+    
+    # ✅ NEU: Validierung der Struktur
+    if not isinstance(questionnaire, dict):
+        logger.error(f"❌ Questionnaire ist kein Dict! Type: {type(questionnaire)}")
+        logger.error(f"   Response Preview: {response.text[:200]}...")
+        return {}, {}
+    
+    # ✅ NEU: Prüfe ob questions vorhanden
+    questions = questionnaire.get('questions', [])
+    if not questions:
+        logger.warning(f"⚠️  Campaign {campaign_id}: 'questions' Array ist leer oder fehlt!")
+        logger.warning(f"   Verfügbare Keys: {list(questionnaire.keys())}")
+        logger.warning(f"   Content-Type war: {content_type}")
+    else:
+        if structured_logging.verbose:
+            logger.info(f"✅ Questionnaire erfolgreich geladen für Campaign: {campaign_id}")
+            logger.info(f"   📊 {len(questions)} Fragen gefunden")
+            
+            # Zeige Priority-Verteilung
+            priority_1 = len([q for q in questions if q.get('priority') == 1])
+            priority_2 = len([q for q in questions if q.get('priority') == 2])
+            logger.info(f"   📋 Priority 1: {priority_1}, Priority 2: {priority_2}")
+        else:
+            structured_logging.event("questionnaire.loaded", campaign_id=campaign_id, questions=len(questions))
+    
+    validators = {
+        "etag": response.headers.get('ETag'),
+        "last_modified": response.headers.get('Last-Modified')
+    }
+    return questionnaire, validators
+
+
+def _fetch_questionnaire_from_hoc(campaign_id: int, etag: str = None, last_modified: str = None) -> tuple:
+    """
+    Holt Questionnaire/Kontextdatei aus HOC basierend auf Campaign-ID
+    
+    Mit robuster JSON-Transformation und Validierung. Sendet If-None-Match /
+    If-Modified-Since, falls Validatoren aus einer früheren Antwort vorliegen.
+    
+    Args:
+        campaign_id: Campaign ID für den Fragebogen
+        etag: ETag der gecachten Version (optional)
+        last_modified: Last-Modified der gecachten Version (optional)
         
-        result = response.choices[0].message.content.strip()
+    Returns:
+        Tuple (questionnaire, validators):
+        - questionnaire: dict mit Questionnaire-Daten, {} bei Fehler, None bei 304 Not Modified
+        - validators: dict mit 'etag' und 'last_modified' der Antwort
+    """
+    try:
+        url, headers = _hoc_questionnaire_request(campaign_id, etag, last_modified)
+        if url is None:
+            return {}, {}
         
-        # Bereinige Ergebnis
-        if result.lower() in ['', 'nicht vorhanden', 'keine angabe', 'n/a', 'null', 'none']:
-            result = ""
+        response = http_pool.get_session("hoc").get(url, headers=headers, timeout=10)
+        return _parse_hoc_questionnaire_response(campaign_id, response, etag, last_modified)
         
-        # Spezielle Nachbearbeitung für campaignrole_title: Geschlechterneutral machen
-        if variable_name == "campaignrole_title" and result:
-            original = result
-            result = make_gender_neutral_job_title(result)
-            if original != result:
-                logger.info(f"🔄 Geschlechterneutralisierung: '{original}' → '{result}'")
+    except requests.exceptions.HTTPError as e:
+        logger.error(f"❌ HTTP Fehler beim Laden des Questionnaires (Campaign {campaign_id}): {e}")
+        if e.response:
+            logger.error(f"   Status Code: {e.response.status_code}")
+            logger.error(f"   Response: {e.response.text[:200]}")
+        return {}, {}
+    except requests.exceptions.RequestException as e:
+        logger.error(f"❌ Fehler beim Laden des Questionnaires (Campaign {campaign_id}): {e}")
+        return {}, {}
+    except json.JSONDecodeError as e:
+        logger.error(f"❌ JSON Parse Fehler (Campaign {campaign_id}): {e}")
+        logger.error(f"   Response Preview: {response.text[:200] if 'response' in locals() else 'N/A'}...")
+        return {}, {}
+    except Exception as e:
+        logger.error(f"❌ Unerwarteter Fehler beim Laden des Questionnaires (Campaign {campaign_id}): {e}")
+        import traceback
+        logger.error(traceback.format_exc())
+        return {}, {}
+
+
+def fetch_questionnaire_context(campaign_id: int, force_refresh: bool = False) -> dict:
+    """
+    Holt Questionnaire/Kontextdatei aus HOC basierend auf Campaign-ID
+    
+    Mit lokalem Cache:
+    - Frisch (< QUESTIONNAIRE_CACHE_TTL_SECONDS): direkt aus dem Cache
+    - Stale (innerhalb QUESTIONNAIRE_CACHE_STALE_SECONDS): sofort aus dem Cache,
+      Revalidierung läuft im Hintergrund
+    - Sonst: Abruf bei HOC (Conditional Request, gleichzeitige Abrufe pro
+      Kampagne werden zu einem Request gebündelt)
+    
+    Args:
+        campaign_id: Campaign ID für den Fragebogen
+        force_refresh: Cache ignorieren und bei HOC revalidieren
         
-        logger.info(f"✅ AI-Extraktion für {variable_name}: {result[:100] if result else '(leer)'}...")
+    Returns:
+        dict mit Questionnaire-Daten und Kontext
+    """
+    entry = get_cached_questionnaire(campaign_id)
+    
+    if entry is not None and not force_refresh:
+        age = time.monotonic() - entry['fetched_at']
         
-        return result
+        if age < Config.QUESTIONNAIRE_CACHE_TTL_SECONDS:
+            if structured_logging.verbose:
+                logger.info(f"⚡ Questionnaire-Cache HIT für Campaign {campaign_id} (Alter: {age:.0f}s)")
+            return entry['questionnaire']
         
-    except Exception as e:
-        logger.error(f"❌ AI-Extraktion für {variable_name} fehlgeschlagen: {e}")
-        return ""
+        if structured_logging.verbose:
+            logger.info(f"♻️ Questionnaire-Cache STALE für Campaign {campaign_id} (Alter: {age:.0f}s) - revalidiere im Hintergrund")
+        _revalidate_questionnaire_in_background(campaign_id, entry)
+        return entry['questionnaire']
+    
+    entry = questionnaire_fetches.do(campaign_id, lambda: _refresh_questionnaire(campaign_id, entry))
+    return entry['questionnaire'] if entry else {}
 
 
-def extract_company_size(questionnaire: dict) -> str:
-    """
-    Extrahiert Mitarbeiterzahl - AI-basiert aus questions Array
+def get_cached_questionnaire(campaign_id: int) -> dict:
     """
-    questions = questionnaire.get('questions', [])
-    if not questions:
-        return ""
+    Liefert den Questionnaire-Cache-Eintrag einer Kampagne
     
-    return extract_variable_with_ai(questions, "companysize")
+    Args:
+        campaign_id: Campaign ID für den Fragebogen
+        
+    Returns:
+        Cache-Eintrag oder None (nicht gecacht oder seit dem Laden invalidiert, auch in einem anderen Worker)
+    """
+    entry = questionnaire_cache.get(campaign_id)
+    if entry is not None and entry.get('generation') != campaign_generations.current(campaign_id):
+        questionnaire_cache.pop(campaign_id)
+        return None
+    return entry
 
 
-def extract_company_pitch(questionnaire: dict) -> str:
+def _refresh_questionnaire(campaign_id: int, previous: dict = None) -> dict:
     """
-    Extrahiert Company Pitch - AI-basiert aus questions Array
+    Lädt einen Questionnaire bei HOC (neu oder per Conditional Request) und aktualisiert den Cache
+    
+    Args:
+        campaign_id: Campaign ID für den Fragebogen
+        previous: Bisheriger Cache-Eintrag (für Validatoren und als Fallback bei Fehlern)
+        
+    Returns:
+        Aktueller Cache-Eintrag oder None, falls nichts geladen werden konnte
     """
-    questions = questionnaire.get('questions', [])
-    if not questions:
-        return ""
+    # Generation vor dem Abruf: eine Invalidierung während des Abrufs verwirft das Ergebnis beim nächsten Lesen
+    generation = campaign_generations.current(campaign_id)
+    questionnaire, validators = _fetch_questionnaire_from_hoc(
+        campaign_id,
+        etag=previous.get('etag') if previous else None,
+        last_modified=previous.get('last_modified') if previous else None
+    )
+    return _store_questionnaire(campaign_id, previous, questionnaire, validators, generation)
+
+
+def _store_questionnaire(campaign_id: int, previous: dict, questionnaire: dict, validators: dict,
+                         generation: int = None) -> dict:
+    """
+    Übernimmt das Ergebnis eines HOC-Abrufs in den Questionnaire-Cache
     
-    return extract_variable_with_ai(questions, "companypitch")
+    Args:
+        campaign_id: Campaign ID für den Fragebogen
+        previous: Bisheriger Cache-Eintrag (Fallback bei Fehlern)
+        questionnaire: Ergebnis des Abrufs ({} bei Fehler, None bei 304)
+        validators: ETag/Last-Modified der Antwort
+        generation: Campaign-Generation vor dem Abruf (Default: aktuelle)
+        
+    Returns:
+        Aktueller Cache-Eintrag oder None, falls nichts geladen werden konnte
+    """
+    if questionnaire is None and previous:
+        # 304 Not Modified → bisherigen Inhalt als frisch markieren
+        questionnaire = previous['questionnaire']
+    
+    if not questionnaire:
+        if previous:
+            logger.warning(f"⚠️  HOC-Abruf für Campaign {campaign_id} fehlgeschlagen - nutze gecachte Version")
+        return previous
+    
+    entry = {
+        'questionnaire': questionnaire,
+        'etag': validators.get('etag'),
+        'last_modified': validators.get('last_modified'),
+        'fetched_at': time.monotonic(),
+        'generation': campaign_generations.current(campaign_id) if generation is None else generation
+    }
+    questionnaire_cache.set(campaign_id, entry)
+    return entry
 
 
-def extract_location(questionnaire: dict) -> str:
-    """
-    Extrahiert Standort (NUR ORT/STADT) - AI-basiert aus questions Array
+def _revalidate_questionnaire_in_background(campaign_id: int, entry: dict) -> None:
+    """Startet eine Hintergrund-Revalidierung, falls für die Kampagne noch keine läuft"""
+    if questionnaire_fetches.in_flight(campaign_id):
+        return
+    
+    def revalidate():
+        try:
+            questionnaire_fetches.do(campaign_id, lambda: _refresh_questionnaire(campaign_id, entry))
+        except Exception as e:
+            logger.warning(f"⚠️  Hintergrund-Revalidierung für Campaign {campaign_id} fehlgeschlagen: {e}")
+    
+    questionnaire_revalidation_executor.submit(revalidate)
+
+
+def build_first_message(company_name: str, first_name: str, last_name: str, campaign_location: str = "") -> str:
     """
-    questions = questionnaire.get('questions', [])
-    if not questions:
-        # Fallback: Direkte Felder prüfen
+    Erstellt personalisierte First Message für den Agent
+    
+    Args:
+        company_name: Firmenname
+        first_name: Vorname Kandidat
+        last_name: Nachname Kandidat
+        campaign_location: Standort der Kampagne (optional)
+        
+    Returns:
+        Personalisierte First Message
+    """
+    if campaign_location:
+        first_message = f"Guten Tag {first_name} {last_name}, hier spricht Susi von {company_name}. Es geht um ihre Bewerbung am Standort {campaign_location}. Haben Sie ungefähr 15 Minuten Zeit für dieses Gespräch um ihre Daten zu erfassen?"
+    else:
+        first_message = f"Guten Tag {first_name} {last_name}, hier spricht Susi von {company_name}. Es geht um ihre Bewerbung. Haben Sie ungefähr 15 Minuten Zeit für dieses Gespräch um ihre Daten zu erfassen?"
+    
+    if structured_logging.verbose:
+        logger.info(f"📝 First Message erstellt: {first_message[:100]}...")
+    return first_message
+
+
+def build_enhanced_prompt(questionnaire: dict, company_name: str, first_name: str, last_name: str) -> str:
+    """
+    Erstellt erweiterten System-Prompt mit Questionnaire-Kontext
+    WICHTIG: Diese Funktion wird nur für WebRTC Links verwendet, nicht für Twilio Outbound Calls!
+    Bei Twilio Outbound Calls wird der Dashboard-Prompt direkt verwendet + Dynamic Variables injiziert.
+    
+    Args:
+        questionnaire: Questionnaire-Daten aus HOC
+        company_name: Firmenname
+        first_name: Vorname Kandidat
+        last_name: Nachname Kandidat
+        
+    Returns:
+        Erweiterter System-Prompt mit vollem Kontext
+    """
+    
+    # HINWEIS: dashboard_prompt.txt wird nicht mehr verwendet
+    # Der Dashboard-Prompt wird direkt von ElevenLabs verwendet
+    # Diese Funktion wird nur für WebRTC Links benötigt (falls conversation_config_override verwendet wird)
+    
+    # Baue Questionnaire-Kontext
+    questionnaire_context = build_questionnaire_context(questionnaire, company_name, first_name, last_name)
+    
+    # Basis-Prompt (wird nur für WebRTC Links verwendet)
+    dashboard_prompt = f"""Du bist ein professioneller Recruiting-Assistent für {company_name}.
+Du führst ein Gespräch mit {first_name} {last_name}.
+
+Nutze die Informationen aus dem KONTEXT-Abschnitt unten."""
+    
+    # FINALER PROMPT: Dashboard-Prompt + Questionnaire-Kontext
+    final_prompt = dashboard_prompt + "\n\n" + questionnaire_context
+    
+    if structured_logging.verbose:
+        logger.info(f"📝 Enhanced Prompt erstellt: {len(final_prompt)} Zeichen (Basis: {len(dashboard_prompt)}, Kontext: {len(questionnaire_context)})")
+    
+    return final_prompt
+
+
+def extract_variable_with_ai(questions: list, variable_name: str) -> str:
+    """
+    Nutzt OpenAI GPT-4o-mini, um eine Dynamic Variable aus den Fragen zu extrahieren
+    
+    Args:
+        questions: Liste von Fragen aus HOC Questionnaire
+        variable_name: Name der zu extrahierenden Variable
+        
+    Returns:
+        Extrahierter Wert als String oder "" falls nicht extrahierbar
+    """
+    try:
+        # Prüfe OpenAI API Key
+        if not Config.OPENAI_API_KEY:
+            logger.warning("⚠️ OpenAI API Key nicht konfiguriert - AI-Extraktion übersprungen")
+            return ""
+        
+        # Formatiere Fragen für AI
+        questions_text = "\n".join([
+            f"- Frage: {q.get('question', '')}\n  Gruppe: {q.get('group', 'N/A')}\n  Priority: {q.get('priority', 'N/A')}\n  Context: {q.get('context', 'N/A')}"
+            for q in questions
+        ])
+        
+        # AI-Prompts pro Variable
+        prompts = {
+            "campaignlocation_label": f"""Analysiere diese Recruiting-Fragen und extrahiere den ARBEITSORT/STANDORT:
+
+{questions_text}
+
+WICHTIG: Extrahiere NUR den ORT/DIE STADT (z.B. "Berlin", "München-Schwabing", "Hamburg-Altona").
+NICHT die komplette Adresse mit Straße und Hausnummer!
+
+Beispiele:
+- "Unser Standort ist Kita Springmäuse, Stollberger Straße 25-27, 12627 Berlin" → "Berlin"
+- "Der Arbeitsort ist München-Schwabing, Leopoldstraße 123" → "München-Schwabing"
+- "Arbeiten Sie in Hamburg-Altona?" → "Hamburg-Altona"
+
+Antworte NUR mit dem Ort, ohne Erklärung.
+Falls kein Standort erkennbar: Antworte mit einem leeren String.""",
+            
+            "companypriorities": f"""Analysiere diese Recruiting-Fragen und identifiziere die TOP 3-4 MUSS-KRITERIEN oder PRIORITÄTEN:
+
+{questions_text}
+
+Fokus auf:
+- Fragen mit Priority=1 (Muss-Kriterien)
+- Context-Felder mit "Muss-Kriterium:"
+- Qualifikationen und Abschlüsse
+- Arbeitszeitmodelle (Vollzeit/Teilzeit)
+
+Gib die Prioritäten als kommaseparierte Liste zurück (max. 4 Items).
+Format: "Kriterium 1, Kriterium 2, Kriterium 3"
+
+Beispiel: "Deutschkenntnisse B2, mehrjährige Berufserfahrung, staatlich anerkannter Abschluss, Vollzeit 39h"
+
+Falls keine klaren Prioritäten: Antworte mit einem leeren String.""",
+            
+            "companysize": f"""Analysiere diese Recruiting-Fragen und extrahiere die UNTERNEHMENSGRÖSSE (Mitarbeiterzahl):
+
+{questions_text}
+
+Suche nach Angaben zur Mitarbeiterzahl oder Unternehmensgröße.
+
+Beispiele:
+- "Wir sind ein Unternehmen mit 120 Mitarbeitenden" → "120 Mitarbeitende"
+- "Unser Team hat ca. 50 Mitarbeiter" → "ca. 50 Mitarbeiter"
+
+Falls keine Angabe vorhanden: Antworte mit einem leeren String.""",
+            
+            "companypitch": f"""Analysiere diese Recruiting-Fragen und erstelle einen kurzen COMPANY PITCH (2-3 Sätze):
+
+{questions_text}
+
+Erstelle basierend auf erkennbaren Informationen (Branche, Besonderheiten, Benefits, Arbeitszeitmodelle) einen professionellen Pitch.
+
+Format: 2-3 prägnante Sätze
+Stil: Professionell und einladend
+
+Falls zu wenig Information erkennbar: Antworte mit einem leeren String."""
+        }
+        
+        # Hole Prompt für die Variable
+        prompt = prompts.get(variable_name, "")
+        if not prompt:
+            logger.warning(f"⚠️ Kein AI-Prompt für Variable '{variable_name}' definiert")
+            return ""
+        
+        if structured_logging.verbose:
+            logger.info(f"🤖 Starte AI-Extraktion für: {variable_name}")
+        
+        request_kwargs = {
+            "model": "gpt-4o-mini",  # Schnell & günstig (~$0.15/1M tokens)
+            "messages": [
+                {"role": "system", "content": "Du bist ein Experte für Recruiting-Datenextraktion. Antworte präzise, kurz und ohne Erklärungen."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.1,  # Deterministisch
+            "max_tokens": 150,
+            "timeout": 10
+        }
+        
+        # OpenAI API Call (neue SDK Syntax) - aus dem LLM-Cache, falls dieselben Fragen schon extrahiert wurden
+        cache_entry, content = lookup_llm_result(request_kwargs, AI_LEGACY_PROMPT_VERSION, variable_name, questions)
+        if content is None:
+            content = openai_chat_completion(**request_kwargs).choices[0].message.content
+            store_llm_result(cache_entry, content)
+        
+        # Bereinige und validiere Ergebnis
+        result = clean_ai_value(variable_name, content)
+        
+        if structured_logging.verbose:
+            logger.info(f"✅ AI-Extraktion für {variable_name}: {result[:100] if result else '(leer)'}...")
+        
+        return result
+        
+    except Exception as e:
+        logger.error(f"❌ AI-Extraktion für {variable_name} fehlgeschlagen: {e}")
+        return ""
+
+
+def extract_company_size(questionnaire: dict) -> str:
+    """
+    Extrahiert Mitarbeiterzahl - AI-basiert aus questions Array
+    """
+    questions = questionnaire.get('questions', [])
+    if not questions:
+        return ""
+    
+    return extract_variable_with_ai(questions, "companysize")
+
+
+def extract_company_pitch(questionnaire: dict) -> str:
+    """
+    Extrahiert Company Pitch - AI-basiert aus questions Array
+    """
+    questions = questionnaire.get('questions', [])
+    if not questions:
+        return ""
+    
+    return extract_variable_with_ai(questions, "companypitch")
+
+
+def extract_location(questionnaire: dict) -> str:
+    """
+    Extrahiert Standort (NUR ORT/STADT) - AI-basiert aus questions Array
+    """
+    questions = questionnaire.get('questions', [])
+    if not questions:
+        # Fallback: Direkte Felder prüfen
         if questionnaire.get('campaignlocation_label'):
             return questionnaire['campaignlocation_label']
         if questionnaire.get('work_location'):
             return questionnaire['work_location']
         return ""
     
-    return extract_variable_with_ai(questions, "campaignlocation_label")
+    return extract_variable_with_ai(questions, "campaignlocation_label")
+
+
+def extract_priorities(questionnaire: dict) -> str:
+    """
+    Extrahiert Prioritäten aus MUSS-Kriterien - AI-basiert aus questions Array
+    """
+    questions = questionnaire.get('questions', [])
+    if not questions:
+        return ""
+    
+    return extract_variable_with_ai(questions, "companypriorities")
+
+
+def build_questions_list(questionnaire: dict) -> str:
+    """
+    Erstellt strukturierte Fragenliste (Dashboard)
+    ALLE Fragen kombiniert
+    
+    Args:
+        questionnaire: Questionnaire-Daten aus HOC
+        
+    Returns:
+        Formatierte Fragenliste als String
+    """
+    try:
+        return prompt_templates.render_questions(get_questionnaire_index(questionnaire))
+    except Exception as e:
+        logger.warning(f"⚠️ Fehler beim Erstellen der Fragenliste: {e}")
+        return ""
+
+
+def build_gate_questions(questionnaire: dict) -> str:
+    """
+    Erstellt Liste der MUSS-Fragen (Priority=1) für Phase 2 (Gate)
+    
+    WICHTIG: Nur Stellentitel/Alternativtitel-Fragen führen zum Abbruch!
+    Andere Muss-Kriterien sind wichtig, aber nicht zwingend.
+    
+    Args:
+        questionnaire: Questionnaire-Daten aus HOC
+        
+    Returns:
+        Formatierte Liste nur der Priority=1 Fragen (Stellentitel zuerst!)
+    """
+    try:
+        index = get_questionnaire_index(questionnaire)
+        gate_text = prompt_templates.render_gate_questions(index)
+        
+        total_must = len(index.must)
+        job_title_count = len(index.job_title_must)
+        if structured_logging.verbose:
+            logger.info(f"✅ Gate Questions erstellt: {total_must} Muss-Kriterien ({job_title_count} Stellentitel-Fragen, {total_must - job_title_count} andere)")
+        return gate_text
+        
+    except Exception as e:
+        logger.warning(f"⚠️ Fehler beim Erstellen der Gate Questions: {e}")
+        return ""
+
+
+def build_preference_questions(questionnaire: dict) -> str:
+    """
+    Erstellt Liste der Präferenz-Fragen (Priority=2) für Phase 4
+    
+    Args:
+        questionnaire: Questionnaire-Daten aus HOC
+        
+    Returns:
+        Formatierte Liste nur der Priority=2 Fragen
+    """
+    try:
+        index = get_questionnaire_index(questionnaire)
+        pref_text = prompt_templates.render_preference_questions(index)
+        
+        if structured_logging.verbose:
+            logger.info(f"✅ Preference Questions erstellt: {len(index.optional)} Fragen")
+        return pref_text
+        
+    except Exception as e:
+        logger.warning(f"⚠️ Fehler beim Erstellen der Preference Questions: {e}")
+        return ""
+
+
+def extract_dynamic_variables(questionnaire: dict, company_name: str, first_name: str, last_name: str,
+                              campaign_id: int = None, campaign_variables: dict = None) -> dict:
+    """
+    Extrahiert alle Dynamic Variables aus dem HOC Questionnaire
+    für ElevenLabs Dashboard-Workflows
+    
+    NUTZT AI (GPT-4o-mini) für intelligente Extraktion aus questions Array
+    
+    Args:
+        questionnaire: Questionnaire-Daten aus HOC
+        company_name: Firmenname
+        first_name: Vorname Kandidat
+        last_name: Nachname Kandidat
+        campaign_id: Campaign ID (aktiviert den Campaign-Cache für AI-Variablen)
+        campaign_variables: Bereits extrahierte AI-Variablen der Kampagne (z.B. im Batch), überspringt die Extraktion
+        
+    Returns:
+        Dict mit allen Dynamic Variables für ElevenLabs
+    """
+    if structured_logging.verbose:
+        logger.info("🔍 Extrahiere Dynamic Variables aus Questionnaire (AI-basiert)...")
+    
+    # BASIS-VARIABLEN (immer vorhanden)
+    variables = {
+        "candidatefirst_name": first_name,
+        "candidatelast_name": last_name,
+        "companyname": company_name
+    }
+    
+    # Hole questions Array
+    questions = questionnaire.get('questions', [])
+    
+    # AI-BASIERTE EXTRAKTION
+    if campaign_variables is not None:
+        variables.update(campaign_variables)
+    elif questions and len(questions) > 0:
+        if structured_logging.verbose:
+            logger.info(f"📊 {len(questions)} Fragen gefunden - starte AI-Extraktion...")
+        
+        # Extrahiere mit AI - aus dem Campaign-Cache oder per AI (ein Request bzw. parallel)
+        variables.update(extract_campaign_variables(questionnaire, campaign_id))
+    else:
+        # ✅ WICHTIG: Keine Fragen im Questionnaire
+        logger.warning("⚠️  Keine Fragen im Questionnaire - AI-Extraktion übersprungen")
+        if questionnaire:
+            logger.warning(f"   Questionnaire-Struktur: {list(questionnaire.keys())}")
+            logger.warning(f"   'questions' Array: {questions if questions else 'leer oder fehlt'}")
+            logger.warning(f"   → Campaign hat möglicherweise keine Fragen im HOC System konfiguriert")
+        else:
+            logger.warning(f"   → Questionnaire ist komplett leer")
+        
+        # Setze alle auf Fallback-Werte (leere Strings, campaignrole_title = "Ihre Position")
+        variables.update(AI_VARIABLE_FALLBACKS)
+    
+    with timing.stage("context"):
+        # KONTEXT-VARIABLEN (strukturiert)
+        variables["questionnaire_context"] = build_questionnaire_context(questionnaire, company_name, first_name, last_name)
+        variables["questions"] = build_questions_list(questionnaire)
+        
+        # PHASEN-SPEZIFISCHE FRAGEN (NEU!)
+        variables["gate_questions"] = build_gate_questions(questionnaire)  # Phase 2: MUSS-Kriterien (nur Stellentitel führen zum Abbruch)
+        variables["preference_questions"] = build_preference_questions(questionnaire)  # Phase 4: Präferenzen
+    
+    # Log welche Variablen gefüllt wurden (structured: Event in log_call_dynamic_variables)
+    if structured_logging.verbose:
+        filled_vars = [k for k, v in variables.items() if v]
+        logger.info(f"✅ {len(filled_vars)}/{len(variables)} Dynamic Variables gefüllt:")
+        for var in filled_vars:
+            value_preview = str(variables[var])[:50]
+            logger.info(f"   • {var}: {value_preview}...")
+    
+    return variables
+
+
+def build_questionnaire_context(questionnaire: dict, company_name: str, first_name: str, last_name: str) -> str:
+    """
+    Erstellt Questionnaire-Kontext als formatierten Text
+    
+    Nur der Kopf (Kandidat, Firma) wird pro Aufruf gerendert; der Fragen-Teil wird
+    einmal pro Kampagne gerendert und am QuestionnaireIndex gecacht.
+    
+    Args:
+        questionnaire: Questionnaire-Daten aus HOC (enthält 'questions' Array)
+        company_name: Firmenname
+        first_name: Vorname Kandidat
+        last_name: Nachname Kandidat
+        
+    Returns:
+        Questionnaire-Kontext als formatierter Text mit Fragen
+    """
+    questionnaire_context = prompt_templates.render_questionnaire_context(
+        get_questionnaire_index(questionnaire), company_name, first_name, last_name
+    )
+    
+    if structured_logging.verbose:
+        logger.info(f"📝 Questionnaire-Kontext erstellt: {len(questionnaire_context)} Zeichen")
+    
+    return questionnaire_context
+
+
+def build_outbound_call_request(agent_phone_number_id: str, to_number: str, dynamic_vars: dict) -> dict:
+    """
+    Baut die Argumente für twilio.outbound_call (geteilt von der Flask- und der ASGI-Variante)
+    
+    Args:
+        agent_phone_number_id: ElevenLabs Phone Number ID
+        to_number: Zielnummer (E.164)
+        dynamic_vars: Dynamic Variables für den Call
+        
+    Returns:
+        Keyword-Argumente für outbound_call
+    """
+    return {
+        "agent_id": Config.ELEVENLABS_AGENT_ID,
+        "agent_phone_number_id": agent_phone_number_id,
+        "to_number": to_number,
+        "conversation_initiation_client_data": {
+            "dynamic_variables": dynamic_vars
+            # KEIN conversation_config_override → Dashboard-Prompt bleibt aktiv!
+            # ElevenLabs ersetzt {{campaignlocation_label}}, {{campaignrole_title}}, etc. automatisch
+        }
+    }
+
+
+def place_outbound_call(agent_phone_number_id: str, to_number: str, dynamic_vars: dict):
+    """
+    Startet einen ElevenLabs Twilio Outbound Call mit Dynamic Variables
+    
+    Nur Dynamic Variables werden gesendet - Dashboard-Prompt bleibt unverändert!
+    ElevenLabs ersetzt automatisch {{variable_name}} Platzhalter im Dashboard-Prompt
+    
+    Args:
+        agent_phone_number_id: ElevenLabs Phone Number ID
+        to_number: Zielnummer (E.164)
+        dynamic_vars: Dynamic Variables für den Call
+        
+    Returns:
+        Response der ElevenLabs API (conversation_id, call_sid, ...)
+        
+    Raises:
+        GovernorTimeout: Dial-Kapazität innerhalb von DIAL_QUEUE_TIMEOUT_SECONDS nicht frei
+    """
+    # Slot pro Nummer: frei nach dem Dial (bzw. beim finalen Twilio-Status, siehe DIAL_HOLD_UNTIL_FINAL_STATUS)
+    slot_id, active_wait = active_calls.acquire(agent_phone_number_id, timeout=Config.DIAL_QUEUE_TIMEOUT_SECONDS)
+    try:
+        remaining = max(0.0, Config.DIAL_QUEUE_TIMEOUT_SECONDS - active_wait)
+        with dial_governor.slot(agent_phone_number_id, timeout=remaining) as wait_seconds:
+            wait_seconds += active_wait
+            timing.record_stage("dial_queue", wait_seconds * 1000)
+            if wait_seconds >= 1:
+                logger.info(f"⏳ Dial für {agent_phone_number_id} {wait_seconds:.1f}s in der Queue gewartet")
+            with timing.stage("dial"):
+                response = client.conversational_ai.twilio.outbound_call(
+                    **build_outbound_call_request(agent_phone_number_id, to_number, dynamic_vars)
+                )
+    except BaseException:
+        active_calls.release(slot_id)
+        raise
+    
+    if Config.DIAL_HOLD_UNTIL_FINAL_STATUS:
+        active_calls.attach(slot_id, getattr(response, 'call_sid', None))
+    else:
+        active_calls.release(slot_id)
+    return response
+
+
+def serialize_json_body(body) -> bytes:
+    """Serialisiert einen Response-Body byte-identisch zu `jsonify(body)` (kompakt, sortiert, Newline)"""
+    return f"{app.json.dumps(body, separators=(',', ':'))}\n".encode("utf-8")
+
+
+def precompute_personalization(questionnaire: dict, company_name: str, first_name: str, last_name: str,
+                               campaign_id: int) -> bytes:
+    """
+    Baut die Antwort des Personalization Webhooks vorab (beim Call-Start statt beim Verbindungsaufbau)
+    
+    Args:
+        questionnaire: Questionnaire-Daten aus HOC (bereits geladen)
+        company_name: Firmenname
+        first_name: Vorname Kandidat
+        last_name: Nachname Kandidat
+        campaign_id: Campaign ID
+        
+    Returns:
+        Serialisierter Response-Body oder None (deaktiviert oder Fehler - Webhook baut dann live)
+    """
+    if not Config.PERSONALIZATION_PRECOMPUTE:
+        return None
+    
+    try:
+        with timing.stage("personalization_precompute"):
+            return serialize_json_body(
+                build_personalization_response(questionnaire, company_name, first_name, last_name, campaign_id)
+            )
+    except Exception as e:
+        logger.error(f"❌ Personalisierung für Campaign {campaign_id} nicht vorberechnet: {e}")
+        return None
+
+
+def preregister_outbound_call(campaign_id: int, company_name: str, first_name: str, last_name: str,
+                              to_number: str, personalization: bytes = None) -> str:
+    """
+    Trägt einen Call vor dem Dial unter der Nummer in die Call-Registry ein
+    
+    Der Personalization Webhook kann eintreffen, bevor die ElevenLabs API antwortet;
+    Nummer und vorberechnete Antwort müssen dann schon in der Registry stehen.
+    
+    Args:
+        campaign_id: Campaign ID
+        company_name: Firmenname
+        first_name: Vorname Kandidat
+        last_name: Nachname Kandidat
+        to_number: Anzurufende Nummer
+        personalization: Vorberechneter Response-Body (siehe precompute_personalization)
+        
+    Returns:
+        Registry-ID für register_outbound_call bzw. discard_outbound_call (None bei Fehler)
+    """
+    try:
+        return call_registry.register(
+            {"campaign_id": campaign_id, "company_name": company_name, "first_name": first_name, "last_name": last_name},
+            to_number=to_number,
+            personalization=personalization
+        )
+    except Exception as e:
+        # Ohne Eintrag baut der Webhook die Antwort live (Lookup über HOC-Fallback), der Call kann trotzdem starten
+        logger.error(f"❌ Call-Registry nicht beschreibbar: {e}")
+        return None
+
+
+def discard_outbound_call(registry_id: str) -> None:
+    """Entfernt den vorab registrierten Eintrag eines nicht gestarteten Calls"""
+    if registry_id is None:
+        return
+    try:
+        call_registry.discard(registry_id)
+    except Exception as e:
+        logger.error(f"❌ Call-Registry nicht beschreibbar: {e}")
+
+
+def register_outbound_call(campaign_id: int, company_name: str, first_name: str, last_name: str,
+                           to_number: str, response, personalization: bytes = None,
+                           agent_phone_number_id: str = None, registry_id: str = None) -> None:
+    """
+    Trägt einen gestarteten Call in die Call-Registry und den Call-Lifecycle ein
+    (für den Personalization Webhook und die Status Callbacks)
+    
+    Args:
+        campaign_id: Campaign ID
+        company_name: Firmenname
+        first_name: Vorname Kandidat
+        last_name: Nachname Kandidat
+        to_number: Angerufene Nummer
+        response: Response der ElevenLabs API (conversation_id, call_sid)
+        personalization: Vorberechneter Response-Body (siehe precompute_personalization)
+        agent_phone_number_id: Phone-Number-ID, über die gewählt wurde
+        registry_id: ID aus preregister_outbound_call (ergänzt nur Call-SID und Conversation-ID)
+    """
+    timer = timing.current_timer()
+    call_sid = getattr(response, 'call_sid', None)
+    conversation_id = getattr(response, 'conversation_id', None)
+    call_event_store.record_dial(
+        call_sid, campaign_id, agent_phone_number_id,
+        request_id=timer.request_id if timer is not None else None
+    )
+    
+    try:
+        if registry_id is not None and call_registry.attach(registry_id, call_sid=call_sid,
+                                                            conversation_id=conversation_id):
+            return
+        call_registry.register(
+            {"campaign_id": campaign_id, "company_name": company_name, "first_name": first_name, "last_name": last_name},
+            to_number=to_number,
+            call_sid=call_sid,
+            conversation_id=conversation_id,
+            personalization=personalization
+        )
+    except Exception as e:
+        # Call läuft bereits - fehlender Registry-Eintrag darf ihn nicht als fehlgeschlagen melden
+        logger.error(f"❌ Call-Registry nicht beschreibbar: {e}")
+
+
+def is_allowed_callback_url(callback_url: str) -> bool:
+    """
+    Prüft eine Callback-URL gegen JOB_CALLBACK_ALLOWED_HOSTS
+    
+    Args:
+        callback_url: URL aus dem Request
+        
+    Returns:
+        True bei http(s)-URL auf einem erlaubten Host
+    """
+    try:
+        parsed = urlparse(str(callback_url))
+        host = (parsed.hostname or '').lower()
+    except ValueError:
+        return False
+    return parsed.scheme in ('http', 'https') and host in Config.JOB_CALLBACK_ALLOWED_HOSTS
+
+
+def validate_trigger_request(data: dict) -> tuple:
+    """
+    Validiert einen Call-Request von HOC und normalisiert die Parameter
+    
+    Args:
+        data: JSON-Body des Requests
+        
+    Returns:
+        Tuple (params, error): params als dict bei Erfolg, sonst error als (response_body, status_code)
+    """
+    # Validiere erforderliche Felder
+    required_fields = ['campaign_id', 'company_name', 'candidate_first_name', 
+                      'candidate_last_name']  # to_number ist jetzt OPTIONAL!
+    
+    missing_fields = [field for field in required_fields if not data.get(field)]
+    
+    if missing_fields:
+        return None, ({
+            "error": "Missing required fields",
+            "missing": missing_fields
+        }, 400)
+    
+    # Extrahiere Daten
+    params = {
+        "campaign_id": int(data['campaign_id']),
+        "company_name": data['company_name'],
+        "first_name": data['candidate_first_name'],
+        "last_name": data['candidate_last_name'],
+        "to_number": data.get('to_number'),  # OPTIONAL!
+        "agent_phone_number_id": data.get('agent_phone_number_id'),  # Optional, nur für SIP Trunk
+        "override_prompt": data.get('override_prompt')
+    }
+    
+    # callback_url: Der Server sendet das Ergebnis dorthin - nur an konfigurierte HOC-Hosts
+    if data.get('callback_url') and not is_allowed_callback_url(data['callback_url']):
+        return None, ({
+            "error": "Invalid callback_url",
+            "message": "callback_url must be an http(s) URL on an allowed host (JOB_CALLBACK_ALLOWED_HOSTS)"
+        }, 400)
+    
+    # Validiere agent_phone_number_id nur wenn to_number vorhanden (SIP Trunk)
+    if params['to_number'] and not params['agent_phone_number_id']:
+        # Versuche aus Config zu holen
+        params['agent_phone_number_id'] = Config.ELEVENLABS_AGENT_PHONE_NUMBER_ID if hasattr(Config, 'ELEVENLABS_AGENT_PHONE_NUMBER_ID') else None
+        
+        if not params['agent_phone_number_id']:
+            return None, ({
+                "error": "Missing agent_phone_number_id",
+                "message": "Provide agent_phone_number_id in request for SIP trunk calls"
+            }, 400)
+    
+    return params, None
+
+
+def log_trigger_request(params: dict) -> None:
+    """Loggt einen eingehenden Call-Request von HOC (structured: ein Event ohne Kandidaten-Daten)"""
+    if not structured_logging.verbose:
+        structured_logging.event(
+            "trigger.received",
+            campaign_id=params['campaign_id'],
+            method="sip_trunk" if params['to_number'] else "webrtc",
+            agent_phone_number_id=params['agent_phone_number_id'],
+        )
+        return
+
+    logger.info(f"\n{'='*70}")
+    if params['to_number']:
+        logger.info(f"📞 NEUE CALL-ANFRAGE VON HOC (SIP TRUNK)")
+    else:
+        logger.info(f"🔗 NEUE LINK-ANFRAGE VON HOC (WEBRTC)")
+    logger.info(f"{'='*70}")
+    logger.info(f"⏰ Zeit: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    logger.info(f"📋 Campaign-ID: {params['campaign_id']}")
+    logger.info(f"👤 Kandidat: {params['first_name']} {params['last_name']}")
+    logger.info(f"🏢 Firma: {params['company_name']}")
+    if params['to_number']:
+        logger.info(f"📞 Nummer: {params['to_number']}")
+        logger.info(f"📱 Phone Number ID: {params['agent_phone_number_id']}")
+    else:
+        logger.info(f"🔗 Methode: WebRTC Link (kein to_number)")
+
+
+def log_call_dynamic_variables(dynamic_vars: dict) -> None:
+    """Loggt die extrahierten Dynamic Variables eines Calls und warnt bei fehlenden wichtigen Variablen"""
+    # WICHTIG: Prüfe ob wichtige Variablen vorhanden sind
+    important_vars = ['campaignlocation_label', 'campaignrole_title', 'companypriorities', 'companypitch', 'questionnaire_context']
+    missing_vars = [v for v in important_vars if not dynamic_vars.get(v)]
+
+    if not structured_logging.verbose:
+        fields = {"count": len(dynamic_vars), "missing": missing_vars}
+        # Werte-Vorschau nur für eine Stichprobe (LOG_PREVIEW_SAMPLE_RATE)
+        if structured_logging.sample_preview():
+            fields["preview"] = structured_logging.preview(dynamic_vars)
+        structured_logging.event("dynamic_variables", level=logging.WARNING if missing_vars else logging.INFO, **fields)
+        return
+
+    logger.info(f"📊 {len(dynamic_vars)} Dynamic Variables extrahiert:")
+    for key in dynamic_vars.keys():
+        value_preview = str(dynamic_vars[key])[:50] if dynamic_vars[key] else "(leer)"
+        logger.info(f"   • {key}: {value_preview}...")
+    
+    if missing_vars:
+        logger.warning(f"⚠️  Wichtige Variablen fehlen: {', '.join(missing_vars)}")
+    else:
+        logger.info(f"✅ Alle wichtigen Variablen vorhanden")
+
+
+def build_call_started_response(params: dict, questionnaire: dict, dynamic_vars: dict, response) -> tuple:
+    """
+    Baut die Antwort an HOC für einen gestarteten Twilio Outbound Call
+    
+    Args:
+        params: Validierte Parameter aus validate_trigger_request
+        questionnaire: Questionnaire-Daten aus HOC
+        dynamic_vars: Gesendete Dynamic Variables
+        response: Response der ElevenLabs API
+        
+    Returns:
+        Tuple (response_body, status_code)
+    """
+    # Parse Response
+    conversation_id = getattr(response, 'conversation_id', 'unknown')
+    call_status = getattr(response, 'status', 'initiated')
+    
+    if structured_logging.verbose:
+        logger.info(f"✅ Call erfolgreich gestartet!")
+        logger.info(f"📞 Conversation ID: {conversation_id}")
+        logger.info(f"📊 Status: {call_status}")
+        logger.info(f"{'='*70}\n")
+    else:
+        structured_logging.event("call.started", campaign_id=params['campaign_id'],
+                                 conversation_id=conversation_id, call_status=call_status,
+                                 dynamic_variables=len(dynamic_vars))
+    
+    # Response zurück an HOC
+    return {
+        "status": "success",
+        "method": "twilio_outbound_call",
+        "message": "Twilio outbound call initiated successfully with Dashboard Workflows + Dynamic Variables",
+        "data": {
+            "campaign_id": params['campaign_id'],
+            "candidate": f"{params['first_name']} {params['last_name']}",
+            "company": params['company_name'],
+            "to_number": params['to_number'],
+            "conversation_id": conversation_id,
+            "call_status": call_status,
+            "questionnaire_loaded": bool(questionnaire),
+            "timestamp": datetime.now().isoformat(),
+            "dynamic_variables_count": len(dynamic_vars),
+            "dynamic_variables_filled": list(dynamic_vars.keys()),
+            "workflow_mode": "dashboard_workflows",
+            "note": "Using ElevenLabs Dashboard Workflows with injected Dynamic Variables"
+        }
+    }, 200
+
+
+def build_webrtc_link_response(params: dict, questionnaire: dict, dynamic_vars_full: dict) -> tuple:
+    """
+    Baut den WebRTC Browser-Link (ElevenLabs Talk-to Page) mit Dynamic Variables als URL-Parameter
+    
+    Args:
+        params: Validierte Parameter aus validate_trigger_request
+        questionnaire: Questionnaire-Daten aus HOC
+        dynamic_vars_full: Alle extrahierten Dynamic Variables
+        
+    Returns:
+        Tuple (response_body, status_code)
+    """
+    # Füge Dynamic Variables als URL-Parameter hinzu
+    # WICHTIG: var_ Prefix für ElevenLabs Public Talk-to Page!
+    # Siehe: https://elevenlabs.io/docs/agents-platform/customization/personalization/dynamic-variables
+    dynamic_vars = {
+        'agent_id': Config.ELEVENLABS_AGENT_ID,
+    }
+    
+    # Füge alle Variablen mit var_ Prefix hinzu
+    for key, value in dynamic_vars_full.items():
+        if value:  # Nur gefüllte Variablen
+            # Kürze große Variablen für URL (questionnaire_context, questions)
+            if key in ['questionnaire_context', 'questions'] and len(str(value)) > 500:
+                value = str(value)[:500] + "..."
+            dynamic_vars[f'var_{key}'] = value
+    
+    # Baue BROWSER-URL für ElevenLabs Public Talk-to Page
+    param_string = urlencode(dynamic_vars)
+    browser_url = f"https://elevenlabs.io/app/talk-to?{param_string}"
+    
+    if structured_logging.verbose:
+        logger.info(f"✅ WebRTC Browser-Link mit Dynamic Variables erstellt!")
+        logger.info(f"📊 Dynamic Variables gefüllt: {len([k for k in dynamic_vars.keys() if k.startswith('var_')])}")
+        logger.info(f"   • agent_id: {Config.ELEVENLABS_AGENT_ID}")
+        for key in sorted([k for k in dynamic_vars.keys() if k.startswith('var_')]):
+            value_preview = str(dynamic_vars[key])[:40] if dynamic_vars[key] else "(leer)"
+            logger.info(f"   • {key}: {value_preview}...")
+        logger.info(f"🔗 Browser URL: {browser_url[:120]}...")
+        logger.info(f"📏 URL-Länge: {len(browser_url)} Zeichen")
+        logger.info(f"{'='*70}\n")
+    else:
+        structured_logging.event("webrtc_link.created", campaign_id=params['campaign_id'], url_length=len(browser_url))
+    
+    return {
+        "status": "success",
+        "method": "webrtc_browser_link",
+        "message": "WebRTC browser link created successfully with dynamic variables",
+        "data": {
+            "campaign_id": params['campaign_id'],
+            "candidate": f"{params['first_name']} {params['last_name']}",
+            "company": params['company_name'],
+            "browser_url": browser_url,
+            "questionnaire_loaded": bool(questionnaire),
+            "questions_count": len(questionnaire.get('questions', [])) if questionnaire else 0,
+            "timestamp": datetime.now().isoformat(),
+            "dynamic_variables_filled": list(dynamic_vars.keys()),
+            "note": "Browser-URL can be opened directly in any web browser"
+        }
+    }, 200
+
+
+def trigger_error_response(error: str, exception: Exception, status_code: int = 500, **extra) -> tuple:
+    """
+    Baut eine Fehler-Antwort für den Call-Request
+    
+    Args:
+        error: Kurze Fehlerbeschreibung (Feld "error")
+        exception: Ursache (Feld "message")
+        status_code: HTTP-Status
+        **extra: Zusätzliche Felder (z.B. retry_after_seconds)
+        
+    Returns:
+        Tuple (response_body, status_code)
+    """
+    body = {
+        "status": "error",
+        "error": error,
+        "message": str(exception),
+        **extra,
+        "timestamp": datetime.now().isoformat()
+    }
+    return body, status_code
+
+
+def dispatch_trigger(params: dict) -> tuple:
+    """
+    Führt einen validierten Call-Request aus: Questionnaire laden, Dynamic Variables
+    extrahieren und Twilio Outbound Call starten bzw. WebRTC Link erstellen
+    
+    Läuft synchron im Request oder asynchron im Dispatch-Worker-Pool.
+    
+    Args:
+        params: Validierte Parameter aus validate_trigger_request
+        
+    Returns:
+        Tuple (response_body, status_code)
+    """
+    campaign_id = params['campaign_id']
+    company_name = params['company_name']
+    first_name = params['first_name']
+    last_name = params['last_name']
+    to_number = params['to_number']
+    agent_phone_number_id = params['agent_phone_number_id']
+    
+    log_trigger_request(params)
+    
+    # 1. Hole Questionnaire aus HOC
+    if structured_logging.verbose:
+        logger.info(f"\n🔄 Lade Questionnaire für Campaign {campaign_id}...")
+    with timing.stage("questionnaire"):
+        questionnaire = fetch_questionnaire_context(campaign_id)
+    
+    if not questionnaire:
+        logger.warning(f"⚠️  Kein Questionnaire gefunden, fahre mit Basis-Prompt fort")
+    
+    # HINWEIS: Enhanced Prompt wird NICHT verwendet, da wir nur Dynamic Variables senden
+    # Der Dashboard-Prompt bleibt unverändert und wird direkt von ElevenLabs verwendet
+    # Die Dynamic Variables werden injiziert und ersetzen {{variable_name}} Platzhalter im Dashboard-Prompt
+    
+    # =================================================================
+    # INTELLIGENTER FALLBACK: SIP Trunk vs. WebRTC Link
+    # =================================================================
+    
+    if to_number:
+        # 📞 OPTION A: TWILIO OUTBOUND CALL (mit Personalisierung)
+        if structured_logging.verbose:
+            logger.info(f"\n{'='*70}")
+            logger.info(f"📞 STARTE TWILIO OUTBOUND CALL (mit voller Personalisierung)")
+            logger.info(f"{'='*70}")
+    
+        try:
+            # ✨ Extrahiere ALLE Dynamic Variables aus Questionnaire
+            dynamic_vars = extract_dynamic_variables(questionnaire, company_name, first_name, last_name, campaign_id)
+            log_call_dynamic_variables(dynamic_vars)
+            
+            # Vor dem Dial berechnet und registriert, damit die Antwort steht, bevor der Personalization Webhook kommt
+            personalization = precompute_personalization(questionnaire, company_name, first_name, last_name, campaign_id)
+    
+            registry_id = preregister_outbound_call(campaign_id, company_name, first_name, last_name, to_number,
+                                                    personalization)
+    
+            # WICHTIG: Nutze twilio.outbound_call mit DIRECT DICT
+            # Nur Dynamic Variables werden gesendet - Dashboard-Prompt bleibt unverändert!
+            # ElevenLabs ersetzt automatisch {{variable_name}} Platzhalter im Dashboard-Prompt
+            try:
+                response = place_outbound_call(agent_phone_number_id, to_number, dynamic_vars)
+            except Exception:
+                discard_outbound_call(registry_id)
+                raise
+            register_outbound_call(campaign_id, company_name, first_name, last_name, to_number, response,
+                                   personalization, agent_phone_number_id, registry_id=registry_id)
+    
+            return build_call_started_response(params, questionnaire, dynamic_vars, response)
+    
+        except GovernorTimeout as capacity_error:
+            logger.warning(f"🚦 Dial-Kapazität erschöpft: {capacity_error}")
+            return trigger_error_response(
+                "Dial capacity exhausted", capacity_error, 503,
+                retry_after_seconds=max(1, int(Config.DIAL_QUEUE_TIMEOUT_SECONDS))
+            )
+    
+        except Exception as api_error:
+            logger.error(f"❌ ElevenLabs API Error: {api_error}", exc_info=True)
+            return trigger_error_response("API call failed", api_error)
+    
+    else:
+        # 🔗 OPTION B: WEBRTC LINK (Fallback)
+        if structured_logging.verbose:
+            logger.info(f"\n{'='*70}")
+            logger.info(f"🔗 ERSTELLE WEBRTC LINK (Kein to_number vorhanden)")
+            logger.info(f"{'='*70}")
+    
+            # WebRTC Links nutzen Dashboard-Konfiguration + Dynamic Variables via URL
+            logger.info("ℹ️  WebRTC Links nutzen Dashboard-Konfiguration mit Dynamic Variables")
+    
+        try:
+            # ✨ NEU: Extrahiere ALLE Dynamic Variables aus Questionnaire
+            dynamic_vars_full = extract_dynamic_variables(questionnaire, company_name, first_name, last_name, campaign_id)
+    
+            with timing.stage("link"):
+                return build_webrtc_link_response(params, questionnaire, dynamic_vars_full)
+    
+        except Exception as api_error:
+            logger.error(f"❌ WebRTC Link Error: {api_error}", exc_info=True)
+            return trigger_error_response("WebRTC Link creation failed", api_error)
 
 
-def extract_priorities(questionnaire: dict) -> str:
-    """
-    Extrahiert Prioritäten aus MUSS-Kriterien - AI-basiert aus questions Array
-    """
-    questions = questionnaire.get('questions', [])
-    if not questions:
-        return ""
-    
-    return extract_variable_with_ai(questions, "companypriorities")
+def wants_async_dispatch(data: dict, prefer_header: str = '') -> bool:
+    """Prüft, ob HOC asynchronen Dispatch angefordert hat (Body-Feld "async" oder Header "Prefer: respond-async")"""
+    if data.get('async') is True or str(data.get('async', '')).lower() in ('1', 'true', 'yes'):
+        return True
+    return 'respond-async' in (prefer_header or '').lower()
 
 
-def build_questions_list(questionnaire: dict) -> str:
+def enqueue_trigger_job(params: dict, callback_url: str = None) -> tuple:
     """
-    Erstellt strukturierte Fragenliste (Dashboard)
-    ALLE Fragen kombiniert
+    Legt einen Job für den Call-Request an und übergibt ihn dem Dispatch-Worker-Pool
     
     Args:
-        questionnaire: Questionnaire-Daten aus HOC
+        params: Validierte Parameter aus validate_trigger_request
+        callback_url: Optionale URL, an die das Ergebnis nach Abschluss gesendet wird
         
     Returns:
-        Formatierte Fragenliste als String
+        Tuple (response_body, 202) mit Job-ID
     """
-    try:
-        questions_text = "=== ALLE FRAGEN (Überblick) ===\n\n"
-        
-        if questionnaire.get('questions'):
-            questions = questionnaire['questions']
-            
-            # Gruppiere nach Kategorien
-            must_questions = [q for q in questions if q.get('priority') == 1]
-            optional_questions = [q for q in questions if q.get('priority') == 2]
-            
-            if must_questions:
-                questions_text += "MUSS-FRAGEN (Priority 1):\n"
-                for i, q in enumerate(must_questions, 1):
-                    question_text = q.get('question', '')
-                    context = q.get('context', '')
-                    questions_text += f"{i}. {question_text}\n"
-                    if context:
-                        questions_text += f"   (Hinweis: {context})\n"
-                questions_text += "\n"
-            
-            if optional_questions:
-                questions_text += "ZUSÄTZLICHE FRAGEN (Priority 2):\n"
-                for i, q in enumerate(optional_questions, 1):
-                    question_text = q.get('question', '')
-                    questions_text += f"{i}. {question_text}\n"
-        
-        return questions_text
-    except Exception as e:
-        logger.warning(f"⚠️ Fehler beim Erstellen der Fragenliste: {e}")
-        return ""
+    job_id = job_store.create("trigger-call", params, callback_url=callback_url)
+    metrics.DISPATCH_QUEUE_DEPTH.inc()
+    call_dispatch_executor.submit(run_trigger_job, job_id, params, callback_url)
+    
+    logger.info(f"📥 Call-Request als Job {job_id} eingereiht (Campaign {params['campaign_id']})")
+    
+    return {
+        "status": "accepted",
+        "job_id": job_id,
+        "status_url": f"/webhook/jobs/{job_id}",
+        "campaign_id": params['campaign_id'],
+        "candidate": f"{params['first_name']} {params['last_name']}",
+        "timestamp": datetime.now().isoformat()
+    }, 202
 
 
-def is_job_title_question(question: dict) -> bool:
+def run_trigger_job(job_id: str, params: dict, callback_url: str = None) -> None:
     """
-    Prüft, ob eine Frage eine Stellentitel- oder Alternativtitel-Frage ist
+    Führt einen eingereihten Call-Request im Dispatch-Worker-Pool aus
     
     Args:
-        question: Frage-Dict aus Questionnaire
-        
-    Returns:
-        True wenn es sich um eine Stellentitel-Frage handelt
-    """
-    question_text = (question.get('question', '') or '').lower()
-    context = (question.get('context', '') or '').lower()
-    group = (question.get('group', '') or '').lower()
-    
-    # Schlüsselwörter, die auf Stellentitel-Fragen hindeuten
-    title_keywords = [
-        'stellentitel', 'stellen-titel', 'job-titel', 'jobtitel',
-        'position', 'rolle', 'beruf', 'berufsbezeichnung',
-        'alternativtitel', 'alternativ-titel', 'alternative position',
-        'alternative rolle', 'alternative stelle'
-    ]
-    
-    # Prüfe ob eines der Schlüsselwörter im Frage-Text, Context oder Group vorkommt
-    for keyword in title_keywords:
-        if keyword in question_text or keyword in context or keyword in group:
-            return True
+        job_id: Job-ID
+        params: Validierte Parameter aus validate_trigger_request
+        callback_url: Optionale URL für die Abschluss-Benachrichtigung
+    """
+    metrics.DISPATCH_QUEUE_DEPTH.dec()
+    timer = timing.start_request("trigger-call-job")
+    try:
+        job_store.mark_running(job_id)
+        response_body, status_code = dispatch_trigger(params)
+        job_store.finish(job_id, status_code, attach_timings(response_body))
+        logger.info(f"✅ Job {job_id} abgeschlossen (HTTP {status_code})")
+    except Exception as e:
+        logger.error(f"❌ Job {job_id} fehlgeschlagen: {e}", exc_info=True)
+        job_store.fail(job_id, str(e))
+    finally:
+        timing.finish_request(timer, job_id=job_id)
     
-    return False
+    if callback_url:
+        send_job_callback(job_id, callback_url)
 
 
-def build_gate_questions(questionnaire: dict) -> str:
+def send_job_callback(job_id: str, callback_url: str) -> None:
     """
-    Erstellt Liste der MUSS-Fragen (Priority=1) für Phase 2 (Gate)
-    
-    WICHTIG: Nur Stellentitel/Alternativtitel-Fragen führen zum Abbruch!
-    Andere Muss-Kriterien sind wichtig, aber nicht zwingend.
+    Sendet den Endstatus eines Jobs per POST an die Callback-URL von HOC
     
     Args:
-        questionnaire: Questionnaire-Daten aus HOC
-        
-    Returns:
-        Formatierte Liste nur der Priority=1 Fragen (Stellentitel zuerst!)
+        job_id: Job-ID
+        callback_url: Ziel-URL
     """
+    job = job_store.get(job_id)
     try:
-        gate_text = "=== MUSS-KRITERIEN (Gate) für Phase 2 ===\n\n"
-        gate_text += "Diese Fragen MÜSSEN in Phase 2 gestellt werden.\n"
-        gate_text += "⚠️ WICHTIG: Nur Stellentitel/Alternativtitel-Fragen führen bei Nichterfüllung zum Abbruch!\n"
-        gate_text += "Andere Muss-Kriterien sind wichtig, aber nicht zwingend.\n\n"
-        
-        if questionnaire.get('questions'):
-            questions = questionnaire['questions']
-            
-            # Nur Priority=1 Fragen
-            must_questions = [q for q in questions if q.get('priority') == 1]
-            
-            if must_questions:
-                # Trenne Stellentitel-Fragen von anderen Muss-Kriterien
-                job_title_questions = []
-                other_must_questions = []
-                
-                for q in must_questions:
-                    if is_job_title_question(q):
-                        job_title_questions.append(q)
-                    else:
-                        other_must_questions.append(q)
-                
-                # Stellentitel-Fragen ZUERST (kritisch - führen zum Abbruch)
-                if job_title_questions:
-                    gate_text += "🔴 KRITISCHE FRAGEN (führen bei Nichterfüllung zum Abbruch):\n\n"
-                    for i, q in enumerate(job_title_questions, 1):
-                        question_text = q.get('question', '')
-                        question_type = q.get('question_type', 'boolean').upper()
-                        context = q.get('context', '')
-                        preamble = q.get('preamble', '')
-                        
-                        gate_text += f"{i}. [{question_type}] {question_text}\n"
-                        gate_text += "   ⚠️ KRITISCH: Bei Nichterfüllung → Gespräch beenden!\n"
-                        
-                        if context:
-                            gate_text += f"   → Kontext: {context}\n"
-                        if preamble:
-                            gate_text += f"   → Preamble: \"{preamble}\"\n"
-                        
-                        gate_text += "\n"
-                    
-                    gate_text += "⚠️ BEI NICHTERFÜLLUNG VON STELLENTITEL/ALTERNATIVTITEL:\n"
-                    gate_text += "\"Vielen Dank für Ihre Offenheit. Leider passt Ihre Qualifikation nicht zu den verfügbaren Positionen.\n"
-                    gate_text += "Deshalb können wir das Gespräch hier leider nicht fortsetzen. Vielen Dank für Ihr Interesse und alles Gute für Ihre weitere Suche.\"\n\n"
-                
-                # Andere Muss-Kriterien (wichtig, aber nicht zwingend)
-                if other_must_questions:
-                    gate_text += "🟡 WICHTIGE FRAGEN (sollten erfüllt sein, führen aber NICHT zum Abbruch):\n\n"
-                    for i, q in enumerate(other_must_questions, 1):
-                        question_text = q.get('question', '')
-                        question_type = q.get('question_type', 'boolean').upper()
-                        context = q.get('context', '')
-                        preamble = q.get('preamble', '')
-                        
-                        gate_text += f"{i}. [{question_type}] {question_text}\n"
-                        gate_text += "   ℹ️ WICHTIG: Sollte erfüllt sein, aber kein Abbruch-Grund\n"
-                        
-                        if context:
-                            gate_text += f"   → Kontext: {context}\n"
-                        if preamble:
-                            gate_text += f"   → Preamble: \"{preamble}\"\n"
-                        
-                        gate_text += "\n"
-            else:
-                gate_text += "(Keine Muss-Kriterien definiert)\n"
-        else:
-            gate_text += "(Keine Fragen vorhanden)\n"
-        
-        total_must = len([q for q in questionnaire.get('questions', []) if q.get('priority') == 1])
-        job_title_count = len([q for q in questionnaire.get('questions', []) if q.get('priority') == 1 and is_job_title_question(q)])
-        logger.info(f"✅ Gate Questions erstellt: {total_must} Muss-Kriterien ({job_title_count} Stellentitel-Fragen, {total_must - job_title_count} andere)")
-        return gate_text
-        
+        response = http_pool.get_session("callback").post(
+            callback_url,
+            json=job,
+            headers={"Content-Type": "application/json", "X-Webhook-Job-Id": job_id},
+            timeout=10,
+            allow_redirects=False
+        )
+        callback_status = f"HTTP {response.status_code}"
+        logger.info(f"📤 Job-Callback für {job_id} gesendet: {callback_status}")
     except Exception as e:
-        logger.warning(f"⚠️ Fehler beim Erstellen der Gate Questions: {e}")
-        return ""
+        callback_status = f"error: {e}"
+        logger.warning(f"⚠️ Job-Callback für {job_id} fehlgeschlagen: {e}")
+    
+    job_store.set_callback_status(job_id, callback_status)
 
 
-def build_preference_questions(questionnaire: dict) -> str:
+@app.route('/webhook/trigger-call', methods=['POST'])
+@track_timing("trigger-call")
+@require_api_key
+def trigger_outbound_call():
     """
-    Erstellt Liste der Präferenz-Fragen (Priority=2) für Phase 4
+    Webhook Endpoint: Empfängt Call-Request von HOC
     
-    Args:
-        questionnaire: Questionnaire-Daten aus HOC
-        
-    Returns:
-        Formatierte Liste nur der Priority=2 Fragen
+    Intelligenter Fallback:
+    - Wenn to_number vorhanden → Outbound SIP Trunk Call (Twilio)
+    - Wenn to_number fehlt → WebRTC Link erstellen (Browser-basiert)
+    
+    Erwartet JSON:
+    {
+        "campaign_id": 123,
+        "company_name": "Tech Startup GmbH",
+        "candidate_first_name": "Max",
+        "candidate_last_name": "Mustermann",
+        "to_number": "+491234567890" (optional - falls fehlt: WebRTC Link),
+        "agent_phone_number_id": "phnum_xxx..." (nur für SIP Trunk),
+        "async": true (optional - sofort 202 + Job-ID, alternativ Header "Prefer: respond-async"),
+        "callback_url": "https://..." (optional - POST des Ergebnisses nach Abschluss, nur mit async;
+                                        Host muss in JOB_CALLBACK_ALLOWED_HOSTS stehen)
+    }
     """
     try:
-        pref_text = "=== PRÄFERENZEN & WÜNSCHE für Phase 4 ===\n\n"
-        pref_text += "Diese Fragen werden in Phase 4 gestellt.\n"
-        pref_text += "Nutze Preamble als Einleitung, falls vorhanden!\n\n"
-        
-        if questionnaire.get('questions'):
-            questions = questionnaire['questions']
+        with timing.stage("parse"):
+            # Parse Request - robuster JSON Parsing
+            data = request.get_json(force=True, silent=True)
             
-            # Nur Priority=2 Fragen
-            optional_questions = [q for q in questions if q.get('priority') == 2]
+            # Falls get_json() None oder String zurückgibt, versuche manuell zu parsen
+            if not data or isinstance(data, str):
+                try:
+                    if isinstance(data, str):
+                        # data ist bereits ein String, parse es
+                        data = json.loads(data)
+                    elif request.data:
+                        # Versuche request.data zu parsen
+                        data = json.loads(request.data.decode('utf-8'))
+                    else:
+                        return jsonify({
+                            "error": "No JSON data provided",
+                            "message": "Request body is empty"
+                        }), 400
+                except (json.JSONDecodeError, AttributeError, UnicodeDecodeError) as e:
+                    logger.error(f"❌ JSON Parse Error: {e}")
+                    logger.error(f"Request data: {request.data[:200] if request.data else 'None'}")
+                    return jsonify({
+                        "error": "Invalid JSON format",
+                        "message": f"Could not parse JSON: {str(e)}"
+                    }), 400
             
-            if optional_questions:
-                for i, q in enumerate(optional_questions, 1):
-                    question_text = q.get('question', '')
-                    question_type = q.get('question_type', 'boolean').upper()
-                    preamble = q.get('preamble', '')
-                    help_text = q.get('help_text', '')
-                    options = q.get('options', None)
-                    
-                    pref_text += f"{i}. [{question_type}] {question_text}\n"
-                    
-                    if preamble:
-                        pref_text += f"   → Preamble: \"{preamble}\" (Nutze als Einleitung!)\n"
-                    if help_text:
-                        pref_text += f"   → Help Text: {help_text}\n"
-                    if options:
-                        pref_text += f"   → Optionen: {options}\n"
-                    
-                    pref_text += "\n"
-            else:
-                pref_text += "(Keine optionalen Fragen definiert)\n"
-        else:
-            pref_text += "(Keine Fragen vorhanden)\n"
-        
-        logger.info(f"✅ Preference Questions erstellt: {len([q for q in questionnaire.get('questions', []) if q.get('priority') == 2])} Fragen")
-        return pref_text
+            # Sicherstellen dass data ein Dict ist
+            if not isinstance(data, dict):
+                logger.error(f"❌ Data is not a dict, type: {type(data)}, value: {data}")
+                return jsonify({
+                    "error": "Invalid request format",
+                    "message": f"Request body must be a JSON object (dict), got {type(data).__name__}"
+                }), 400
+            
+            params, error = validate_trigger_request(data)
+            if error:
+                error_body, status_code = error
+                return jsonify(error_body), status_code
+        
+        # Opt-in: Asynchroner Dispatch → sofort 202 mit Job-ID
+        if wants_async_dispatch(data, request.headers.get('Prefer', '')):
+            response_body, status_code = enqueue_trigger_job(params, data.get('callback_url'))
+            return jsonify(response_body), status_code
+        
+        response_body, status_code = dispatch_trigger(params)
+        attach_timings(response_body)
+        if status_code == 503 and 'retry_after_seconds' in response_body:
+            return jsonify(response_body), status_code, {"Retry-After": str(response_body['retry_after_seconds'])}
+        return jsonify(response_body), status_code
         
     except Exception as e:
-        logger.warning(f"⚠️ Fehler beim Erstellen der Preference Questions: {e}")
-        return ""
+        logger.error(f"❌ Fehler beim Call: {e}", exc_info=True)
+        
+        return jsonify({
+            "status": "error",
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }), 500
 
 
-def extract_dynamic_variables(questionnaire: dict, company_name: str, first_name: str, last_name: str) -> dict:
+def dial_batch_candidate(index: int, candidate: dict, campaign: dict) -> dict:
     """
-    Extrahiert alle Dynamic Variables aus dem HOC Questionnaire
-    für ElevenLabs Dashboard-Workflows
-    
-    NUTZT AI (GPT-4o-mini) für intelligente Extraktion aus questions Array
+    Startet den Call für einen Kandidaten eines Batches (läuft im Batch-Dial-Pool)
     
     Args:
-        questionnaire: Questionnaire-Daten aus HOC
-        company_name: Firmenname
-        first_name: Vorname Kandidat
-        last_name: Nachname Kandidat
+        index: Position des Kandidaten im Request
+        candidate: Kandidaten-Daten aus dem Request
+        campaign: Gemeinsame Kampagnen-Daten (Questionnaire, AI-Variablen, Firma, ...)
         
     Returns:
-        Dict mit allen Dynamic Variables für ElevenLabs
+        Ergebnis-Dict für diesen Kandidaten
     """
-    logger.info("🔍 Extrahiere Dynamic Variables aus Questionnaire (AI-basiert)...")
-    
-    # BASIS-VARIABLEN (immer vorhanden)
-    variables = {
-        "candidatefirst_name": first_name,
-        "candidatelast_name": last_name,
-        "companyname": company_name
+    first_name = candidate.get('candidate_first_name')
+    last_name = candidate.get('candidate_last_name')
+    to_number = candidate.get('to_number')
+    agent_phone_number_id = candidate.get('agent_phone_number_id') or campaign['agent_phone_number_id']
+    
+    result = {
+        "type": "result",
+        "index": index,
+        "candidate": f"{first_name or ''} {last_name or ''}".strip(),
+        "to_number": to_number
     }
     
-    # Hole questions Array
-    questions = questionnaire.get('questions', [])
-    
-    # AI-BASIERTE EXTRAKTION
-    if questions and len(questions) > 0:
-        logger.info(f"📊 {len(questions)} Fragen gefunden - starte AI-Extraktion...")
-        
-        # Extrahiere mit AI (parallel möglich, aber sequential für Einfachheit)
-        variables["campaignlocation_label"] = extract_with_ai(questions, "campaignlocation_label")
-        variables["companypriorities"] = extract_with_ai(questions, "companypriorities")
-        variables["companysize"] = extract_with_ai(questions, "companysize")
-        variables["companypitch"] = extract_with_ai(questions, "companypitch")
-        variables["campaignrole_title"] = extract_with_ai(questions, "campaignrole_title")  # NEU: AI-Extraktion für Job-Titel
-    else:
-        # ✅ WICHTIG: Keine Fragen im Questionnaire
-        logger.warning("⚠️  Keine Fragen im Questionnaire - AI-Extraktion übersprungen")
-        if questionnaire:
-            logger.warning(f"   Questionnaire-Struktur: {list(questionnaire.keys())}")
-            logger.warning(f"   'questions' Array: {questions if questions else 'leer oder fehlt'}")
-            logger.warning(f"   → Campaign hat möglicherweise keine Fragen im HOC System konfiguriert")
-        else:
-            logger.warning(f"   → Questionnaire ist komplett leer")
-        
-        # Setze alle auf leere Strings (außer campaignrole_title mit Fallback)
-        variables["campaignlocation_label"] = ""
-        variables["companypriorities"] = ""
-        variables["companysize"] = ""
-        variables["companypitch"] = ""
-        variables["campaignrole_title"] = "Ihre Position"  # Fallback
+    missing = [field for field in ('candidate_first_name', 'candidate_last_name', 'to_number') if not candidate.get(field)]
+    if missing:
+        result.update({"status": "error", "error": "Missing required fields", "missing": missing})
+        return result
     
-    # KONTEXT-VARIABLEN (strukturiert)
-    variables["questionnaire_context"] = build_questionnaire_context(questionnaire, company_name, first_name, last_name)
-    variables["questions"] = build_questions_list(questionnaire)
+    if not agent_phone_number_id:
+        result.update({"status": "error", "error": "Missing agent_phone_number_id"})
+        return result
     
-    # PHASEN-SPEZIFISCHE FRAGEN (NEU!)
-    variables["gate_questions"] = build_gate_questions(questionnaire)  # Phase 2: MUSS-Kriterien (nur Stellentitel führen zum Abbruch)
-    variables["preference_questions"] = build_preference_questions(questionnaire)  # Phase 4: Präferenzen
+    try:
+        dynamic_vars = extract_dynamic_variables(
+            campaign['questionnaire'], campaign['company_name'], first_name, last_name,
+            campaign['campaign_id'], campaign_variables=campaign['campaign_variables']
+        )
+        personalization = precompute_personalization(
+            campaign['questionnaire'], campaign['company_name'], first_name, last_name, campaign['campaign_id']
+        )
+        
+        registry_id = preregister_outbound_call(campaign['campaign_id'], campaign['company_name'], first_name,
+                                                last_name, to_number, personalization)
+        
+        try:
+            response = place_outbound_call(agent_phone_number_id, to_number, dynamic_vars)
+        except Exception:
+            discard_outbound_call(registry_id)
+            raise
+        register_outbound_call(campaign['campaign_id'], campaign['company_name'], first_name, last_name,
+                               to_number, response, personalization, agent_phone_number_id,
+                               registry_id=registry_id)
+        
+        result.update({
+            "status": "success",
+            "conversation_id": getattr(response, 'conversation_id', 'unknown'),
+            "call_sid": getattr(response, 'call_sid', None),
+            "timestamp": datetime.now().isoformat()
+        })
+        if structured_logging.verbose:
+            logger.info(f"✅ Batch-Call {index} gestartet: {result['candidate']} ({result['conversation_id']})")
+    except GovernorTimeout as e:
+        logger.warning(f"🚦 Batch-Call {index} nicht gestartet, Dial-Kapazität erschöpft: {e}")
+        result.update({"status": "error", "error": "Dial capacity exhausted", "message": str(e)})
+    except Exception as e:
+        logger.error(f"❌ Batch-Call {index} fehlgeschlagen ({result['candidate']}): {e}")
+        result.update({"status": "error", "error": "API call failed", "message": str(e)})
     
-    # Log welche Variablen gefüllt wurden
-    filled_vars = [k for k, v in variables.items() if v]
-    logger.info(f"✅ {len(filled_vars)}/{len(variables)} Dynamic Variables gefüllt:")
-    for var in filled_vars:
-        value_preview = str(variables[var])[:50]
-        logger.info(f"   • {var}: {value_preview}...")
+    return result
+
+
+def batch_sync_limit() -> int:
+    """
+    Maximale Kandidatenzahl, die synchron gewählt wird
     
-    return variables
+    Ein Batch blockiert einen gunicorn sync Worker ca. N / DIAL_RATE_PER_SECOND Sekunden;
+    BATCH_SYNC_MAX_SECONDS bleibt mit Abstand unter dem gunicorn --timeout (120s).
+    """
+    return max(1, int(Config.DIAL_RATE_PER_SECOND * Config.BATCH_SYNC_MAX_SECONDS))
 
 
-def build_questionnaire_context(questionnaire: dict, company_name: str, first_name: str, last_name: str) -> str:
+def start_batch(campaign_id: int, company_name: str, agent_phone_number_id: str, candidates: list) -> tuple:
     """
-    Erstellt Questionnaire-Kontext als formatierten Text
+    Lädt Questionnaire und AI-Variablen EINMAL und übergibt alle Kandidaten dem Batch-Dial-Pool
     
     Args:
-        questionnaire: Questionnaire-Daten aus HOC (enthält 'questions' Array)
+        campaign_id: Campaign ID
         company_name: Firmenname
-        first_name: Vorname Kandidat
-        last_name: Nachname Kandidat
+        agent_phone_number_id: Default Phone-Number-ID des Batches
+        candidates: Kandidaten-Daten aus dem Request
         
     Returns:
-        Questionnaire-Kontext als formatierter Text mit Fragen
+        Tuple (questionnaire, futures) - ein Future pro Kandidat in Request-Reihenfolge
     """
-    
-    # KONTEXT: Basis-Informationen
-    questionnaire_context = f"""
-===================================
-KONTEXT AUS QUESTIONNAIRE:
-===================================
-
-Kandidat: {first_name} {last_name}
-Firma: {company_name}
-"""
+    questionnaire = fetch_questionnaire_context(campaign_id)
+    if not questionnaire:
+        logger.warning(f"⚠️  Kein Questionnaire gefunden, fahre mit Basis-Variablen fort")
     
     if questionnaire and questionnaire.get('questions'):
-        questions = questionnaire['questions']
-        
-        # Gruppiere Fragen nach Kategorien
-        questions_by_category = {}
-        for q in questions:
-            if isinstance(q, dict):
-                category = q.get('category', 'general')
-                group = q.get('group', 'Allgemein')
-                
-                if category not in questions_by_category:
-                    questions_by_category[category] = {
-                        'group': group,
-                        'questions': []
-                    }
-                
-                questions_by_category[category]['questions'].append(q)
-        
-        # Formatiere Fragen nach Kategorien
-        questionnaire_context += f"\n\n📋 FRAGEN ZU KLÄREN ({len(questions)} insgesamt):\n"
-        questionnaire_context += "="*50
-        
-        # Sortiere nach category_order wenn vorhanden
-        sorted_categories = sorted(
-            questions_by_category.items(),
-            key=lambda x: x[1]['questions'][0].get('category_order', 99) if x[1]['questions'] else 99
-        )
-        
-        for category, data in sorted_categories:
-            group_name = data['group']
-            category_questions = data['questions']
-            
-            questionnaire_context += f"\n\n🔹 {group_name.upper()}:"
-            
-            # Sortiere Fragen nach Priority (1 = wichtig, 2 = optional)
-            must_questions = [q for q in category_questions if q.get('priority') == 1]
-            optional_questions = [q for q in category_questions if q.get('priority') == 2]
-            
-            if must_questions:
-                questionnaire_context += f"\n\n  ⚠️  MUSS-KRITERIEN:"
-                for q in must_questions:
-                    question_text = q.get('question', '')
-                    context = q.get('context', '')
-                    preamble = q.get('preamble', '')
-                    
-                    questionnaire_context += f"\n  • {question_text}"
-                    if context:
-                        questionnaire_context += f"\n    (Kontext: {context})"
-                    if preamble:
-                        questionnaire_context += f"\n    (Überleitung: {preamble})"
-            
-            if optional_questions:
-                questionnaire_context += f"\n\n  ℹ️  ZUSÄTZLICHE FRAGEN:"
-                for q in optional_questions:
-                    question_text = q.get('question', '')
-                    preamble = q.get('preamble', '')
-                    
-                    questionnaire_context += f"\n  • {question_text}"
-                    if preamble:
-                        questionnaire_context += f"\n    (Überleitung: {preamble})"
-    
-    questionnaire_context += "\n\n===================================\n"
+        campaign_variables = extract_campaign_variables(questionnaire, campaign_id)
+    else:
+        campaign_variables = dict(AI_VARIABLE_FALLBACKS)
+    
+    campaign = {
+        "campaign_id": campaign_id,
+        "company_name": company_name,
+        "agent_phone_number_id": agent_phone_number_id,
+        "questionnaire": questionnaire,
+        "campaign_variables": campaign_variables
+    }
     
-    logger.info(f"📝 Questionnaire-Kontext erstellt: {len(questionnaire_context)} Zeichen")
+    futures = [
+        batch_dial_executor.submit(dial_batch_candidate, index, candidate, campaign)
+        for index, candidate in enumerate(candidates)
+    ]
+    return questionnaire, futures
+
+
+def batch_summary(campaign_id: int, questionnaire: dict, results: list) -> dict:
+    """Zusammenfassung eines Batches (letzte Zeile im NDJSON-Stream)"""
+    succeeded = len([r for r in results if r.get('status') == 'success'])
+    return {
+        "type": "summary",
+        "status": "success" if succeeded == len(results) else ("partial" if succeeded else "error"),
+        "campaign_id": campaign_id,
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "questionnaire_loaded": bool(questionnaire),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+def batch_result(campaign_id: int, questionnaire: dict, results: list) -> dict:
+    """Response-Body eines abgeschlossenen Batches (Zusammenfassung + Ergebnis pro Kandidat)"""
+    response_body = batch_summary(campaign_id, questionnaire, results)
+    response_body.pop("type")
+    response_body["results"] = results
     
-    return questionnaire_context
+    logger.info(f"✅ Batch abgeschlossen: {response_body['succeeded']}/{response_body['total']} Calls gestartet")
+    if structured_logging.verbose:
+        logger.info(f"{'='*70}\n")
+    return response_body
 
 
-@app.route('/webhook/trigger-call', methods=['POST'])
+def run_batch_job(job_id: str, campaign_id: int, company_name: str, agent_phone_number_id: str,
+                  candidates: list) -> None:
+    """Führt einen eingereihten Batch im Dispatch-Worker-Pool aus (Ergebnis unter /webhook/jobs/<job_id>)"""
+    try:
+        job_store.mark_running(job_id)
+        questionnaire, futures = start_batch(campaign_id, company_name, agent_phone_number_id, candidates)
+        job_store.finish(job_id, 200, batch_result(campaign_id, questionnaire, [future.result() for future in futures]))
+    except Exception as e:
+        logger.error(f"❌ Batch-Job {job_id} fehlgeschlagen: {e}", exc_info=True)
+        job_store.fail(job_id, str(e))
+
+
+@app.route('/webhook/trigger-calls/batch', methods=['POST'])
 @require_api_key
-def trigger_outbound_call():
+def trigger_outbound_calls_batch():
     """
-    Webhook Endpoint: Empfängt Call-Request von HOC
+    Webhook Endpoint: Startet Outbound Calls für eine ganze Kandidaten-Liste einer Kampagne
     
-    Intelligenter Fallback:
-    - Wenn to_number vorhanden → Outbound SIP Trunk Call (Twilio)
-    - Wenn to_number fehlt → WebRTC Link erstellen (Browser-basiert)
+    Questionnaire und AI-Variablen werden EINMAL pro Batch geladen/extrahiert,
+    die Calls laufen danach rate-limitiert und parallel.
+    
+    Batches über DIAL_RATE_PER_SECOND × BATCH_SYNC_MAX_SECONDS Kandidaten (Default 120)
+    laufen als Job: 202 + Job-ID, Ergebnis unter /webhook/jobs/<job_id>.
     
     Erwartet JSON:
     {
         "campaign_id": 123,
         "company_name": "Tech Startup GmbH",
-        "candidate_first_name": "Max",
-        "candidate_last_name": "Mustermann",
-        "to_number": "+491234567890" (optional - falls fehlt: WebRTC Link),
-        "agent_phone_number_id": "phnum_xxx..." (nur für SIP Trunk)
+        "agent_phone_number_id": "phnum_xxx..." (optional, Default aus Config),
+        "stream": false (optional - true: Ergebnisse als NDJSON streamen),
+        "async": false (optional - true: immer 202 + Job-ID),
+        "candidates": [
+            {"candidate_first_name": "Max", "candidate_last_name": "Mustermann", "to_number": "+491234567890"},
+            ...
+        ]
     }
     """
     try:
-        # Parse Request - robuster JSON Parsing
         data = request.get_json(force=True, silent=True)
-        
-        # Falls get_json() None oder String zurückgibt, versuche manuell zu parsen
-        if not data or isinstance(data, str):
-            try:
-                if isinstance(data, str):
-                    # data ist bereits ein String, parse es
-                    data = json.loads(data)
-                elif request.data:
-                    # Versuche request.data zu parsen
-                    data = json.loads(request.data.decode('utf-8'))
-                else:
-                    return jsonify({
-                        "error": "No JSON data provided",
-                        "message": "Request body is empty"
-                    }), 400
-            except (json.JSONDecodeError, AttributeError, UnicodeDecodeError) as e:
-                logger.error(f"❌ JSON Parse Error: {e}")
-                logger.error(f"Request data: {request.data[:200] if request.data else 'None'}")
-                return jsonify({
-                    "error": "Invalid JSON format",
-                    "message": f"Could not parse JSON: {str(e)}"
-                }), 400
-        
-        # Sicherstellen dass data ein Dict ist
         if not isinstance(data, dict):
-            logger.error(f"❌ Data is not a dict, type: {type(data)}, value: {data}")
             return jsonify({
                 "error": "Invalid request format",
-                "message": f"Request body must be a JSON object (dict), got {type(data).__name__}"
+                "message": "Request body must be a JSON object"
             }), 400
         
-        # Validiere erforderliche Felder
-        required_fields = ['campaign_id', 'company_name', 'candidate_first_name', 
-                          'candidate_last_name']  # to_number ist jetzt OPTIONAL!
+        missing = [f for f in ('campaign_id', 'company_name', 'candidates') if not data.get(f)]
+        if missing:
+            return jsonify({
+                "error": "Missing required fields",
+                "missing": missing
+            }), 400
         
-        missing_fields = [field for field in required_fields if not data.get(field)]
+        candidates = data['candidates']
+        if not isinstance(candidates, list) or not all(isinstance(c, dict) for c in candidates):
+            return jsonify({
+                "error": "Invalid candidates",
+                "message": "candidates must be a list of JSON objects"
+            }), 400
         
-        if missing_fields:
+        if len(candidates) > Config.BATCH_MAX_CANDIDATES:
             return jsonify({
-                "error": "Missing required fields",
-                "missing": missing_fields
+                "error": "Batch too large",
+                "message": f"Maximum {Config.BATCH_MAX_CANDIDATES} candidates per batch, got {len(candidates)}"
             }), 400
         
-        # Extrahiere Daten
         campaign_id = int(data['campaign_id'])
         company_name = data['company_name']
-        first_name = data['candidate_first_name']
-        last_name = data['candidate_last_name']
-        to_number = data.get('to_number')  # OPTIONAL!
-        agent_phone_number_id = data.get('agent_phone_number_id')  # Optional, nur für SIP Trunk
-        override_prompt = data.get('override_prompt')
-        
-        # Validiere agent_phone_number_id nur wenn to_number vorhanden (SIP Trunk)
-        if to_number and not agent_phone_number_id:
-            # Versuche aus Config zu holen
-            agent_phone_number_id = Config.ELEVENLABS_AGENT_PHONE_NUMBER_ID if hasattr(Config, 'ELEVENLABS_AGENT_PHONE_NUMBER_ID') else None
-            
-            if not agent_phone_number_id:
-                return jsonify({
-                    "error": "Missing agent_phone_number_id",
-                    "message": "Provide agent_phone_number_id in request for SIP trunk calls"
-                }), 400
-        
-        logger.info(f"\n{'='*70}")
-        if to_number:
-            logger.info(f"📞 NEUE CALL-ANFRAGE VON HOC (SIP TRUNK)")
-        else:
-            logger.info(f"🔗 NEUE LINK-ANFRAGE VON HOC (WEBRTC)")
-        logger.info(f"{'='*70}")
-        logger.info(f"⏰ Zeit: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        logger.info(f"📋 Campaign-ID: {campaign_id}")
-        logger.info(f"👤 Kandidat: {first_name} {last_name}")
-        logger.info(f"🏢 Firma: {company_name}")
-        if to_number:
-            logger.info(f"📞 Nummer: {to_number}")
-            logger.info(f"📱 Phone Number ID: {agent_phone_number_id}")
-        else:
-            logger.info(f"🔗 Methode: WebRTC Link (kein to_number)")
-        
-        # 1. Hole Questionnaire aus HOC
-        logger.info(f"\n🔄 Lade Questionnaire für Campaign {campaign_id}...")
-        questionnaire = fetch_questionnaire_context(campaign_id)
-        
-        if not questionnaire:
-            logger.warning(f"⚠️  Kein Questionnaire gefunden, fahre mit Basis-Prompt fort")
+        agent_phone_number_id = data.get('agent_phone_number_id') or Config.ELEVENLABS_AGENT_PHONE_NUMBER_ID
         
-        # HINWEIS: Enhanced Prompt wird NICHT verwendet, da wir nur Dynamic Variables senden
-        # Der Dashboard-Prompt bleibt unverändert und wird direkt von ElevenLabs verwendet
-        # Die Dynamic Variables werden injiziert und ersetzen {{variable_name}} Platzhalter im Dashboard-Prompt
-        
-        # =================================================================
-        # INTELLIGENTER FALLBACK: SIP Trunk vs. WebRTC Link
-        # =================================================================
-        
-        if to_number:
-            # 📞 OPTION A: TWILIO OUTBOUND CALL (mit Personalisierung)
+        if structured_logging.verbose:
             logger.info(f"\n{'='*70}")
-            logger.info(f"📞 STARTE TWILIO OUTBOUND CALL (mit voller Personalisierung)")
+            logger.info(f"📞 NEUE BATCH-ANFRAGE VON HOC: {len(candidates)} Kandidaten")
             logger.info(f"{'='*70}")
+            logger.info(f"📋 Campaign-ID: {campaign_id}")
+            logger.info(f"🏢 Firma: {company_name}")
+        
+        # Größere Batches würden den gunicorn Worker über --timeout blockieren → Job (202 + Job-ID)
+        sync_limit = batch_sync_limit()
+        if len(candidates) > sync_limit or wants_async_dispatch(data, request.headers.get('Prefer', '')):
+            job_id = job_store.create("trigger-calls-batch", {
+                "campaign_id": campaign_id,
+                "company_name": company_name,
+                "agent_phone_number_id": agent_phone_number_id,
+                "candidates": len(candidates)
+            })
+            call_dispatch_executor.submit(run_batch_job, job_id, campaign_id, company_name, agent_phone_number_id,
+                                          candidates)
+            logger.info(f"📥 Batch mit {len(candidates)} Kandidaten als Job {job_id} eingereiht "
+                        f"(synchron maximal {sync_limit})")
             
-            try:
-                # ✨ Extrahiere ALLE Dynamic Variables aus Questionnaire
-                dynamic_vars = extract_dynamic_variables(questionnaire, company_name, first_name, last_name)
-                
-                logger.info(f"📊 {len(dynamic_vars)} Dynamic Variables extrahiert:")
-                for key in dynamic_vars.keys():
-                    value_preview = str(dynamic_vars[key])[:50] if dynamic_vars[key] else "(leer)"
-                    logger.info(f"   • {key}: {value_preview}...")
-                
-                # WICHTIG: Prüfe ob wichtige Variablen vorhanden sind
-                important_vars = ['campaignlocation_label', 'campaignrole_title', 'companypriorities', 'companypitch', 'questionnaire_context']
-                missing_vars = [v for v in important_vars if not dynamic_vars.get(v)]
-                if missing_vars:
-                    logger.warning(f"⚠️  Wichtige Variablen fehlen: {', '.join(missing_vars)}")
-                else:
-                    logger.info(f"✅ Alle wichtigen Variablen vorhanden")
-                
-                # WICHTIG: Nutze twilio.outbound_call mit DIRECT DICT
-                # Nur Dynamic Variables werden gesendet - Dashboard-Prompt bleibt unverändert!
-                # ElevenLabs ersetzt automatisch {{variable_name}} Platzhalter im Dashboard-Prompt
-                response = client.conversational_ai.twilio.outbound_call(
-                    agent_id=Config.ELEVENLABS_AGENT_ID,
-                    agent_phone_number_id=agent_phone_number_id,
-                    to_number=to_number,
-                    conversation_initiation_client_data={
-                        "dynamic_variables": dynamic_vars
-                        # KEIN conversation_config_override → Dashboard-Prompt bleibt aktiv!
-                        # ElevenLabs ersetzt {{campaignlocation_label}}, {{campaignrole_title}}, etc. automatisch
-                    }
-                )
-                
-                # Parse Response
-                conversation_id = getattr(response, 'conversation_id', 'unknown')
-                call_status = getattr(response, 'status', 'initiated')
-                
-                logger.info(f"✅ Call erfolgreich gestartet!")
-                logger.info(f"📞 Conversation ID: {conversation_id}")
-                logger.info(f"📊 Status: {call_status}")
-                logger.info(f"{'='*70}\n")
-                
-                # Response zurück an HOC
-                return jsonify({
-                    "status": "success",
-                    "method": "twilio_outbound_call",
-                    "message": "Twilio outbound call initiated successfully with Dashboard Workflows + Dynamic Variables",
-                    "data": {
-                        "campaign_id": campaign_id,
-                        "candidate": f"{first_name} {last_name}",
-                        "company": company_name,
-                        "to_number": to_number,
-                        "conversation_id": conversation_id,
-                        "call_status": call_status,
-                        "questionnaire_loaded": bool(questionnaire),
-                        "timestamp": datetime.now().isoformat(),
-                        "dynamic_variables_count": len(dynamic_vars),
-                        "dynamic_variables_filled": list(dynamic_vars.keys()),
-                        "workflow_mode": "dashboard_workflows",
-                        "note": "Using ElevenLabs Dashboard Workflows with injected Dynamic Variables"
-                    }
-                }), 200
-                
-            except Exception as api_error:
-                logger.error(f"❌ ElevenLabs API Error: {api_error}", exc_info=True)
-                return jsonify({
-                    "status": "error",
-                    "error": "API call failed",
-                    "message": str(api_error),
-                    "timestamp": datetime.now().isoformat()
-                }), 500
+            return jsonify({
+                "status": "accepted",
+                "job_id": job_id,
+                "status_url": f"/webhook/jobs/{job_id}",
+                "campaign_id": campaign_id,
+                "total": len(candidates),
+                "sync_max_candidates": sync_limit,
+                "timestamp": datetime.now().isoformat()
+            }), 202
         
-        else:
-            # 🔗 OPTION B: WEBRTC LINK (Fallback)
-            logger.info(f"\n{'='*70}")
-            logger.info(f"🔗 ERSTELLE WEBRTC LINK (Kein to_number vorhanden)")
-            logger.info(f"{'='*70}")
-            
-            # WebRTC Links nutzen Dashboard-Konfiguration + Dynamic Variables via URL
-            logger.info("ℹ️  WebRTC Links nutzen Dashboard-Konfiguration mit Dynamic Variables")
-            
-            try:
-                # ✨ NEU: Extrahiere ALLE Dynamic Variables aus Questionnaire
-                dynamic_vars_full = extract_dynamic_variables(questionnaire, company_name, first_name, last_name)
-                
-                # Füge Dynamic Variables als URL-Parameter hinzu
-                # WICHTIG: var_ Prefix für ElevenLabs Public Talk-to Page!
-                # Siehe: https://elevenlabs.io/docs/agents-platform/customization/personalization/dynamic-variables
-                dynamic_vars = {
-                    'agent_id': Config.ELEVENLABS_AGENT_ID,
-                }
-                
-                # Füge alle Variablen mit var_ Prefix hinzu
-                for key, value in dynamic_vars_full.items():
-                    if value:  # Nur gefüllte Variablen
-                        # Kürze große Variablen für URL (questionnaire_context, questions)
-                        if key in ['questionnaire_context', 'questions'] and len(str(value)) > 500:
-                            value = str(value)[:500] + "..."
-                        dynamic_vars[f'var_{key}'] = value
-                
-                # Baue BROWSER-URL für ElevenLabs Public Talk-to Page
-                param_string = urlencode(dynamic_vars)
-                browser_url = f"https://elevenlabs.io/app/talk-to?{param_string}"
-                
-                logger.info(f"✅ WebRTC Browser-Link mit Dynamic Variables erstellt!")
-                logger.info(f"📊 Dynamic Variables gefüllt: {len([k for k in dynamic_vars.keys() if k.startswith('var_')])}")
-                logger.info(f"   • agent_id: {Config.ELEVENLABS_AGENT_ID}")
-                for key in sorted([k for k in dynamic_vars.keys() if k.startswith('var_')]):
-                    value_preview = str(dynamic_vars[key])[:40] if dynamic_vars[key] else "(leer)"
-                    logger.info(f"   • {key}: {value_preview}...")
-                logger.info(f"🔗 Browser URL: {browser_url[:120]}...")
-                logger.info(f"📏 URL-Länge: {len(browser_url)} Zeichen")
-                logger.info(f"{'='*70}\n")
-                
-                return jsonify({
-                    "status": "success",
-                    "method": "webrtc_browser_link",
-                    "message": "WebRTC browser link created successfully with dynamic variables",
-                    "data": {
-                        "campaign_id": campaign_id,
-                        "candidate": f"{first_name} {last_name}",
-                        "company": company_name,
-                        "browser_url": browser_url,
-                        "questionnaire_loaded": bool(questionnaire),
-                        "questions_count": len(questionnaire.get('questions', [])) if questionnaire else 0,
-                        "timestamp": datetime.now().isoformat(),
-                        "dynamic_variables_filled": list(dynamic_vars.keys()),
-                        "note": "Browser-URL can be opened directly in any web browser"
-                    }
-                }), 200
-                    
-            except Exception as api_error:
-                logger.error(f"❌ WebRTC Link Error: {api_error}", exc_info=True)
-                
-                return jsonify({
-                    "status": "error",
-                    "error": "WebRTC Link creation failed",
-                    "message": str(api_error),
-                    "timestamp": datetime.now().isoformat()
-                }), 500
+        questionnaire, futures = start_batch(campaign_id, company_name, agent_phone_number_id, candidates)
+        
+        stream = data.get('stream') is True or 'application/x-ndjson' in request.headers.get('Accept', '')
+        
+        if stream:
+            def generate():
+                results = []
+                for future in as_completed(futures):
+                    result = future.result()
+                    results.append(result)
+                    yield json.dumps(result, ensure_ascii=False) + "\n"
+                yield json.dumps(batch_summary(campaign_id, questionnaire, results), ensure_ascii=False) + "\n"
+            
+            return Response(stream_with_context(generate()), status=200, mimetype='application/x-ndjson')
+        
+        response_body = batch_result(campaign_id, questionnaire, [future.result() for future in futures])
+        return jsonify(response_body), 200
         
     except Exception as e:
-        logger.error(f"❌ Fehler beim Call: {e}", exc_info=True)
+        logger.error(f"❌ Fehler beim Batch: {e}", exc_info=True)
         
         return jsonify({
             "status": "error",
@@ -1382,19 +2672,111 @@ def trigger_outbound_call():
         }), 500
 
 
-@app.route('/webhook/health', methods=['GET'])
-def health_check():
-    """Health Check Endpoint"""
+@app.route('/webhook/jobs/<job_id>', methods=['GET'])
+@require_api_key
+def get_job_status(job_id):
+    """Status eines asynchron verarbeiteten Call-Requests (inkl. Ergebnis nach Abschluss)"""
+    job = job_store.get(job_id)
+    
+    if not job:
+        return jsonify({
+            "status": "error",
+            "error": "Job not found",
+            "job_id": job_id
+        }), 404
+    
     return jsonify({
+        "status": "success",
+        "job": job,
+        "timestamp": datetime.now().isoformat()
+    }), 200
+
+
+def health_status() -> dict:
+    """Liefert den Health-Check-Body"""
+    return {
         "status": "healthy",
         "service": "Sellcruiting Agent Webhook",
         "agent_id": Config.ELEVENLABS_AGENT_ID,
         "hirings_api_url": Config.HIRINGS_API_URL,
         "timestamp": datetime.now().isoformat()
-    }), 200
+    }
+
+
+@app.route('/webhook/health', methods=['GET'])
+def health_check():
+    """Health Check Endpoint"""
+    return jsonify(health_status()), 200
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus-Metriken (aggregiert über alle gunicorn Worker, siehe gunicorn.conf.py)"""
+    payload, content_type = metrics.render()
+    return Response(payload, status=200, content_type=content_type)
+
+
+def get_campaign_location(questionnaire: dict) -> str:
+    """Liefert den Arbeitsort aus dem Questionnaire (für die First Message)"""
+    return (
+        questionnaire.get('campaignlocation_label', '') or 
+        questionnaire.get('work_location', '') or 
+        questionnaire.get('location', '') or
+        (f"{questionnaire.get('work_location', '')} {questionnaire.get('work_location_postal_code', '')}".strip())
+    )
+
+
+def build_webrtc_agent_override(questionnaire: dict, company_name: str, first_name: str, last_name: str,
+                                override_prompt: str = None) -> tuple:
+    """
+    Baut Prompt und First Message für eine WebRTC-Conversation
+    
+    Returns:
+        Tuple (enhanced_prompt, first_message)
+    """
+    enhanced_prompt = override_prompt if override_prompt else build_enhanced_prompt(
+        questionnaire=questionnaire,
+        company_name=company_name,
+        first_name=first_name,
+        last_name=last_name
+    )
+    first_message = build_first_message(company_name, first_name, last_name, get_campaign_location(questionnaire))
+    return enhanced_prompt, first_message
+
+
+def build_webrtc_fallback_response(questionnaire: dict, company_name: str, first_name: str, last_name: str) -> dict:
+    """
+    Baut den Fallback-Link (Talk-to Page mit URL-Parametern), falls keine signierte URL erstellt werden konnte
+    
+    Returns:
+        Response-Body für create-webrtc-link
+    """
+    try:
+        with open('dashboard_prompt.txt', 'r', encoding='utf-8') as f:
+            _ = f.read()
+    except Exception:
+        pass
+    questionnaire_context = build_questionnaire_context(questionnaire, company_name, first_name, last_name)
+    params = {
+        'agent_id': Config.ELEVENLABS_AGENT_ID,
+        'companyname': company_name,
+        'candidatefirst_name': first_name,
+        'candidatelast_name': last_name,
+        'questionnaire_context': questionnaire_context
+    }
+    signed_url = f"https://eu.residency.elevenlabs.io/app/talk-to?{urlencode(params)}"
+    return {
+        "status": "success",
+        "conversation_id": None,
+        "signed_url": signed_url,
+        "fallback": True,
+        "questionnaire_loaded": bool(questionnaire),
+        "timestamp": datetime.now().isoformat()
+    }
 
 
 @app.route('/webhook/create-webrtc-link', methods=['POST'])
+@track_timing("create-webrtc-link")
 @require_api_key
 def create_webrtc_link():
     try:
@@ -1419,20 +2801,11 @@ def create_webrtc_link():
         last_name = data['candidate_last_name']
         override_prompt = data.get('override_prompt')
 
-        questionnaire = fetch_questionnaire_context(campaign_id)
-        enhanced_prompt = override_prompt if override_prompt else build_enhanced_prompt(
-            questionnaire=questionnaire,
-            company_name=company_name,
-            first_name=first_name,
-            last_name=last_name
+        with timing.stage("questionnaire"):
+            questionnaire = fetch_questionnaire_context(campaign_id)
+        enhanced_prompt, first_message = build_webrtc_agent_override(
+            questionnaire, company_name, first_name, last_name, override_prompt
         )
-        campaign_location = (
-            questionnaire.get('campaignlocation_label', '') or 
-            questionnaire.get('work_location', '') or 
-            questionnaire.get('location', '') or
-            (f"{questionnaire.get('work_location', '')} {questionnaire.get('work_location_postal_code', '')}".strip())
-        )
-        first_message = build_first_message(company_name, first_name, last_name, campaign_location)
 
         try:
             conv = client.conversational_ai.conversations.create(
@@ -1457,28 +2830,7 @@ def create_webrtc_link():
             else:
                 raise AttributeError('get_signed_url not available')
         except Exception:
-            try:
-                with open('dashboard_prompt.txt', 'r', encoding='utf-8') as f:
-                    _ = f.read()
-            except Exception:
-                pass
-            questionnaire_context = build_questionnaire_context(questionnaire, company_name, first_name, last_name)
-            params = {
-                'agent_id': Config.ELEVENLABS_AGENT_ID,
-                'companyname': company_name,
-                'candidatefirst_name': first_name,
-                'candidatelast_name': last_name,
-                'questionnaire_context': questionnaire_context
-            }
-            signed_url = f"https://eu.residency.elevenlabs.io/app/talk-to?{urlencode(params)}"
-            return jsonify({
-                "status": "success",
-                "conversation_id": None,
-                "signed_url": signed_url,
-                "fallback": True,
-                "questionnaire_loaded": bool(questionnaire),
-                "timestamp": datetime.now().isoformat()
-            }), 200
+            return jsonify(build_webrtc_fallback_response(questionnaire, company_name, first_name, last_name)), 200
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -1486,7 +2838,149 @@ def create_webrtc_link():
             "timestamp": datetime.now().isoformat()
         }), 500
 
+
+# Minimale Personalisierung für unbekannte Calls (nicht in der Call-Registry) und bei Fehlern
+PERSONALIZATION_FALLBACK_RESPONSE = {
+    "type": "conversation_initiation_client_data",
+    "dynamic_variables": {
+        "candidatefirst_name": "Kandidat",
+        "candidatelast_name": "",
+        "companyname": "Unser Unternehmen",
+        "questionnaire_context": ""
+    },
+    "conversation_config_override": {
+        "agent": {
+            "first_message": "Guten Tag, wie kann ich Ihnen helfen?",
+            "language": "de"
+        }
+    }
+}
+
+
+def resolve_personalization_candidate(data: dict) -> dict:
+    """
+    Ermittelt Kampagne und Kandidat für einen eingehenden Twilio-Call
+    
+    Args:
+        data: Request-Body von ElevenLabs (caller_id, agent_id, called_number, call_sid)
+        
+    Returns:
+        Dict mit campaign_id, first_name, last_name, company_name (matched_key: Treffer in der Call-Registry,
+        personalization: vorberechneter Response-Body oder None) oder None, falls der Call unbekannt ist
+    """
+    # Lokaler Lookup in der Call-Registry (Call-SID, sonst Anrufer- bzw. angerufene Nummer)
+    try:
+        candidate = call_registry.lookup(
+            call_sid=data.get('call_sid'),
+            numbers=(data.get('caller_id'), data.get('called_number'))
+        )
+    except Exception as e:
+        logger.error(f"❌ Call-Registry nicht lesbar: {e}")
+        candidate = None
+    
+    if candidate is not None:
+        if not Config.PERSONALIZATION_PRECOMPUTE:
+            candidate['personalization'] = None
+        return candidate
+    
+    logger.warning(f"⚠️  Kein registrierter Call für call_sid={data.get('call_sid')} - neutrale Begrüßung")
+    return None
+
+
+def build_personalization_response(questionnaire: dict, company_name: str, first_name: str, last_name: str,
+                                   campaign_id: int = None) -> dict:
+    """
+    Baut conversation_initiation_client_data für den Twilio Personalization Webhook
+    
+    Args:
+        questionnaire: Questionnaire-Daten aus HOC (leer → minimaler Kontext)
+        company_name: Firmenname
+        first_name: Vorname Kandidat
+        last_name: Nachname Kandidat
+        campaign_id: Campaign ID (nur für Logs)
+        
+    Returns:
+        Response-Body im Format von ElevenLabs
+    """
+    if not questionnaire:
+        logger.warning(f"⚠️  Kein Questionnaire für campaign_id {campaign_id} gefunden!")
+        # Fallback: Minimaler Kontext
+        questionnaire = {
+            'campaign_name': 'Allgemeine Bewerbung',
+            'work_location': 'Berlin',
+            'questions_list': []
+        }
+    
+    # Baue Enhanced Prompt mit Questionnaire-Kontext
+    enhanced_prompt = build_enhanced_prompt(
+        questionnaire=questionnaire,
+        company_name=company_name,
+        first_name=first_name,
+        last_name=last_name
+    )
+    
+    # Baue Questionnaire-Kontext für Dynamic Variables
+    questionnaire_context = build_questionnaire_context(
+        questionnaire=questionnaire,
+        company_name=company_name,
+        first_name=first_name,
+        last_name=last_name
+    )
+    
+    first_message = build_first_message(
+        company_name=company_name,
+        first_name=first_name,
+        last_name=last_name,
+        campaign_location=get_campaign_location(questionnaire)
+    )
+    
+    if structured_logging.verbose:
+        logger.info(f"📝 Enhanced Prompt: {len(enhanced_prompt)} Zeichen")
+        logger.info(f"💬 First Message: {first_message[:80]}...")
+        logger.info(f"📊 Questionnaire Context: {len(questionnaire_context)} Zeichen")
+    
+    # Baue Response im RICHTIGEN Format für ElevenLabs
+    response_data = {
+        "type": "conversation_initiation_client_data",
+        "dynamic_variables": {
+            "candidatefirst_name": first_name,
+            "candidatelast_name": last_name,
+            "companyname": company_name,
+            "questionnaire_context": questionnaire_context
+        },
+        "conversation_config_override": {
+            "agent": {
+                "prompt": {
+                    "prompt": enhanced_prompt
+                },
+                "first_message": first_message,
+                "language": "de"
+            }
+        }
+    }
+    
+    if structured_logging.verbose:
+        logger.info(f"✅ Personalisierte Daten erstellt!")
+        logger.info(f"{'='*70}\n")
+    
+    return response_data
+
+
+def log_personalization_event(data: dict, candidate: dict) -> None:
+    """Structured-Event für einen Personalization-Webhook (Payload nur in der Stichprobe)"""
+    fields = {
+        "campaign_id": candidate['campaign_id'],
+        "call_sid": data.get('call_sid'),
+        "matched_key": candidate.get('matched_key'),
+        "precomputed": candidate.get('personalization') is not None,
+    }
+    if structured_logging.sample_preview():
+        fields["payload"] = data
+    structured_logging.event("personalization.received", **fields)
+
+
 @app.route('/webhook/twilio-personalization', methods=['POST'])
+@track_timing("twilio-personalization")
 @require_api_key
 def twilio_personalization():
     """
@@ -1511,103 +3005,43 @@ def twilio_personalization():
     }
     """
     try:
-        logger.info(f"\n{'='*70}")
-        logger.info(f"🔔 TWILIO PERSONALIZATION WEBHOOK AUFGERUFEN")
-        logger.info(f"{'='*70}")
-        
         # Parse incoming data
         data = request.get_json()
-        logger.info(f"📥 Empfangene Daten: {json.dumps(data, indent=2)}")
         
-        caller_id = data.get('caller_id')  # z.B. +4915204465582
-        agent_id = data.get('agent_id')
-        called_number = data.get('called_number')
-        call_sid = data.get('call_sid')
+        if structured_logging.verbose:
+            logger.info(f"\n{'='*70}")
+            logger.info(f"🔔 TWILIO PERSONALIZATION WEBHOOK AUFGERUFEN")
+            logger.info(f"{'='*70}")
+            logger.info(f"📥 Empfangene Daten: {json.dumps(data, indent=2)}")
         
-        # TODO: Lookup campaign_id from HOC based on caller_id
-        # Für jetzt: Nutze eine Test campaign_id
-        campaign_id = 804  # Beispiel: Urban Kita gGmbH
+        caller_id = data.get('caller_id')  # z.B. +4915204465582
         
-        # Hole Kandidaten-Daten (in Produktion: aus Datenbank via caller_id)
-        # Für jetzt: Beispiel-Daten
-        first_name = "Max"
-        last_name = "Mustermann"
-        company_name = "Urban Kita gGmbH"
+        candidate = resolve_personalization_candidate(data)
+        if candidate is None:
+            # Unbekannter oder abgelaufener Call: kein erfundener Kandidat, kein HOC-Abruf im Zeitfenster von ElevenLabs
+            return jsonify(PERSONALIZATION_FALLBACK_RESPONSE), 200
+        campaign_id = candidate['campaign_id']
+        
+        if structured_logging.verbose:
+            logger.info(f"📞 Anruf von: {caller_id}")
+            logger.info(f"👤 Kandidat: {candidate['first_name']} {candidate['last_name']}")
+            logger.info(f"🏢 Firma: {candidate['company_name']}")
+            logger.info(f"📋 Campaign ID: {campaign_id}")
+        else:
+            log_personalization_event(data, candidate)
         
-        logger.info(f"📞 Anruf von: {caller_id}")
-        logger.info(f"👤 Kandidat: {first_name} {last_name}")
-        logger.info(f"🏢 Firma: {company_name}")
-        logger.info(f"📋 Campaign ID: {campaign_id}")
+        # Beim Call-Start vorberechnet: nur den gespeicherten Body ausliefern (kein HOC, kein Prompt-Bau)
+        if candidate['personalization'] is not None:
+            return Response(candidate['personalization'], status=200, mimetype='application/json')
         
         # Hole Questionnaire-Kontext von HOC
-        questionnaire = fetch_questionnaire_context(campaign_id)
-        
-        if not questionnaire:
-            logger.warning(f"⚠️  Kein Questionnaire für campaign_id {campaign_id} gefunden!")
-            # Fallback: Minimaler Kontext
-            questionnaire = {
-                'campaign_name': 'Allgemeine Bewerbung',
-                'work_location': 'Berlin',
-                'questions_list': []
-            }
-        
-        # Baue Enhanced Prompt mit Questionnaire-Kontext
-        enhanced_prompt = build_enhanced_prompt(
-            questionnaire=questionnaire,
-            company_name=company_name,
-            first_name=first_name,
-            last_name=last_name
-        )
-        
-        # Baue Questionnaire-Kontext für Dynamic Variables
-        questionnaire_context = build_questionnaire_context(
-            questionnaire=questionnaire,
-            company_name=company_name,
-            first_name=first_name,
-            last_name=last_name
-        )
-        
-        # Extrahiere campaign_location für First Message
-        campaign_location = (
-            questionnaire.get('campaignlocation_label', '') or 
-            questionnaire.get('work_location', '') or 
-            questionnaire.get('location', '') or
-            (f"{questionnaire.get('work_location', '')} {questionnaire.get('work_location_postal_code', '')}".strip())
-        )
-        
-        first_message = build_first_message(
-            company_name=company_name,
-            first_name=first_name,
-            last_name=last_name,
-            campaign_location=campaign_location
-        )
-        
-        logger.info(f"📝 Enhanced Prompt: {len(enhanced_prompt)} Zeichen")
-        logger.info(f"💬 First Message: {first_message[:80]}...")
-        logger.info(f"📊 Questionnaire Context: {len(questionnaire_context)} Zeichen")
-        
-        # Baue Response im RICHTIGEN Format für ElevenLabs
-        response_data = {
-            "type": "conversation_initiation_client_data",
-            "dynamic_variables": {
-                "candidatefirst_name": first_name,
-                "candidatelast_name": last_name,
-                "companyname": company_name,
-                "questionnaire_context": questionnaire_context
-            },
-            "conversation_config_override": {
-                "agent": {
-                    "prompt": {
-                        "prompt": enhanced_prompt
-                    },
-                    "first_message": first_message,
-                    "language": "de"
-                }
-            }
-        }
+        with timing.stage("questionnaire"):
+            questionnaire = fetch_questionnaire_context(campaign_id)
         
-        logger.info(f"✅ Personalisierte Daten erstellt!")
-        logger.info(f"{'='*70}\n")
+        with timing.stage("context"):
+            response_data = build_personalization_response(
+                questionnaire, candidate['company_name'], candidate['first_name'], candidate['last_name'], campaign_id
+            )
         
         return jsonify(response_data), 200
         
@@ -1615,33 +3049,78 @@ def twilio_personalization():
         logger.error(f"❌ Fehler in Twilio Personalization: {e}", exc_info=True)
         
         # Fallback: Minimale Response
-        return jsonify({
-            "type": "conversation_initiation_client_data",
-            "dynamic_variables": {
-                "candidatefirst_name": "Kandidat",
-                "candidatelast_name": "",
-                "companyname": "Unser Unternehmen",
-                "questionnaire_context": ""
-            },
-            "conversation_config_override": {
-                "agent": {
-                    "first_message": "Guten Tag, wie kann ich Ihnen helfen?",
-                    "language": "de"
-                }
-            }
-        }), 200
+        return jsonify(PERSONALIZATION_FALLBACK_RESPONSE), 200
+
+
+def record_twilio_status(data: dict) -> None:
+    """
+    Verarbeitet einen Twilio Status Callback: Call-Lifecycle und Freigabe des Active-Call-Slots
+    
+    Args:
+        data: Form-Parameter des Callbacks (CallSid, CallStatus, Timestamp, ...)
+    """
+    call_event_store.record_status(data)
+    if data.get('CallStatus') in FINAL_STATUSES:
+        active_calls.finish_call(data.get('CallSid'))
+
+
+def twilio_signed_url(url: str, forwarded_proto: str = None) -> str:
+    """
+    URL, die Twilio für die X-Twilio-Signature signiert hat
+    
+    Args:
+        url: URL des Requests, wie der Server sie sieht
+        forwarded_proto: X-Forwarded-Proto des TLS-Proxys (falls vorhanden)
+        
+    Returns:
+        Öffentliche URL (Schema und Host aus WEBHOOK_PUBLIC_URL bzw. X-Forwarded-Proto, Pfad und Query aus url)
+    """
+    parsed = urlparse(url)
+    if Config.WEBHOOK_PUBLIC_URL:
+        public = urlparse(Config.WEBHOOK_PUBLIC_URL)
+        return parsed._replace(scheme=public.scheme, netloc=public.netloc).geturl()
+    if forwarded_proto:
+        return parsed._replace(scheme=forwarded_proto.split(",")[0].strip()).geturl()
+    return url
+
+
+def is_valid_twilio_request(url: str, params: dict, signature: str) -> bool:
+    """
+    Prüft die X-Twilio-Signature eines Twilio Callbacks
+    
+    Args:
+        url: Signierte URL (siehe twilio_signed_url)
+        params: Form-Parameter des Requests
+        signature: Wert des Headers X-Twilio-Signature
+        
+    Returns:
+        True, wenn die Signatur zum TWILIO_AUTH_TOKEN passt (oder die Prüfung abgeschaltet ist)
+    """
+    if not Config.TWILIO_VALIDATE_SIGNATURE:
+        return True
+    if not Config.TWILIO_AUTH_TOKEN:
+        logger.error("❌ TWILIO_AUTH_TOKEN fehlt - Twilio Callbacks werden abgelehnt (oder TWILIO_VALIDATE_SIGNATURE=false)")
+        return False
+    return bool(signature) and RequestValidator(Config.TWILIO_AUTH_TOKEN).validate(url, params, signature)
 
 
 @app.route('/webhook/twilio-status', methods=['POST'])
 def twilio_status():
     """
     Twilio Status Callback Endpoint
-    Empfängt Status-Updates von Twilio Calls
+    Empfängt Status-Updates von Twilio Calls (initiated, ringing, answered, completed)
+    und reiht sie in den Call-Lifecycle ein (geschrieben im Hintergrund).
+    Nur mit gültiger X-Twilio-Signature - sonst könnte jeder Calls als beendet melden.
     """
+    data = request.form.to_dict()
+    url = twilio_signed_url(request.url, request.headers.get('X-Forwarded-Proto'))
+    if not is_valid_twilio_request(url, data, request.headers.get('X-Twilio-Signature', '')):
+        logger.warning(f"🚫 Twilio Status Callback ohne gültige Signatur abgelehnt (von {request.remote_addr})")
+        return jsonify({"status": "error", "error": "Invalid Twilio signature"}), 403
+    
     try:
-        data = request.form.to_dict()
-        logger.info(f"📞 Twilio Status Update: {data.get('CallStatus', 'unknown')}")
-        logger.info(f"   Call SID: {data.get('CallSid', 'unknown')}")
+        logger.info(f"📞 Twilio Status Update: {data.get('CallStatus', 'unknown')} (Call SID: {data.get('CallSid', 'unknown')})")
+        record_twilio_status(data)
         
         return jsonify({"status": "received"}), 200
     except Exception as e:
@@ -1649,10 +3128,251 @@ def twilio_status():
         return jsonify({"status": "error"}), 200
 
 
+@app.route('/webhook/admin/stats', methods=['GET'])
+@require_api_key
+def admin_stats():
+    """Admin Endpoint: Cache-, Connection-Pool- und Governor-Statistiken dieses Worker-Prozesses"""
+    return jsonify({
+        "status": "success",
+        "caches": {
+            "campaign_variables": campaign_variables_cache.stats(),
+            "questionnaires": questionnaire_cache.stats(),
+            "llm_results": llm_result_cache.stats()
+        },
+        "http_pools": http_pool.pool_stats(),
+        "governors": {
+            "dial": dial_governor.stats(),
+            "active_calls": active_calls.stats(),
+            "openai": openai_governor.stats()
+        },
+        "call_registry": call_registry.stats(),
+        "call_events": call_event_store.stats(),
+        "logging": {
+            "mode": Config.LOG_MODE,
+            "dropped_records": structured_logging.dropped_records()
+        },
+        "timestamp": datetime.now().isoformat()
+    }), 200
+
+
+@app.route('/webhook/admin/campaigns/<int:campaign_id>/invalidate-cache', methods=['POST'])
+@require_api_key
+def admin_invalidate_campaign_cache(campaign_id):
+    """
+    Admin Endpoint: Verwirft gecachten Questionnaire und alle gecachten Variablen einer Kampagne
+    
+    Die In-Memory-Caches dieses Workers werden direkt geleert; die übrigen Worker
+    erkennen die Invalidierung beim nächsten Lesen an der erhöhten Campaign-Generation.
+    """
+    generation = campaign_generations.bump(campaign_id)
+    
+    # Fragen-Hashes der Kampagne: auch die zugehörigen LLM-Antworten verwerfen (erzwingt neue Extraktion)
+    fingerprints = set()
+    
+    def matches_campaign(key):
+        if key[0] != campaign_id:
+            return False
+        fingerprints.add(key[1])
+        return True
+    
+    removed = campaign_variables_cache.invalidate(matches_campaign)
+    cached_questionnaire = questionnaire_cache.pop(campaign_id)
+    if cached_questionnaire is not None:
+        removed += 1
+        fingerprints.add(questionnaire_fingerprint(cached_questionnaire.get("questionnaire")))
+    removed += llm_result_cache.invalidate_questions(fingerprints)
+    removed += call_registry.discard_personalizations(campaign_id)
+    logger.info(f"🗑️ Campaign-Cache für Campaign {campaign_id} invalidiert ({removed} Einträge, Generation {generation})")
+    
+    return jsonify({
+        "status": "success",
+        "campaign_id": campaign_id,
+        "invalidated_entries": removed,
+        "generation": generation,
+        "timestamp": datetime.now().isoformat()
+    }), 200
+
+
+def warm_campaign(campaign_id: int, force_refresh: bool = False) -> dict:
+    """
+    Lädt Questionnaire und AI-Variablen einer Kampagne in die Caches (vor dem ersten Call)
+    
+    Füllt Questionnaire-Cache, Campaign-Cache, LLM-Cache und die kampagnenweiten
+    Prompt-Texte am QuestionnaireIndex. Die In-Memory-Caches gelten pro Worker-Prozess,
+    der LLM-Cache für alle Worker.
+    
+    Args:
+        campaign_id: Campaign ID
+        force_refresh: Questionnaire bei HOC revalidieren, auch wenn er frisch im Cache liegt
+        
+    Returns:
+        Warm-Status der Kampagne (status: warm, partial, no_questions, not_found oder error)
+    """
+    started = time.perf_counter()
+    result = {"campaign_id": campaign_id}
+    
+    try:
+        questionnaire = fetch_questionnaire_context(campaign_id, force_refresh=force_refresh)
+        result["questionnaire_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        
+        questions = questionnaire.get('questions', []) if questionnaire else []
+        result["questions"] = len(questions)
+        
+        if not questionnaire:
+            result["status"] = "not_found"
+        elif not questions:
+            result["status"] = "no_questions"
+        else:
+            ai_started = time.perf_counter()
+            cache_key, cached = lookup_campaign_variables(questionnaire, campaign_id)
+            failed = set()
+            if cached is None:
+                store_campaign_variables(cache_key, extract_ai_variables(questions, failed=failed), failed)
+            result["ai_ms"] = round((time.perf_counter() - ai_started) * 1000, 1)
+            result["variables_cached"] = cached is not None
+            
+            # Kampagnenweite Prompt-Texte (questions, gate, preference, Kontext-Body)
+            build_questions_list(questionnaire)
+            build_gate_questions(questionnaire)
+            build_preference_questions(questionnaire)
+            prompt_templates.render_questionnaire_context_body(get_questionnaire_index(questionnaire))
+            
+            if failed:
+                result["status"] = "partial"
+                result["failed_variables"] = sorted(failed)
+            else:
+                result["status"] = "warm"
+    except Exception as e:
+        logger.error(f"❌ Pre-Warming für Campaign {campaign_id} fehlgeschlagen: {e}", exc_info=True)
+        result["status"] = "error"
+        result["error"] = str(e)
+    
+    result["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(f"🔥 Pre-Warming Campaign {campaign_id}: {result['status']} ({result['duration_ms']:.0f}ms)")
+    return result
+
+
+def warm_campaigns(campaign_ids: list, force_refresh: bool = False) -> dict:
+    """
+    Wärmt mehrere Kampagnen parallel vor (PREWARM_CONCURRENCY gleichzeitig)
+    
+    Args:
+        campaign_ids: Liste von Campaign IDs
+        force_refresh: Questionnaires bei HOC revalidieren
+        
+    Returns:
+        Zusammenfassung mit Warm-Status und Dauer pro Kampagne
+    """
+    started = time.perf_counter()
+    futures = [prewarm_executor.submit(warm_campaign, campaign_id, force_refresh) for campaign_id in campaign_ids]
+    results = [future.result() for future in futures]
+    
+    warm = len([r for r in results if r['status'] == 'warm'])
+    return {
+        "status": "success" if warm == len(results) else ("partial" if warm else "error"),
+        "total": len(results),
+        "warm": warm,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        "campaigns": results,
+        **prewarm_scope(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+def prewarm_scope() -> dict:
+    """
+    Beschreibt, welche Caches ein Pre-Warming erreicht (für die Antwort an den Aufrufer)
+    
+    Questionnaire-, Campaign-Cache und Prompt-Texte liegen im Speicher des Workers, der
+    das Pre-Warming ausführt; die anderen gunicorn Worker teilen nur den LLM-Cache (SQLite).
+    Deren erster Call lädt den Questionnaire also noch von HOC, die AI-Extraktion ist ein Cache-Hit.
+    """
+    return {
+        "worker_pid": os.getpid(),
+        "shared_caches": ["llm_results"],
+        "worker_local_caches": ["questionnaire", "campaign_variables", "prompt_texts"],
+        "scope_note": "Questionnaire and campaign caches are warmed in this worker only; "
+                      "other workers reuse the shared LLM cache and load the questionnaire on their first call"
+    }
+
+
+def run_prewarm_job(job_id: str, campaign_ids: list, force_refresh: bool = False) -> None:
+    """Führt ein eingereihtes Pre-Warming im Dispatch-Worker-Pool aus"""
+    try:
+        job_store.mark_running(job_id)
+        job_store.finish(job_id, 200, warm_campaigns(campaign_ids, force_refresh))
+    except Exception as e:
+        logger.error(f"❌ Pre-Warming Job {job_id} fehlgeschlagen: {e}", exc_info=True)
+        job_store.fail(job_id, str(e))
+
+
+@app.route('/webhook/admin/campaigns/prewarm', methods=['POST'])
+@require_api_key
+def admin_prewarm_campaigns():
+    """
+    Admin Endpoint: Lädt Questionnaire und AI-Variablen von Kampagnen vor dem ersten Call
+    (z.B. von HOC oder einem Scheduler aufgerufen, sobald eine Kampagne live geht)
+    
+    Erwartet JSON:
+    {
+        "campaign_ids": [123, 456],
+        "refresh": false (optional - Questionnaires bei HOC revalidieren),
+        "wait": false (optional - true: synchron, Ergebnis direkt in der Antwort)
+    }
+    
+    Ohne wait: 202 + Job-ID, Warm-Status pro Kampagne unter /webhook/jobs/<job_id>
+    
+    Questionnaire- und Campaign-Cache werden nur in dem Worker gefüllt, der das Pre-Warming
+    ausführt (worker_pid in der Antwort); die anderen Worker profitieren über den LLM-Cache.
+    """
+    data = request.get_json(force=True, silent=True)
+    campaign_ids = data.get('campaign_ids') if isinstance(data, dict) else None
+    
+    if not isinstance(campaign_ids, list) or not campaign_ids:
+        return jsonify({
+            "error": "Missing required fields",
+            "missing": ["campaign_ids"]
+        }), 400
+    
+    try:
+        # Reihenfolge beibehalten, Duplikate entfernen
+        campaign_ids = list(dict.fromkeys(int(campaign_id) for campaign_id in campaign_ids))
+    except (TypeError, ValueError):
+        return jsonify({
+            "error": "Invalid campaign_ids",
+            "message": "campaign_ids must be a list of integers"
+        }), 400
+    
+    if len(campaign_ids) > Config.PREWARM_MAX_CAMPAIGNS:
+        return jsonify({
+            "error": "Too many campaigns",
+            "message": f"Maximum {Config.PREWARM_MAX_CAMPAIGNS} campaigns per request, got {len(campaign_ids)}"
+        }), 400
+    
+    force_refresh = data.get('refresh') is True
+    
+    if data.get('wait') is True:
+        return jsonify(warm_campaigns(campaign_ids, force_refresh)), 200
+    
+    job_id = job_store.create("campaign-prewarm", {"campaign_ids": campaign_ids, "refresh": force_refresh})
+    call_dispatch_executor.submit(run_prewarm_job, job_id, campaign_ids, force_refresh)
+    logger.info(f"📥 Pre-Warming für {len(campaign_ids)} Kampagnen als Job {job_id} eingereiht")
+    
+    return jsonify({
+        "status": "accepted",
+        "job_id": job_id,
+        "status_url": f"/webhook/jobs/{job_id}",
+        "campaign_ids": campaign_ids,
+        **prewarm_scope(),
+        "timestamp": datetime.now().isoformat()
+    }), 202
+
+
 @app.route('/webhook/test-questionnaire/<int:campaign_id>', methods=['GET'])
 def test_questionnaire_fetch(campaign_id):
-    """Test-Endpoint um Questionnaire-Abruf zu testen"""
-    questionnaire = fetch_questionnaire_context(campaign_id)
+    """Test-Endpoint um Questionnaire-Abruf zu testen (?refresh=1 umgeht den Cache)"""
+    force_refresh = request.args.get('refresh', '').lower() in ('1', 'true', 'yes')
+    questionnaire = fetch_questionnaire_context(campaign_id, force_refresh=force_refresh)
     
     if questionnaire:
         return jsonify({
@@ -1668,6 +3388,38 @@ def test_questionnaire_fetch(campaign_id):
         }), 404
 
 
+@app.route('/webhook/admin/call-stats', methods=['GET'])
+@require_api_key
+def admin_call_stats():
+    """
+    Admin Endpoint: Call-Kennzahlen aus den Rollups der Twilio Status Callbacks
+    
+    Query-Parameter:
+        group_by: campaign (Default) oder phone_number
+        since_hours: Zeitraum in Stunden (Default: 24)
+        value: Nur diese Campaign ID bzw. Phone-Number-ID
+    """
+    group_by = request.args.get('group_by', 'campaign')
+    try:
+        since_hours = float(request.args.get('since_hours', '24'))
+        results = call_event_store.aggregates(group_by, since=time.time() - since_hours * 3600,
+                                              value=request.args.get('value'))
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }), 400
+    
+    return jsonify({
+        "status": "success",
+        "group_by": group_by,
+        "since_hours": since_hours,
+        "results": results,
+        "timestamp": datetime.now().isoformat()
+    }), 200
+
+
 if __name__ == '__main__':
     print(f"""
 {'='*70}
@@ -1679,10 +3431,16 @@ Environment: PRODUCTION_EU (DSGVO-konform)
 HIRINGS API: {Config.HIRINGS_API_URL}/api/v1/questionnaire/<campaign_id>
 
 Endpoints:
-  POST /webhook/trigger-call                 - Empfängt Call-Request
+  POST /webhook/trigger-call                 - Empfängt Call-Request (optional async → 202 + Job-ID)
+  GET  /webhook/jobs/<job_id>                - Status eines async Call-Requests
+  POST /webhook/trigger-calls/batch          - Batch-Calls für eine Kampagne (JSON/NDJSON, große Batches → 202 + Job-ID)
   POST /webhook/twilio-personalization       - Twilio Personalization Webhook
   GET  /webhook/health                       - Health Check
   GET  /webhook/test-questionnaire/<id>     - Test Questionnaire-Abruf
+  GET  /webhook/admin/stats                  - Cache- und Pool-Statistiken
+  POST /webhook/admin/campaigns/<id>/invalidate-cache - Campaign-Cache leeren
+  POST /webhook/admin/campaigns/prewarm      - Kampagnen vorwärmen (202 + Job-ID oder wait=true)
+  GET  /webhook/admin/call-stats             - Annahmequote, Time-to-Answer, Dauer pro Kampagne/Nummer
 
 Server startet auf: http://0.0.0.0:5000
 {'='*70}